@@ -9,22 +9,36 @@ This module provides centralized agent management:
 - Agent lifecycle management
 """
 
+import asyncio
+import importlib
 import logging
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from typing import Dict, List, Any, Optional, TYPE_CHECKING
 from datetime import datetime
-from enum import Enum
 
 from app.agents.base_agent import BaseAgent, AgentStatus
-from app.agents.master_orchestrator_v2 import MasterOrchestrator
-from app.agents.data_retrieval_agent import get_data_retrieval_agent
-from app.agents.ai_analysis_agent import get_ai_analysis_agent
-from app.agents.notification_agent import get_notification_agent
-from app.agents.verification_agent import get_verification_agent
-from app.agents.matching_agent import get_matching_agent
-from app.agents.analytics_agent import get_analytics_agent
+from app.core.request_context import deadline_scope
+
+if TYPE_CHECKING:
+    from app.agents.master_orchestrator_v2 import MasterOrchestratorV2
 
 logger = logging.getLogger(__name__)
 
+ORCHESTRATOR_ID = "master-orchestrator-001"
+
+# Agent factories as "module:getter", imported on first use so that the
+# registry itself (and app startup) does not pay for every agent module
+AGENT_FACTORIES: Dict[str, str] = {
+    ORCHESTRATOR_ID: "app.agents.master_orchestrator_v2:get_master_orchestrator",
+    "data-retrieval-001": "app.agents.data_retrieval_agent:get_data_retrieval_agent",
+    "ai-analysis-001": "app.agents.ai_analysis_agent:get_ai_analysis_agent",
+    "notification-001": "app.agents.notification_agent:get_notification_agent",
+    "verification-001": "app.agents.verification_agent:get_verification_agent",
+    "matching-001": "app.agents.matching_agent:get_matching_agent",
+    "analytics-001": "app.agents.analytics_agent:get_analytics_agent",
+}
+
 
 class AgentRegistry:
     """
@@ -32,75 +46,108 @@ class AgentRegistry:
     
     Provides:
     - Agent registration and discovery
+    - Lazy agent construction: an agent module is imported and its agent
+      built on first use, or up front by warm_up()
+    - Shared LLM clients injected into every agent
     - Health monitoring
     - Task routing
     - Load balancing
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        factories: Optional[Dict[str, str]] = None,
+        anthropic_client: Any = None,
+        openai_client: Any = None
+    ):
+        self._factories: Dict[str, str] = dict(AGENT_FACTORIES if factories is None else factories)
         self._agents: Dict[str, BaseAgent] = {}
-        self._orchestrator: Optional[MasterOrchestrator] = None
+        self._anthropic_client = anthropic_client
+        self._openai_client = openai_client
+        self._lock = threading.RLock()
         self._initialized = False
+        self.load_times_ms: Dict[str, float] = {}
+    
+    def register(self, agent: BaseAgent) -> None:
+        """Register an already constructed agent"""
+        with self._lock:
+            if self._anthropic_client is not None:
+                agent.anthropic_client = self._anthropic_client
+            if self._openai_client is not None:
+                agent.openai_client = self._openai_client
+            self._agents[agent.agent_id] = agent
+            logger.info(f"Registered agent: {agent.name} ({agent.agent_id})")
+    
+    def _load(self, agent_id: str) -> Optional[BaseAgent]:
+        """Import an agent's module and build it through its factory"""
+        factory = self._factories.get(agent_id)
+        if factory is None:
+            return None
         
-    def initialize(self) -> None:
-        """Initialize all agents and register them"""
+        with self._lock:
+            agent = self._agents.get(agent_id)
+            if agent is not None:
+                return agent
+            
+            started = time.perf_counter()
+            module_name, getter = factory.split(":")
+            agent = getattr(importlib.import_module(module_name), getter)()
+            self.load_times_ms[agent_id] = round((time.perf_counter() - started) * 1000, 2)
+            self.register(agent)
+            return agent
+    
+    def warm_up(self) -> None:
+        """Construct every agent now rather than on first request"""
         if self._initialized:
             logger.info("Agent registry already initialized")
             return
         
         try:
             logger.info("Initializing agent registry...")
-            
-            # Initialize Master Orchestrator
-            self._orchestrator = MasterOrchestrator()
-            self._agents[self._orchestrator.agent_id] = self._orchestrator
-            
-            # Initialize all specialized agents
-            agents = [
-                get_data_retrieval_agent(),
-                get_ai_analysis_agent(),
-                get_notification_agent(),
-                get_verification_agent(),
-                get_matching_agent(),
-                get_analytics_agent()
-            ]
-            
-            # Register each agent
-            for agent in agents:
-                self._agents[agent.agent_id] = agent
-                logger.info(f"Registered agent: {agent.name} ({agent.agent_id})")
+            for agent_id in self._factories:
+                self._load(agent_id)
             
             self._initialized = True
-            logger.info(f"Agent registry initialized with {len(self._agents)} agents")
+            logger.info(
+                f"Agent registry initialized with {len(self._agents)} agents "
+                f"in {sum(self.load_times_ms.values()):.0f}ms"
+            )
             
         except Exception as e:
             logger.error(f"Error initializing agent registry: {e}")
             raise
     
+    # Kept for callers that initialize explicitly
+    initialize = warm_up
+    
     def get_agent(self, agent_id: str) -> Optional[BaseAgent]:
-        """Get agent by ID"""
-        return self._agents.get(agent_id)
+        """Get agent by ID, constructing it on first use"""
+        return self._agents.get(agent_id) or self._load(agent_id)
     
-    def get_orchestrator(self) -> Optional[MasterOrchestrator]:
+    def get_orchestrator(self) -> Optional["MasterOrchestratorV2"]:
         """Get the Master Orchestrator"""
-        return self._orchestrator
+        return self.get_agent(ORCHESTRATOR_ID)
     
     def list_agents(self) -> List[Dict[str, Any]]:
-        """List all registered agents"""
-        return [
-            {
+        """List all known agents; agents not constructed yet are listed as not loaded"""
+        agents = []
+        for agent_id in {**self._factories, **self._agents}:
+            agent = self._agents.get(agent_id)
+            if agent is None:
+                agents.append({"agent_id": agent_id, "status": "not_loaded"})
+                continue
+            agents.append({
                 "agent_id": agent.agent_id,
                 "name": agent.name,
                 "description": agent.description,
                 "status": agent.status.value,
-                "capabilities": [cap.value for cap in agent.capabilities]
-            }
-            for agent in self._agents.values()
-        ]
+                "capabilities": [getattr(cap, "value", cap) for cap in agent.capabilities]
+            })
+        return agents
     
     def get_agent_status(self, agent_id: str) -> Dict[str, Any]:
         """Get status of a specific agent"""
-        agent = self._agents.get(agent_id)
+        agent = self.get_agent(agent_id)
         if not agent:
             return {"error": f"Agent {agent_id} not found"}
         
@@ -108,21 +155,22 @@ class AgentRegistry:
             "agent_id": agent.agent_id,
             "name": agent.name,
             "status": agent.status.value,
-            "capabilities": [cap.value for cap in agent.capabilities],
-            "task_history_count": len(agent.task_history)
+            "capabilities": [getattr(cap, "value", cap) for cap in agent.capabilities],
+            "task_history_count": len(agent.task_history),
+            "load_time_ms": self.load_times_ms.get(agent_id)
         }
     
     def get_system_health(self) -> Dict[str, Any]:
-        """Get overall system health"""
+        """Get overall system health of the constructed agents"""
         total_agents = len(self._agents)
         idle_agents = sum(1 for agent in self._agents.values() if agent.status == AgentStatus.IDLE)
-        busy_agents = sum(1 for agent in self._agents.values() if agent.status == AgentStatus.BUSY)
-        error_agents = sum(1 for agent in self._agents.values() if agent.status == AgentStatus.ERROR)
+        busy_agents = sum(1 for agent in self._agents.values() if agent.status in (AgentStatus.BUSY, AgentStatus.RUNNING))
+        error_agents = sum(1 for agent in self._agents.values() if agent.status in (AgentStatus.ERROR, AgentStatus.FAILED))
         
         health_status = "healthy"
         if error_agents > 0:
             health_status = "degraded"
-        if error_agents >= total_agents // 2:
+        if total_agents and error_agents >= total_agents // 2:
             health_status = "critical"
         
         return {
@@ -131,6 +179,7 @@ class AgentRegistry:
             "idle_agents": idle_agents,
             "busy_agents": busy_agents,
             "error_agents": error_agents,
+            "not_loaded_agents": len(set(self._factories) - set(self._agents)),
             "initialized": self._initialized,
             "checked_at": datetime.utcnow().isoformat()
         }
@@ -138,10 +187,16 @@ class AgentRegistry:
     async def execute_task(
         self,
         agent_id: str,
-        task: Dict[str, Any]
+        task: Dict[str, Any],
+        timeout: Optional[float] = None
     ) -> Dict[str, Any]:
-        """Execute a task on a specific agent"""
-        agent = self._agents.get(agent_id)
+        """
+        Execute a task on a specific agent
+        
+        The task is bounded by the request deadline, by timeout seconds if
+        sooner, and by AGENT_TIMEOUT_SECONDS at most.
+        """
+        agent = self.get_agent(agent_id)
         if not agent:
             return {
                 "success": False,
@@ -149,32 +204,37 @@ class AgentRegistry:
             }
         
         try:
-            result = await agent.execute(task)
+            with deadline_scope(timeout):
+                result = await agent.execute(task)
             return result
         except Exception as e:
             logger.error(f"Error executing task on agent {agent_id}: {e}")
             return {
                 "success": False,
                 "error": str(e),
+                "timed_out": isinstance(e, asyncio.TimeoutError),
                 "agent_id": agent_id
             }
     
-    async def orchestrate_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
-        """Orchestrate a complex task using Master Orchestrator"""
-        if not self._orchestrator:
+    async def orchestrate_task(self, task: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Orchestrate a complex task using Master Orchestrator, bounded like execute_task"""
+        orchestrator = self.get_orchestrator()
+        if not orchestrator:
             return {
                 "success": False,
                 "error": "Master Orchestrator not initialized"
             }
         
         try:
-            result = await self._orchestrator.execute(task)
+            with deadline_scope(timeout):
+                result = await orchestrator.execute(task)
             return result
         except Exception as e:
             logger.error(f"Error orchestrating task: {e}")
             return {
                 "success": False,
-                "error": str(e)
+                "error": str(e),
+                "timed_out": isinstance(e, asyncio.TimeoutError)
             }
 
 
@@ -183,17 +243,16 @@ _agent_registry = None
 
 
 def get_agent_registry() -> AgentRegistry:
-    """Get or create the global agent registry"""
+    """Get or create the global agent registry; agents are built on first use"""
     global _agent_registry
     if _agent_registry is None:
         _agent_registry = AgentRegistry()
-        _agent_registry.initialize()
     return _agent_registry
 
 
 def initialize_agents() -> AgentRegistry:
-    """Initialize all agents and return registry"""
+    """Construct all agents up front and return the registry"""
     registry = get_agent_registry()
+    registry.warm_up()
     logger.info("All agents initialized and ready")
     return registry
-
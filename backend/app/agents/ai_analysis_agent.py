@@ -137,7 +137,7 @@ Provide a detailed analysis including:
 
 Format as JSON."""
 
-            analysis = await self.ai_client.generate_structured_output(
+            analysis = await self.ai_client.generate_structured_output_async(
                 prompt=prompt,
                 schema={
                     "match_score": "number (0-100)",
@@ -187,7 +187,7 @@ Provide comprehensive career recommendations including:
 
 Format as JSON."""
 
-            recommendations = await self.ai_client.generate_structured_output(
+            recommendations = await self.ai_client.generate_structured_output_async(
                 prompt=prompt,
                 schema={
                     "progression_score": "number (0-10)",
@@ -227,7 +227,7 @@ Provide a structured learning path including:
 
 Format as JSON."""
 
-            learning_path = await self.ai_client.generate_structured_output(
+            learning_path = await self.ai_client.generate_structured_output_async(
                 prompt=prompt,
                 schema={
                     "skill_gaps": "array of strings",
@@ -266,7 +266,7 @@ Provide comprehensive analysis including:
 
 Format as JSON."""
 
-            analysis = await self.ai_client.generate_structured_output(
+            analysis = await self.ai_client.generate_structured_output_async(
                 prompt=prompt,
                 schema={
                     "quality_score": "number (0-100)",
@@ -310,7 +310,7 @@ Provide optimization suggestions including:
 
 Format as JSON."""
 
-            optimization = await self.ai_client.generate_structured_output(
+            optimization = await self.ai_client.generate_structured_output_async(
                 prompt=prompt,
                 schema={
                     "improved_title": "string",
@@ -355,7 +355,7 @@ Provide salary prediction including:
 
 Format as JSON."""
 
-            prediction = await self.ai_client.generate_structured_output(
+            prediction = await self.ai_client.generate_structured_output_async(
                 prompt=prompt,
                 schema={
                     "min_salary": "number",
@@ -398,7 +398,7 @@ Provide comprehensive analysis including:
 
 Format as JSON."""
 
-            analysis = await self.ai_client.generate_structured_output(
+            analysis = await self.ai_client.generate_structured_output_async(
                 prompt=prompt,
                 schema={
                     "trajectory_score": "number (0-10)",
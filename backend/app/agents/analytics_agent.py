@@ -10,18 +10,31 @@ This agent handles analytics and insights:
 - Predictive analytics
 """
 
+import json
 import logging
 from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from collections import Counter
 
 from app.agents.base_agent import BaseAgent, AgentCapability, AgentStatus
 from app.core.ai_client import get_ai_client
 from app.agents.data_retrieval_agent import get_data_retrieval_agent
+from app.services.skill_demand import get_skill_demand_counters
+from app.services.sketch_analytics import get_sketch_analytics, timeframe_days
+from app.services.hiring_forecast import get_hiring_forecaster
+from app.services.percentiles import get_percentile_service
+from app.core.telemetry import get_telemetry, ROUTE, AGENT
 
 logger = logging.getLogger(__name__)
 
 
+def growth(current: Optional[int], previous: Optional[int]) -> Optional[str]:
+    """Period-over-period change as a signed percentage, None without a baseline"""
+    if current is None or not previous:
+        return None
+    return f"{(current - previous) / previous * 100:+.1f}%"
+
+
 class AnalyticsAgent(BaseAgent):
     """Agent for analytics and insights generation"""
     
@@ -38,6 +51,10 @@ class AnalyticsAgent(BaseAgent):
         )
         self.ai_client = get_ai_client()
         self.data_agent = get_data_retrieval_agent()
+        self.demand_counters = get_skill_demand_counters()
+        self.sketches = get_sketch_analytics()
+        self.forecaster = get_hiring_forecaster()
+        self.percentiles = get_percentile_service()
         
     async def execute(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -122,30 +139,38 @@ class AnalyticsAgent(BaseAgent):
     ) -> Dict[str, Any]:
         """Analyze skills gap in the market"""
         try:
-            # Fetch job postings to understand demand
-            filters = {}
-            if industry:
-                filters["industry"] = industry
-            if location:
-                filters["location"] = location
-            
-            jobs = await self.data_agent.fetch_job_postings(filters)
-            
-            # Extract required skills from jobs
-            all_required_skills = []
-            all_preferred_skills = []
-            
-            for job in jobs:
-                all_required_skills.extend(job.get("required_skills", []))
-                all_preferred_skills.extend(job.get("preferred_skills", []))
-            
-            # Count skill frequencies
-            required_counter = Counter(all_required_skills)
-            preferred_counter = Counter(all_preferred_skills)
-            
-            # Get top skills in demand
-            top_required = required_counter.most_common(10)
-            top_preferred = preferred_counter.most_common(10)
+            # Market-wide demand from the precomputed counters
+            demand = await self.demand_counters.get_demand(industry=industry, emirate=location, k=10)
+            if demand:
+                top_required = demand["top"]["required"]
+                top_preferred = demand["top"]["preferred"]
+                total_jobs = demand["active_postings"]
+            else:
+                # Counters unavailable: sample the latest postings
+                filters = {}
+                if industry:
+                    filters["industry"] = industry
+                if location:
+                    filters["location"] = location
+                
+                jobs = await self.data_agent.fetch_job_postings(filters)
+                
+                # Extract required skills from jobs
+                all_required_skills = []
+                all_preferred_skills = []
+                
+                for job in jobs:
+                    all_required_skills.extend(job.get("required_skills", []))
+                    all_preferred_skills.extend(job.get("preferred_skills", []))
+                
+                # Count skill frequencies
+                required_counter = Counter(all_required_skills)
+                preferred_counter = Counter(all_preferred_skills)
+                
+                # Get top skills in demand
+                top_required = required_counter.most_common(10)
+                top_preferred = preferred_counter.most_common(10)
+                total_jobs = len(jobs)
             
             # AI-powered gap analysis
             prompt = f"""Analyze the skills gap in the market.
@@ -168,7 +193,7 @@ Provide analysis:
 
 Format as JSON."""
 
-            analysis = await self.ai_client.generate_structured_output(
+            analysis = await self.ai_client.generate_structured_output_async(
                 prompt=prompt,
                 schema={
                     "critical_gaps": "array of objects with: skill, demand_level, gap_severity",
@@ -184,6 +209,8 @@ Format as JSON."""
                 "location": location,
                 "top_required_skills": [{"skill": skill, "demand": count} for skill, count in top_required],
                 "top_preferred_skills": [{"skill": skill, "demand": count} for skill, count in top_preferred],
+                "total_jobs_analyzed": total_jobs,
+                "demand_source": "counters" if demand else "sample",
                 **analysis,
                 "analyzed_at": datetime.utcnow().isoformat()
             }
@@ -210,27 +237,47 @@ Format as JSON."""
             locations = Counter([job.get("location") for job in jobs if job.get("location")])
             employment_types = Counter([job.get("employment_type") for job in jobs if job.get("employment_type")])
             
-            return {
+            trends = {
                 "timeframe": timeframe,
                 "total_jobs": len(jobs),
                 "top_industries": [{"industry": ind, "count": count} for ind, count in industries.most_common(5)],
                 "top_locations": [{"location": loc, "count": count} for loc, count in locations.most_common(5)],
                 "employment_types": [{"type": et, "count": count} for et, count in employment_types.most_common()],
-                "growth_rate": "+15%",  # Placeholder
+                "growth_rate": None,
                 "generated_at": datetime.utcnow().isoformat()
             }
             
+            # Growth over the timeframe from the posting forecasts
+            if await self.forecaster.ensure_ready():
+                horizon = max(1, round(timeframe_days(timeframe) / 7))
+                outlook = self.forecaster.forecast(industry=industry, horizon_weeks=horizon)
+                if outlook:
+                    trends["growth_rate"] = f"{outlook['expected_change'] * 100:+.1f}%"
+                    trends["outlook"] = {
+                        key: outlook[key]
+                        for key in ("recent_weekly_average", "forecast_weekly_average", "expected_change", "trend")
+                    }
+                trends["growing_industries"] = self.forecaster.top_movers("industry", horizon_weeks=horizon, k=5)["growing"]
+                trends["growing_skills"] = self.forecaster.top_movers(
+                    "skill", industry=industry, horizon_weeks=horizon, k=5
+                )["growing"]
+            
+            return trends
+            
         except Exception as e:
             logger.error(f"Error generating market trends: {e}")
             return {"error": str(e)}
     
     async def analyze_user_engagement(
         self,
-        user_id: str,
+        user_id: Optional[str] = None,
         timeframe: str = "month"
     ) -> Dict[str, Any]:
-        """Analyze user engagement metrics"""
+        """Analyze user engagement metrics (platform-wide when user_id is omitted)"""
         try:
+            if not user_id:
+                return await self._analyze_platform_engagement(timeframe)
+            
             # In production, would fetch user activity logs
             # For MVP, return simulated metrics
             
@@ -259,6 +306,27 @@ Format as JSON."""
             logger.error(f"Error analyzing user engagement: {e}")
             return {"error": str(e)}
     
+    async def _analyze_platform_engagement(self, timeframe: str) -> Dict[str, Any]:
+        """Approximate platform engagement from the analytics sketches"""
+        days = timeframe_days(timeframe)
+        active = await self.sketches.distinct_users(days=days)
+        daily_active = [day["distinct_users"] for day in active["daily"]]
+        average_daily = sum(daily_active) / days if daily_active else 0
+        
+        return {
+            "timeframe": timeframe,
+            "metrics": {
+                "active_users": active["distinct_users"],
+                "average_daily_active_users": round(average_daily),
+                # Share of the period's users active on an average day
+                "stickiness": round(average_daily / active["distinct_users"], 3) if active["distinct_users"] else 0.0
+            },
+            "daily_active_users": active["daily"],
+            "trending_skills": (await self.sketches.trending_skills(days=days))["skills"],
+            "relative_error": active["relative_error"],
+            "analyzed_at": datetime.utcnow().isoformat()
+        }
+    
     async def generate_workforce_insights(
         self,
         filters: Dict[str, Any] = None
@@ -280,7 +348,7 @@ Analyze:
 
 Format as JSON."""
 
-            insights = await self.ai_client.generate_structured_output(
+            insights = await self.ai_client.generate_structured_output_async(
                 prompt=prompt,
                 schema={
                     "workforce_size": "number",
@@ -311,8 +379,58 @@ Format as JSON."""
     ) -> Dict[str, Any]:
         """Predict hiring trends for next N months"""
         try:
-            # AI-powered prediction
-            prompt = f"""Predict hiring trends for the next {months_ahead} months.
+            if not await self.forecaster.ensure_ready():
+                return await self._predict_hiring_trends_with_ai(industry, months_ahead)
+            
+            horizon = max(1, round(months_ahead * 52 / 12))
+            outlook = self.forecaster.forecast(industry=industry, horizon_weeks=horizon)
+            if outlook is None:
+                return {
+                    "industry": industry,
+                    "prediction_period": f"{months_ahead} months",
+                    "error": "No job postings found for this industry"
+                }
+            
+            skills = self.forecaster.top_movers("skill", industry=industry, horizon_weeks=horizon)
+            # Emirate series are not broken down by industry
+            emirates = self.forecaster.top_movers("emirate", horizon_weeks=horizon, k=7) if not industry else None
+            
+            prediction = {
+                "industry": industry,
+                "prediction_period": f"{months_ahead} months",
+                "hiring_volume_trend": outlook["trend"],
+                "expected_growth_rate": round(outlook["expected_change"] * 100, 1),
+                "weekly_postings": {
+                    "recent_average": outlook["recent_weekly_average"],
+                    "forecast_average": outlook["forecast_weekly_average"]
+                },
+                "forecast": outlook["forecast"],
+                "in_demand_skills": [entry["skill"] for entry in skills["growing"]],
+                "declining_skills": [entry["skill"] for entry in skills["declining"]],
+                "skill_outlook": skills,
+                "emirate_outlook": emirates,
+                "model": outlook["model"],
+                "mean_absolute_error": outlook["mae"],
+                "forecast_built_at": outlook["built_at"],
+                "predicted_at": datetime.utcnow().isoformat()
+            }
+            prediction["summary"] = await self._narrate(
+                "hiring forecast",
+                {key: value for key, value in prediction.items() if key not in ("forecast", "skill_outlook")}
+            )
+            return prediction
+            
+        except Exception as e:
+            logger.error(f"Error predicting hiring trends: {e}")
+            return {"error": str(e)}
+    
+    async def _predict_hiring_trends_with_ai(
+        self,
+        industry: Optional[str],
+        months_ahead: int
+    ) -> Dict[str, Any]:
+        """Model-only prediction, used when there is no posting history to forecast from"""
+        prompt = f"""Predict hiring trends for the next {months_ahead} months.
 
 Industry: {industry or 'All Industries'}
 Location: UAE
@@ -327,30 +445,46 @@ Predict:
 
 Format as JSON."""
 
-            predictions = await self.ai_client.generate_structured_output(
-                prompt=prompt,
-                schema={
-                    "hiring_volume_trend": "string (increasing/decreasing/stable)",
-                    "expected_growth_rate": "number (percentage)",
-                    "hot_job_roles": "array of strings",
-                    "in_demand_skills": "array of strings",
-                    "salary_trend": "string (increasing/decreasing/stable)",
-                    "competition_level": "string (low/medium/high)",
-                    "best_hiring_months": "array of strings",
-                    "confidence_level": "number (0-100)"
-                }
-            )
-            
-            return {
-                "industry": industry,
-                "prediction_period": f"{months_ahead} months",
-                **predictions,
-                "predicted_at": datetime.utcnow().isoformat()
+        predictions = await self.ai_client.generate_structured_output_async(
+            prompt=prompt,
+            system_prompt="You are a UAE labour market analyst.",
+            output_schema={
+                "hiring_volume_trend": "string (increasing/decreasing/stable)",
+                "expected_growth_rate": "number (percentage)",
+                "hot_job_roles": "array of strings",
+                "in_demand_skills": "array of strings",
+                "salary_trend": "string (increasing/decreasing/stable)",
+                "competition_level": "string (low/medium/high)",
+                "best_hiring_months": "array of strings",
+                "confidence_level": "number (0-100)"
             }
-            
+        )
+        
+        return {
+            "industry": industry,
+            "prediction_period": f"{months_ahead} months",
+            **predictions,
+            "model": "ai",
+            "predicted_at": datetime.utcnow().isoformat()
+        }
+    
+    async def _narrate(self, subject: str, figures: Dict[str, Any]) -> Optional[str]:
+        """Have the model describe computed figures in prose (None when AI is unavailable)"""
+        if not self.ai_client.is_available():
+            return None
+        try:
+            return await self.ai_client.generate_completion_async(
+                prompt=(
+                    f"Summarize this {subject} for a UAE workforce planner in 3-4 sentences. "
+                    f"Use only the figures given; do not add new numbers.\n\n"
+                    f"{json.dumps(figures, default=str)}"
+                ),
+                system_prompt="You are a UAE labour market analyst.",
+                max_tokens=300
+            )
         except Exception as e:
-            logger.error(f"Error predicting hiring trends: {e}")
-            return {"error": str(e)}
+            logger.warning(f"Forecast narration failed: {e}")
+            return None
     
     async def analyze_platform_performance(
         self,
@@ -358,29 +492,45 @@ Format as JSON."""
     ) -> Dict[str, Any]:
         """Analyze platform performance metrics"""
         try:
-            # In production, would fetch real metrics from database
-            # For MVP, return simulated metrics
+            # Distinct active users from the analytics sketches, latency and
+            # errors from request telemetry, totals from the database
+            days = timeframe_days(timeframe)
+            active = await self.sketches.distinct_users(days=days)
+            counts = await self._platform_counts(days)
+            telemetry = get_telemetry()
+            routes = await telemetry.get_metrics(ROUTE, minutes=days * 24 * 60)
+            agents = await telemetry.get_metrics(AGENT, minutes=days * 24 * 60)
+            requests = routes["overall"]
+            slowest_routes = sorted(
+                (
+                    {"route": route, **{key: summary[key] for key in ("requests", "p50", "p95", "p99", "error_rate")}}
+                    for route, summary in routes["metrics"].items()
+                    if summary["p95"] is not None
+                ),
+                key=lambda entry: entry["p95"],
+                reverse=True
+            )[:5]
             
             return {
                 "timeframe": timeframe,
                 "metrics": {
-                    "total_users": 1250,
-                    "new_users": 85,
-                    "active_users": 620,
-                    "total_jobs": 340,
-                    "new_jobs": 28,
-                    "total_applications": 1840,
-                    "new_applications": 156,
-                    "successful_placements": 12,
-                    "average_response_time_ms": 185,
-                    "api_uptime_percentage": 99.8
+                    **{key: value for key, value in counts.items() if not key.startswith("previous_")},
+                    "active_users": active["distinct_users"],
+                    "total_requests": requests["requests"],
+                    "average_response_time_ms": requests["avg_ms"],
+                    "api_success_rate_percentage": round((1 - requests["error_rate"]) * 100, 2)
                 },
+                "latency_ms": {key: requests[key] for key in ("p50", "p95", "p99")},
+                "slowest_routes": slowest_routes,
+                "agent_actions": agents["metrics"],
+                "telemetry_source": routes["source"],
                 "growth_metrics": {
-                    "user_growth": "+7.3%",
-                    "job_growth": "+9.0%",
-                    "application_growth": "+11.2%"
+                    "user_growth": growth(counts.get("new_users"), counts.get("previous_users")),
+                    "job_growth": growth(counts.get("new_jobs"), counts.get("previous_jobs")),
+                    "application_growth": growth(counts.get("new_applications"), counts.get("previous_applications"))
                 },
-                "health_status": "excellent",
+                "daily_active_users": active["daily"],
+                "health_status": self._health_status(requests),
                 "analyzed_at": datetime.utcnow().isoformat()
             }
             
@@ -388,44 +538,128 @@ Format as JSON."""
             logger.error(f"Error analyzing platform performance: {e}")
             return {"error": str(e)}
     
+    async def _platform_counts(self, days: int) -> Dict[str, int]:
+        """
+        Users, job postings, applications and placements: totals, new in the
+        last `days` days and new in the `days` before that (empty when the
+        database is unavailable)
+        """
+        from sqlalchemy import text
+        from app.db.postgres import get_session_factory, ANALYTICS
+        
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        previous = since - timedelta(days=days)
+        try:
+            async with get_session_factory(ANALYTICS)() as session:
+                row = (await session.execute(text("""
+                    SELECT
+                        (SELECT COUNT(*) FROM users) AS total_users,
+                        (SELECT COUNT(*) FROM users WHERE created_at >= :since) AS new_users,
+                        (SELECT COUNT(*) FROM users
+                         WHERE created_at >= :previous AND created_at < :since) AS previous_users,
+                        (SELECT COUNT(*) FROM job_postings WHERE status <> 'draft') AS total_jobs,
+                        (SELECT COUNT(*) FROM job_postings
+                         WHERE status <> 'draft' AND posted_date >= :since_date) AS new_jobs,
+                        (SELECT COUNT(*) FROM job_postings
+                         WHERE status <> 'draft' AND posted_date >= :previous_date
+                           AND posted_date < :since_date) AS previous_jobs,
+                        (SELECT COUNT(*) FROM job_applications) AS total_applications,
+                        (SELECT COUNT(*) FROM job_applications WHERE applied_at >= :since) AS new_applications,
+                        (SELECT COUNT(*) FROM job_applications
+                         WHERE applied_at >= :previous AND applied_at < :since) AS previous_applications,
+                        (SELECT COUNT(*) FROM job_applications
+                         WHERE application_status = 'accepted' AND reviewed_at >= :since) AS successful_placements
+                """), {
+                    "since": since,
+                    "previous": previous,
+                    "since_date": since.date(),
+                    "previous_date": previous.date()
+                })).one()
+            return {key: int(value) for key, value in row._mapping.items()}
+        except Exception as e:
+            logger.warning(f"Platform counts unavailable: {e}")
+            return {}
+    
+    def _health_status(self, requests: Dict[str, Any]) -> str:
+        """Classify platform health from the server error rate and tail latency"""
+        if not requests["requests"]:
+            return "unknown"
+        p95 = requests["p95"] or 0
+        if requests["error_rate"] > 0.05 or p95 > 5000:
+            return "critical"
+        if requests["error_rate"] > 0.01 or p95 > 1000:
+            return "degraded"
+        return "excellent"
+    
     async def generate_skill_demand_report(
         self,
         industry: Optional[str] = None
     ) -> Dict[str, Any]:
         """Generate detailed skill demand report"""
         try:
-            # Fetch job postings
-            jobs = await self.data_agent.fetch_job_postings({
-                "industry": industry,
-                "limit": 200
-            })
+            category_skills = {
+                "technical": ["python", "java", "aws", "sql"],
+                "soft_skills": ["communication", "leadership", "teamwork"],
+                "management": ["project management", "agile", "scrum"]
+            }
             
-            # Extract and analyze skills
-            all_skills = []
-            for job in jobs:
-                all_skills.extend(job.get("required_skills", []))
-                all_skills.extend(job.get("preferred_skills", []))
+            # Counters keep skill names as posted, so look up the common spellings
+            spellings = {
+                category: {variant for skill in skills for variant in (skill, skill.title(), skill.upper())}
+                for category, skills in category_skills.items()
+            }
             
-            skill_counter = Counter(all_skills)
-            top_skills = skill_counter.most_common(20)
+            # Market-wide demand from the precomputed counters
+            demand = await self.demand_counters.get_demand(
+                industry=industry,
+                k=20,
+                skills=sorted(set().union(*spellings.values()))
+            )
+            if demand:
+                total_jobs = demand["active_postings"]
+                total_unique_skills = demand["unique_skills"]
+                top_skills = demand["top"]["any"]
+                skill_categories = {
+                    category: sum(demand["skill_counts"].get(skill, 0) for skill in variants)
+                    for category, variants in spellings.items()
+                }
+            else:
+                # Counters unavailable: sample the latest postings
+                jobs = await self.data_agent.fetch_job_postings({
+                    "industry": industry,
+                    "limit": 200
+                })
+                
+                # Extract and analyze skills
+                all_skills = []
+                for job in jobs:
+                    all_skills.extend(job.get("required_skills", []))
+                    all_skills.extend(job.get("preferred_skills", []))
+                
+                skill_counter = Counter(all_skills)
+                total_jobs = len(jobs)
+                total_unique_skills = len(skill_counter)
+                top_skills = skill_counter.most_common(20)
+                skill_categories = {
+                    category: len([s for s in all_skills if s.lower() in skills])
+                    for category, skills in category_skills.items()
+                }
             
             return {
                 "industry": industry or "All Industries",
-                "total_jobs_analyzed": len(jobs),
-                "total_unique_skills": len(skill_counter),
+                "total_jobs_analyzed": total_jobs,
+                "total_unique_skills": total_unique_skills,
                 "top_skills": [
                     {
                         "skill": skill,
                         "demand_count": count,
-                        "demand_percentage": round((count / len(jobs)) * 100, 1)
+                        "demand_percentage": round((count / total_jobs) * 100, 1) if total_jobs else 0.0
                     }
                     for skill, count in top_skills
                 ],
-                "skill_categories": {
-                    "technical": len([s for s in all_skills if s.lower() in ["python", "java", "aws", "sql"]]),
-                    "soft_skills": len([s for s in all_skills if s.lower() in ["communication", "leadership", "teamwork"]]),
-                    "management": len([s for s in all_skills if s.lower() in ["project management", "agile", "scrum"]])
-                },
+                "skill_categories": skill_categories,
+                "trending_skills": (await self.sketches.trending_skills(days=7, k=10))["skills"],
+                "demand_source": "counters" if demand else "sample",
                 "generated_at": datetime.utcnow().isoformat()
             }
             
@@ -453,7 +687,7 @@ Provide:
 
 Format as JSON."""
 
-            analysis = await self.ai_client.generate_structured_output(
+            analysis = await self.ai_client.generate_structured_output_async(
                 prompt=prompt,
                 schema={
                     "min_salary": "number",
@@ -472,6 +706,14 @@ Format as JSON."""
                 "role": role,
                 "location": location or "UAE",
                 **analysis,
+                "market_salary_percentiles": await self.sketches.percentiles("salary", days=90),
+                # Posted salaries for this role (p10/p50/p90 with error bounds)
+                "salary_percentiles": await self.percentiles.percentiles(
+                    "salary", {"role": role, "location": location}
+                ),
+                "salary_percentiles_by_location": (await self.percentiles.percentiles(
+                    "salary", {"role": role}, group_by="location"
+                ))["groups"],
                 "analyzed_at": datetime.utcnow().isoformat()
             }
             
@@ -5,14 +5,15 @@ NOOR Platform - Base AI Agent Class
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+import asyncio
+import functools
 import logging
-import json
+import time
 from enum import Enum
 
-from anthropic import Anthropic
-from openai import OpenAI
-
 from app.core.config import settings
+from app.core.request_context import deadline_scope, deadline_expired, time_remaining
+from app.core.task_history import TaskHistory
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +22,10 @@ class AgentStatus(str, Enum):
     """Agent execution status"""
     IDLE = "idle"
     RUNNING = "running"
+    BUSY = "busy"
     COMPLETED = "completed"
     FAILED = "failed"
+    ERROR = "error"
     PAUSED = "paused"
 
 
@@ -36,6 +39,77 @@ class AgentCapability(str, Enum):
     DEPLOYMENT = "deployment"
     MONITORING = "monitoring"
     SECURITY = "security"
+    DATA_RETRIEVAL = "data_retrieval"
+    DATA_TRANSFORMATION = "data_transformation"
+    CACHING = "caching"
+    AI_ANALYSIS = "ai_analysis"
+    DOCUMENT_PROCESSING = "document_processing"
+    RECOMMENDATIONS = "recommendations"
+    NOTIFICATION = "notification"
+    EMAIL = "email"
+    SMS = "sms"
+    VERIFICATION = "verification"
+    SKILL_MATCHING = "skill_matching"
+    ANALYTICS = "analytics"
+
+
+# Time the execute() guard allows past the deadline, so that agents which
+# watch the deadline themselves get to return their partial results first
+DEADLINE_GRACE_SECONDS = 0.5
+
+
+def _timed_out(result: Any) -> bool:
+    """Whether an agent result was cut short by the deadline"""
+    if not isinstance(result, dict):
+        return False
+    return bool(result.get("timed_out") or result.get("partial")) or (
+        result.get("success") is False and deadline_expired()
+    )
+
+
+def _timed_execute(execute):
+    """Bound an agent's execute() by the request deadline and record it in telemetry"""
+    @functools.wraps(execute)
+    async def wrapper(self, task: Dict[str, Any], *args, **kwargs) -> Dict[str, Any]:
+        from app.core.telemetry import get_telemetry
+        
+        # Specialized agents take an "action", orchestrators a task "type"
+        action = (task.get("action") or task.get("type")) if isinstance(task, dict) else None
+        start_time = time.perf_counter()
+        success = timed_out = False
+        try:
+            # Nested agent calls share the caller's deadline
+            with deadline_scope(settings.AGENT_TIMEOUT_SECONDS):
+                try:
+                    result = await asyncio.wait_for(
+                        execute(self, task, *args, **kwargs),
+                        max(time_remaining(), 0.0) + DEADLINE_GRACE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if not deadline_expired():
+                        raise
+                    logger.warning(f"Agent {self.agent_id} action {action} cancelled at the request deadline")
+                    self.status = AgentStatus.IDLE
+                    result = {
+                        "success": False,
+                        "error": "Request deadline exceeded",
+                        "timed_out": True,
+                        "agent_id": self.agent_id,
+                        "action": action
+                    }
+            # Agents report most failures in the result rather than raising
+            success = not (isinstance(result, dict) and result.get("success") is False)
+            timed_out = _timed_out(result)
+            return result
+        except asyncio.TimeoutError:
+            timed_out = deadline_expired()
+            raise
+        finally:
+            if settings.TELEMETRY_ENABLED:
+                get_telemetry().record_agent_action(
+                    self.agent_id, action, time.perf_counter() - start_time, success, timed_out
+                )
+    return wrapper
 
 
 class BaseAgent(ABC):
@@ -49,8 +123,18 @@ class BaseAgent(ABC):
     - Error handling
     - Logging
     - MCP protocol communication
+    - Per-action latency, error and timeout telemetry
+    - The request deadline (AGENT_TIMEOUT_SECONDS at most) enforced on
+      execute(), cancelling outstanding child work when it passes
     """
     
+    def __init_subclass__(cls, **kwargs):
+        """Time every agent's execute() by action"""
+        super().__init_subclass__(**kwargs)
+        execute = cls.__dict__.get("execute")
+        if execute is not None and not getattr(execute, "__isabstractmethod__", False):
+            cls.execute = _timed_execute(execute)
+    
     def __init__(
         self,
         agent_id: str,
@@ -68,13 +152,38 @@ class BaseAgent(ABC):
         self.created_at = datetime.utcnow()
         self.last_execution = None
         self.execution_count = 0
+        self.task_history = TaskHistory(settings.TASK_HISTORY_SIZE)
         
-        # Initialize LLM clients
-        self.anthropic_client = Anthropic(api_key=settings.ANTHROPIC_API_KEY) if settings.ANTHROPIC_API_KEY else None
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+        # LLM clients are shared across agents unless one is injected
+        self._anthropic_client = None
+        self._openai_client = None
         
         logger.info(f"Agent initialized: {self.name} ({self.agent_id})")
     
+    @property
+    def anthropic_client(self):
+        """Injected Anthropic client, or the process-wide one"""
+        if self._anthropic_client is None:
+            from app.core.ai_client import get_ai_client
+            return get_ai_client().client
+        return self._anthropic_client
+    
+    @anthropic_client.setter
+    def anthropic_client(self, client):
+        self._anthropic_client = client
+    
+    @property
+    def openai_client(self):
+        """Injected OpenAI client, or the process-wide one"""
+        if self._openai_client is None:
+            from app.core.ai_client import get_openai_client
+            return get_openai_client()
+        return self._openai_client
+    
+    @openai_client.setter
+    def openai_client(self, client):
+        self._openai_client = client
+    
     @abstractmethod
     async def execute(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -113,12 +222,14 @@ class BaseAgent(ABC):
             execution_time = (datetime.utcnow() - start_time).total_seconds()
             logger.info(f"Agent {self.name} completed in {execution_time:.2f}s")
             
+            self.log_task(task, result)
             return {
                 "success": True,
                 "agent_id": self.agent_id,
                 "agent_name": self.name,
                 "execution_time": execution_time,
                 "result": result,
+                "timed_out": _timed_out(result),
                 "timestamp": self.last_execution.isoformat()
             }
             
@@ -126,11 +237,13 @@ class BaseAgent(ABC):
             self.status = AgentStatus.FAILED
             logger.error(f"Agent {self.name} failed: {str(e)}", exc_info=True)
             
+            self.log_task(task, {"success": False, "error": str(e)})
             return {
                 "success": False,
                 "agent_id": self.agent_id,
                 "agent_name": self.name,
                 "error": str(e),
+                "timed_out": isinstance(e, asyncio.TimeoutError),
                 "timestamp": datetime.utcnow().isoformat()
             }
     
@@ -153,6 +266,8 @@ class BaseAgent(ABC):
         Returns:
             LLM response text
         """
+        from app.core.ai_client import deadline_options
+        
         try:
             # Use Anthropic Claude by default
             if self.anthropic_client and "claude" in self.model.lower():
@@ -163,7 +278,8 @@ class BaseAgent(ABC):
                     max_tokens=max_tokens,
                     temperature=temperature,
                     system=system_prompt or "",
-                    messages=messages
+                    messages=messages,
+                    **deadline_options()
                 )
                 
                 return response.content[0].text
@@ -179,7 +295,8 @@ class BaseAgent(ABC):
                     model=self.model if "gpt" in self.model.lower() else "gpt-4",
                     messages=messages,
                     max_tokens=max_tokens,
-                    temperature=temperature
+                    temperature=temperature,
+                    **deadline_options()
                 )
                 
                 return response.choices[0].message.content
@@ -201,6 +318,7 @@ class BaseAgent(ABC):
             "capabilities": [cap.value for cap in self.capabilities],
             "execution_count": self.execution_count,
             "last_execution": self.last_execution.isoformat() if self.last_execution else None,
+            "tasks_logged": dict(self.task_history.counts),
             "created_at": self.created_at.isoformat()
         }
     
@@ -228,13 +346,18 @@ class BaseAgent(ABC):
             task: Task that was executed
             result: Execution result
         """
-        # TODO: Implement MongoDB logging
+        failed = isinstance(result, dict) and result.get("success") is False
         log_entry = {
             "agent_id": self.agent_id,
             "agent_name": self.name,
+            "task_id": task.get("task_id"),
+            "type": task.get("type") or task.get("action"),
+            "status": "failed" if failed else "completed",
             "task": task,
             "result": result,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.utcnow()
         }
-        logger.info(f"Task log: {json.dumps(log_entry)}")
+        # Kept in the bounded in-memory history and written in batches off the request path
+        self.task_history.append(log_entry)
+        logger.debug(f"Task logged: {self.name} {log_entry['type']} {log_entry['status']}")
 
@@ -8,6 +8,7 @@ This agent is responsible for fetching and managing data from various sources:
 - Data transformation and validation
 """
 
+import asyncio
 import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
@@ -17,7 +18,10 @@ from app.agents.base_agent import BaseAgent, AgentCapability, AgentStatus
 from app.core.ai_client import get_ai_client
 from app.db.postgres import get_db
 from app.db.mongodb import get_mongodb
-from app.db.redis import get_redis
+from app.db.redis import get_redis, cache_get, cache_set, cache_get_many, cache_set_many
+from app.services.skill_search_index import get_skill_search_index
+from app.services.cache_warmer import get_cache_warmer
+from app.services.sketch_analytics import get_sketch_analytics
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
@@ -64,6 +68,8 @@ class DataRetrievalAgent(BaseAgent):
                 result = await self.fetch_user_skills(parameters.get("user_id"))
             elif action == "fetch_work_experience":
                 result = await self.fetch_work_experience(parameters.get("user_id"))
+            elif action == "fetch_user_bundle":
+                result = await self.fetch_user_bundle(parameters.get("user_id"))
             elif action == "fetch_job_postings":
                 result = await self.fetch_job_postings(parameters.get("filters", {}))
             elif action == "fetch_institution_data":
@@ -102,6 +108,9 @@ class DataRetrievalAgent(BaseAgent):
     async def fetch_user_profile(self, user_id: str) -> Dict[str, Any]:
         """Fetch user profile from database"""
         try:
+            get_cache_warmer().record_access(user_id)
+            get_sketch_analytics().record_user_activity(user_id)
+            
             # Check cache first
             cache_key = f"user_profile:{user_id}"
             cached_data = await self.get_cached_data(cache_key)
@@ -109,26 +118,9 @@ class DataRetrievalAgent(BaseAgent):
                 logger.info(f"Cache hit for user profile: {user_id}")
                 return cached_data
             
-            # Fetch from database
-            db: Session = next(get_db())
-            query = text("""
-                SELECT id, email, first_name, last_name, phone, 
-                       date_of_birth, nationality, emirate, 
-                       created_at, updated_at
-                FROM users
-                WHERE id = :user_id
-            """)
-            result = db.execute(query, {"user_id": user_id}).fetchone()
-            
-            if not result:
-                return {"error": "User not found"}
-            
-            user_data = dict(result._mapping)
-            
-            # Convert datetime objects to ISO format
-            for key, value in user_data.items():
-                if isinstance(value, datetime):
-                    user_data[key] = value.isoformat()
+            user_data = await asyncio.to_thread(self._query_user_profile, user_id)
+            if "error" in user_data:
+                return user_data
             
             # Cache the result
             await self.set_cached_data(cache_key, user_data, ttl=600)  # 10 minutes
@@ -140,6 +132,30 @@ class DataRetrievalAgent(BaseAgent):
             logger.error(f"Error fetching user profile: {e}")
             raise
     
+    def _query_user_profile(self, user_id: str) -> Dict[str, Any]:
+        """Load user profile from database"""
+        db: Session = next(get_db())
+        query = text("""
+            SELECT id, email, first_name, last_name, phone, 
+                   date_of_birth, nationality, emirate, 
+                   created_at, updated_at
+            FROM users
+            WHERE id = :user_id
+        """)
+        result = db.execute(query, {"user_id": user_id}).fetchone()
+        
+        if not result:
+            return {"error": "User not found"}
+        
+        user_data = dict(result._mapping)
+        
+        # Convert datetime objects to ISO format
+        for key, value in user_data.items():
+            if isinstance(value, datetime):
+                user_data[key] = value.isoformat()
+        
+        return user_data
+    
     async def fetch_user_skills(self, user_id: str) -> List[Dict[str, Any]]:
         """Fetch user skills from database"""
         try:
@@ -149,27 +165,7 @@ class DataRetrievalAgent(BaseAgent):
             if cached_data:
                 return cached_data
             
-            # Fetch from database
-            db: Session = next(get_db())
-            query = text("""
-                SELECT us.id, us.user_id, us.skill_id, us.proficiency_level,
-                       us.years_of_experience, us.last_used_date, us.is_verified,
-                       s.name as skill_name, s.category as skill_category
-                FROM user_skills us
-                JOIN skills s ON us.skill_id = s.id
-                WHERE us.user_id = :user_id
-                ORDER BY us.proficiency_level DESC, us.years_of_experience DESC
-            """)
-            results = db.execute(query, {"user_id": user_id}).fetchall()
-            
-            skills = []
-            for row in results:
-                skill_data = dict(row._mapping)
-                # Convert datetime objects
-                for key, value in skill_data.items():
-                    if isinstance(value, datetime):
-                        skill_data[key] = value.isoformat()
-                skills.append(skill_data)
+            skills = await asyncio.to_thread(self._query_user_skills, user_id)
             
             # Cache the result
             await self.set_cached_data(cache_key, skills, ttl=300)  # 5 minutes
@@ -181,6 +177,31 @@ class DataRetrievalAgent(BaseAgent):
             logger.error(f"Error fetching user skills: {e}")
             raise
     
+    def _query_user_skills(self, user_id: str) -> List[Dict[str, Any]]:
+        """Load user skills from database"""
+        db: Session = next(get_db())
+        query = text("""
+            SELECT us.id, us.user_id, us.skill_id, us.proficiency_level,
+                   us.years_of_experience, us.last_used_date, us.is_verified,
+                   s.name as skill_name, s.category as skill_category
+            FROM user_skills us
+            JOIN skills s ON us.skill_id = s.id
+            WHERE us.user_id = :user_id
+            ORDER BY us.proficiency_level DESC, us.years_of_experience DESC
+        """)
+        results = db.execute(query, {"user_id": user_id}).fetchall()
+        
+        skills = []
+        for row in results:
+            skill_data = dict(row._mapping)
+            # Convert datetime objects
+            for key, value in skill_data.items():
+                if isinstance(value, datetime):
+                    skill_data[key] = value.isoformat()
+            skills.append(skill_data)
+        
+        return skills
+    
     async def fetch_work_experience(self, user_id: str) -> List[Dict[str, Any]]:
         """Fetch user work experience from database"""
         try:
@@ -190,26 +211,7 @@ class DataRetrievalAgent(BaseAgent):
             if cached_data:
                 return cached_data
             
-            # Fetch from database
-            db: Session = next(get_db())
-            query = text("""
-                SELECT id, user_id, company_name, job_title, employment_type,
-                       industry, location, start_date, end_date, is_current,
-                       description, achievements, skills_used, is_verified
-                FROM work_experience
-                WHERE user_id = :user_id
-                ORDER BY start_date DESC
-            """)
-            results = db.execute(query, {"user_id": user_id}).fetchall()
-            
-            experiences = []
-            for row in results:
-                exp_data = dict(row._mapping)
-                # Convert datetime and JSON objects
-                for key, value in exp_data.items():
-                    if isinstance(value, datetime):
-                        exp_data[key] = value.isoformat()
-                experiences.append(exp_data)
+            experiences = await asyncio.to_thread(self._query_work_experience, user_id)
             
             # Cache the result
             await self.set_cached_data(cache_key, experiences, ttl=300)
@@ -221,6 +223,79 @@ class DataRetrievalAgent(BaseAgent):
             logger.error(f"Error fetching work experience: {e}")
             raise
     
+    def _query_work_experience(self, user_id: str) -> List[Dict[str, Any]]:
+        """Load user work experience from database"""
+        db: Session = next(get_db())
+        query = text("""
+            SELECT id, user_id, company_name, job_title, employment_type,
+                   industry, location, start_date, end_date, is_current,
+                   description, achievements, skills_used, is_verified
+            FROM work_experience
+            WHERE user_id = :user_id
+            ORDER BY start_date DESC
+        """)
+        results = db.execute(query, {"user_id": user_id}).fetchall()
+        
+        experiences = []
+        for row in results:
+            exp_data = dict(row._mapping)
+            # Convert datetime and JSON objects
+            for key, value in exp_data.items():
+                if isinstance(value, datetime):
+                    exp_data[key] = value.isoformat()
+            experiences.append(exp_data)
+        
+        return experiences
+    
+    async def fetch_user_bundle(self, user_id: str, record_access: bool = True) -> Dict[str, Any]:
+        """
+        Fetch profile, skills and work experience for a user
+        
+        Reads all three cache entries with one MGET and writes back the
+        misses with one pipeline, instead of a round-trip per entry.
+        
+        Args:
+            user_id: User to fetch
+            record_access: Count the fetch as user activity (off for cache warming)
+        
+        Returns:
+            Dict with profile, skills and work_experience
+        """
+        try:
+            if record_access:
+                get_cache_warmer().record_access(user_id)
+                get_sketch_analytics().record_user_activity(user_id)
+            
+            sources = {
+                "profile": (f"user_profile:{user_id}", self._query_user_profile, 600),
+                "skills": (f"user_skills:{user_id}", self._query_user_skills, 300),
+                "work_experience": (f"work_experience:{user_id}", self._query_work_experience, 300)
+            }
+            
+            cached = await self.get_cached_many([key for key, _, _ in sources.values()])
+            
+            bundle = {}
+            to_cache = {}
+            ttls = {}
+            for part, (cache_key, loader, ttl) in sources.items():
+                if cache_key in cached:
+                    bundle[part] = cached[cache_key]
+                    continue
+                
+                bundle[part] = await asyncio.to_thread(loader, user_id)
+                if not (isinstance(bundle[part], dict) and "error" in bundle[part]):
+                    to_cache[cache_key] = bundle[part]
+                    ttls[cache_key] = ttl
+            
+            await self.set_cached_many(to_cache, ttls=ttls)
+            
+            logger.info(f"Fetched user bundle: {user_id} ({len(cached)}/{len(sources)} cache hits)")
+            return bundle
+            
+        except Exception as e:
+            logger.error(f"Error fetching user bundle: {e}")
+            raise
+    
     async def fetch_job_postings(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Fetch job postings with filters"""
         try:
@@ -230,48 +305,7 @@ class DataRetrievalAgent(BaseAgent):
             if cached_data:
                 return cached_data
             
-            # Fetch from database
-            db: Session = next(get_db())
-            
-            # Build dynamic query based on filters
-            where_clauses = ["status = 'active'"]
-            params = {}
-            
-            if filters.get("location"):
-                where_clauses.append("location = :location")
-                params["location"] = filters["location"]
-            
-            if filters.get("industry"):
-                where_clauses.append("industry = :industry")
-                params["industry"] = filters["industry"]
-            
-            if filters.get("min_salary"):
-                where_clauses.append("salary_min >= :min_salary")
-                params["min_salary"] = filters["min_salary"]
-            
-            where_sql = " AND ".join(where_clauses)
-            
-            query = text(f"""
-                SELECT id, institution_id, title, description, location,
-                       employment_type, industry, salary_min, salary_max,
-                       required_skills, preferred_skills, posted_date
-                FROM job_postings
-                WHERE {where_sql}
-                ORDER BY posted_date DESC
-                LIMIT :limit
-            """)
-            params["limit"] = filters.get("limit", 50)
-            
-            results = db.execute(query, params).fetchall()
-            
-            jobs = []
-            for row in results:
-                job_data = dict(row._mapping)
-                # Convert datetime objects
-                for key, value in job_data.items():
-                    if isinstance(value, datetime):
-                        job_data[key] = value.isoformat()
-                jobs.append(job_data)
+            jobs = await asyncio.to_thread(self._query_job_postings, filters)
             
             # Cache the result
             await self.set_cached_data(cache_key, jobs, ttl=180)  # 3 minutes
@@ -283,6 +317,52 @@ class DataRetrievalAgent(BaseAgent):
             logger.error(f"Error fetching job postings: {e}")
             raise
     
+    def _query_job_postings(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Load active job postings matching filters from database"""
+        db: Session = next(get_db())
+        
+        # Build dynamic query based on filters
+        where_clauses = ["status = 'active'"]
+        params = {}
+        
+        if filters.get("location"):
+            where_clauses.append("location = :location")
+            params["location"] = filters["location"]
+        
+        if filters.get("industry"):
+            where_clauses.append("industry = :industry")
+            params["industry"] = filters["industry"]
+        
+        if filters.get("min_salary"):
+            where_clauses.append("salary_min >= :min_salary")
+            params["min_salary"] = filters["min_salary"]
+        
+        where_sql = " AND ".join(where_clauses)
+        
+        query = text(f"""
+            SELECT id, institution_id, title, description, location,
+                   employment_type, industry, salary_min, salary_max,
+                   required_skills, preferred_skills, posted_date
+            FROM job_postings
+            WHERE {where_sql}
+            ORDER BY posted_date DESC
+            LIMIT :limit
+        """)
+        params["limit"] = filters.get("limit", 50)
+        
+        results = db.execute(query, params).fetchall()
+        
+        jobs = []
+        for row in results:
+            job_data = dict(row._mapping)
+            # Convert datetime objects
+            for key, value in job_data.items():
+                if isinstance(value, datetime):
+                    job_data[key] = value.isoformat()
+            jobs.append(job_data)
+        
+        return jobs
+    
     async def fetch_institution_data(self, institution_id: str) -> Dict[str, Any]:
         """Fetch institution data from database"""
         try:
@@ -325,6 +405,19 @@ class DataRetrievalAgent(BaseAgent):
     async def search_skills(self, query: str) -> List[Dict[str, Any]]:
         """Search skills by name or category"""
         try:
+            # Serve from the in-memory index when it is built
+            search_index = get_skill_search_index()
+            if search_index.is_ready:
+                return [
+                    {
+                        "id": str(skill["id"]),
+                        "name": skill["name"],
+                        "category": skill["category"],
+                        "description": skill.get("description")
+                    }
+                    for skill in search_index.search(query, limit=50)
+                ]
+            
             # Check cache
             cache_key = f"skill_search:{query.lower()}"
             cached_data = await self.get_cached_data(cache_key)
@@ -356,25 +449,24 @@ class DataRetrievalAgent(BaseAgent):
     
     async def get_cached_data(self, key: str) -> Optional[Any]:
         """Get data from Redis cache"""
-        try:
-            redis_client = await get_redis()
-            cached = await redis_client.get(key)
-            if cached:
-                return json.loads(cached)
-            return None
-        except Exception as e:
-            logger.warning(f"Cache get error: {e}")
-            return None
+        return await cache_get(key)
     
     async def set_cached_data(self, key: str, value: Any, ttl: int = 300) -> bool:
         """Set data in Redis cache"""
-        try:
-            redis_client = await get_redis()
-            await redis_client.setex(key, ttl, json.dumps(value))
-            return True
-        except Exception as e:
-            logger.warning(f"Cache set error: {e}")
-            return False
+        return await cache_set(key, value, ttl)
+    
+    async def get_cached_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several entries from Redis cache in one round-trip"""
+        return await cache_get_many(keys)
+    
+    async def set_cached_many(
+        self,
+        items: Dict[str, Any],
+        ttl: int = 300,
+        ttls: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """Set several entries in Redis cache in one round-trip"""
+        return await cache_set_many(items, ttl, ttls)
     
     async def invalidate_cache(self, pattern: str) -> int:
         """Invalidate cache keys matching pattern"""
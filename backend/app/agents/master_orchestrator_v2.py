@@ -3,17 +3,44 @@ NOOR Platform - Master Orchestrator Agent v2
 Enhanced with Claude AI integration
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
 import logging
 import asyncio
+import copy
+import re
 from datetime import datetime
 
 from app.agents.base_agent import BaseAgent
+from app.agents.task_dag import DAGExecutor
 from app.core.ai_client import get_ai_client
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Task types with a fixed, type-driven decomposition
+PLANNED_TASK_TYPES = ("skill_matching", "career_analysis", "job_recommendation")
+
+# Stands in for a task parameter in a cached plan
+PARAMETER = re.compile(r"\{\{param:([\w-]+)\}\}")
+
+
+def _parameter_shape(parameters: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    """Parameter names and value types, which decide a task's plan"""
+    return tuple(sorted((name, type(value).__name__) for name, value in parameters.items()))
+
+
+def _instantiate(template: Any, parameters: Dict[str, Any]) -> Any:
+    """Fill a cached plan's parameter placeholders with a task's values"""
+    if isinstance(template, str):
+        match = PARAMETER.fullmatch(template)
+        return copy.deepcopy(parameters.get(match.group(1))) if match else template
+    if isinstance(template, dict):
+        return {key: _instantiate(value, parameters) for key, value in template.items()}
+    if isinstance(template, list):
+        return [_instantiate(value, parameters) for value in template]
+    return template
+
 
 class MasterOrchestratorV2(BaseAgent):
     """
@@ -37,7 +64,16 @@ class MasterOrchestratorV2(BaseAgent):
         )
         self.ai_client = get_ai_client()
         self.sub_agents: Dict[str, BaseAgent] = {}
-        self.task_history: List[Dict[str, Any]] = []
+        # (task type, parameter shape) -> {"analysis", "subtasks"} with placeholders
+        self.plan_cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self.plan_cache_hits = 0
+        self.plan_cache_misses = 0
+        self._background_analyses: set = set()
+        self.dag_executor = DAGExecutor(
+            self._run_subtask,
+            max_concurrency=settings.ORCHESTRATOR_MAX_CONCURRENCY,
+            default_timeout=settings.ORCHESTRATOR_SUBTASK_TIMEOUT_SECONDS
+        )
     
     def register_agent(self, agent: BaseAgent):
         """Register a sub-agent"""
@@ -60,56 +96,111 @@ class MasterOrchestratorV2(BaseAgent):
         logger.info(f"🚀 Master Orchestrator executing task: {task_id} ({task_type})")
         
         try:
-            # Step 1: Analyze task using AI
-            task_analysis = await self._analyze_task_with_ai(task)
-            
-            # Step 2: Decompose into subtasks
-            subtasks = await self._decompose_task(task, task_analysis)
+            # Steps 1-2: Analyze and decompose, from the plan cache when possible
+            task_analysis, subtasks, plan_cached = await self._plan(task)
             
             # Step 3: Route to appropriate agents
-            results = await self._execute_subtasks(subtasks)
+            execution = await self._execute_subtasks(subtasks)
+            results = execution["results"]
             
             # Step 4: Aggregate results
             final_result = await self._aggregate_results(results, task)
             
-            # Store in history
-            self.task_history.append({
-                "task_id": task_id,
-                "type": task_type,
-                "status": "completed",
-                "result": final_result,
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            logger.info(f"✅ Task {task_id} completed successfully")
+            if execution["partial"]:
+                logger.warning(f"Task {task_id} hit the request deadline; returning completed subtasks only")
+            else:
+                logger.info(f"✅ Task {task_id} completed successfully")
             
-            return {
+            response = {
                 "success": True,
                 "task_id": task_id,
                 "result": final_result,
+                "partial": execution["partial"],
                 "metadata": {
                     "subtasks_count": len(subtasks),
-                    "execution_time": final_result.get("execution_time", 0)
+                    "plan_cached": plan_cached,
+                    "complexity": task_analysis.get("complexity"),
+                    "execution_time": final_result.get("execution_time", 0),
+                    "wall_time_ms": execution["wall_time_ms"],
+                    "subtask_timings": execution["timings"]
                 }
             }
             
+            # Store in history
+            self.log_task({**task, "task_id": task_id}, response)
+            return response
+            
         except Exception as e:
             logger.error(f"❌ Task {task_id} failed: {str(e)}")
             
-            # Store failure in history
-            self.task_history.append({
-                "task_id": task_id,
-                "type": task_type,
-                "status": "failed",
-                "error": str(e),
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            return {
+            response = {
                 "success": False,
                 "task_id": task_id,
                 "error": str(e)
             }
+            
+            # Store failure in history
+            self.log_task({**task, "task_id": task_id}, response)
+            return response
+    
+    async def _plan(self, task: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]], bool]:
+        """
+        Get the analysis and subtasks of a task
+        
+        Plans are cached per task type and parameter shape. Known task types
+        decompose by type alone, so they are planned without a model call and
+        the AI analysis runs in the background for telemetry; unknown types
+        are analyzed by the model once per shape.
+        
+        Returns:
+            (analysis, subtasks, whether the plan came from the cache)
+        """
+        task_type = task.get("type", "unknown")
+        parameters = task.get("parameters", {})
+        key = (task_type, _parameter_shape(parameters))
+        
+        plan = self.plan_cache.get(key)
+        cached = plan is not None
+        if cached:
+            self.plan_cache.move_to_end(key)
+            self.plan_cache_hits += 1
+        else:
+            self.plan_cache_misses += 1
+            if task_type in PLANNED_TASK_TYPES:
+                analysis = self._fallback_task_analysis(task)
+                self._analyze_in_background(key, task)
+            else:
+                analysis = await self._analyze_task_with_ai(task)
+            
+            # Decompose against placeholders so the plan fits any task of this shape
+            template_task = {
+                **task,
+                "parameters": {name: f"{{{{param:{name}}}}}" for name in parameters}
+            }
+            plan = {
+                "analysis": analysis,
+                "subtasks": await self._decompose_task(template_task, analysis)
+            }
+            self.plan_cache[key] = plan
+            while len(self.plan_cache) > settings.ORCHESTRATOR_PLAN_CACHE_SIZE:
+                self.plan_cache.popitem(last=False)
+        
+        return plan["analysis"], _instantiate(plan["subtasks"], parameters), cached
+    
+    def _analyze_in_background(self, key: Tuple, task: Dict[str, Any]) -> None:
+        """Run the AI analysis off the request path and attach it to the cached plan"""
+        if not settings.ORCHESTRATOR_BACKGROUND_ANALYSIS or not self.ai_client.is_available():
+            return
+        
+        async def analyze():
+            analysis = await self._analyze_task_with_ai(task)
+            plan = self.plan_cache.get(key)
+            if plan is not None:
+                plan["analysis"] = {**plan["analysis"], **analysis}
+        
+        background = asyncio.create_task(analyze())
+        self._background_analyses.add(background)
+        background.add_done_callback(self._background_analyses.discard)
     
     async def _analyze_task_with_ai(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -279,28 +370,25 @@ Provide a comprehensive analysis."""
             }
         ]
     
-    async def _execute_subtasks(self, subtasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """
-        Execute subtasks in parallel or sequence based on dependencies
+    async def _execute_subtasks(self, subtasks: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        results = []
+        Execute subtasks concurrently in dependency order
         
-        for subtask in subtasks:
-            agent_name = subtask.get("agent", "default")
-            
-            if agent_name in self.sub_agents:
-                # Execute using registered agent
-                result = await self.sub_agents[agent_name].execute(subtask)
-            else:
-                # Execute directly
-                result = await self._execute_subtask_directly(subtask)
-            
-            results.append({
-                "subtask_id": subtask["subtask_id"],
-                "result": result
-            })
+        Subtasks wait only for the subtasks their {{id.result}} placeholders
+        reference, so independent retrievals overlap and the whole plan takes
+        as long as its critical path.
+        """
+        return await self.dag_executor.run(subtasks)
+    
+    async def _run_subtask(self, subtask: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one subtask on its agent, or directly"""
+        agent_name = subtask.get("agent", "default")
         
-        return results
+        if agent_name in self.sub_agents:
+            # Execute using registered agent
+            return await self.sub_agents[agent_name].execute(subtask)
+        # Execute directly
+        return await self._execute_subtask_directly(subtask)
     
     async def _execute_subtask_directly(self, subtask: Dict[str, Any]) -> Dict[str, Any]:
         """Execute subtask directly without sub-agent"""
@@ -385,17 +473,25 @@ Provide a comprehensive analysis."""
         return {
             "name": self.name,
             "registered_agents": list(self.sub_agents.keys()),
-            "tasks_completed": len([t for t in self.task_history if t["status"] == "completed"]),
-            "tasks_failed": len([t for t in self.task_history if t["status"] == "failed"]),
+            "tasks_completed": self.task_history.counts["completed"],
+            "tasks_failed": self.task_history.counts["failed"],
+            "plan_cache": {
+                "size": len(self.plan_cache),
+                "hits": self.plan_cache_hits,
+                "misses": self.plan_cache_misses
+            },
             "ai_available": self.ai_client.is_available()
         }
 
 
 # Global orchestrator instance
-master_orchestrator = MasterOrchestratorV2()
+_master_orchestrator = None
 
 
 def get_master_orchestrator() -> MasterOrchestratorV2:
     """Get global master orchestrator instance"""
-    return master_orchestrator
+    global _master_orchestrator
+    if _master_orchestrator is None:
+        _master_orchestrator = MasterOrchestratorV2()
+    return _master_orchestrator
 
@@ -9,17 +9,29 @@ This agent handles intelligent matching between:
 - Mentors and mentees
 """
 
+import hashlib
+import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 from app.agents.base_agent import BaseAgent, AgentCapability, AgentStatus
 from app.core.ai_client import get_ai_client
+from app.core.request_context import deadline_expired
 from app.agents.data_retrieval_agent import get_data_retrieval_agent
 from app.agents.ai_analysis_agent import get_ai_analysis_agent
 
 logger = logging.getLogger(__name__)
 
+# Job listing scored for each user; the cache warmer preloads the same entry
+MATCH_JOB_FILTERS = {"limit": 100}
+
+
+def skills_version(user_skills: List[Dict[str, Any]]) -> str:
+    """Short digest of a user's skills; changes whenever a skill is added, removed or updated"""
+    payload = json.dumps(user_skills, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
 
 class MatchingAgent(BaseAgent):
     """Agent for intelligent matching and recommendations"""
@@ -38,6 +50,7 @@ class MatchingAgent(BaseAgent):
         self.ai_client = get_ai_client()
         self.data_agent = get_data_retrieval_agent()
         self.analysis_agent = get_ai_analysis_agent()
+        self.match_cache_ttl = 300  # Same lifetime as cached user skills
         
     async def execute(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -57,8 +70,9 @@ class MatchingAgent(BaseAgent):
             logger.info(f"Matching Agent executing: {action}")
             
             # Route to appropriate method
+            skipped = 0
             if action == "match_jobs_to_user":
-                result = await self.match_jobs_to_user(
+                result, skipped = await self._match_jobs_to_user(
                     user_id=parameters.get("user_id"),
                     limit=parameters.get("limit", 10)
                 )
@@ -99,6 +113,8 @@ class MatchingAgent(BaseAgent):
                 "success": True,
                 "action": action,
                 "matches": result,
+                # Matching stops scoring at the request deadline and ranks what it has
+                "partial": skipped > 0,
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -118,56 +134,82 @@ class MatchingAgent(BaseAgent):
         limit: int = 10
     ) -> List[Dict[str, Any]]:
         """Find best job matches for a user"""
+        matches, _ = await self._match_jobs_to_user(user_id, limit)
+        return matches
+    
+    async def _match_jobs_to_user(
+        self,
+        user_id: str,
+        limit: int
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Best job matches for a user, and how many jobs went unscored at the deadline"""
+        skipped = 0
         try:
-            # Fetch user profile and skills
-            user_profile = await self.data_agent.fetch_user_profile(user_id)
-            user_skills = await self.data_agent.fetch_user_skills(user_id)
-            work_experience = await self.data_agent.fetch_work_experience(user_id)
+            # Fetch user profile, skills and experience in one cache round-trip
+            user_bundle = await self.data_agent.fetch_user_bundle(user_id)
+            user_skills = user_bundle["skills"]
             
             # Fetch available jobs
-            jobs = await self.data_agent.fetch_job_postings({
-                "limit": 100  # Get more jobs for better matching
-            })
+            # Get more jobs for better matching
+            jobs = await self.data_agent.fetch_job_postings(MATCH_JOB_FILTERS)
+            
+            # Previously computed matches for this user's current skills, in one MGET
+            version = skills_version(user_skills)
+            match_keys = {job.get("id"): f"skill_match:{user_id}:{version}:{job.get('id')}" for job in jobs}
+            cached_matches = await self.data_agent.get_cached_many(list(match_keys.values()))
+            new_matches = {}
             
             # Score each job
             scored_jobs = []
             for job in jobs:
-                # Use AI Analysis Agent for skill matching
-                match_result = await self.analysis_agent.execute({
-                    "action": "analyze_skill_match",
-                    "parameters": {
-                        "user_skills": user_skills,
-                        "job_requirements": {
-                            "title": job.get("title"),
-                            "required_skills": job.get("required_skills", []),
-                            "preferred_skills": job.get("preferred_skills", []),
-                            "industry": job.get("industry")
-                        }
-                    }
-                })
+                match_key = match_keys[job.get("id")]
+                analysis = cached_matches.get(match_key)
                 
-                if match_result.get("success"):
-                    analysis = match_result.get("analysis", {})
-                    match_score = analysis.get("match_score", 0)
+                if analysis is None:
+                    if deadline_expired():
+                        # Out of time: rank the cached and already scored jobs
+                        skipped += 1
+                        continue
                     
-                    scored_jobs.append({
-                        **job,
-                        "match_score": match_score,
-                        "matched_skills": analysis.get("matched_required_skills", []),
-                        "missing_skills": analysis.get("missing_required_skills", []),
-                        "recommendation": analysis.get("recommendation")
+                    # Use AI Analysis Agent for skill matching
+                    match_result = await self.analysis_agent.execute({
+                        "action": "analyze_skill_match",
+                        "parameters": {
+                            "user_skills": user_skills,
+                            "job_requirements": {
+                                "title": job.get("title"),
+                                "required_skills": job.get("required_skills", []),
+                                "preferred_skills": job.get("preferred_skills", []),
+                                "industry": job.get("industry")
+                            }
+                        }
                     })
+                    if not match_result.get("success"):
+                        continue
+                    analysis = match_result.get("analysis", {})
+                    new_matches[match_key] = analysis
+                
+                scored_jobs.append({
+                    **job,
+                    "match_score": analysis.get("match_score", 0),
+                    "matched_skills": analysis.get("matched_required_skills", []),
+                    "missing_skills": analysis.get("missing_required_skills", []),
+                    "recommendation": analysis.get("recommendation")
+                })
+            
+            # Write all new matches back in one pipeline
+            await self.data_agent.set_cached_many(new_matches, ttl=self.match_cache_ttl)
             
             # Sort by match score and return top matches
             scored_jobs.sort(key=lambda x: x["match_score"], reverse=True)
             top_matches = scored_jobs[:limit]
             
             logger.info(f"Found {len(top_matches)} job matches for user {user_id}")
-            return top_matches
+            return top_matches, skipped
             
         except Exception as e:
             logger.error(f"Error matching jobs to user: {e}")
-            return []
+            return [], skipped
     
     async def match_candidates_to_job(
         self,
@@ -265,8 +307,9 @@ class MatchingAgent(BaseAgent):
         """Find users with similar profiles"""
         try:
             # Fetch user data
-            user_skills = await self.data_agent.fetch_user_skills(user_id)
-            work_experience = await self.data_agent.fetch_work_experience(user_id)
+            user_bundle = await self.data_agent.fetch_user_bundle(user_id)
+            user_skills = user_bundle["skills"]
+            work_experience = user_bundle["work_experience"]
             
             # In production, would search database for similar profiles
             # For MVP, return placeholder
@@ -313,8 +356,9 @@ class MatchingAgent(BaseAgent):
         """Recommend skills to develop based on market demand"""
         try:
             # Fetch user skills and experience
-            user_skills = await self.data_agent.fetch_user_skills(user_id)
-            work_experience = await self.data_agent.fetch_work_experience(user_id)
+            user_bundle = await self.data_agent.fetch_user_bundle(user_id)
+            user_skills = user_bundle["skills"]
+            work_experience = user_bundle["work_experience"]
             
             # Determine user's industry and role
             industry = "Technology"  # Default
@@ -342,7 +386,7 @@ Provide recommendations:
 
 Format as JSON."""
 
-            recommendations = await self.ai_client.generate_structured_output(
+            recommendations = await self.ai_client.generate_structured_output_async(
                 prompt=prompt,
                 schema={
                     "in_demand_skills": "array of objects with: skill, reason, priority",
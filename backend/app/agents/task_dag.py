@@ -0,0 +1,205 @@
+"""
+NOOR Platform - Subtask DAG Executor
+Runs orchestrator subtasks concurrently in dependency order
+"""
+
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Set
+import asyncio
+import logging
+import re
+import time
+
+from app.core.request_context import clamp_timeout, deadline_expired
+
+logger = logging.getLogger(__name__)
+
+# "{{subtask_id.result}}", optionally followed by a path into the result
+REFERENCE = re.compile(r"\{\{\s*([\w-]+)\.result((?:\.[\w-]+)*)\s*\}\}")
+
+COMPLETED = "completed"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+SKIPPED = "skipped"
+
+
+def references(value: Any) -> Set[str]:
+    """Subtask ids referenced by placeholders anywhere in a parameter value"""
+    if isinstance(value, str):
+        return {match.group(1) for match in REFERENCE.finditer(value)}
+    if isinstance(value, dict):
+        return set().union(*(references(item) for item in value.values())) if value else set()
+    if isinstance(value, (list, tuple)):
+        return set().union(*(references(item) for item in value)) if value else set()
+    return set()
+
+
+def _lookup(result: Any, path: str) -> Any:
+    """Follow a ".a.b" path into a result"""
+    for key in filter(None, path.split(".")):
+        result = result.get(key) if isinstance(result, dict) else None
+    return result
+
+
+def substitute(value: Any, results: Dict[str, Any]) -> Any:
+    """
+    Replace placeholders with upstream results
+
+    A string that is exactly one placeholder becomes the referenced object;
+    placeholders embedded in longer strings are formatted into the string.
+    """
+    if isinstance(value, str):
+        whole = REFERENCE.fullmatch(value.strip())
+        if whole:
+            return _lookup(results.get(whole.group(1)), whole.group(2))
+        return REFERENCE.sub(lambda match: str(_lookup(results.get(match.group(1)), match.group(2))), value)
+    if isinstance(value, dict):
+        return {key: substitute(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [substitute(item, results) for item in value]
+    return value
+
+
+def build_graph(subtasks: List[Dict[str, Any]]) -> Dict[str, Set[str]]:
+    """
+    Dependencies of each subtask, from placeholders and explicit depends_on
+
+    Raises:
+        ValueError: On duplicate ids, unknown references or cycles
+    """
+    ids = [subtask["subtask_id"] for subtask in subtasks]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Duplicate subtask ids")
+
+    graph = {
+        subtask["subtask_id"]: references(subtask.get("parameters", {})) | set(subtask.get("depends_on", []))
+        for subtask in subtasks
+    }
+    for node, upstream in graph.items():
+        unknown = upstream - graph.keys()
+        if unknown:
+            raise ValueError(f"Subtask {node} references unknown subtasks: {', '.join(sorted(unknown))}")
+
+    # Kahn's algorithm; anything left over is on a cycle
+    remaining = {node: set(upstream) for node, upstream in graph.items()}
+    ready = [node for node, upstream in remaining.items() if not upstream]
+    while ready:
+        done = ready.pop()
+        del remaining[done]
+        for node, upstream in remaining.items():
+            if done in upstream:
+                upstream.discard(done)
+                if not upstream:
+                    ready.append(node)
+    if remaining:
+        raise ValueError(f"Subtask dependency cycle among: {', '.join(sorted(remaining))}")
+    return graph
+
+
+class DAGExecutor:
+    """
+    Concurrent subtask executor
+
+    Provides:
+    - Dependency edges parsed from {{subtask_id.result}} placeholders
+    - Ready subtasks run concurrently under a concurrency cap
+    - Upstream results substituted into parameters before a subtask runs
+    - Per-subtask timeouts ("timeout" seconds on the subtask, or the default),
+      cut short by the request deadline; when it passes, subtasks still
+      running are cancelled and the completed ones are returned as a
+      partial result
+    - Per-subtask timing; dependents of a failed subtask are skipped
+    """
+
+    def __init__(
+        self,
+        run_subtask: Callable[[Dict[str, Any]], Awaitable[Any]],
+        max_concurrency: int = 8,
+        default_timeout: Optional[float] = None
+    ):
+        self.run_subtask = run_subtask
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+
+    async def run(self, subtasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Execute subtasks
+
+        Returns:
+            {"results": [...], "timings": {...}, "wall_time_ms": float, "partial": bool};
+            results follow the input order with subtask_id, status and result
+        """
+        graph = build_graph(subtasks)
+        by_id = {subtask["subtask_id"]: subtask for subtask in subtasks}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        start = time.perf_counter()
+
+        results: Dict[str, Any] = {}
+        status: Dict[str, str] = {}
+        timings: Dict[str, Dict[str, float]] = {}
+        running: Dict[asyncio.Task, str] = {}
+        launched: Set[str] = set()
+
+        async def run_node(node: str) -> Any:
+            subtask = dict(by_id[node])
+            subtask["parameters"] = substitute(subtask.get("parameters", {}), results)
+            async with semaphore:
+                timeout = clamp_timeout(subtask.get("timeout", self.default_timeout))
+                started = time.perf_counter()
+                try:
+                    return await asyncio.wait_for(self.run_subtask(subtask), timeout)
+                finally:
+                    timings[node] = {
+                        "started_ms": round((started - start) * 1000, 2),
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+                    }
+
+        def launch_ready() -> None:
+            for node, upstream in graph.items():
+                if node in launched:
+                    continue
+                if any(status.get(dependency) in (FAILED, TIMED_OUT, SKIPPED) for dependency in upstream):
+                    status[node] = SKIPPED
+                    launched.add(node)
+                    continue
+                if all(status.get(dependency) == COMPLETED for dependency in upstream):
+                    running[asyncio.create_task(run_node(node))] = node
+                    launched.add(node)
+
+        try:
+            launch_ready()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    node = running.pop(task)
+                    try:
+                        results[node] = task.result()
+                        status[node] = COMPLETED
+                    except asyncio.TimeoutError:
+                        status[node] = TIMED_OUT
+                        logger.warning(f"Subtask {node} timed out")
+                    except Exception as e:
+                        status[node] = FAILED
+                        results[node] = {"success": False, "error": str(e)}
+                        logger.error(f"Subtask {node} failed: {e}")
+                # Skipping may make further nodes skippable, so repeat until stable
+                settled = -1
+                while settled != len(launched):
+                    settled = len(launched)
+                    launch_ready()
+        finally:
+            for task in running:
+                task.cancel()
+
+        return {
+            "results": [
+                {
+                    "subtask_id": node,
+                    "status": status.get(node, SKIPPED),
+                    "result": results.get(node)
+                }
+                for node in by_id
+            ],
+            "timings": timings,
+            "wall_time_ms": round((time.perf_counter() - start) * 1000, 2),
+            "partial": deadline_expired() and any(status.get(node) != COMPLETED for node in by_id)
+        }
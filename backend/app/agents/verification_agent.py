@@ -175,7 +175,7 @@ Evaluate:
 
 Format as JSON."""
 
-            analysis = await self.ai_client.generate_structured_output(
+            analysis = await self.ai_client.generate_structured_output_async(
                 prompt=prompt,
                 schema={
                     "sufficient_evidence": "boolean",
@@ -251,7 +251,7 @@ Verify:
 
 Format as JSON."""
 
-            analysis = await self.ai_client.generate_structured_output(
+            analysis = await self.ai_client.generate_structured_output_async(
                 prompt=prompt,
                 schema={
                     "credible_evidence": "boolean",
@@ -5,7 +5,7 @@ NOOR Platform - Authentication Endpoints
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 import logging
@@ -32,6 +32,7 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     user_id: Optional[str] = None
     emirates_id: Optional[str] = None
+    roles: List[str] = []
 
 
 class UserRegister(BaseModel):
@@ -99,7 +100,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-        token_data = TokenData(user_id=user_id)
+        token_data = TokenData(user_id=user_id, roles=payload.get("roles") or [])
     except JWTError:
         raise credentials_exception
     
@@ -2,9 +2,15 @@
 NOOR Platform - Eight-Faculty Model API Endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
+from datetime import date
+
+from app.api.v1.endpoints.auth import get_current_user, TokenData
+from app.services.assessment_generator import AssessmentScorer
+from app.services.faculty_rollups import get_faculty_rollups
+from app.services.percentiles import get_percentile_service
 
 router = APIRouter()
 
@@ -36,6 +42,15 @@ class FacultyScoreResponse(BaseModel):
     total_competencies: int
     last_assessment_date: str
 
+class CompetencyAnswers(BaseModel):
+    competency_id: str
+    answers: List[Any]
+
+class FacultyAssessmentSubmission(BaseModel):
+    assessment_id: str
+    competencies: List[CompetencyAnswers]
+    biometric_verified: bool = False
+
 # ============================================================================
 # Mock Data (Replace with database queries)
 # ============================================================================
@@ -192,24 +207,162 @@ async def get_user_faculty_scores(user_id: str):
         }
     ]
 
+@router.post("/users/{user_id}/faculties/{faculty_id}/assessments")
+async def submit_faculty_assessment(
+    user_id: str,
+    faculty_id: str,
+    submission: FacultyAssessmentSubmission,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Score a completed faculty assessment and save the result
+    
+    Answers are scored against the assessment's stored answer key. The
+    scored assessment is added to the faculty score cube and the
+    percentile digests as it is saved.
+    """
+    if current_user.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Cannot submit assessments for another user")
+    _check_faculty(faculty_id)
+    rollups = get_faculty_rollups()
+    questions = await rollups.load_questions(submission.assessment_id, faculty_id)
+    if questions is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+
+    competency_scores = []
+    for competency in submission.competencies:
+        competency_questions = questions.get(competency.competency_id)
+        if competency_questions is None:
+            raise HTTPException(status_code=422, detail=f"Competency {competency.competency_id} is not part of this assessment")
+        if len(competency.answers) != len(competency_questions):
+            raise HTTPException(
+                status_code=422,
+                detail=f"Competency {competency.competency_id} has {len(competency_questions)} questions"
+            )
+        try:
+            score = AssessmentScorer.score_competency(competency_questions, competency.answers)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Competency {competency.competency_id}: {e}")
+        competency_scores.append({"competency_id": competency.competency_id, **score})
+
+    faculty_score = AssessmentScorer.score_faculty(competency_scores)
+    user_assessment_id = await rollups.record_assessment(
+        user_id,
+        submission.assessment_id,
+        faculty_id,
+        faculty_score,
+        biometric_verified=submission.biometric_verified
+    )
+    return {
+        "user_assessment_id": user_assessment_id,
+        "faculty_id": faculty_id,
+        **faculty_score
+    }
+
+def _faculty_names() -> Dict[str, str]:
+    """Map faculty IDs to display names"""
+    return {f["id"]: f["name"] for f in FACULTIES}
+
+
+def _check_faculty(faculty_id: Optional[str]) -> None:
+    """Reject unknown faculty IDs"""
+    if faculty_id and faculty_id not in _faculty_names():
+        raise HTTPException(status_code=404, detail="Faculty not found")
+
+
+def _label_faculties(groups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add faculty names to faculty groups"""
+    names = _faculty_names()
+    for group in groups:
+        if "faculty" in group:
+            group["faculty_name"] = names.get(group["faculty"], group["faculty"])
+    return groups
+
+
 @router.get("/institutions/{institution_id}/faculty-analytics")
-async def get_institution_faculty_analytics(institution_id: str):
+async def get_institution_faculty_analytics(
+    institution_id: str,
+    faculty_id: Optional[str] = Query(None, description="Drill down into this faculty's competencies"),
+    group_by: Optional[str] = Query(None, pattern="^(faculty|competency|emirate|period)$"),
+    period_from: Optional[date] = Query(None),
+    period_to: Optional[date] = Query(None)
+):
     """
     Get aggregated faculty analytics for an institution
+    
+    Served from the pre-aggregated faculty score cube. Without faculty_id,
+    returns one summary per faculty; with faculty_id, one per competency.
     """
-    # TODO: Implement with database
+    _check_faculty(faculty_id)
+    group_by = group_by or ("competency" if faculty_id else "faculty")
+    groups = await get_faculty_rollups().query(
+        institution_id=institution_id,
+        faculty_id=faculty_id,
+        period_from=period_from,
+        period_to=period_to,
+        group_by=group_by
+    )
     return {
-        "message": "Institution faculty analytics endpoint - to be implemented",
-        "institution_id": institution_id
+        "institution_id": institution_id,
+        "faculty_id": faculty_id,
+        "period_from": period_from,
+        "period_to": period_to,
+        "group_by": group_by,
+        "groups": _label_faculties(groups)
     }
 
 @router.get("/federal/faculty-analytics")
-async def get_federal_faculty_analytics():
+async def get_federal_faculty_analytics(
+    emirate: Optional[str] = Query(None),
+    faculty_id: Optional[str] = Query(None),
+    group_by: str = Query("faculty", pattern="^(faculty|competency|institution|emirate|period)$"),
+    period_from: Optional[date] = Query(None),
+    period_to: Optional[date] = Query(None)
+):
     """
     Get national-level faculty analytics
+    
+    Served from the pre-aggregated faculty score cube, with drill-down by
+    emirate, faculty, competency, institution or month.
     """
-    # TODO: Implement with database
+    _check_faculty(faculty_id)
+    groups = await get_faculty_rollups().query(
+        emirate=emirate,
+        faculty_id=faculty_id,
+        period_from=period_from,
+        period_to=period_to,
+        group_by=group_by
+    )
     return {
-        "message": "Federal faculty analytics endpoint - to be implemented"
+        "emirate": emirate,
+        "faculty_id": faculty_id,
+        "period_from": period_from,
+        "period_to": period_to,
+        "group_by": group_by,
+        "groups": _label_faculties(groups)
     }
 
+@router.get("/faculty-percentiles")
+async def get_faculty_score_percentiles(
+    faculty_id: Optional[str] = Query(None),
+    institution_id: Optional[str] = Query(None),
+    emirate: Optional[str] = Query(None),
+    group_by: Optional[str] = Query(None, pattern="^(faculty|institution|emirate)$")
+):
+    """
+    Get p10/p50/p90 faculty scores for any roll-up
+    
+    Served by merging per-(faculty, institution, emirate) t-digests; each
+    answer includes its rank error and a value interval per percentile.
+    """
+    _check_faculty(faculty_id)
+    result = await get_percentile_service().percentiles(
+        "faculty_score",
+        {"faculty": faculty_id, "institution": institution_id, "emirate": emirate},
+        group_by=group_by
+    )
+    if group_by == "faculty":
+        names = {faculty.lower(): name for faculty, name in _faculty_names().items()}
+        for group in result["groups"]:
+            group["faculty_name"] = names.get(group["faculty"], group["faculty"])
+    return result
@@ -0,0 +1,116 @@
+"""
+NOOR Platform - Bulk Export Endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+from typing import Dict, Any
+import os
+
+from app.api.v1.endpoints.auth import get_current_user, TokenData
+from app.services.exports import (
+    get_export_service,
+    parquet_available,
+    can_export,
+    ExportLimitError,
+    EXPORT_DATASETS,
+    FORMATS,
+    COMPLETED
+)
+
+router = APIRouter()
+
+
+class CreateExport(BaseModel):
+    dataset: str
+    format: str = "csv"
+    filters: Dict[str, Any] = {}
+
+
+def _job_response(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job record"""
+    return {
+        **{key: value for key, value in job.items() if key != "owner_id"},
+        "status_url": f"/api/v1/exports/{job['job_id']}",
+        "download_url": f"/api/v1/exports/{job['job_id']}/download" if job["status"] == COMPLETED else None
+    }
+
+
+async def _owned_job(job_id: str, current_user: TokenData) -> Dict[str, Any]:
+    """Look up a job of the current user"""
+    job = await get_export_service().get_job(job_id)
+    if not job or job["owner_id"] != current_user.user_id:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job
+
+
+@router.get("/datasets")
+async def list_export_datasets(current_user: TokenData = Depends(get_current_user)):
+    """Datasets the current user may export, with their columns and filters"""
+    return {
+        "success": True,
+        "formats": [name for name in FORMATS if name != "parquet" or parquet_available()],
+        "datasets": [
+            {
+                "name": name,
+                "description": definition["description"],
+                "columns": [column for column, _ in definition["columns"]],
+                "filters": list(definition["filters"])
+            }
+            for name, definition in EXPORT_DATASETS.items()
+            if can_export(name, current_user.roles)
+        ]
+    }
+
+
+@router.post("/", status_code=status.HTTP_202_ACCEPTED)
+async def create_export(request: CreateExport, current_user: TokenData = Depends(get_current_user)):
+    """
+    Start a background export
+
+    Poll the returned status_url for progress; download_url is set once the
+    export has completed.
+    """
+    if not can_export(request.dataset, current_user.roles):
+        roles = ", ".join(EXPORT_DATASETS[request.dataset]["roles"])
+        raise HTTPException(status_code=403, detail=f"Exporting {request.dataset} requires one of: {roles}")
+    try:
+        job = await get_export_service().create_export(
+            current_user.user_id,
+            request.dataset,
+            format=request.format,
+            filters=request.filters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExportLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "60"})
+    return {"success": True, "export": _job_response(job)}
+
+
+@router.get("/{job_id}")
+async def get_export(job_id: str, current_user: TokenData = Depends(get_current_user)):
+    """Export status and progress"""
+    job = await _owned_job(job_id, current_user)
+    return {"success": True, "export": _job_response(job)}
+
+
+@router.get("/{job_id}/download")
+async def download_export(job_id: str, current_user: TokenData = Depends(get_current_user)):
+    """Download a completed export"""
+    job = await _owned_job(job_id, current_user)
+    path = get_export_service().file_path(job)
+    if job["status"] != COMPLETED or not os.path.exists(path):
+        raise HTTPException(status_code=409, detail=f"Export is {job['status']}, not available for download")
+    media_type = "application/vnd.apache.parquet" if job["format"] == "parquet" else "application/gzip"
+    return FileResponse(path, media_type=media_type, filename=job["file_name"])
+
+
+@router.delete("/{job_id}")
+async def cancel_export(job_id: str, current_user: TokenData = Depends(get_current_user)):
+    """Cancel a queued or running export"""
+    await _owned_job(job_id, current_user)
+    if not await get_export_service().cancel(job_id):
+        raise HTTPException(status_code=409, detail="Export is not running on this server or has finished")
+    return {"success": True, "message": "Export cancelled"}
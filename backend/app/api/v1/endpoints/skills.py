@@ -8,6 +8,7 @@ from typing import Optional, List
 import logging
 
 from app.api.v1.endpoints.auth import get_current_user, TokenData
+from app.services.skill_search_index import get_skill_search_index
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -45,6 +46,30 @@ async def list_skills(
     return {"success": True, "skills": [], "total": 0}
 
 
+@router.get("/autocomplete")
+async def autocomplete_skills(
+    q: str = Query(..., min_length=1, max_length=100),
+    category: Optional[str] = Query(None),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Suggest skills for the skill picker from the in-memory search index"""
+    search_index = get_skill_search_index()
+    suggestions = search_index.autocomplete(q, limit=limit, category=category)
+    return {
+        "success": True,
+        "skills": [
+            {
+                "id": str(skill["id"]),
+                "name": skill["name"],
+                "category": skill["category"],
+                "user_count": skill.get("user_count", 0)
+            }
+            for skill in suggestions
+        ],
+        "index_version": search_index.version
+    }
+
+
 @router.get("/me")
 async def get_my_skills(current_user: TokenData = Depends(get_current_user)):
     """Get current user's skills"""
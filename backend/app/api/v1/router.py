@@ -22,7 +22,8 @@ from app.api.v1.endpoints import (
     eight_faculty,
     gamification,
     learning,
-    payments
+    payments,
+    exports
 )
 
 api_router = APIRouter()
@@ -144,3 +145,9 @@ api_router.include_router(
     tags=["Payments"]
 )
 
+# Bulk Exports
+api_router.include_router(
+    exports.router,
+    prefix="/exports",
+    tags=["Exports"]
+)
@@ -7,10 +7,26 @@ from anthropic import Anthropic, AsyncAnthropic
 from typing import List, Dict, Any, Optional
 import logging
 from app.core.config import settings
+from app.core.request_context import DeadlineExceeded, time_remaining, within_deadline
 
 logger = logging.getLogger(__name__)
 
 
+def deadline_options() -> Dict[str, Any]:
+    """
+    Per-call SDK options bounding an LLM request by the request deadline
+
+    Raises:
+        DeadlineExceeded: The deadline has already passed
+    """
+    remaining = time_remaining()
+    if remaining is None:
+        return {}
+    if remaining <= 0:
+        raise DeadlineExceeded("Request deadline exceeded before the LLM call")
+    return {"timeout": remaining}
+
+
 class ClaudeAIClient:
     """
     Anthropic Claude AI client for NOOR Platform
@@ -57,6 +73,7 @@ class ClaudeAIClient:
         
         try:
             message = self.client.messages.create(
+                **deadline_options(),
                 model=model or settings.AI_MODEL,
                 max_tokens=max_tokens or settings.AI_MAX_TOKENS,
                 temperature=temperature or settings.AI_TEMPERATURE,
@@ -102,7 +119,8 @@ class ClaudeAIClient:
             raise ValueError("AI client not available")
         
         try:
-            message = await self.async_client.messages.create(
+            # Cancelled, not just abandoned, when the deadline passes
+            message = await within_deadline(self.async_client.messages.create(
                 model=model or settings.AI_MODEL,
                 max_tokens=max_tokens or settings.AI_MAX_TOKENS,
                 temperature=temperature or settings.AI_TEMPERATURE,
@@ -110,7 +128,7 @@ class ClaudeAIClient:
                 messages=[
                     {"role": "user", "content": prompt}
                 ]
-            )
+            ))
             
             response_text = message.content[0].text
             
@@ -230,3 +248,15 @@ def get_ai_client() -> ClaudeAIClient:
     """Get global AI client instance"""
     return ai_client
 
+
+# Shared OpenAI client, created on first use
+_openai_client = None
+
+
+def get_openai_client():
+    """Get the shared OpenAI client, or None when no API key is configured"""
+    global _openai_client
+    if _openai_client is None and settings.OPENAI_API_KEY:
+        from openai import OpenAI
+        _openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    return _openai_client
@@ -0,0 +1,176 @@
+"""
+NOOR Platform - Request Context
+Per-request accounting and deadlines carried through context variables
+"""
+
+from contextvars import ContextVar
+from contextlib import contextmanager
+from collections import Counter
+from typing import Optional, Dict, Any, List, Tuple, Awaitable, Iterator, TypeVar
+import asyncio
+import re
+import time
+
+T = TypeVar("T")
+
+# Literals and bind parameters that vary between otherwise identical statements
+_SHAPE_LITERALS = re.compile(r"'(?:[^']|'')*'|\$\d+|%\(\w+\)s|\b\d+(?:\.\d+)?\b")
+_SHAPE_IN_LISTS = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_SHAPE_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so executions differing only in parameters compare equal"""
+    shape = _SHAPE_LITERALS.sub("?", statement)
+    shape = _SHAPE_IN_LISTS.sub("IN (?)", shape)
+    return _SHAPE_WHITESPACE.sub(" ", shape).strip()
+
+
+class RequestStats:
+    """
+    Counters collected while serving a single request
+
+    The timing middleware creates one instance per request; lower layers
+    (cache, database) record into it through the module-level helpers.
+    """
+
+    __slots__ = ("redis_round_trips", "redis_keys", "db_statements", "db_time", "db_shapes")
+
+    def __init__(self):
+        self.redis_round_trips = 0
+        self.redis_keys = 0
+        self.db_statements = 0
+        self.db_time = 0.0
+        self.db_shapes: Counter = Counter()
+
+    @property
+    def db_max_repeats(self) -> int:
+        """Highest number of executions of a single statement shape"""
+        return max(self.db_shapes.values(), default=0)
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed more than threshold times, most repeated first"""
+        return [(shape, count) for shape, count in self.db_shapes.most_common() if count > threshold]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export counters"""
+        return {
+            "redis_round_trips": self.redis_round_trips,
+            "redis_keys": self.redis_keys,
+            "db_statements": self.db_statements,
+            "db_time_ms": round(self.db_time * 1000, 2),
+            "db_max_repeats": self.db_max_repeats
+        }
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def begin_request_stats() -> RequestStats:
+    """Start accounting for the current request"""
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def get_request_stats() -> Optional[RequestStats]:
+    """Get the stats of the current request, if any"""
+    return _request_stats.get()
+
+
+def record_redis_round_trip(keys: int = 1) -> None:
+    """Record one Redis round-trip touching the given number of keys"""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.redis_round_trips += 1
+        stats.redis_keys += keys
+
+
+def record_db_statement(statement: str, duration: float) -> None:
+    """Record one executed SQL statement and its duration in seconds"""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_statements += 1
+        stats.db_time += duration
+        stats.db_shapes[statement_shape(statement)] += 1
+
+
+# ============================================================================
+# DEADLINES
+# ============================================================================
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The request deadline passed before the work finished"""
+
+
+# Absolute deadline on the time.monotonic() clock; child tasks inherit it
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+def set_deadline(seconds: Optional[float]) -> None:
+    """Set the deadline of the current request to seconds from now (None clears it)"""
+    _deadline.set(time.monotonic() + seconds if seconds is not None else None)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound the work inside the block to seconds from now
+
+    An enclosing deadline that comes sooner still applies; a scope never
+    extends it.
+    """
+    current = _deadline.get()
+    deadline = time.monotonic() + seconds if seconds is not None else None
+    if deadline is None or (current is not None and current <= deadline):
+        yield
+        return
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the deadline (negative once passed), or None without one"""
+    deadline = _deadline.get()
+    return deadline - time.monotonic() if deadline is not None else None
+
+
+def deadline_expired() -> bool:
+    """Whether the current deadline has passed"""
+    remaining = time_remaining()
+    return remaining is not None and remaining <= 0
+
+
+def clamp_timeout(timeout: Optional[float]) -> Optional[float]:
+    """The smaller of a timeout and the time left before the deadline"""
+    remaining = time_remaining()
+    if remaining is None:
+        return timeout
+    remaining = max(remaining, 0.0)
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+async def within_deadline(awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """
+    Await work that is cancelled when the deadline (or timeout) passes
+
+    Raises:
+        DeadlineExceeded: The deadline passed first
+        asyncio.TimeoutError: The (shorter) timeout passed first
+    """
+    limit = clamp_timeout(timeout)
+    if limit is None:
+        return await awaitable
+    if deadline_expired():
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded("Request deadline exceeded")
+    try:
+        return await asyncio.wait_for(awaitable, limit)
+    except asyncio.TimeoutError:
+        if deadline_expired():
+            raise DeadlineExceeded("Request deadline exceeded") from None
+        raise
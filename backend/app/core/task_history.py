@@ -0,0 +1,167 @@
+"""
+NOOR Platform - Task History
+Bounded in-memory task history with batched persistence to MongoDB
+"""
+
+from typing import Dict, Any, List, Optional
+from collections import Counter, deque
+from datetime import datetime
+import asyncio
+import json
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TASK_HISTORY_COLLECTION = "agent_task_history"
+
+
+class TaskHistory:
+    """
+    Most recent task entries of an agent
+
+    A fixed-size ring buffer with running counters, so status lookups are
+    O(1) however long the process runs. Every entry is also handed to the
+    history writer for persistence.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.entries: deque = deque(maxlen=capacity)
+        self.counts: Counter = Counter()
+        self.total = 0
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Record an entry"""
+        self.entries.append(entry)
+        self.counts[entry.get("status", "unknown")] += 1
+        self.total += 1
+        if settings.ENABLE_AGENT_LOGGING:
+            get_task_history_writer().enqueue(entry)
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent entries, newest first"""
+        return [self.entries[-i] for i in range(1, min(limit, len(self.entries)) + 1)]
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __iter__(self):
+        return iter(self.entries)
+
+
+def _bson_safe(value: Any) -> Any:
+    """Coerce task payloads to types MongoDB can store"""
+    return json.loads(json.dumps(value, default=str))
+
+
+class TaskHistoryWriter:
+    """
+    Task history writer
+
+    Provides:
+    - A non-blocking enqueue for the request path
+    - Batched insert_many to MongoDB on an interval or when a batch fills
+    - A bound on queued entries; the oldest are dropped (and counted) when
+      MongoDB is unavailable for long
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval: int = 5, max_pending: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending: deque = deque(maxlen=max_pending)
+        self.written = 0
+        self.dropped = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, entry: Dict[str, Any]) -> None:
+        """Queue an entry for persistence"""
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        self.pending.append(entry)
+        if len(self.pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """
+        Write queued entries in batches
+
+        Returns:
+            Number of entries written
+        """
+        from app.db.mongodb import get_mongodb
+
+        db = await get_mongodb()
+        if db is None:
+            return 0
+
+        written = 0
+        while self.pending:
+            batch = [self.pending.popleft() for _ in range(min(self.batch_size, len(self.pending)))]
+            documents = [
+                {
+                    **entry,
+                    "task": _bson_safe(entry.get("task")),
+                    "result": _bson_safe(entry.get("result"))
+                }
+                for entry in batch
+            ]
+            try:
+                await db[TASK_HISTORY_COLLECTION].insert_many(documents, ordered=False)
+                written += len(documents)
+            except Exception as e:
+                logger.warning(f"Task history write failed, retrying later: {e}")
+                self.pending.extendleft(reversed(batch))
+                break
+        self.written += written
+        return written
+
+    async def _run(self) -> None:
+        """Flush every interval, or sooner when a batch fills"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Task history flush failed: {e}")
+
+    def start(self) -> None:
+        """Start the writer"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer and write what is left"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Writer counters"""
+        return {"pending": len(self.pending), "written": self.written, "dropped": self.dropped}
+
+
+# Singleton instance
+_task_history_writer = None
+
+
+def get_task_history_writer() -> TaskHistoryWriter:
+    """Get or create Task History Writer instance"""
+    global _task_history_writer
+    if _task_history_writer is None:
+        _task_history_writer = TaskHistoryWriter(
+            batch_size=settings.TASK_HISTORY_BATCH_SIZE,
+            flush_interval=settings.TASK_HISTORY_FLUSH_SECONDS,
+            max_pending=settings.TASK_HISTORY_MAX_PENDING
+        )
+    return _task_history_writer
@@ -0,0 +1,472 @@
+"""
+NOOR Platform - Telemetry
+Latency histograms, recent-sample ring buffers and error and timeout counters
+per route and agent action
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+from array import array
+from datetime import datetime
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.core.request_context import record_redis_round_trip
+
+logger = logging.getLogger(__name__)
+
+# Metric kinds
+ROUTE = "route"
+AGENT = "agent"
+
+# Histogram layout: 2^SUB_BUCKET_BITS linear sub-buckets per power of two,
+# i.e. about 3% relative precision, from 1µs up to 2^MAX_EXPONENT µs (~19h)
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_EXPONENT = 36
+BUCKET_COUNT = (MAX_EXPONENT - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+
+# Redis windows: (name, seconds, retention seconds)
+RESOLUTIONS = [
+    ("5m", 300, 2 * 86400),
+    ("1d", 86400, 35 * 86400)
+]
+WINDOW_KEY = "telemetry:{resolution}:{window}:{kind}:{name}"
+WINDOW_INDEX_KEY = "telemetry:{resolution}:{window}:{kind}"
+
+# Counter fields stored next to the histogram buckets in each window hash
+COUNTER_FIELDS = ("count", "errors", "client_errors", "timeouts", "sum_us")
+
+
+def bucket_index(micros: int) -> int:
+    """Histogram bucket of a duration in microseconds"""
+    if micros < SUB_BUCKETS:
+        return max(micros, 0)
+    exponent = micros.bit_length() - SUB_BUCKET_BITS - 1
+    return min((exponent + 1) * SUB_BUCKETS + (micros >> exponent) - SUB_BUCKETS, BUCKET_COUNT - 1)
+
+
+def bucket_value(index: int) -> float:
+    """Midpoint of a histogram bucket in microseconds"""
+    if index < SUB_BUCKETS:
+        return float(index)
+    exponent = index // SUB_BUCKETS - 1
+    low = (index % SUB_BUCKETS + SUB_BUCKETS) << exponent
+    return low + ((1 << exponent) - 1) / 2
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear latency histogram
+
+    Recording is one index computation and one array increment; histograms
+    from different workers and windows merge by adding bucket counts.
+    """
+
+    __slots__ = ("counts", "count", "sum_us")
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * BUCKET_COUNT))
+        self.count = 0
+        self.sum_us = 0
+
+    def record(self, micros: int) -> None:
+        """Record a duration in microseconds"""
+        self.counts[bucket_index(micros)] += 1
+        self.count += 1
+        self.sum_us += micros
+
+    def add_bucket(self, index: int, count: int) -> None:
+        """Add count samples to a bucket (used when merging stored windows)"""
+        self.counts[index] += count
+        self.count += count
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add another histogram's samples to this one"""
+        for index, count in other.nonzero().items():
+            self.counts[index] += count
+        self.count += other.count
+        self.sum_us += other.sum_us
+        return self
+
+    def percentiles(self, ps: Tuple[float, ...] = (50, 95, 99)) -> Dict[str, Optional[float]]:
+        """Percentiles in milliseconds"""
+        result: Dict[str, Optional[float]] = {f"p{p:g}": None for p in ps}
+        if not self.count:
+            return result
+        targets = sorted((max(1, self.count * p / 100), f"p{p:g}") for p in ps)
+        seen = 0
+        position = 0
+        for index, bucket in enumerate(self.counts):
+            if not bucket:
+                continue
+            seen += bucket
+            while position < len(targets) and seen >= targets[position][0]:
+                result[targets[position][1]] = round(bucket_value(index) / 1000, 2)
+                position += 1
+            if position == len(targets):
+                break
+        return result
+
+    def nonzero(self) -> Dict[int, int]:
+        """Non-empty buckets"""
+        return {index: count for index, count in enumerate(self.counts) if count}
+
+
+class RingBuffer:
+    """Fixed-size buffer of the most recent samples"""
+
+    __slots__ = ("samples", "position", "size")
+
+    def __init__(self, capacity: int = 1024):
+        self.samples = array("d", bytes(8 * capacity))
+        self.position = 0
+        self.size = 0
+
+    def append(self, value: float) -> None:
+        """Add a sample, overwriting the oldest when full"""
+        self.samples[self.position] = value
+        self.position = (self.position + 1) % len(self.samples)
+        self.size = min(self.size + 1, len(self.samples))
+
+    def values(self) -> List[float]:
+        """Samples, oldest first"""
+        if self.size < len(self.samples):
+            return list(self.samples[:self.size])
+        return list(self.samples[self.position:]) + list(self.samples[:self.position])
+
+
+class MetricSeries:
+    """Telemetry of one route or agent action"""
+
+    __slots__ = (
+        "histogram", "pending", "recent", "errors", "client_errors", "timeouts",
+        "pending_errors", "pending_client_errors", "pending_timeouts"
+    )
+
+    def __init__(self, ring_size: int):
+        # Totals since start, for the local view
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.client_errors = 0
+        self.timeouts = 0
+        # Deltas since the last flush
+        self.pending = LatencyHistogram()
+        self.pending_errors = 0
+        self.pending_client_errors = 0
+        self.pending_timeouts = 0
+        # Raw recent samples (milliseconds)
+        self.recent = RingBuffer(ring_size)
+
+    def record(self, micros: int, error: bool = False, client_error: bool = False, timeout: bool = False) -> None:
+        """Record one observation; timeouts are counted apart from errors"""
+        self.histogram.record(micros)
+        self.pending.record(micros)
+        self.recent.append(micros / 1000)
+        if error:
+            self.errors += 1
+            self.pending_errors += 1
+        elif client_error:
+            self.client_errors += 1
+            self.pending_client_errors += 1
+        if timeout:
+            self.timeouts += 1
+            self.pending_timeouts += 1
+
+    def take_pending(self) -> Tuple[LatencyHistogram, int, int, int]:
+        """Detach the deltas for flushing"""
+        pending = (self.pending, self.pending_errors, self.pending_client_errors, self.pending_timeouts)
+        self.pending = LatencyHistogram()
+        self.pending_errors = 0
+        self.pending_client_errors = 0
+        self.pending_timeouts = 0
+        return pending
+
+
+def summarize(histogram: LatencyHistogram, errors: int, client_errors: int, timeouts: int = 0) -> Dict[str, Any]:
+    """Summary of a histogram and its error counters"""
+    return {
+        "requests": histogram.count,
+        "errors": errors,
+        "client_errors": client_errors,
+        "timeouts": timeouts,
+        "error_rate": round(errors / histogram.count, 4) if histogram.count else 0.0,
+        "avg_ms": round(histogram.sum_us / histogram.count / 1000, 2) if histogram.count else None,
+        **histogram.percentiles()
+    }
+
+
+class Telemetry:
+    """
+    In-process request and agent telemetry
+
+    Provides:
+    - Latency histograms, recent-sample ring buffers and error counters per
+      route ("GET /api/v1/skills") and agent action ("analytics-001:analyze_skills_gap")
+    - Deadline timeouts per agent action
+    - Periodic flush of deltas to Redis in 5-minute and daily windows, so
+      percentiles can be read across all workers
+
+    Recording never awaits or locks: every worker owns its series and the
+    event loop is single-threaded, so the per-request cost is a few array
+    writes.
+    """
+
+    def __init__(self, flush_interval: int = 10, ring_size: int = 1024):
+        self.flush_interval = flush_interval
+        self.ring_size = ring_size
+        self.started_at = datetime.utcnow()
+        self._series: Dict[Tuple[str, str], MetricSeries] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _get_series(self, kind: str, name: str) -> MetricSeries:
+        """Get or create the series of a route or action"""
+        series = self._series.get((kind, name))
+        if series is None:
+            series = self._series[(kind, name)] = MetricSeries(self.ring_size)
+        return series
+
+    # ========================================================================
+    # RECORDING
+    # ========================================================================
+
+    def record_request(self, route: str, duration: float, status_code: int) -> None:
+        """Record a served request (duration in seconds)"""
+        self._get_series(ROUTE, route).record(
+            int(duration * 1_000_000),
+            error=status_code >= 500,
+            client_error=400 <= status_code < 500
+        )
+
+    def record_agent_action(
+        self,
+        agent_id: str,
+        action: Optional[str],
+        duration: float,
+        success: bool,
+        timed_out: bool = False
+    ) -> None:
+        """
+        Record an agent task execution (duration in seconds)
+
+        A timed-out execution that still succeeded, with partial results,
+        counts as a timeout but not an error.
+        """
+        self._get_series(AGENT, f"{agent_id}:{action or 'unknown'}").record(
+            int(duration * 1_000_000),
+            error=not success,
+            timeout=timed_out
+        )
+
+    # ========================================================================
+    # FLUSH
+    # ========================================================================
+
+    async def flush(self) -> int:
+        """
+        Add the deltas since the last flush to the Redis windows
+
+        Returns:
+            Number of series flushed
+        """
+        from app.db.redis import get_redis
+
+        redis_client = await get_redis()
+        if not redis_client:
+            return 0
+
+        pending = [
+            (kind, name, *series.take_pending())
+            for (kind, name), series in self._series.items()
+            if series.pending.count
+        ]
+        if not pending:
+            return 0
+
+        now = int(time.time())
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for resolution, seconds, retention in RESOLUTIONS:
+                    window = now - now % seconds
+                    for kind, name, histogram, errors, client_errors, timeouts in pending:
+                        key = WINDOW_KEY.format(resolution=resolution, window=window, kind=kind, name=name)
+                        index_key = WINDOW_INDEX_KEY.format(resolution=resolution, window=window, kind=kind)
+                        # Hash counters are additive, so workers never overwrite each other
+                        for index, count in histogram.nonzero().items():
+                            pipe.hincrby(key, f"b{index}", count)
+                        pipe.hincrby(key, "count", histogram.count)
+                        pipe.hincrby(key, "sum_us", histogram.sum_us)
+                        if errors:
+                            pipe.hincrby(key, "errors", errors)
+                        if client_errors:
+                            pipe.hincrby(key, "client_errors", client_errors)
+                        if timeouts:
+                            pipe.hincrby(key, "timeouts", timeouts)
+                        pipe.expire(key, retention)
+                        pipe.sadd(index_key, name)
+                        pipe.expire(index_key, retention)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Telemetry flush failed: {e}")
+            # Put the deltas back for the next flush
+            for kind, name, histogram, errors, client_errors, timeouts in pending:
+                series = self._get_series(kind, name)
+                for index, count in histogram.nonzero().items():
+                    series.pending.add_bucket(index, count)
+                series.pending.sum_us += histogram.sum_us
+                series.pending_errors += errors
+                series.pending_client_errors += client_errors
+                series.pending_timeouts += timeouts
+            return 0
+        return len(pending)
+
+    async def _run_flushes(self) -> None:
+        """Flush every interval"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Telemetry flush run failed: {e}")
+
+    def start(self) -> None:
+        """Start the flush schedule"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._run_flushes())
+
+    async def stop(self) -> None:
+        """Stop the flush schedule and flush what is left"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    def local_snapshot(self, kind: str = ROUTE) -> Dict[str, Any]:
+        """
+        Summaries of this worker since start
+
+        Per-series summaries include the mean and maximum of the most recent
+        samples.
+        """
+        metrics = {}
+        total = LatencyHistogram()
+        errors = client_errors = timeouts = 0
+        for (series_kind, name), series in sorted(self._series.items()):
+            if series_kind != kind:
+                continue
+            recent = series.recent.values()
+            metrics[name] = {
+                **summarize(series.histogram, series.errors, series.client_errors, series.timeouts),
+                "recent_samples": len(recent),
+                "recent_avg_ms": round(sum(recent) / len(recent), 2) if recent else None,
+                "recent_max_ms": round(max(recent), 2) if recent else None
+            }
+            total.merge(series.histogram)
+            errors += series.errors
+            client_errors += series.client_errors
+            timeouts += series.timeouts
+        return {
+            "source": "local",
+            "since": self.started_at.isoformat(),
+            "overall": summarize(total, errors, client_errors, timeouts),
+            "metrics": metrics
+        }
+
+    async def cluster_snapshot(self, kind: str = ROUTE, minutes: int = 60) -> Optional[Dict[str, Any]]:
+        """
+        Summaries across all workers over the last minutes, from Redis
+
+        Windows overlapping the period are merged, so the period is rounded
+        out to whole windows (5 minutes up to a day, days beyond).
+
+        Returns:
+            Overall and per route or action summaries, or None if Redis is unavailable
+        """
+        from app.db.redis import get_redis
+
+        redis_client = await get_redis()
+        if not redis_client:
+            return None
+
+        resolution, seconds, _ = RESOLUTIONS[0] if minutes <= 24 * 60 else RESOLUTIONS[1]
+        now = int(time.time())
+        last = now - now % seconds
+        windows = list(range(last - ((minutes * 60 - 1) // seconds) * seconds, last + 1, seconds))
+
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for window in windows:
+                    pipe.smembers(WINDOW_INDEX_KEY.format(resolution=resolution, window=window, kind=kind))
+                members = await pipe.execute()
+            record_redis_round_trip(len(windows))
+
+            keys = [
+                (name, WINDOW_KEY.format(resolution=resolution, window=window, kind=kind, name=name))
+                for window, names in zip(windows, members)
+                for name in names
+            ]
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for _, key in keys:
+                    pipe.hgetall(key)
+                stored = await pipe.execute()
+            record_redis_round_trip(len(keys))
+        except Exception as e:
+            logger.warning(f"Telemetry read failed: {e}")
+            return None
+
+        merged: Dict[str, Tuple[LatencyHistogram, Dict[str, int]]] = {}
+        for (name, _), fields in zip(keys, stored):
+            histogram, counters = merged.setdefault(name, (LatencyHistogram(), dict.fromkeys(COUNTER_FIELDS, 0)))
+            for field, value in fields.items():
+                if field.startswith("b"):
+                    histogram.add_bucket(int(field[1:]), int(value))
+                elif field in counters:
+                    counters[field] += int(value)
+            histogram.sum_us += int(fields.get("sum_us", 0))
+
+        total = LatencyHistogram()
+        for histogram, _ in merged.values():
+            total.merge(histogram)
+        return {
+            "source": "cluster",
+            "window_minutes": minutes,
+            "overall": summarize(
+                total,
+                sum(counters["errors"] for _, counters in merged.values()),
+                sum(counters["client_errors"] for _, counters in merged.values()),
+                sum(counters["timeouts"] for _, counters in merged.values())
+            ),
+            "metrics": {
+                name: summarize(histogram, counters["errors"], counters["client_errors"], counters["timeouts"])
+                for name, (histogram, counters) in sorted(merged.items())
+            }
+        }
+
+    async def get_metrics(self, kind: str = ROUTE, minutes: int = 60) -> Dict[str, Any]:
+        """Cluster metrics when Redis is reachable, this worker's otherwise"""
+        cluster = await self.cluster_snapshot(kind, minutes)
+        return cluster if cluster is not None else self.local_snapshot(kind)
+
+
+# Singleton instance
+_telemetry = None
+
+
+def get_telemetry() -> Telemetry:
+    """Get or create Telemetry instance"""
+    global _telemetry
+    if _telemetry is None:
+        _telemetry = Telemetry(
+            flush_interval=settings.TELEMETRY_FLUSH_SECONDS,
+            ring_size=settings.TELEMETRY_RING_SIZE
+        )
+    return _telemetry
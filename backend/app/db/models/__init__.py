@@ -10,6 +10,7 @@ from app.db.models.work_experience import (
     CareerAnalytics,
     work_experience_skills
 )
+from app.db.models.analytics import SkillDemandCounter, FacultyScoreRollup
 
 __all__ = [
     "User",
@@ -19,6 +20,8 @@ __all__ = [
     "WorkExperience",
     "WorkExperienceVerification",
     "CareerAnalytics",
-    "work_experience_skills"
+    "work_experience_skills",
+    "SkillDemandCounter",
+    "FacultyScoreRollup"
 ]
 
@@ -0,0 +1,76 @@
+"""
+NOOR Platform - Analytics Rollup SQLAlchemy ORM Models
+"""
+
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Date, DateTime, Index
+from sqlalchemy.sql import func
+
+from app.db.postgres import Base
+
+
+class SkillDemandCounter(Base):
+    """
+    Weekly skill demand checkpoint
+
+    One row per (week, kind, skill, industry, emirate) holding the number of
+    postings opened that week listing the skill. Live counters are kept in
+    Redis; this table is their durable checkpoint.
+    """
+    __tablename__ = "skill_demand_counters"
+    
+    week = Column(Date, primary_key=True)  # Monday of the ISO week
+    kind = Column(String(20), primary_key=True)  # required, preferred
+    skill = Column(String(200), primary_key=True)
+    industry = Column(String(100), primary_key=True, default="")
+    emirate = Column(String(50), primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    # Indexes
+    __table_args__ = (
+        Index('idx_skill_demand_skill', 'skill'),
+    )
+    
+    def __repr__(self):
+        return f"<SkillDemandCounter(week={self.week}, skill='{self.skill}', count={self.count})>"
+
+
+class FacultyScoreRollup(Base):
+    """
+    Eight-faculty score cube
+
+    One row per (period, institution, emirate, faculty, competency) holding
+    additive aggregates of scored assessments: count, sum and sum of squares
+    of the percentage score, and a 10-bucket histogram (0-10, 10-20, ... 90-100).
+    Faculty-level rows have an empty competency_id.
+    """
+    __tablename__ = "faculty_score_rollups"
+    
+    period = Column(Date, primary_key=True)  # First day of the month
+    institution_id = Column(String(64), primary_key=True, default="")
+    emirate = Column(String(50), primary_key=True, default="")
+    faculty_id = Column(String(50), primary_key=True)
+    competency_id = Column(String(50), primary_key=True, default="")
+    count = Column(BigInteger, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0)
+    score_sum_sq = Column(Float, nullable=False, default=0)
+    bucket_0 = Column(BigInteger, nullable=False, default=0)
+    bucket_1 = Column(BigInteger, nullable=False, default=0)
+    bucket_2 = Column(BigInteger, nullable=False, default=0)
+    bucket_3 = Column(BigInteger, nullable=False, default=0)
+    bucket_4 = Column(BigInteger, nullable=False, default=0)
+    bucket_5 = Column(BigInteger, nullable=False, default=0)
+    bucket_6 = Column(BigInteger, nullable=False, default=0)
+    bucket_7 = Column(BigInteger, nullable=False, default=0)
+    bucket_8 = Column(BigInteger, nullable=False, default=0)
+    bucket_9 = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    # Indexes
+    __table_args__ = (
+        Index('idx_faculty_rollups_institution', 'institution_id', 'faculty_id', 'period'),
+        Index('idx_faculty_rollups_faculty', 'faculty_id', 'period'),
+    )
+    
+    def __repr__(self):
+        return f"<FacultyScoreRollup(period={self.period}, faculty='{self.faculty_id}', count={self.count})>"
@@ -3,7 +3,7 @@ NOOR Platform - Work Experience SQLAlchemy ORM Models
 """
 
 from sqlalchemy import Column, String, Text, Boolean, DateTime, Integer, Date, ForeignKey, Index, Table
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import date
@@ -133,6 +133,7 @@ class CareerAnalytics(Base):
     industry_changes = Column(Integer, default=0)
     insights = Column(ARRAY(Text), nullable=True)
     recommendations = Column(ARRAY(Text), nullable=True)
+    timeline = Column(JSONB, nullable=True)  # [{"period", "title", "company", "duration_months"}], oldest first
     last_calculated = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -152,6 +153,9 @@ class CareerAnalytics(Base):
     @property
     def needs_refresh(self):
         """Check if analytics need to be recalculated (older than 24 hours)"""
-        from datetime import datetime, timedelta
-        return datetime.now() - self.last_calculated > timedelta(hours=24)
+        from datetime import datetime, timedelta, timezone
+        last_calculated = self.last_calculated
+        if last_calculated.tzinfo is None:
+            last_calculated = last_calculated.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - last_calculated > timedelta(hours=24)
 
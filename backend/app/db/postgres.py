@@ -2,32 +2,111 @@
 NOOR Platform - PostgreSQL Database Connection
 """
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from contextlib import asynccontextmanager
+from functools import wraps
+from typing import Dict, Any, List
+import itertools
 import logging
+import time
 
 from app.core.config import settings
+from app.core.request_context import record_db_statement, RequestStats, DeadlineExceeded, deadline_expired
 
 logger = logging.getLogger(__name__)
 
+# Session roles
+PRIMARY = "primary"
+READ_ONLY = "read_only"
+ANALYTICS = "analytics"
+
+# Pool usage counters, keyed by pool name
+_pool_counters: Dict[str, Dict[str, int]] = {}
+
+# Query totals per route, keyed by "METHOD /path"
+_query_totals: Dict[str, Dict[str, Any]] = {}
+
+
+def _instrument_queries(engine) -> None:
+    """
+    Time every statement of a (sync) engine into the current request's stats
+
+    Statements are refused once the request deadline has passed; statements
+    in flight are cancelled with the task awaiting them.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if deadline_expired():
+            raise DeadlineExceeded("Request deadline exceeded before the query")
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_time"].pop()
+        record_db_statement(statement, time.perf_counter() - started)
+
+
+def _track_pool(name: str, engine: AsyncEngine) -> AsyncEngine:
+    """Count checkouts and peak usage of an engine's pool and time its queries"""
+    counters = _pool_counters.setdefault(name, {"checkouts": 0, "peak_checked_out": 0})
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        counters["checkouts"] += 1
+        counters["peak_checked_out"] = max(
+            counters["peak_checked_out"],
+            engine.sync_engine.pool.checkedout()
+        )
+
+    _instrument_queries(engine.sync_engine)
+    return engine
+
+
 # Create async engine
-async_engine = create_async_engine(
+async_engine = _track_pool(PRIMARY, create_async_engine(
     settings.ASYNC_POSTGRES_URL,
     echo=settings.DEBUG,
-    pool_size=20,
-    max_overflow=40,
+    pool_size=settings.POSTGRES_POOL_SIZE,
+    max_overflow=settings.POSTGRES_MAX_OVERFLOW,
     pool_pre_ping=True
-)
+))
+
+# Read replica engines, one pool per replica
+replica_engines: List[AsyncEngine] = [
+    _track_pool(f"replica-{index}", create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        pool_size=settings.POSTGRES_REPLICA_POOL_SIZE,
+        max_overflow=settings.POSTGRES_REPLICA_MAX_OVERFLOW,
+        pool_pre_ping=True
+    ))
+    for index, url in enumerate(settings.POSTGRES_REPLICA_URLS)
+]
+
+# Small bounded pool for heavy aggregate queries, so they queue among
+# themselves instead of taking connections from latency-sensitive reads
+analytics_engine = _track_pool(ANALYTICS, create_async_engine(
+    settings.POSTGRES_ANALYTICS_URL
+    or (settings.POSTGRES_REPLICA_URLS[-1] if settings.POSTGRES_REPLICA_URLS else settings.ASYNC_POSTGRES_URL),
+    echo=settings.DEBUG,
+    pool_size=settings.POSTGRES_ANALYTICS_POOL_SIZE,
+    max_overflow=settings.POSTGRES_ANALYTICS_MAX_OVERFLOW,
+    pool_timeout=settings.POSTGRES_ANALYTICS_POOL_TIMEOUT,
+    pool_pre_ping=True
+))
 
 # Create sync engine for migrations
 sync_engine = create_engine(
     settings.POSTGRES_URL,
     echo=settings.DEBUG,
-    pool_size=20,
-    max_overflow=40,
+    pool_size=settings.POSTGRES_POOL_SIZE,
+    max_overflow=settings.POSTGRES_MAX_OVERFLOW,
     pool_pre_ping=True
 )
+_instrument_queries(sync_engine)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -38,10 +117,48 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False
 )
 
+
+def _read_only_sessionmaker(engine: AsyncEngine) -> async_sessionmaker:
+    """Session factory whose transactions are opened READ ONLY"""
+    return async_sessionmaker(
+        engine.execution_options(postgresql_readonly=True),
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False
+    )
+
+
+# Read-only session factories; fall back to the primary when no replica is configured
+ReplicaSessionLocals = [_read_only_sessionmaker(engine) for engine in replica_engines] or [
+    _read_only_sessionmaker(async_engine)
+]
+_replica_cycle = itertools.cycle(ReplicaSessionLocals)
+
+AnalyticsSessionLocal = _read_only_sessionmaker(analytics_engine)
+
 # Base class for models
 Base = declarative_base()
 
 
+def get_session_factory(role: str = PRIMARY) -> async_sessionmaker:
+    """
+    Get the session factory for a workload
+
+    Args:
+        role: "primary" for reads that must see the latest writes and all writes,
+              "read_only" for replica reads (round-robin across replicas),
+              "analytics" for heavy aggregate queries on the bounded analytics pool
+    """
+    if role == PRIMARY:
+        return AsyncSessionLocal
+    if role == READ_ONLY:
+        return next(_replica_cycle)
+    if role == ANALYTICS:
+        return AnalyticsSessionLocal
+    raise ValueError(f"Unknown session role: {role}")
+
+
 async def init_postgres():
     """
     Initialize PostgreSQL connection
@@ -49,12 +166,20 @@ async def init_postgres():
     try:
         async with async_engine.begin() as conn:
             # Test connection
-            await conn.execute("SELECT 1")
+            await conn.execute(text("SELECT 1"))
         logger.info("✅ PostgreSQL connected successfully")
     except Exception as e:
         logger.error(f"❌ PostgreSQL connection failed: {str(e)}")
         raise
 
+    for index, engine in enumerate(replica_engines):
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            logger.info(f"✅ PostgreSQL replica {index} connected successfully")
+        except Exception as e:
+            logger.warning(f"PostgreSQL replica {index} unavailable: {str(e)}")
+
 
 async def get_db() -> AsyncSession:
     """
@@ -70,3 +195,128 @@ async def get_db() -> AsyncSession:
         finally:
             await session.close()
 
+
+async def get_read_db() -> AsyncSession:
+    """
+    Dependency to get a read-only replica session
+    """
+    async with get_session_factory(READ_ONLY)() as session:
+        yield session
+
+
+async def get_analytics_db() -> AsyncSession:
+    """
+    Dependency to get a read-only session from the analytics pool
+    """
+    async with get_session_factory(ANALYTICS)() as session:
+        yield session
+
+
+@asynccontextmanager
+async def routed_session(role: str):
+    """Open a session for the given role"""
+    async with get_session_factory(role)() as session:
+        yield session
+
+
+def _routed(role: str):
+    """
+    Build a decorator that runs a service method on a session of the given role
+
+    The service's ``self.db`` is swapped for the duration of the call, so the
+    method and anything it calls on the service use the routed session.
+    Services are created per request, so the swap is not shared across requests.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            async with routed_session(role) as session:
+                original_db = self.db
+                self.db = session
+                try:
+                    return await func(self, *args, **kwargs)
+                finally:
+                    self.db = original_db
+        return wrapper
+    return decorator
+
+
+# Service method markers
+read_only = _routed(READ_ONLY)
+analytical = _routed(ANALYTICS)
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get utilization metrics for every connection pool
+
+    Returns:
+        Mapping of pool name to size, checked-out connections, overflow,
+        utilization and usage counters
+    """
+    engines = {PRIMARY: async_engine, ANALYTICS: analytics_engine}
+    engines.update({f"replica-{index}": engine for index, engine in enumerate(replica_engines)})
+
+    stats = {}
+    for name, engine in engines.items():
+        pool = engine.sync_engine.pool
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        checked_out = pool.checkedout()
+        stats[name] = {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": checked_out,
+            "overflow": pool.overflow(),
+            "utilization": round(checked_out / capacity, 3) if capacity else 0.0,
+            **_pool_counters.get(name, {})
+        }
+    return stats
+
+
+def record_request_queries(route: str, stats: RequestStats) -> List[tuple]:
+    """
+    Add a finished request's query accounting to the per-route totals
+
+    Args:
+        route: Route label, e.g. "GET /api/v1/skills"
+        stats: Stats collected while serving the request
+
+    Returns:
+        Statement shapes repeated more than DB_QUERY_REPEAT_THRESHOLD times
+        (likely N+1 patterns), most repeated first
+    """
+    repeated = stats.repeated_statements(settings.DB_QUERY_REPEAT_THRESHOLD)
+    totals = _query_totals.setdefault(route, {
+        "requests": 0,
+        "statements": 0,
+        "db_time_ms": 0.0,
+        "max_statements": 0,
+        "repeated_statement_requests": 0
+    })
+    totals["requests"] += 1
+    totals["statements"] += stats.db_statements
+    totals["db_time_ms"] += stats.db_time * 1000
+    totals["max_statements"] = max(totals["max_statements"], stats.db_statements)
+    if repeated:
+        totals["repeated_statement_requests"] += 1
+    return repeated
+
+
+def get_query_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get query accounting per route
+
+    Returns:
+        Mapping of route to request count, average statements and DB time
+        per request, worst request and number of requests with N+1 patterns
+    """
+    return {
+        route: {
+            "requests": totals["requests"],
+            "avg_statements": round(totals["statements"] / totals["requests"], 2),
+            "avg_db_time_ms": round(totals["db_time_ms"] / totals["requests"], 2),
+            "max_statements": totals["max_statements"],
+            "repeated_statement_requests": totals["repeated_statement_requests"]
+        }
+        for route, totals in _query_totals.items()
+    }
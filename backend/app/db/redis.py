@@ -3,10 +3,12 @@ NOOR Platform - Redis Connection
 """
 
 import redis.asyncio as redis
-from typing import Optional
+from typing import Optional, Any, Dict, List
 import logging
+import json
 
 from app.core.config import settings
+from app.core.request_context import record_redis_round_trip
 
 logger = logging.getLogger(__name__)
 
@@ -51,3 +53,93 @@ async def close_redis():
         await redis_client.close()
         logger.info("Redis connection closed")
 
+
+
+# ============================================================================
+# JSON CACHE HELPERS
+# ============================================================================
+
+async def cache_get(key: str) -> Optional[Any]:
+    """
+    Get a JSON value from the cache
+    
+    Returns:
+        Decoded value, or None on miss or cache error
+    """
+    try:
+        record_redis_round_trip()
+        cached = await redis_client.get(key)
+        return json.loads(cached) if cached else None
+    except Exception as e:
+        logger.warning(f"Cache get error: {e}")
+        return None
+
+
+async def cache_set(key: str, value: Any, ttl: int = 300) -> bool:
+    """Set a JSON value in the cache with a TTL"""
+    try:
+        record_redis_round_trip()
+        await redis_client.setex(key, ttl, json.dumps(value, default=str))
+        return True
+    except Exception as e:
+        logger.warning(f"Cache set error: {e}")
+        return False
+
+
+async def cache_get_many(keys: List[str]) -> Dict[str, Any]:
+    """
+    Get many JSON values in a single MGET round-trip
+    
+    Args:
+        keys: Cache keys to fetch
+        
+    Returns:
+        Mapping of key to decoded value for the keys that were hits
+    """
+    if not keys:
+        return {}
+    
+    try:
+        record_redis_round_trip(len(keys))
+        values = await redis_client.mget(keys)
+    except Exception as e:
+        logger.warning(f"Cache get_many error: {e}")
+        return {}
+    
+    hits = {}
+    for key, value in zip(keys, values):
+        if value:
+            try:
+                hits[key] = json.loads(value)
+            except ValueError:
+                logger.warning(f"Discarding undecodable cache entry: {key}")
+    return hits
+
+
+async def cache_set_many(
+    items: Dict[str, Any],
+    ttl: int = 300,
+    ttls: Optional[Dict[str, int]] = None
+) -> bool:
+    """
+    Set many JSON values with a TTL in a single pipelined round-trip
+    
+    Args:
+        items: Mapping of cache key to value
+        ttl: Default time to live in seconds
+        ttls: Per-key TTL overrides
+    """
+    ttls = ttls or {}
+    if not items:
+        return True
+    
+    try:
+        record_redis_round_trip(len(items))
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.setex(key, ttls.get(key, ttl), json.dumps(value, default=str))
+            await pipe.execute()
+        return True
+    except Exception as e:
+        logger.warning(f"Cache set_many error: {e}")
+        return False
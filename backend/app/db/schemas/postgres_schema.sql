@@ -111,8 +111,10 @@ CREATE TABLE assessments (
     assessment_type VARCHAR(50) NOT NULL,
     duration_minutes INTEGER,
     passing_score DECIMAL(5,2),
+    faculty_id VARCHAR(50), -- Eight-faculty assessments only
+    questions_json JSONB, -- Questions with answer keys by competency_id; never sent to clients
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    CONSTRAINT valid_assessment_type CHECK (assessment_type IN ('cognitive', 'personality', 'technical', 'language'))
+    CONSTRAINT valid_assessment_type CHECK (assessment_type IN ('cognitive', 'personality', 'technical', 'language', 'faculty'))
 );
 
 -- User Assessment Results
@@ -127,6 +129,30 @@ CREATE TABLE user_assessments (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Eight-Faculty Score Rollups (additive cube of scored assessments)
+CREATE TABLE faculty_score_rollups (
+    period DATE NOT NULL,
+    institution_id VARCHAR(64) NOT NULL DEFAULT '',
+    emirate VARCHAR(50) NOT NULL DEFAULT '',
+    faculty_id VARCHAR(50) NOT NULL,
+    competency_id VARCHAR(50) NOT NULL DEFAULT '',
+    count BIGINT NOT NULL DEFAULT 0,
+    score_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    score_sum_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+    bucket_0 BIGINT NOT NULL DEFAULT 0,
+    bucket_1 BIGINT NOT NULL DEFAULT 0,
+    bucket_2 BIGINT NOT NULL DEFAULT 0,
+    bucket_3 BIGINT NOT NULL DEFAULT 0,
+    bucket_4 BIGINT NOT NULL DEFAULT 0,
+    bucket_5 BIGINT NOT NULL DEFAULT 0,
+    bucket_6 BIGINT NOT NULL DEFAULT 0,
+    bucket_7 BIGINT NOT NULL DEFAULT 0,
+    bucket_8 BIGINT NOT NULL DEFAULT 0,
+    bucket_9 BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (period, institution_id, emirate, faculty_id, competency_id)
+);
+
 -- Health Records (SEHA/DHA/MOHAP Integration)
 CREATE TABLE health_records (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -273,6 +299,9 @@ CREATE TABLE job_postings (
     requirements TEXT,
     employment_type VARCHAR(50),
     experience_level VARCHAR(50),
+    industry VARCHAR(100),
+    required_skills TEXT[] NOT NULL DEFAULT '{}',
+    preferred_skills TEXT[] NOT NULL DEFAULT '{}',
     salary_min DECIMAL(12,2),
     salary_max DECIMAL(12,2),
     currency VARCHAR(3) DEFAULT 'AED',
@@ -305,6 +334,18 @@ CREATE TABLE job_applications (
     UNIQUE(job_posting_id, user_id)
 );
 
+-- Skill Demand Counters (weekly checkpoint of the Redis demand rollups)
+CREATE TABLE skill_demand_counters (
+    week DATE NOT NULL,
+    kind VARCHAR(20) NOT NULL,
+    skill VARCHAR(200) NOT NULL,
+    industry VARCHAR(100) NOT NULL DEFAULT '',
+    emirate VARCHAR(50) NOT NULL DEFAULT '',
+    count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (week, kind, skill, industry, emirate)
+);
+
 -- ============================================================================
 -- INDEXES FOR PERFORMANCE
 -- ============================================================================
@@ -342,11 +383,15 @@ CREATE INDEX idx_employees_is_active ON employees(is_active);
 CREATE INDEX idx_job_postings_institution_id ON job_postings(institution_id);
 CREATE INDEX idx_job_postings_status ON job_postings(status);
 CREATE INDEX idx_job_postings_posted_date ON job_postings(posted_date);
+CREATE INDEX idx_job_postings_industry ON job_postings(industry);
 
 -- Job Applications
 CREATE INDEX idx_job_applications_job_posting_id ON job_applications(job_posting_id);
 CREATE INDEX idx_job_applications_user_id ON job_applications(user_id);
 CREATE INDEX idx_job_applications_status ON job_applications(application_status);
+CREATE INDEX idx_skill_demand_skill ON skill_demand_counters(skill);
+CREATE INDEX idx_faculty_rollups_institution ON faculty_score_rollups(institution_id, faculty_id, period);
+CREATE INDEX idx_faculty_rollups_faculty ON faculty_score_rollups(faculty_id, period);
 
 -- ============================================================================
 -- TRIGGERS FOR UPDATED_AT
@@ -9,15 +9,31 @@ from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+from datetime import datetime
+import asyncio
 import logging
+import math
 import time
 
 from app.core.config import settings
 from app.core.logging import setup_logging
+from app.core.request_context import begin_request_stats, set_deadline
+from app.core.telemetry import get_telemetry, ROUTE, AGENT
 from app.api.v1.router import api_router
-from app.db.postgres import init_postgres
+from app.db.postgres import init_postgres, get_pool_stats, get_query_stats, record_request_queries
 from app.db.mongodb import init_mongodb
 from app.db.redis import init_redis
+from app.services.skill_search_index import get_skill_search_index
+from app.services.cache_warmer import get_cache_warmer
+from app.services.skill_demand import get_skill_demand_counters
+from app.services.sketch_analytics import get_sketch_analytics
+from app.services.faculty_rollups import get_faculty_rollups
+from app.services.hiring_forecast import get_hiring_forecaster
+from app.services.exports import get_export_service
+from app.services.career_analytics import get_career_analytics_worker
+from app.services.percentiles import get_percentile_service
+from app.core.task_history import get_task_history_writer
+from app.agents.agent_registry import get_agent_registry
 
 # Setup logging
 setup_logging()
@@ -37,12 +53,72 @@ async def lifespan(app: FastAPI):
     await init_mongodb()
     await init_redis()
     
+    # Build in-process search indexes
+    if settings.SKILL_INDEX_ENABLED:
+        await get_skill_search_index().start()
+    
+    # Restore skill demand rollups
+    if settings.SKILL_DEMAND_ENABLED:
+        await get_skill_demand_counters().start()
+    
+    # Backfill faculty score rollups from existing assessments
+    if settings.FACULTY_ROLLUPS_BACKFILL_ON_STARTUP:
+        await get_faculty_rollups().start()
+    
+    # Flush analytics sketches across workers
+    if settings.SKETCH_ANALYTICS_ENABLED:
+        get_sketch_analytics().start()
+    
+    # Flush percentile digests across workers
+    if settings.PERCENTILES_ENABLED:
+        get_percentile_service().start()
+    
+    # Refit hiring forecasts as job postings change
+    if settings.HIRING_FORECAST_ENABLED:
+        get_hiring_forecaster().start()
+    
+    # Recompute stale career analytics in batches
+    if settings.CAREER_ANALYTICS_ENABLED:
+        get_career_analytics_worker().start()
+    
+    # Flush request telemetry across workers
+    if settings.TELEMETRY_ENABLED:
+        get_telemetry().start()
+    
+    # Remove expired export files
+    get_export_service().start()
+    
+    # Persist agent task history in batches
+    if settings.ENABLE_AGENT_LOGGING:
+        get_task_history_writer().start()
+    
+    # Warm hot cache entries in the background
+    if settings.CACHE_WARMING_ENABLED:
+        get_cache_warmer().start()
+    
+    # Build agents and their LLM clients before serving, not on the first request
+    if settings.AGENT_WARMUP_ON_STARTUP:
+        try:
+            await asyncio.to_thread(get_agent_registry().warm_up)
+        except Exception as e:
+            logger.warning(f"Agent warm-up failed; agents will load on first use: {e}")
+    
     logger.info("✅ NOOR Platform started successfully")
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down NOOR Platform...")
+    await get_cache_warmer().stop()
+    await get_skill_demand_counters().stop()
+    await get_sketch_analytics().stop()
+    await get_percentile_service().stop()
+    await get_hiring_forecaster().stop()
+    await get_career_analytics_worker().stop()
+    await get_telemetry().stop()
+    await get_export_service().stop()
+    await get_task_history_writer().stop()
+    await get_skill_search_index().stop()
     logger.info("✅ NOOR Platform shut down successfully")
 
 
@@ -74,14 +150,51 @@ app.add_middleware(
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 
+def _route_label(request: Request) -> str:
+    """Label a request by route template so path parameters don't explode the metric keys"""
+    matched_route = request.scope.get("route")
+    return f"{request.method} {getattr(matched_route, 'path', None) or 'unmatched'}"
+
+
+def _request_timeout(request: Request) -> float:
+    """Deadline of a request: X-Request-Timeout seconds, capped at AGENT_TIMEOUT_SECONDS"""
+    try:
+        requested = float(request.headers.get("X-Request-Timeout", settings.AGENT_TIMEOUT_SECONDS))
+    except ValueError:
+        requested = settings.AGENT_TIMEOUT_SECONDS
+    if not math.isfinite(requested):
+        requested = settings.AGENT_TIMEOUT_SECONDS
+    return min(max(requested, 0.0), settings.AGENT_TIMEOUT_SECONDS)
+
+
 # Request Timing Middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
-    """Add processing time to response headers"""
+    """Add processing time, cache round-trips and query accounting to response headers"""
+    stats = begin_request_stats()
+    set_deadline(_request_timeout(request))
     start_time = time.time()
-    response = await call_next(request)
+    try:
+        response = await call_next(request)
+    except Exception:
+        if settings.TELEMETRY_ENABLED:
+            get_telemetry().record_request(_route_label(request), time.time() - start_time, 500)
+        raise
     process_time = time.time() - start_time
     response.headers["X-Process-Time"] = str(process_time)
+    response.headers["X-Redis-Round-Trips"] = str(stats.redis_round_trips)
+
+    route = _route_label(request)
+    if settings.TELEMETRY_ENABLED:
+        get_telemetry().record_request(route, process_time, response.status_code)
+    repeated = record_request_queries(route, stats)
+    for shape, count in repeated:
+        logger.warning(f"Possible N+1 in {route}: statement executed {count} times: {shape[:200]}")
+
+    if settings.DEBUG:
+        response.headers["X-DB-Statements"] = str(stats.db_statements)
+        response.headers["X-DB-Time"] = f"{stats.db_time * 1000:.2f}ms"
+        response.headers["X-DB-Max-Repeats"] = str(stats.db_max_repeats)
     return response
 
 
@@ -148,7 +261,32 @@ async def health_check():
     return {
         "success": True,
         "status": "healthy",
-        "version": "7.2.0"
+        "version": "7.2.0",
+        "cache_warming": get_cache_warmer().get_progress(),
+        "database_pools": get_pool_stats(),
+        "database_queries": get_query_stats()
+    }
+
+
+@app.get("/metrics")
+async def metrics(minutes: int = 60, scope: str = "cluster"):
+    """
+    Latency percentiles and error rates by route and by agent action
+
+    scope=cluster merges all workers' flushed windows over the last minutes;
+    scope=local reports this worker since start.
+    """
+    telemetry = get_telemetry()
+    if scope == "local":
+        routes, agents = telemetry.local_snapshot(ROUTE), telemetry.local_snapshot(AGENT)
+    else:
+        routes = await telemetry.get_metrics(ROUTE, minutes)
+        agents = await telemetry.get_metrics(AGENT, minutes)
+    return {
+        "success": True,
+        "routes": routes,
+        "agent_actions": agents,
+        "generated_at": datetime.utcnow().isoformat()
     }
 
 
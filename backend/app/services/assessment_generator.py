@@ -301,12 +301,15 @@ class AssessmentScorer:
         
         Returns:
             Score (0-4 points)
+        
+        Raises:
+            ValueError: A scale answer that is not a whole number from 0 to 4
         """
         if question_type == "multiple_choice":
             return 4 if user_answer == correct_answer else 0
         
         elif question_type == "likert_scale":
-            return int(user_answer)  # 0-4 scale
+            return AssessmentScorer.scale_answer(user_answer)
         
         elif question_type == "scenario_based":
             # Map A=0, B=1, C=3, D=4
@@ -314,10 +317,21 @@ class AssessmentScorer:
             return scoring_map.get(user_answer, 0)
         
         elif question_type == "self_reflection":
-            return int(user_answer)  # 0-4 scale
+            return AssessmentScorer.scale_answer(user_answer)
         
         return 0
     
+    @staticmethod
+    def scale_answer(user_answer: Any) -> int:
+        """Points of an answer on the 0-4 scale"""
+        try:
+            value = float(user_answer)
+        except (TypeError, ValueError):
+            value = None
+        if isinstance(user_answer, bool) or value is None or not value.is_integer() or not 0 <= value <= 4:
+            raise ValueError(f"Scale answers must be whole numbers from 0 to 4, got {user_answer!r}")
+        return int(value)
+    
     @staticmethod
     def score_competency(questions: List[Dict], answers: List[Any]) -> Dict[str, Any]:
         """
@@ -335,7 +349,7 @@ class AssessmentScorer:
         
         for question, answer in zip(questions, answers):
             score = AssessmentScorer.score_question(
-                question["type"],
+                question.get("type"),
                 answer,
                 question.get("correct_answer")
             )
@@ -0,0 +1,248 @@
+"""
+NOOR Platform - Cache Warmer
+Preloads hot cache entries at startup and on a schedule
+"""
+
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from collections import Counter
+from datetime import datetime
+import asyncio
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Sorted set of user id -> request count, shared by all workers
+USER_ACCESS_KEY = "cache_warm:user_access"
+
+
+class CacheWarmer:
+    """
+    Cache warming subsystem
+
+    Provides:
+    - A registry of named warm tasks (skill catalog, job postings, hot users)
+    - Access-frequency tracking to pick the top-N user bundles
+    - A concurrency limit so warming never starves live traffic
+    - Progress reporting for the health endpoint
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        top_users: int = 200,
+        interval_seconds: int = 600
+    ):
+        self.concurrency = concurrency
+        self.top_users = top_users
+        self.interval_seconds = interval_seconds
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._access_counts: Counter = Counter()
+        self._scheduler_task: Optional[asyncio.Task] = None
+        self._tasks: Dict[str, Callable[[], Awaitable[int]]] = {
+            "skill_catalog": self._warm_skill_catalog,
+            "job_postings": self._warm_job_postings,
+            "user_bundles": self._warm_user_bundles
+        }
+        self.progress: Dict[str, Any] = {
+            "state": "idle",
+            "runs": 0,
+            "started_at": None,
+            "finished_at": None,
+            "tasks_total": len(self._tasks),
+            "tasks_done": 0,
+            "tasks_failed": 0,
+            "items_warmed": 0,
+            "tasks": {}
+        }
+
+    # ========================================================================
+    # ACCESS TRACKING
+    # ========================================================================
+
+    def record_access(self, user_id: str) -> None:
+        """
+        Count a user data access
+
+        Counts are kept in process and flushed to Redis by the next warming
+        run, so recording adds no round-trip to the request.
+        """
+        if user_id:
+            self._access_counts[str(user_id)] += 1
+
+    async def _flush_access_counts(self, redis_client) -> None:
+        """Merge local access counts into the shared sorted set"""
+        if not self._access_counts:
+            return
+
+        counts, self._access_counts = self._access_counts, Counter()
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for user_id, count in counts.items():
+                pipe.zincrby(USER_ACCESS_KEY, count, user_id)
+            # Keep the set bounded to the users that could ever be warmed
+            pipe.zremrangebyrank(USER_ACCESS_KEY, 0, -(self.top_users * 10) - 1)
+            await pipe.execute()
+
+    async def get_hot_users(self) -> List[str]:
+        """Get the most requested user ids across all workers"""
+        from app.db.redis import get_redis
+
+        redis_client = await get_redis()
+        if not redis_client:
+            return [user_id for user_id, _ in self._access_counts.most_common(self.top_users)]
+
+        await self._flush_access_counts(redis_client)
+        return await redis_client.zrevrange(USER_ACCESS_KEY, 0, self.top_users - 1)
+
+    # ========================================================================
+    # WARM TASKS
+    # ========================================================================
+
+    async def _warm_skill_catalog(self) -> int:
+        """Make sure the in-process skill index is built"""
+        from app.services.skill_search_index import get_skill_search_index
+
+        search_index = get_skill_search_index()
+        if not search_index.is_ready:
+            await search_index.refresh()
+        return search_index.get_stats()["skills"]
+
+    async def _warm_job_postings(self) -> int:
+        """Preload the active job postings listing the matching agent reads"""
+        from app.agents.data_retrieval_agent import get_data_retrieval_agent
+        from app.agents.matching_agent import MATCH_JOB_FILTERS
+
+        jobs = await get_data_retrieval_agent().fetch_job_postings(MATCH_JOB_FILTERS)
+        return len(jobs)
+
+    async def _warm_user_bundles(self) -> int:
+        """Preload profile, skills and experience for the hottest users"""
+        from app.agents.data_retrieval_agent import get_data_retrieval_agent
+
+        data_agent = get_data_retrieval_agent()
+        user_ids = await self.get_hot_users()
+        task_progress = self.progress["tasks"]["user_bundles"]
+        task_progress["total"] = len(user_ids)
+
+        async def warm_user(user_id: str) -> bool:
+            async with self._semaphore:
+                try:
+                    # Warming must not count as user activity
+                    await data_agent.fetch_user_bundle(user_id, record_access=False)
+                    return True
+                except Exception as e:
+                    logger.warning(f"Failed to warm user bundle {user_id}: {e}")
+                    return False
+                finally:
+                    task_progress["done"] += 1
+
+        results = await asyncio.gather(*(warm_user(user_id) for user_id in user_ids))
+        return sum(results)
+
+    # ========================================================================
+    # RUNS
+    # ========================================================================
+
+    async def _run_task(self, name: str, task: Callable[[], Awaitable[int]]) -> None:
+        """Run one warm task and record its progress"""
+        task_progress = {"state": "running", "done": 0, "total": None, "items": 0, "error": None}
+        self.progress["tasks"][name] = task_progress
+
+        try:
+            if name == "user_bundles":
+                # Fans out internally under the semaphore
+                items = await task()
+            else:
+                async with self._semaphore:
+                    items = await task()
+            task_progress["state"] = "completed"
+            task_progress["items"] = items
+            self.progress["items_warmed"] += items
+        except Exception as e:
+            task_progress["state"] = "failed"
+            task_progress["error"] = str(e)
+            self.progress["tasks_failed"] += 1
+            logger.warning(f"Cache warm task {name} failed: {e}")
+        finally:
+            self.progress["tasks_done"] += 1
+
+    async def warm(self) -> Dict[str, Any]:
+        """
+        Run every warm task once
+
+        Returns:
+            Progress report of the run
+        """
+        if self.progress["state"] == "running":
+            logger.info("Cache warming already running, skipping")
+            return self.get_progress()
+
+        self.progress.update({
+            "state": "running",
+            "started_at": datetime.utcnow().isoformat(),
+            "finished_at": None,
+            "tasks_done": 0,
+            "tasks_failed": 0,
+            "items_warmed": 0,
+            "tasks": {}
+        })
+        logger.info("🔥 Cache warming started")
+
+        await asyncio.gather(*(self._run_task(name, task) for name, task in self._tasks.items()))
+
+        self.progress["state"] = "completed"
+        self.progress["runs"] += 1
+        self.progress["finished_at"] = datetime.utcnow().isoformat()
+        logger.info(
+            f"✅ Cache warming finished: {self.progress['items_warmed']} items, "
+            f"{self.progress['tasks_failed']} failed tasks"
+        )
+        return self.get_progress()
+
+    async def _run_schedule(self) -> None:
+        """Warm now, then every interval"""
+        while True:
+            try:
+                await self.warm()
+            except Exception as e:
+                logger.error(f"Cache warming run failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """Start warming in the background so startup is not delayed"""
+        if self._scheduler_task is None:
+            self._scheduler_task = asyncio.create_task(self._run_schedule())
+
+    async def stop(self) -> None:
+        """Stop the warming schedule"""
+        if self._scheduler_task:
+            self._scheduler_task.cancel()
+            try:
+                await self._scheduler_task
+            except asyncio.CancelledError:
+                pass
+            self._scheduler_task = None
+
+    def get_progress(self) -> Dict[str, Any]:
+        """Get warm-up progress"""
+        return {
+            **self.progress,
+            "tasks": {name: dict(task) for name, task in self.progress["tasks"].items()}
+        }
+
+
+# Singleton instance
+_cache_warmer = None
+
+
+def get_cache_warmer() -> CacheWarmer:
+    """Get or create Cache Warmer instance"""
+    global _cache_warmer
+    if _cache_warmer is None:
+        _cache_warmer = CacheWarmer(
+            concurrency=settings.CACHE_WARMING_CONCURRENCY,
+            top_users=settings.CACHE_WARMING_TOP_USERS,
+            interval_seconds=settings.CACHE_WARMING_INTERVAL_SECONDS
+        )
+    return _cache_warmer
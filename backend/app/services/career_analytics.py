@@ -0,0 +1,360 @@
+"""
+NOOR Platform - Career Analytics Recompute
+Background batch recomputation of precomputed career progression rows
+"""
+
+from typing import Dict, Any, List, Optional, Iterable, Sequence
+from datetime import date, datetime, timedelta
+import asyncio
+import logging
+import uuid
+
+import numpy as np
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+STALE_USERS_KEY = "career_analytics:stale"
+
+# Rows are recomputed before they reach the 24 hour needs_refresh age,
+# since durations of current positions grow every day
+REFRESH_AGE = timedelta(hours=20)
+
+NO_EXPERIENCE_INSIGHTS = ["No work experience recorded yet"]
+NO_EXPERIENCE_RECOMMENDATIONS = ["Add your first work experience to get started"]
+
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+def career_insights(score: float, industries: Sequence[str]) -> List[str]:
+    """Insights for a progression score and the distinct industries worked in"""
+    insights = []
+
+    if score >= 7:
+        insights.append("Strong career progression with consistent growth")
+    elif score >= 5:
+        insights.append("Steady career development")
+    else:
+        insights.append("Early career stage with room for growth")
+
+    if len(industries) == 1:
+        insights.append(f"Specialized expertise in {industries[0]} sector")
+    elif len(industries) > 2:
+        insights.append("Diverse cross-industry experience")
+
+    return insights
+
+
+def career_recommendations(latest_title: Optional[str]) -> List[str]:
+    """Recommendations based on the most recent job title"""
+    recommendations = []
+
+    if latest_title:
+        if 'junior' in latest_title.lower():
+            recommendations.append("Consider pursuing mid-level positions")
+        elif 'senior' in latest_title.lower():
+            recommendations.append("Explore leadership and management roles")
+
+    recommendations.append("Continue building technical skills")
+    recommendations.append("Seek mentorship opportunities")
+
+    return recommendations
+
+
+def compute_career_metrics(
+    user_ids: Iterable[str],
+    experiences: Sequence[Sequence[Any]],
+    today: Optional[date] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute career progression rows for many users at once
+
+    Args:
+        user_ids: Users to compute; users without experiences get an empty row
+        experiences: (user_id, job_title, company_name, industry, start_date,
+            end_date, is_current) tuples
+        today: End date of current positions (today when omitted)
+
+    Returns:
+        Mapping of user_id to CareerAnalytics column values
+    """
+    today = today or date.today()
+    rows: Dict[str, Dict[str, Any]] = {
+        str(user_id): {
+            "user_id": str(user_id),
+            "total_experiences": 0,
+            "total_months": 0,
+            "total_years": 0,
+            "current_positions": 0,
+            "companies_worked": 0,
+            "industries": [],
+            "progression_score": 0,
+            "average_tenure_months": 0,
+            "job_changes": 0,
+            "industry_changes": 0,
+            "insights": NO_EXPERIENCE_INSIGHTS,
+            "recommendations": NO_EXPERIENCE_RECOMMENDATIONS,
+            "timeline": []
+        }
+        for user_id in user_ids
+    }
+    if not experiences:
+        return rows
+
+    # Group by user, oldest position first
+    experiences = sorted(experiences, key=lambda e: (str(e[0]), e[4]))
+    owners = [str(experience[0]) for experience in experiences]
+    users, user_index = np.unique(owners, return_inverse=True)
+    n = len(users)
+
+    # Per-experience columns
+    start_months = np.array([e[4].year * 12 + e[4].month for e in experiences])
+    end_months = np.array([(e[5] or today).year * 12 + (e[5] or today).month for e in experiences])
+    months = np.maximum(end_months - start_months, 0)
+    is_current = np.array([bool(e[6]) for e in experiences])
+    senior = np.array(['senior' in e[1].lower() or 'lead' in e[1].lower() for e in experiences])
+    _, company_codes = np.unique([e[2] for e in experiences], return_inverse=True)
+    industries = [e[3] or "" for e in experiences]
+    _, industry_codes = np.unique(industries, return_inverse=True)
+    has_industry = np.array([bool(industry) for industry in industries])
+
+    # Per-user aggregates
+    counts = np.bincount(user_index, minlength=n)
+    total_months = np.bincount(user_index, weights=months, minlength=n).astype(int)
+    current_positions = np.bincount(user_index, weights=is_current, minlength=n).astype(int)
+    average_tenure = total_months / counts
+    companies = np.bincount(np.unique(np.stack([user_index, company_codes], axis=1), axis=0)[:, 0], minlength=n)
+    industry_pairs = np.unique(np.stack([user_index, industry_codes], axis=1)[has_industry], axis=0)
+    industry_counts = np.bincount(industry_pairs[:, 0], minlength=n) if len(industry_pairs) else np.zeros(n, dtype=int)
+
+    # The last two rows of a user's group are the two most recent positions
+    group_end = np.cumsum(counts)
+    rank_from_end = group_end[user_index] - 1 - np.arange(len(experiences))
+    recent_senior = np.bincount(user_index, weights=senior & (rank_from_end < 2), minlength=n) > 0
+
+    score = (
+        5.0
+        + (counts >= 3) * 1.0
+        + (average_tenure >= 24) * 1.0
+        + (current_positions > 0) * 0.5
+        + recent_senior * 1.5
+    )
+    score = np.minimum(score, 10.0)
+
+    for i, user_id in enumerate(users):
+        group = experiences[group_end[i] - counts[i]:group_end[i]]
+        user_industries = sorted({industry for industry in (e[3] for e in group) if industry})
+        rows[user_id] = {
+            "user_id": user_id,
+            "total_experiences": int(counts[i]),
+            "total_months": int(total_months[i]),
+            "total_years": int(total_months[i] // 12),  # Integer column; whole years
+            "current_positions": int(current_positions[i]),
+            "companies_worked": int(companies[i]),
+            "industries": user_industries,
+            "progression_score": round(float(score[i])),
+            "average_tenure_months": round(float(average_tenure[i])),
+            "job_changes": int(counts[i]) - 1,
+            "industry_changes": max(int(industry_counts[i]) - 1, 0),
+            "insights": career_insights(float(score[i]), user_industries),
+            "recommendations": career_recommendations(group[-1][1]),
+            "timeline": [
+                {
+                    "period": f"{e[4].year}-{e[5].year if e[5] else 'Present'}",
+                    "title": e[1],
+                    "company": e[2],
+                    "duration_months": int(duration)
+                }
+                for e, duration in zip(group, months[group_end[i] - counts[i]:group_end[i]])
+            ]
+        }
+    return rows
+
+
+# ============================================================================
+# RECOMPUTE WORKER
+# ============================================================================
+
+class CareerAnalyticsWorker:
+    """
+    Career analytics recompute worker
+
+    Provides:
+    - A stale-user queue (Redis set, so repeated edits collapse) fed by the
+      work experience write paths
+    - Batch recomputes: one query loads all experiences of a batch, metrics
+      are computed vectorized, and CareerAnalytics rows are bulk-upserted
+    - A periodic sweep queueing rows approaching their 24 hour refresh age
+    """
+
+    def __init__(self, batch_size: int = 500, interval: int = 5):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending: set = set()  # Used when Redis is unavailable
+        self._task: Optional[asyncio.Task] = None
+        self._last_sweep = 0.0
+
+    async def enqueue(self, user_ids: Iterable[str]) -> None:
+        """Queue users whose career analytics are stale"""
+        from app.db.redis import get_redis
+
+        user_ids = [str(user_id) for user_id in user_ids]
+        if not user_ids:
+            return
+        redis_client = await get_redis()
+        if redis_client:
+            try:
+                await redis_client.sadd(STALE_USERS_KEY, *user_ids)
+                return
+            except Exception as e:
+                logger.warning(f"Career analytics queue unavailable, queueing locally: {e}")
+        self._pending.update(user_ids)
+
+    async def _dequeue(self) -> List[str]:
+        """Take up to batch_size queued users"""
+        from app.db.redis import get_redis
+
+        batch = [self._pending.pop() for _ in range(min(self.batch_size, len(self._pending)))]
+        redis_client = await get_redis()
+        if redis_client and len(batch) < self.batch_size:
+            try:
+                batch.extend(await redis_client.spop(STALE_USERS_KEY, self.batch_size - len(batch)) or [])
+            except Exception as e:
+                logger.warning(f"Career analytics queue read failed: {e}")
+        return batch
+
+    async def recompute(self, user_ids: Sequence[str], db=None) -> int:
+        """
+        Recompute and upsert the career analytics of users
+
+        Args:
+            user_ids: Users to recompute
+            db: Session to use (a new primary session when omitted)
+
+        Returns:
+            Number of rows upserted
+        """
+        from app.db.postgres import AsyncSessionLocal
+        from app.db.models import WorkExperience, CareerAnalytics
+
+        if not user_ids:
+            return 0
+
+        async def run(session) -> int:
+            users = [uuid.UUID(str(user_id)) for user_id in user_ids]
+            experiences = (await session.execute(
+                select(
+                    WorkExperience.user_id,
+                    WorkExperience.job_title,
+                    WorkExperience.company_name,
+                    WorkExperience.industry,
+                    WorkExperience.start_date,
+                    WorkExperience.end_date,
+                    WorkExperience.is_current
+                )
+                .where(WorkExperience.user_id.in_(users))
+            )).all()
+            rows = list(compute_career_metrics(user_ids, experiences).values())
+
+            statement = insert(CareerAnalytics.__table__).values([
+                {**row, "user_id": uuid.UUID(row["user_id"]), "last_calculated": func.now()} for row in rows
+            ])
+            statement = statement.on_conflict_do_update(
+                index_elements=["user_id"],
+                set_={
+                    **{column: statement.excluded[column] for column in rows[0] if column != "user_id"},
+                    "last_calculated": func.now(),
+                    "updated_at": func.now()
+                }
+            )
+            await session.execute(statement)
+            await session.commit()
+            return len(rows)
+
+        if db is not None:
+            return await run(db)
+        async with AsyncSessionLocal() as session:
+            return await run(session)
+
+    async def sweep(self) -> int:
+        """
+        Queue users whose rows are approaching their refresh age
+
+        Returns:
+            Number of users queued
+        """
+        from app.db.postgres import get_session_factory, ANALYTICS
+        from app.db.models import CareerAnalytics
+
+        async with get_session_factory(ANALYTICS)() as session:
+            user_ids = (await session.execute(
+                select(CareerAnalytics.user_id)
+                .where(CareerAnalytics.last_calculated < func.now() - REFRESH_AGE)
+                .limit(self.batch_size * 20)
+            )).scalars().all()
+        await self.enqueue(user_ids)
+        return len(user_ids)
+
+    async def run_once(self) -> int:
+        """Drain the queue in batches; returns the number of rows recomputed"""
+        recomputed = 0
+        while True:
+            batch = await self._dequeue()
+            if not batch:
+                return recomputed
+            try:
+                recomputed += await self.recompute(batch)
+            except Exception as e:
+                logger.error(f"Career analytics recompute failed for {len(batch)} users: {e}")
+                await self.enqueue(batch)
+                return recomputed
+
+    async def _run(self) -> None:
+        """Process the queue every interval and sweep every hour"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if loop.time() - self._last_sweep >= 3600:
+                    self._last_sweep = loop.time()
+                    await self.sweep()
+                recomputed = await self.run_once()
+                if recomputed:
+                    logger.info(f"Recomputed career analytics for {recomputed} users")
+            except Exception as e:
+                logger.error(f"Career analytics worker run failed: {e}")
+
+    def start(self) -> None:
+        """Start the worker"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Singleton instance
+_career_analytics_worker = None
+
+
+def get_career_analytics_worker() -> CareerAnalyticsWorker:
+    """Get or create Career Analytics Worker instance"""
+    global _career_analytics_worker
+    if _career_analytics_worker is None:
+        _career_analytics_worker = CareerAnalyticsWorker(
+            batch_size=settings.CAREER_ANALYTICS_BATCH_SIZE,
+            interval=settings.CAREER_ANALYTICS_INTERVAL_SECONDS
+        )
+    return _career_analytics_worker
@@ -0,0 +1,549 @@
+"""
+NOOR Platform - Bulk Exports
+Background extracts of analytics datasets to compressed CSV or Parquet files
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import csv
+import gzip
+import logging
+import os
+import uuid
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.request_context import set_deadline
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY = "export:job:{job_id}"
+
+FORMATS = {
+    "csv": ".csv.gz",
+    "parquet": ".parquet"
+}
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class ExportLimitError(Exception):
+    """Raised when an export cannot be accepted because of concurrency limits"""
+
+
+# ============================================================================
+# DATASETS
+# ============================================================================
+#
+# Each dataset is one SELECT with a fixed column list and typed columns (so
+# every Parquet row group has the same schema), plus the filters it accepts
+# as bind parameters. Datasets with "roles" can only be exported by users
+# holding one of them.
+
+EXPORT_DATASETS: Dict[str, Dict[str, Any]] = {
+    "skill_distribution": {
+        "description": "Users per skill, proficiency level and emirate of current employer",
+        "sql": """
+            SELECT s.name AS skill, s.category, COALESCE(e.emirate, '') AS emirate,
+                   us.proficiency_level, COUNT(*) AS users,
+                   COUNT(*) FILTER (WHERE us.is_verified) AS verified_users,
+                   AVG(us.years_of_experience) AS avg_years_of_experience
+            FROM user_skills us
+            JOIN skills s ON s.id = us.skill_id
+            LEFT JOIN LATERAL (
+                SELECT i.emirate FROM employees em
+                JOIN institutions i ON i.id = em.institution_id
+                WHERE em.user_id = us.user_id AND em.is_active
+                ORDER BY em.start_date DESC
+                LIMIT 1
+            ) e ON true
+            WHERE {where}
+            GROUP BY 1, 2, 3, 4
+            ORDER BY 1, 3, 4
+        """,
+        "columns": [
+            ("skill", "string"),
+            ("category", "string"),
+            ("emirate", "string"),
+            ("proficiency_level", "string"),
+            ("users", "int"),
+            ("verified_users", "int"),
+            ("avg_years_of_experience", "float")
+        ],
+        "filters": {
+            "emirate": "e.emirate = :emirate",
+            "category": "s.category = :category"
+        }
+    },
+    "workforce": {
+        "description": "Active employees with employer, role and demographics (source of workforce insights)",
+        "roles": ["admin", "analyst"],
+        "sql": """
+            SELECT em.id AS employee_id, i.name AS institution, i.industry, i.emirate,
+                   i.is_government, em.job_title, em.department, em.employment_type,
+                   em.start_date, u.nationality, u.gender,
+                   DATE_PART('year', AGE(u.date_of_birth))::int AS age
+            FROM employees em
+            JOIN institutions i ON i.id = em.institution_id
+            JOIN users u ON u.id = em.user_id
+            WHERE em.is_active AND {where}
+            ORDER BY em.id
+        """,
+        "columns": [
+            ("employee_id", "string"),
+            ("institution", "string"),
+            ("industry", "string"),
+            ("emirate", "string"),
+            ("is_government", "bool"),
+            ("job_title", "string"),
+            ("department", "string"),
+            ("employment_type", "string"),
+            ("start_date", "date"),
+            ("nationality", "string"),
+            ("gender", "string"),
+            ("age", "int")
+        ],
+        "filters": {
+            "emirate": "i.emirate = :emirate",
+            "industry": "i.industry = :industry",
+            "institution_id": "i.id = CAST(:institution_id AS uuid)"
+        }
+    },
+    "emiratization_compliance": {
+        "description": "Emirati share of active employees per institution",
+        "sql": """
+            SELECT i.id AS institution_id, i.name AS institution, i.trade_license, i.industry,
+                   i.emirate, i.size, i.is_government,
+                   COUNT(em.id) AS employees,
+                   COUNT(em.id) FILTER (WHERE u.nationality IN ('UAE', 'Emirati', 'AE')) AS emirati_employees,
+                   ROUND(
+                       COUNT(em.id) FILTER (WHERE u.nationality IN ('UAE', 'Emirati', 'AE'))::numeric
+                       / NULLIF(COUNT(em.id), 0), 4
+                   )::float AS emiratization_ratio
+            FROM institutions i
+            LEFT JOIN employees em ON em.institution_id = i.id AND em.is_active
+            LEFT JOIN users u ON u.id = em.user_id
+            WHERE {where}
+            GROUP BY i.id
+            ORDER BY i.emirate, i.name
+        """,
+        "columns": [
+            ("institution_id", "string"),
+            ("institution", "string"),
+            ("trade_license", "string"),
+            ("industry", "string"),
+            ("emirate", "string"),
+            ("size", "string"),
+            ("is_government", "bool"),
+            ("employees", "int"),
+            ("emirati_employees", "int"),
+            ("emiratization_ratio", "float")
+        ],
+        "filters": {
+            "emirate": "i.emirate = :emirate",
+            "industry": "i.industry = :industry"
+        }
+    },
+    "job_postings": {
+        "description": "Job postings with salary range and status",
+        "sql": """
+            SELECT p.id AS job_posting_id, p.institution_id, p.title, p.employment_type,
+                   p.experience_level, p.industry, COALESCE(p.emirate, p.location) AS emirate,
+                   p.salary_min, p.salary_max, p.currency, p.posted_date, p.expiry_date,
+                   p.status, p.applications_count
+            FROM job_postings p
+            WHERE {where}
+            ORDER BY p.posted_date, p.id
+        """,
+        "columns": [
+            ("job_posting_id", "string"),
+            ("institution_id", "string"),
+            ("title", "string"),
+            ("employment_type", "string"),
+            ("experience_level", "string"),
+            ("industry", "string"),
+            ("emirate", "string"),
+            ("salary_min", "float"),
+            ("salary_max", "float"),
+            ("currency", "string"),
+            ("posted_date", "date"),
+            ("expiry_date", "date"),
+            ("status", "string"),
+            ("applications_count", "int")
+        ],
+        "filters": {
+            "emirate": "COALESCE(p.emirate, p.location) = :emirate",
+            "industry": "p.industry = :industry",
+            "status": "p.status = :status",
+            "posted_from": "p.posted_date >= CAST(:posted_from AS date)",
+            "posted_to": "p.posted_date <= CAST(:posted_to AS date)"
+        }
+    }
+}
+
+
+def parquet_available() -> bool:
+    """Whether the optional pyarrow dependency is installed"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def can_export(dataset: str, roles: List[str]) -> bool:
+    """Whether a user with these roles may export a dataset"""
+    definition = EXPORT_DATASETS.get(dataset)
+    allowed = definition.get("roles") if definition else None
+    return not allowed or bool(set(allowed) & set(roles))
+
+
+def build_query(dataset: str, filters: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Render a dataset's SQL with the requested filters
+
+    Raises:
+        ValueError: Unknown dataset or filter
+    """
+    definition = EXPORT_DATASETS.get(dataset)
+    if definition is None:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    unknown = set(filters) - set(definition["filters"])
+    if unknown:
+        raise ValueError(f"Unsupported filters for {dataset}: {', '.join(sorted(unknown))}")
+
+    clauses = [definition["filters"][name] for name, value in filters.items() if value is not None]
+    params = {name: str(value) for name, value in filters.items() if value is not None}
+    return definition["sql"].format(where=" AND ".join(clauses) or "true"), params
+
+
+# ============================================================================
+# WRITERS
+# ============================================================================
+#
+# Writers run in a thread (compression and encoding are CPU work) and only
+# ever hold one chunk of rows.
+
+class CsvWriter:
+    """Gzip-compressed CSV with a header row"""
+
+    def __init__(self, path: str, columns: List[Tuple[str, str]]):
+        self.file = gzip.open(path, "wt", newline="", encoding="utf-8", compresslevel=6)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([name for name, _ in columns])
+
+    def write(self, rows: List[tuple]) -> None:
+        self.writer.writerows(rows)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ParquetWriter:
+    """Parquet file with one row group per chunk"""
+
+    TYPES = {
+        "string": "string",
+        "int": "int64",
+        "float": "float64",
+        "bool": "bool_",
+        "date": "date32"
+    }
+
+    def __init__(self, path: str, columns: List[Tuple[str, str]]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.columns = columns
+        self.schema = pa.schema([(name, getattr(pa, self.TYPES[kind])()) for name, kind in columns])
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write(self, rows: List[tuple]) -> None:
+        arrays = []
+        for i, (name, kind) in enumerate(self.columns):
+            values = [row[i] for row in rows]
+            if kind == "string":
+                values = [None if value is None else str(value) for value in values]
+            elif kind == "float":
+                values = [None if value is None else float(value) for value in values]
+            arrays.append(self.pa.array(values, type=self.schema.field(name).type))
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+WRITERS = {
+    "csv": CsvWriter,
+    "parquet": ParquetWriter
+}
+
+
+# ============================================================================
+# EXPORT SERVICE
+# ============================================================================
+
+class ExportService:
+    """
+    Background dataset exports
+
+    Provides:
+    - Jobs that stream a dataset through a server-side cursor, chunk by
+      chunk, into a compressed CSV or Parquet file on EXPORT_DIR
+    - Job records in Redis (status, rows, chunks, bytes) so any worker can
+      report progress; the file is the download handle
+    - Per-worker limits on running exports, queued exports and active
+      exports per user
+    - Removal of expired files
+
+    Memory per running export is bounded by one chunk of rows.
+    """
+
+    def __init__(
+        self,
+        export_dir: str,
+        chunk_rows: int = 10000,
+        max_concurrent: int = 2,
+        max_queued: int = 20,
+        max_per_user: int = 2,
+        retention_hours: int = 24
+    ):
+        self.export_dir = export_dir
+        self.chunk_rows = chunk_rows
+        self.max_queued = max_queued
+        self.max_per_user = max_per_user
+        self.retention = timedelta(hours=retention_hours)
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    # ========================================================================
+    # JOBS
+    # ========================================================================
+
+    async def create_export(
+        self,
+        owner_id: str,
+        dataset: str,
+        format: str = "csv",
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Queue an export
+
+        Args:
+            owner_id: User requesting the export
+            dataset: Name in EXPORT_DATASETS
+            format: csv (gzip-compressed) or parquet
+            filters: Dataset filters
+
+        Returns:
+            Job record
+
+        Raises:
+            ValueError: Unknown dataset, filter or format
+            ExportLimitError: Too many queued exports or active exports for the user
+        """
+        filters = filters or {}
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported format: {format}")
+        if format == "parquet" and not parquet_available():
+            raise ValueError("Parquet exports require pyarrow; use format=csv")
+        build_query(dataset, filters)
+
+        active = [job for job in self._jobs.values() if job["status"] in ACTIVE_STATES]
+        if len(active) >= self.max_queued:
+            raise ExportLimitError("Too many exports in progress, try again later")
+        if sum(1 for job in active if job["owner_id"] == owner_id) >= self.max_per_user:
+            raise ExportLimitError(f"At most {self.max_per_user} exports per user can run at once")
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "owner_id": owner_id,
+            "dataset": dataset,
+            "format": format,
+            "filters": filters,
+            "status": QUEUED,
+            "rows": 0,
+            "chunks": 0,
+            "bytes": 0,
+            "file_name": f"{dataset}-{datetime.utcnow():%Y%m%d-%H%M%S}{FORMATS[format]}",
+            "error": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "expires_at": None
+        }
+        self._jobs[job_id] = job
+        await self._save(job)
+        self._tasks[job_id] = asyncio.create_task(self._run(job))
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job record from this worker or, for other workers' jobs, from Redis"""
+        from app.db.redis import cache_get
+
+        return self._jobs.get(job_id) or await cache_get(JOB_KEY.format(job_id=job_id))
+
+    def file_path(self, job: Dict[str, Any]) -> str:
+        """Location of a job's file"""
+        return os.path.join(self.export_dir, f"{job['job_id']}{FORMATS[job['format']]}")
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running export of this worker"""
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def _save(self, job: Dict[str, Any]) -> None:
+        """Publish a job record"""
+        from app.db.redis import cache_set
+
+        await cache_set(JOB_KEY.format(job_id=job["job_id"]), job, ttl=int(self.retention.total_seconds()))
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        """Wait for a slot and run the export"""
+        # Exports outlive the request that started them; drop its deadline
+        set_deadline(None)
+        path = self.file_path(job)
+        partial = f"{path}.part"
+        try:
+            async with self._slots:
+                job["status"] = RUNNING
+                job["started_at"] = datetime.utcnow().isoformat()
+                await self._save(job)
+                await self._export(job, partial)
+            os.replace(partial, path)
+            job["status"] = COMPLETED
+            job["bytes"] = os.path.getsize(path)
+            job["expires_at"] = (datetime.utcnow() + self.retention).isoformat()
+            logger.info(f"Export {job['job_id']} ({job['dataset']}) wrote {job['rows']} rows, {job['bytes']} bytes")
+        except asyncio.CancelledError:
+            job["status"] = CANCELLED
+        except Exception as e:
+            logger.error(f"Export {job['job_id']} ({job['dataset']}) failed: {e}")
+            job["status"] = FAILED
+            job["error"] = str(e)
+        finally:
+            if job["status"] != COMPLETED and os.path.exists(partial):
+                os.remove(partial)
+            job["finished_at"] = datetime.utcnow().isoformat()
+            self._tasks.pop(job["job_id"], None)
+            await self._save(job)
+
+    async def _export(self, job: Dict[str, Any], path: str) -> None:
+        """Stream the dataset into a file, one chunk at a time"""
+        from app.db.postgres import get_session_factory, ANALYTICS
+
+        sql, params = build_query(job["dataset"], job["filters"])
+        columns = EXPORT_DATASETS[job["dataset"]]["columns"]
+        os.makedirs(self.export_dir, exist_ok=True)
+        writer = await asyncio.to_thread(WRITERS[job["format"]], path, columns)
+        try:
+            async with get_session_factory(ANALYTICS)() as session:
+                # stream() opens a server-side cursor; yield_per bounds each fetch
+                result = await session.stream(
+                    text(sql).execution_options(yield_per=self.chunk_rows),
+                    params
+                )
+                async for chunk in result.partitions(self.chunk_rows):
+                    rows = [tuple(row) for row in chunk]
+                    await asyncio.to_thread(writer.write, rows)
+                    job["rows"] += len(rows)
+                    job["chunks"] += 1
+                    job["bytes"] = os.path.getsize(path)
+                    await self._save(job)
+        finally:
+            await asyncio.to_thread(writer.close)
+
+    # ========================================================================
+    # CLEANUP
+    # ========================================================================
+
+    def remove_expired(self) -> int:
+        """
+        Delete export files past their retention
+
+        Returns:
+            Number of files removed
+        """
+        if not os.path.isdir(self.export_dir):
+            return 0
+        cutoff = (datetime.utcnow() - self.retention).timestamp()
+        removed = 0
+        for name in os.listdir(self.export_dir):
+            path = os.path.join(self.export_dir, name)
+            if name.endswith(".part") or os.path.getmtime(path) >= cutoff:
+                continue
+            os.remove(path)
+            removed += 1
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] not in ACTIVE_STATES and job["finished_at"]
+            and datetime.fromisoformat(job["finished_at"]).timestamp() < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return removed
+
+    async def _run_cleanups(self) -> None:
+        """Remove expired files every hour"""
+        while True:
+            await asyncio.sleep(3600)
+            try:
+                removed = await asyncio.to_thread(self.remove_expired)
+                if removed:
+                    logger.info(f"Removed {removed} expired export files")
+            except Exception as e:
+                logger.error(f"Export cleanup failed: {e}")
+
+    def start(self) -> None:
+        """Start the cleanup schedule"""
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._run_cleanups())
+
+    async def stop(self) -> None:
+        """Stop the cleanup schedule and cancel running exports"""
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+            try:
+                await self._cleanup_task
+            except asyncio.CancelledError:
+                pass
+            self._cleanup_task = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Singleton instance
+_export_service = None
+
+
+def get_export_service() -> ExportService:
+    """Get or create Export Service instance"""
+    global _export_service
+    if _export_service is None:
+        _export_service = ExportService(
+            export_dir=settings.EXPORT_DIR,
+            chunk_rows=settings.EXPORT_CHUNK_ROWS,
+            max_concurrent=settings.EXPORT_MAX_CONCURRENT,
+            max_queued=settings.EXPORT_MAX_QUEUED,
+            max_per_user=settings.EXPORT_MAX_PER_USER,
+            retention_hours=settings.EXPORT_RETENTION_HOURS
+        )
+    return _export_service
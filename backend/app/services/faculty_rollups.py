@@ -0,0 +1,508 @@
+"""
+NOOR Platform - Faculty Score Rollups
+Pre-aggregated eight-faculty score cube for institution and federal analytics
+"""
+
+from sqlalchemy import select, func, delete, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+from datetime import date, datetime, timezone
+import json
+import logging
+import math
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Histogram of percentage scores in 10-point buckets
+HISTOGRAM_BUCKETS = 10
+BUCKET_COLUMNS = [f"bucket_{i}" for i in range(HISTOGRAM_BUCKETS)]
+
+# Cube dimensions available for drill-down
+GROUP_BY_COLUMNS = {
+    "faculty": "faculty_id",
+    "competency": "competency_id",
+    "institution": "institution_id",
+    "emirate": "emirate",
+    "period": "period"
+}
+
+QUERY_CACHE_PREFIX = "faculty_rollups:"
+
+REBUILD_BATCH_SIZE = 1000
+
+# Institution and emirate an assessment is counted under: the user's most
+# recent active employment
+AFFILIATION_QUERY = text("""
+    SELECT e.institution_id, i.emirate
+    FROM employees e
+    JOIN institutions i ON i.id = e.institution_id
+    WHERE e.user_id = :user_id AND e.is_active
+    ORDER BY e.start_date DESC
+    LIMIT 1
+""")
+
+ASSESSMENT_QUESTIONS_QUERY = text("""
+    SELECT questions_json
+    FROM assessments
+    WHERE id = :assessment_id AND assessment_type = 'faculty' AND faculty_id = :faculty_id
+""")
+
+
+def period_start(value: Any = None) -> date:
+    """Return the first day of the month containing value (today when omitted)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value or date.today()).replace(day=1)
+
+
+def bucket_index(score: float) -> int:
+    """Histogram bucket of a percentage score"""
+    return min(max(int(score // (100 / HISTOGRAM_BUCKETS)), 0), HISTOGRAM_BUCKETS - 1)
+
+
+def summarize(count: int, score_sum: float, score_sum_sq: float, buckets: List[int]) -> Dict[str, Any]:
+    """
+    Turn additive aggregates into summary statistics
+
+    Percentiles are interpolated linearly inside histogram buckets, so they
+    are accurate to within one bucket width (10 points).
+    """
+    if not count:
+        return {"count": 0, "mean": None, "std_dev": None, "percentiles": {}, "histogram": buckets}
+
+    mean = score_sum / count
+    variance = max(score_sum_sq / count - mean * mean, 0.0)
+    width = 100 / HISTOGRAM_BUCKETS
+
+    percentiles = {}
+    for p in (25, 50, 75, 90):
+        target = count * p / 100
+        seen = 0
+        for i, bucket in enumerate(buckets):
+            if bucket and seen + bucket >= target:
+                percentiles[f"p{p}"] = round(i * width + width * (target - seen) / bucket, 1)
+                break
+            seen += bucket
+
+    return {
+        "count": count,
+        "mean": round(mean, 2),
+        "std_dev": round(math.sqrt(variance), 2),
+        "percentiles": percentiles,
+        "histogram": buckets
+    }
+
+
+def faculty_scores(faculty_score: Dict[str, Any]) -> List[Tuple[str, float]]:
+    """
+    (competency_id, percentage) scores of a scored faculty assessment
+
+    The faculty-level score comes first with an empty competency_id,
+    followed by each competency score that carries a competency_id.
+    """
+    scores: List[Tuple[str, float]] = [("", float(faculty_score["percentage"]))]
+    scores.extend(
+        (competency["competency_id"], float(competency["percentage"]))
+        for competency in faculty_score.get("competency_scores", [])
+        if competency.get("competency_id")
+    )
+    return scores
+
+
+def add_score(
+    cells: Dict[Tuple, Dict[str, Any]],
+    period: date,
+    institution_id: Optional[str],
+    emirate: Optional[str],
+    faculty_id: str,
+    competency_id: str,
+    score: float
+) -> None:
+    """Add one percentage score to its cube cell, keyed by the cube's primary key"""
+    key = (period, str(institution_id or ""), emirate or "", faculty_id, competency_id)
+    cell = cells.get(key)
+    if cell is None:
+        cell = cells[key] = {
+            **dict(zip(("period", "institution_id", "emirate", "faculty_id", "competency_id"), key)),
+            "count": 0,
+            "score_sum": 0.0,
+            "score_sum_sq": 0.0,
+            **{column: 0 for column in BUCKET_COLUMNS}
+        }
+    cell["count"] += 1
+    cell["score_sum"] += score
+    cell["score_sum_sq"] += score * score
+    cell[BUCKET_COLUMNS[bucket_index(score)]] += 1
+
+
+async def iter_faculty_assessments(session: AsyncSession) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream scored faculty assessments from user_assessments
+
+    Yields dicts with faculty_id, institution_id, emirate, faculty_score
+    (as saved by FacultyRollupEngine.record_assessment) and completed_at.
+    """
+    result = await session.stream(text("""
+        SELECT results_json, completed_at
+        FROM user_assessments
+        WHERE results_json ->> 'faculty_id' IS NOT NULL
+          AND results_json -> 'faculty_score' IS NOT NULL
+    """))
+    async for row in result:
+        results = json.loads(row.results_json) if isinstance(row.results_json, str) else row.results_json
+        yield {
+            "faculty_id": results["faculty_id"],
+            "institution_id": results.get("institution_id"),
+            "emirate": results.get("emirate"),
+            "faculty_score": results["faculty_score"],
+            "completed_at": row.completed_at
+        }
+
+
+class FacultyRollupEngine:
+    """
+    Eight-faculty OLAP rollups
+
+    Provides:
+    - An additive cube (count, sum, sum of squares, histogram) by period,
+      institution, emirate, faculty and competency
+    - Incremental updates as assessments are scored (one upsert per scoring,
+      committed with the assessment itself)
+    - A full rebuild from user_assessments, run at startup when the cube is empty
+    - Drill-down queries answered from the cube, never from raw attempts
+    - A short-lived cache for dashboard polling
+    """
+
+    def __init__(self, cache_ttl: int = 60):
+        self.cache_ttl = cache_ttl
+
+    async def load_questions(self, assessment_id: str, faculty_id: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Questions and answer keys of a stored faculty assessment
+
+        Returns:
+            Questions by competency_id, or None when no faculty assessment
+            with this ID exists for the faculty
+        """
+        from app.db.postgres import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as session:
+            questions = (await session.execute(
+                ASSESSMENT_QUESTIONS_QUERY, {"assessment_id": assessment_id, "faculty_id": faculty_id}
+            )).scalar_one_or_none()
+        if isinstance(questions, str):
+            questions = json.loads(questions)
+        return questions or None
+
+    # ========================================================================
+    # UPDATES
+    # ========================================================================
+
+    async def record_assessment(
+        self,
+        user_id: str,
+        assessment_id: str,
+        faculty_id: str,
+        faculty_score: Dict[str, Any],
+        biometric_verified: bool = False
+    ) -> str:
+        """
+        Save a scored faculty assessment and add it to the cube
+
+        The assessment is counted under the institution and emirate of the
+        user's active employment record. The user_assessments row and the
+        cube update commit together, so rebuild() never counts an assessment
+        twice or misses one.
+
+        Returns:
+            ID of the user_assessments row
+        """
+        from app.db.postgres import AsyncSessionLocal
+
+        completed_at = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as session:
+            affiliation = (await session.execute(AFFILIATION_QUERY, {"user_id": user_id})).first()
+            institution_id = str(affiliation.institution_id) if affiliation else None
+            emirate = affiliation.emirate if affiliation else None
+            results = {
+                "faculty_id": faculty_id,
+                "institution_id": institution_id,
+                "emirate": emirate,
+                "faculty_score": faculty_score
+            }
+            user_assessment_id = (await session.execute(text("""
+                INSERT INTO user_assessments
+                    (user_id, assessment_id, score, completed_at, biometric_verified, results_json)
+                VALUES (:user_id, :assessment_id, :score, :completed_at, :biometric_verified, CAST(:results AS JSONB))
+                RETURNING id
+            """), {
+                "user_id": user_id,
+                "assessment_id": assessment_id,
+                "score": round(faculty_score["percentage"], 2),
+                "completed_at": completed_at,
+                "biometric_verified": biometric_verified,
+                "results": json.dumps(results)
+            })).scalar_one()
+            await self.record_faculty_score(
+                faculty_id,
+                faculty_score,
+                institution_id=institution_id,
+                emirate=emirate,
+                scored_at=completed_at,
+                session=session
+            )
+            await session.commit()
+        return str(user_assessment_id)
+
+    async def record_faculty_score(
+        self,
+        faculty_id: str,
+        faculty_score: Dict[str, Any],
+        institution_id: Optional[str] = None,
+        emirate: Optional[str] = None,
+        scored_at: Optional[datetime] = None,
+        session: Optional[AsyncSession] = None
+    ) -> int:
+        """
+        Add a scored faculty assessment to the cube
+
+        Args:
+            faculty_id: Faculty scored
+            faculty_score: Result of AssessmentScorer.score_faculty; competency
+                scores carrying a competency_id are rolled up individually
+            institution_id: Institution of the assessed user
+            emirate: Emirate of the assessed user
+            scored_at: Scoring time (now when omitted)
+            session: Session to update the cube in, left uncommitted
+
+        Returns:
+            Number of cube cells updated
+        """
+        from app.services.sketch_analytics import get_sketch_analytics
+        from app.services.percentiles import get_percentile_service
+
+        get_sketch_analytics().record_value(f"faculty_score:{faculty_id}", faculty_score["percentage"])
+        get_percentile_service().record(
+            "faculty_score",
+            faculty_score["percentage"],
+            faculty=faculty_id,
+            institution=institution_id,
+            emirate=emirate
+        )
+
+        return await self.record_scores(
+            faculty_id,
+            faculty_scores(faculty_score),
+            institution_id=institution_id,
+            emirate=emirate,
+            scored_at=scored_at,
+            session=session
+        )
+
+    async def record_scores(
+        self,
+        faculty_id: str,
+        scores: List[Tuple[str, float]],
+        institution_id: Optional[str] = None,
+        emirate: Optional[str] = None,
+        scored_at: Optional[datetime] = None,
+        session: Optional[AsyncSession] = None
+    ) -> int:
+        """
+        Add (competency_id, percentage) scores of one faculty to the cube
+
+        An empty competency_id records a faculty-level score. Without a
+        session, the update is committed in its own transaction.
+        """
+        from app.db.postgres import AsyncSessionLocal
+        from app.db.models import FacultyScoreRollup
+
+        cells: Dict[Tuple, Dict[str, Any]] = {}
+        period = period_start(scored_at)
+        for competency_id, score in scores:
+            add_score(cells, period, institution_id, emirate, faculty_id, competency_id, score)
+
+        table = FacultyScoreRollup.__table__
+        statement = insert(table).values(list(cells.values()))
+        statement = statement.on_conflict_do_update(
+            index_elements=["period", "institution_id", "emirate", "faculty_id", "competency_id"],
+            set_={
+                **{
+                    column: table.c[column] + statement.excluded[column]
+                    for column in ["count", "score_sum", "score_sum_sq", *BUCKET_COLUMNS]
+                },
+                "updated_at": func.now()
+            }
+        )
+
+        if session is not None:
+            await session.execute(statement)
+        else:
+            async with AsyncSessionLocal() as session:
+                await session.execute(statement)
+                await session.commit()
+        return len(cells)
+
+    # ========================================================================
+    # REBUILD
+    # ========================================================================
+
+    async def rebuild(self) -> int:
+        """
+        Recompute the cube from all scored faculty assessments
+
+        The cube is locked against concurrent updates for the duration, so
+        assessments recorded meanwhile are applied after the rebuild.
+
+        Returns:
+            Number of cube cells written
+        """
+        from app.db.postgres import AsyncSessionLocal
+        from app.db.models import FacultyScoreRollup
+
+        table = FacultyScoreRollup.__table__
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("LOCK TABLE faculty_score_rollups IN SHARE ROW EXCLUSIVE MODE"))
+            cells: Dict[Tuple, Dict[str, Any]] = {}
+            async for assessment in iter_faculty_assessments(session):
+                period = period_start(assessment["completed_at"])
+                for competency_id, score in faculty_scores(assessment["faculty_score"]):
+                    add_score(
+                        cells,
+                        period,
+                        assessment["institution_id"],
+                        assessment["emirate"],
+                        assessment["faculty_id"],
+                        competency_id,
+                        score
+                    )
+
+            await session.execute(delete(table))
+            rows = list(cells.values())
+            for i in range(0, len(rows), REBUILD_BATCH_SIZE):
+                await session.execute(insert(table).values(rows[i:i + REBUILD_BATCH_SIZE]))
+            await session.commit()
+
+        logger.info(f"Rebuilt faculty score rollups: {len(rows)} cells")
+        return len(rows)
+
+    async def start(self) -> None:
+        """Backfill the cube from existing assessments when it is empty"""
+        from app.db.postgres import AsyncSessionLocal
+
+        try:
+            async with AsyncSessionLocal() as session:
+                populated = (await session.execute(text("SELECT 1 FROM faculty_score_rollups LIMIT 1"))).first()
+            if not populated:
+                await self.rebuild()
+        except Exception as e:
+            logger.warning(f"Faculty score rollup backfill failed: {e}")
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    async def query(
+        self,
+        institution_id: Optional[str] = None,
+        emirate: Optional[str] = None,
+        faculty_id: Optional[str] = None,
+        period_from: Optional[date] = None,
+        period_to: Optional[date] = None,
+        group_by: str = "faculty"
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate the cube along one dimension
+
+        Args:
+            institution_id: Restrict to one institution
+            emirate: Restrict to one emirate
+            faculty_id: Restrict to one faculty
+            period_from: First month included
+            period_to: Last month included
+            group_by: faculty, competency, institution, emirate or period
+
+        Returns:
+            One summary per group value, ordered by group value
+        """
+        from app.db.redis import cache_get, cache_set
+        from app.db.postgres import get_session_factory, ANALYTICS
+        from app.db.models import FacultyScoreRollup
+
+        if group_by not in GROUP_BY_COLUMNS:
+            raise ValueError(f"Unknown group_by: {group_by}")
+
+        filters = {
+            "institution_id": institution_id,
+            "emirate": emirate,
+            "faculty_id": faculty_id,
+            "period_from": period_from.isoformat() if period_from else None,
+            "period_to": period_to.isoformat() if period_to else None,
+            "group_by": group_by
+        }
+        cache_key = f"{QUERY_CACHE_PREFIX}{json.dumps(filters, sort_keys=True)}"
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        table = FacultyScoreRollup.__table__
+        group_column = table.c[GROUP_BY_COLUMNS[group_by]]
+        query = select(
+            group_column.label("group"),
+            func.sum(table.c.count).label("count"),
+            func.sum(table.c.score_sum).label("score_sum"),
+            func.sum(table.c.score_sum_sq).label("score_sum_sq"),
+            *[func.sum(table.c[column]).label(column) for column in BUCKET_COLUMNS]
+        ).group_by(group_column).order_by(group_column)
+
+        # Faculty-level and competency-level cells must not be double counted
+        if group_by == "competency":
+            query = query.where(table.c.competency_id != "")
+        else:
+            query = query.where(table.c.competency_id == "")
+        if institution_id:
+            query = query.where(table.c.institution_id == str(institution_id))
+        if emirate:
+            query = query.where(table.c.emirate == emirate)
+        if faculty_id:
+            query = query.where(table.c.faculty_id == faculty_id)
+        if period_from:
+            query = query.where(table.c.period >= period_start(period_from))
+        if period_to:
+            query = query.where(table.c.period <= period_start(period_to))
+
+        async with get_session_factory(ANALYTICS)() as session:
+            rows = (await session.execute(query)).all()
+
+        groups = [
+            {
+                group_by: row.group.isoformat() if isinstance(row.group, date) else row.group,
+                **summarize(
+                    int(row.count),
+                    float(row.score_sum),
+                    float(row.score_sum_sq),
+                    [int(getattr(row, column)) for column in BUCKET_COLUMNS]
+                )
+            }
+            for row in rows
+        ]
+
+        await cache_set(cache_key, groups, ttl=self.cache_ttl)
+        return groups
+
+
+# Singleton instance
+_faculty_rollups = None
+
+
+def get_faculty_rollups() -> FacultyRollupEngine:
+    """Get or create Faculty Rollup Engine instance"""
+    global _faculty_rollups
+    if _faculty_rollups is None:
+        _faculty_rollups = FacultyRollupEngine(cache_ttl=settings.FACULTY_ANALYTICS_CACHE_SECONDS)
+    return _faculty_rollups
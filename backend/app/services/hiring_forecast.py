@@ -0,0 +1,501 @@
+"""
+NOOR Platform - Hiring Forecasts
+Batch forecasting of weekly job-posting counts by industry, emirate and skill
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+import asyncio
+import logging
+import time
+
+import numpy as np
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.services.skill_demand import ALL, week_start
+
+logger = logging.getLogger(__name__)
+
+# Smoothing parameter grids searched per series
+ALPHAS = np.array([0.1, 0.2, 0.3, 0.5, 0.7, 0.9])
+BETAS = np.array([0.0, 0.05, 0.1, 0.2])
+
+# Trailing weeks used to pick between models per series
+SELECTION_WEEKS = 8
+
+# Relative change over the horizon below which a trend is "stable"
+STABLE_THRESHOLD = 0.05
+
+# Series key: (industry, emirate, skill) with ALL for rolled-up dimensions
+SeriesKey = Tuple[str, str, str]
+
+
+# ============================================================================
+# MODELS
+# ============================================================================
+#
+# Every model takes a (series, weeks) matrix and forecasts all rows at once.
+# The only Python loop is over time steps; work across series is vectorized.
+
+def seasonal_naive(y: np.ndarray, horizon: int, season: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Repeat the last observed season
+
+    Returns:
+        (forecast of shape (n, horizon), one-step errors of shape (n, weeks))
+        with NaN errors where no prediction exists
+    """
+    n, weeks = y.shape
+    season = min(season, weeks)
+    forecast = y[:, weeks - season + np.arange(horizon) % season]
+
+    errors = np.full((n, weeks), np.nan)
+    errors[:, season:] = y[:, season:] - y[:, :-season]
+    return forecast, errors
+
+
+def holt_smoothing(y: np.ndarray, horizon: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Holt's linear exponential smoothing, fitted by grid search
+
+    Each (alpha, beta) pair of the grids is run for all series at once;
+    each series keeps the pair with the lowest one-step squared error.
+    Only the current pair's and the best pair's errors are held, so memory
+    stays at two (n, weeks) arrays whatever the grid size.
+    beta = 0 is simple exponential smoothing with the initial trend.
+
+    Returns:
+        (forecast of shape (n, horizon), one-step errors of shape (n, weeks),
+        chosen (alpha, beta) pairs of shape (n, 2))
+    """
+    n, weeks = y.shape
+    # Time-major so each step writes one contiguous row
+    observed = np.ascontiguousarray(y.T)
+    initial_trend = observed[1] - observed[0] if weeks > 1 else np.zeros(n)
+
+    best_sse = np.full(n, np.inf)
+    best_errors = np.full((weeks, n), np.nan)
+    best_level = np.zeros(n)
+    best_trend = np.zeros(n)
+    params = np.zeros((n, 2))
+    errors = np.full((weeks, n), np.nan)
+    for alpha in ALPHAS:
+        for beta in BETAS:
+            level = observed[0].copy()
+            trend = initial_trend.copy()
+            for t in range(1, weeks):
+                predicted = level + trend
+                errors[t] = observed[t] - predicted
+                previous = level
+                level = alpha * observed[t] + (1 - alpha) * predicted
+                trend = beta * (level - previous) + (1 - beta) * trend
+
+            sse = np.nansum(errors ** 2, axis=0)
+            better = sse < best_sse
+            best_sse[better] = sse[better]
+            best_errors[:, better] = errors[:, better]
+            best_level[better] = level[better]
+            best_trend[better] = trend[better]
+            params[better] = (alpha, beta)
+
+    steps = np.arange(1, horizon + 1)
+    forecast = best_level[:, None] + best_trend[:, None] * steps
+    return forecast, best_errors.T, params
+
+
+def forecast_batch(y: np.ndarray, horizon: int, season: int = 52) -> Dict[str, np.ndarray]:
+    """
+    Forecast every row of a weekly count matrix
+
+    Both models are fitted to all series; each series then uses the model
+    with the lower mean absolute one-step error over the last
+    SELECTION_WEEKS weeks. Seasonal naive needs two full seasons of history
+    to be considered.
+
+    Returns:
+        forecast, lower and upper (80% interval) of shape (n, horizon),
+        model (0 = Holt, 1 = seasonal naive) and mae of shape (n,)
+    """
+    y = np.asarray(y, dtype=float)
+    n, weeks = y.shape
+    holt_forecast, holt_errors, _ = holt_smoothing(y, horizon)
+    forecast = holt_forecast
+    errors = holt_errors
+    model = np.zeros(n, dtype=int)
+
+    if weeks >= 2 * season:
+        naive_forecast, naive_errors = seasonal_naive(y, horizon, season)
+        recent = slice(weeks - SELECTION_WEEKS, weeks)
+        use_naive = (
+            np.nanmean(np.abs(naive_errors[:, recent]), axis=1)
+            < np.nanmean(np.abs(holt_errors[:, recent]), axis=1)
+        )
+        forecast = np.where(use_naive[:, None], naive_forecast, holt_forecast)
+        errors = np.where(use_naive[:, None], naive_errors, holt_errors)
+        model = use_naive.astype(int)
+
+    # Interval widens with the square root of the horizon (random-walk errors)
+    sigma = np.sqrt(np.nanmean(errors ** 2, axis=1))
+    sigma = np.nan_to_num(sigma)
+    spread = 1.28 * sigma[:, None] * np.sqrt(np.arange(1, horizon + 1))
+    forecast = np.maximum(forecast, 0)
+    return {
+        "forecast": forecast,
+        "lower": np.maximum(forecast - spread, 0),
+        "upper": forecast + spread,
+        "model": model,
+        "mae": np.nan_to_num(np.nanmean(np.abs(errors), axis=1))
+    }
+
+
+def trend_direction(change: float) -> str:
+    """Classify a relative change"""
+    if change > STABLE_THRESHOLD:
+        return "increasing"
+    if change < -STABLE_THRESHOLD:
+        return "decreasing"
+    return "stable"
+
+
+# ============================================================================
+# FORECASTER
+# ============================================================================
+
+class HiringForecaster:
+    """
+    Hiring trend forecasts
+
+    Provides:
+    - Weekly posting-count series per industry, emirate and skill (and their
+      rollups), built from job_postings in two aggregate queries
+    - One batch fit for all series per data refresh, run in a worker thread
+    - Forecast lookups and top movers served from memory until the next
+      refresh; refreshes are skipped when job_postings has not changed
+    """
+
+    MODELS = ["holt", "seasonal_naive"]
+
+    def __init__(
+        self,
+        history_weeks: int = 104,
+        horizon_weeks: int = 26,
+        season_weeks: int = 52,
+        refresh_interval: int = 3600
+    ):
+        self.history_weeks = history_weeks
+        self.horizon_weeks = horizon_weeks
+        self.season_weeks = season_weeks
+        self.refresh_interval = refresh_interval
+        self.data_version: Optional[str] = None
+        self.built_at: Optional[datetime] = None
+        self.weeks: List[date] = []
+        self.keys: List[SeriesKey] = []
+        self._index: Dict[SeriesKey, int] = {}
+        self._history: Optional[np.ndarray] = None
+        self._result: Dict[str, np.ndarray] = {}
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._first_fit: Optional[asyncio.Task] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether forecasts have been computed"""
+        return self._history is not None
+
+    # ========================================================================
+    # REFRESH
+    # ========================================================================
+
+    async def _load(self, session, since: date) -> List[Tuple[date, SeriesKey, int]]:
+        """Load weekly posting counts at the finest grain"""
+        posting_rows = (await session.execute(text("""
+            SELECT date_trunc('week', posted_date)::date AS week,
+                   COALESCE(industry, '') AS industry,
+                   COALESCE(emirate, location, '') AS emirate, COUNT(*) AS count
+            FROM job_postings
+            WHERE posted_date >= :since AND status <> 'draft'
+            GROUP BY 1, 2, 3
+        """), {"since": since})).all()
+        skill_rows = (await session.execute(text("""
+            SELECT date_trunc('week', p.posted_date)::date AS week, s.skill,
+                   COALESCE(p.industry, '') AS industry, COUNT(*) AS count
+            FROM job_postings p
+            CROSS JOIN LATERAL (
+                SELECT DISTINCT skill FROM unnest(p.required_skills || p.preferred_skills) AS skill
+            ) s
+            WHERE p.posted_date >= :since AND p.status <> 'draft' AND s.skill <> ''
+            GROUP BY 1, 2, 3
+        """), {"since": since})).all()
+
+        cells: List[Tuple[date, SeriesKey, int]] = []
+        for row in posting_rows:
+            # Roll every posting cell into its industry, emirate and total series
+            for key in {
+                (row.industry, row.emirate, ALL),
+                (row.industry, ALL, ALL),
+                (ALL, row.emirate, ALL),
+                (ALL, ALL, ALL)
+            }:
+                cells.append((row.week, key, row.count))
+        for row in skill_rows:
+            for key in {(row.industry, ALL, row.skill), (ALL, ALL, row.skill)}:
+                cells.append((row.week, key, row.count))
+        return cells
+
+    def _fit(
+        self,
+        cells: List[Tuple[date, SeriesKey, int]],
+        since: date
+    ) -> Tuple[List[date], List[SeriesKey], Dict[SeriesKey, int], np.ndarray, Dict[str, np.ndarray]]:
+        """Build the weekly count matrix and fit every series (CPU-bound; run off the event loop)"""
+        weeks = [since + timedelta(weeks=i) for i in range(self.history_weeks)]
+        week_index = {week: i for i, week in enumerate(weeks)}
+        keys = sorted({key for _, key, _ in cells})
+        index = {key: i for i, key in enumerate(keys)}
+
+        # Current (incomplete) week is excluded so it does not read as a drop
+        history = np.zeros((len(keys), len(weeks)))
+        for week, key, count in cells:
+            column = week_index.get(week)
+            if column is not None:
+                history[index[key], column] += count
+
+        result = forecast_batch(history, self.horizon_weeks, self.season_weeks) if keys else {}
+        return weeks, keys, index, history, result
+
+    async def refresh(self, force: bool = False) -> bool:
+        """
+        Rebuild the series and refit every forecast
+
+        Args:
+            force: Refit even when job_postings is unchanged
+
+        Returns:
+            Whether forecasts were recomputed
+        """
+        from app.db.postgres import get_session_factory, ANALYTICS
+
+        async with self._lock:
+            end = week_start(date.today())
+            since = end - timedelta(weeks=self.history_weeks)
+            async with get_session_factory(ANALYTICS)() as session:
+                version_row = (await session.execute(text(
+                    "SELECT COUNT(*) AS count, MAX(updated_at) AS updated FROM job_postings"
+                ))).one()
+                version = f"{version_row.count}:{version_row.updated}:{end.isoformat()}"
+                if not force and version == self.data_version:
+                    return False
+                cells = await self._load(session, since)
+
+            started = time.perf_counter()
+            weeks, keys, index, history, result = await asyncio.to_thread(self._fit, cells, since)
+
+            self.weeks, self.keys, self._index = weeks, keys, index
+            self._history, self._result = history, result
+            self.data_version = version
+            self.built_at = datetime.utcnow()
+            logger.info(
+                f"Hiring forecasts refitted for {len(keys)} series in "
+                f"{(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+            return True
+
+    async def _refresh_safely(self) -> None:
+        """Refresh, logging failures"""
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Hiring forecast refresh failed: {e}")
+
+    async def ensure_ready(self) -> bool:
+        """
+        Whether forecasts are available; False when no data is available yet
+
+        Never fits inside the caller: when no forecasts exist, a background
+        refresh is started (unless one is running) and callers fall back.
+        """
+        if not self.is_ready and self._refresh_task is None and (
+            self._first_fit is None or self._first_fit.done()
+        ):
+            self._first_fit = asyncio.create_task(self._refresh_safely())
+        return self.is_ready and bool(self.keys)
+
+    async def _run_refreshes(self) -> None:
+        """Fit now, then refresh every interval"""
+        while True:
+            await self._refresh_safely()
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        """Start the refresh schedule, beginning with a first fit in the background"""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._run_refreshes())
+
+    async def stop(self) -> None:
+        """Stop the refresh schedule"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    def _summary(self, row: int, horizon: int) -> Dict[str, Any]:
+        """Summarize one series' history and forecast"""
+        history = self._history[row]
+        forecast = self._result["forecast"][row, :horizon]
+        recent = history[-horizon:].mean() if horizon else 0.0
+        expected = forecast.mean() if horizon else 0.0
+        change = (expected - recent) / recent if recent else (1.0 if expected else 0.0)
+        return {
+            "recent_weekly_average": round(float(recent), 2),
+            "forecast_weekly_average": round(float(expected), 2),
+            "expected_change": round(float(change), 4),
+            "trend": trend_direction(change),
+            "model": self.MODELS[int(self._result["model"][row])],
+            "mae": round(float(self._result["mae"][row]), 2)
+        }
+
+    def forecast(
+        self,
+        industry: Optional[str] = None,
+        emirate: Optional[str] = None,
+        skill: Optional[str] = None,
+        horizon_weeks: int = 13
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Forecast weekly postings of one series
+
+        Args:
+            industry: Industry (all when omitted)
+            emirate: Emirate (all when omitted); not combined with skill
+            skill: Skill (all when omitted)
+            horizon_weeks: Weeks ahead, at most the fitted horizon
+
+        Returns:
+            Summary with weekly history and forecast, or None if the series
+            has no postings
+        """
+        if not self.is_ready:
+            return None
+        row = self._index.get((industry or ALL, emirate or ALL, skill or ALL))
+        if row is None:
+            return None
+
+        horizon = max(1, min(horizon_weeks, self.horizon_weeks))
+        first_week = self.weeks[-1] + timedelta(weeks=1)
+        return {
+            "industry": industry,
+            "emirate": emirate,
+            "skill": skill,
+            **self._summary(row, horizon),
+            "history": [
+                {"week": week.isoformat(), "postings": int(count)}
+                for week, count in zip(self.weeks[-horizon:], self._history[row, -horizon:])
+            ],
+            "forecast": [
+                {
+                    "week": (first_week + timedelta(weeks=i)).isoformat(),
+                    "postings": round(float(self._result["forecast"][row, i]), 1),
+                    "lower": round(float(self._result["lower"][row, i]), 1),
+                    "upper": round(float(self._result["upper"][row, i]), 1)
+                }
+                for i in range(horizon)
+            ],
+            "built_at": self.built_at.isoformat() if self.built_at else None
+        }
+
+    def top_movers(
+        self,
+        dimension: str = "skill",
+        industry: Optional[str] = None,
+        horizon_weeks: int = 13,
+        k: int = 10,
+        min_weekly: float = 1.0
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Series with the largest expected growth and decline
+
+        Args:
+            dimension: skill, industry or emirate
+            industry: Restrict skills to one industry
+            horizon_weeks: Weeks ahead
+            k: Entries per list
+            min_weekly: Ignore series averaging fewer postings per week
+
+        Returns:
+            {"growing": [...], "declining": [...]}
+        """
+        if not self.is_ready or not self.keys:
+            return {"growing": [], "declining": []}
+
+        position = {"industry": 0, "emirate": 1, "skill": 2}[dimension]
+        # Series of the dimension: its value in that position, the scope elsewhere
+        scope = [ALL, ALL, ALL]
+        if dimension == "skill":
+            scope[0] = industry or ALL
+        rows = [
+            row for key, row in self._index.items()
+            if key[position] != ALL
+            and all(value == scope[i] for i, value in enumerate(key) if i != position)
+        ]
+        if not rows:
+            return {"growing": [], "declining": []}
+
+        horizon = max(1, min(horizon_weeks, self.horizon_weeks))
+        rows_array = np.array(rows)
+        recent = self._history[rows_array, -horizon:].mean(axis=1)
+        expected = self._result["forecast"][rows_array, :horizon].mean(axis=1)
+        eligible = recent >= min_weekly
+        change = np.where(recent > 0, (expected - recent) / np.where(recent > 0, recent, 1), 0.0)
+
+        def entries(order: np.ndarray) -> List[Dict[str, Any]]:
+            return [
+                {
+                    dimension: self.keys[rows[i]][position],
+                    "recent_weekly_average": round(float(recent[i]), 2),
+                    "forecast_weekly_average": round(float(expected[i]), 2),
+                    "expected_change": round(float(change[i]), 4)
+                }
+                for i in order if eligible[i]
+            ][:k]
+
+        ranked = np.argsort(-change, kind="stable")
+        return {
+            "growing": [entry for entry in entries(ranked) if entry["expected_change"] > STABLE_THRESHOLD],
+            "declining": [entry for entry in entries(ranked[::-1]) if entry["expected_change"] < -STABLE_THRESHOLD]
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Forecaster statistics"""
+        return {
+            "ready": self.is_ready,
+            "series": len(self.keys),
+            "weeks": len(self.weeks),
+            "horizon_weeks": self.horizon_weeks,
+            "data_version": self.data_version,
+            "built_at": self.built_at.isoformat() if self.built_at else None
+        }
+
+
+# Singleton instance
+_hiring_forecaster = None
+
+
+def get_hiring_forecaster() -> HiringForecaster:
+    """Get or create Hiring Forecaster instance"""
+    global _hiring_forecaster
+    if _hiring_forecaster is None:
+        _hiring_forecaster = HiringForecaster(
+            history_weeks=settings.HIRING_FORECAST_HISTORY_WEEKS,
+            horizon_weeks=settings.HIRING_FORECAST_HORIZON_WEEKS,
+            season_weeks=settings.HIRING_FORECAST_SEASON_WEEKS,
+            refresh_interval=settings.HIRING_FORECAST_REFRESH_SECONDS
+        )
+    return _hiring_forecaster
@@ -0,0 +1,380 @@
+"""
+NOOR Platform - Percentile Service
+Salary and score percentiles by dimension, served from mergeable t-digests
+"""
+
+from typing import Dict, Any, Optional, Tuple, Iterable, AsyncIterator
+import asyncio
+import logging
+
+from redis.exceptions import WatchError
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.request_context import record_redis_round_trip
+from app.services.sketches import TDigest
+
+logger = logging.getLogger(__name__)
+
+SEP = "\x1f"
+
+# Dimensions of each metric; one digest is kept per combination of values
+PERCENTILE_METRICS: Dict[str, Tuple[str, ...]] = {
+    "salary": ("role", "location"),
+    "faculty_score": ("faculty", "institution", "emirate")
+}
+
+# One serialized digest per cell, plus the set of cells of a metric
+DIGEST_KEY = "percentile:{metric}:{cell}"
+CELLS_KEY = "percentile:{metric}:cells"
+
+# Held by the worker rebuilding digests from the source tables
+REBUILD_LOCK_KEY = "percentile:rebuild_lock"
+
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+# Posting salary as recorded by SkillDemandCounters.posting_opened
+SALARY_QUERY = text("""
+    SELECT title AS role, COALESCE(emirate, location) AS location,
+           (COALESCE(salary_min, salary_max) + COALESCE(salary_max, salary_min)) / 2 AS value
+    FROM job_postings
+    WHERE status <> 'draft' AND (salary_min IS NOT NULL OR salary_max IS NOT NULL)
+""")
+
+
+def _normalize(value: Any) -> str:
+    """Dimension values are matched case-insensitively; missing values are ''"""
+    return str(value).strip().lower() if value is not None else ""
+
+
+class PercentileService:
+    """
+    Percentile service
+
+    Provides:
+    - One t-digest per dimension combination (salary by role and location,
+      faculty score by faculty, institution and emirate)
+    - Updates on insert, buffered in process and merged into Redis on a
+      flush interval; digests are stored compressed (~1-2 KB each)
+    - Arbitrary roll-ups: any subset of dimensions can be fixed and the
+      remaining cells are merged, optionally grouped by one dimension
+    - Each answer carries the rank error and a value interval per percentile
+    - A periodic rebuild from job_postings and user_assessments, so digests
+      are complete even for rows written by other services
+    """
+
+    def __init__(self, compression: float = 100, flush_interval: int = 60, rebuild_interval: int = 3600):
+        self.compression = compression
+        self.flush_interval = flush_interval
+        self.rebuild_interval = rebuild_interval
+        self._local: Dict[Tuple[str, str], TDigest] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _cell(metric: str, dimensions: Dict[str, Any]) -> str:
+        """Encode a metric's dimension values as a cell id"""
+        if metric not in PERCENTILE_METRICS:
+            raise ValueError(f"Unknown percentile metric: {metric}")
+        return SEP.join(_normalize(dimensions.get(name)) for name in PERCENTILE_METRICS[metric])
+
+    # ========================================================================
+    # RECORDING
+    # ========================================================================
+
+    def record(self, metric: str, value: Optional[float], **dimensions: Any) -> None:
+        """Add a value to the digest of its dimension combination"""
+        if value is None:
+            return
+        key = (metric, self._cell(metric, dimensions))
+        digest = self._local.get(key)
+        if digest is None:
+            digest = self._local[key] = TDigest(self.compression)
+        digest.add(float(value))
+
+    # ========================================================================
+    # FLUSH
+    # ========================================================================
+
+    async def flush(self) -> int:
+        """
+        Merge local digests into Redis
+
+        Returns:
+            Number of digests flushed
+        """
+        from app.db.redis import get_redis
+
+        redis_client = await get_redis()
+        if not redis_client or not self._local:
+            return 0
+
+        local, self._local = self._local, {}
+        flushed = 0
+        for (metric, cell), digest in local.items():
+            key = DIGEST_KEY.format(metric=metric, cell=cell)
+            try:
+                async with redis_client.pipeline(transaction=True) as pipe:
+                    while True:
+                        try:
+                            # Optimistic read-merge-write; retried if another worker flushed meanwhile
+                            await pipe.watch(key)
+                            existing = await pipe.get(key)
+                            merged = TDigest.deserialize(existing).merge(digest) if existing else digest
+                            pipe.multi()
+                            pipe.set(key, merged.serialize())
+                            pipe.sadd(CELLS_KEY.format(metric=metric), cell)
+                            await pipe.execute()
+                            break
+                        except WatchError:
+                            continue
+                flushed += 1
+            except Exception as e:
+                logger.warning(f"Percentile digest flush failed for {key}: {e}")
+                # Keep the data for the next flush
+                pending = self._local.get((metric, cell))
+                self._local[(metric, cell)] = pending.merge(digest) if pending else digest
+        return flushed
+
+    # ========================================================================
+    # REBUILD
+    # ========================================================================
+
+    async def _source_values(self, session, metric: str) -> AsyncIterator[Tuple[float, Dict[str, Any]]]:
+        """Stream (value, dimensions) of a metric from its source table"""
+        if metric == "salary":
+            result = await session.stream(SALARY_QUERY)
+            async for row in result:
+                yield float(row.value), {"role": row.role, "location": row.location}
+        elif metric == "faculty_score":
+            from app.services.faculty_rollups import iter_faculty_assessments
+
+            async for assessment in iter_faculty_assessments(session):
+                yield float(assessment["faculty_score"]["percentage"]), {
+                    "faculty": assessment["faculty_id"],
+                    "institution": assessment["institution_id"],
+                    "emirate": assessment["emirate"]
+                }
+
+    async def rebuild(self, metrics: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Replace the stored digests with digests built from the source tables
+
+        This worker's pending values are flushed first and so replaced too.
+        Values still pending on other workers are merged on top when they
+        flush, so up to one flush interval of them may be counted twice
+        until the next rebuild.
+
+        Returns:
+            Number of cells written per metric
+        """
+        from app.db.redis import get_redis
+        from app.db.postgres import get_session_factory, ANALYTICS
+
+        redis_client = await get_redis()
+        if not redis_client:
+            raise RuntimeError("Redis is not available")
+        await self.flush()
+
+        rebuilt: Dict[str, Dict[str, TDigest]] = {}
+        async with get_session_factory(ANALYTICS)() as session:
+            for metric in metrics or PERCENTILE_METRICS:
+                cells = rebuilt[metric] = {}
+                async for value, dimensions in self._source_values(session, metric):
+                    cell = self._cell(metric, dimensions)
+                    digest = cells.get(cell)
+                    if digest is None:
+                        digest = cells[cell] = TDigest(self.compression)
+                    digest.add(value)
+
+        for metric, cells in rebuilt.items():
+            cells_key = CELLS_KEY.format(metric=metric)
+            stale = set(await redis_client.smembers(cells_key)) - set(cells)
+            async with redis_client.pipeline(transaction=True) as pipe:
+                if stale:
+                    pipe.delete(*[DIGEST_KEY.format(metric=metric, cell=cell) for cell in stale])
+                pipe.delete(cells_key)
+                for cell, digest in cells.items():
+                    pipe.set(DIGEST_KEY.format(metric=metric, cell=cell), digest.serialize())
+                if cells:
+                    pipe.sadd(cells_key, *cells)
+                await pipe.execute()
+            logger.info(f"Percentile digests rebuilt for {metric}: {len(cells)} cells")
+        return {metric: len(cells) for metric, cells in rebuilt.items()}
+
+    async def reconcile(self) -> bool:
+        """
+        Rebuild the digests from the source tables
+
+        One worker rebuilds at a time; the others skip while the lock is held.
+
+        Returns:
+            Whether this worker rebuilt
+        """
+        from app.db.redis import get_redis
+
+        redis_client = await get_redis()
+        if not redis_client:
+            return False
+        if not await redis_client.set(REBUILD_LOCK_KEY, "1", nx=True, ex=max(self.rebuild_interval, 60)):
+            return False
+        await self.rebuild()
+        return True
+
+    async def _run_flushes(self) -> None:
+        """Rebuild now, then flush every interval and rebuild every rebuild interval"""
+        loop = asyncio.get_running_loop()
+        next_rebuild = loop.time()
+        while True:
+            if loop.time() >= next_rebuild:
+                next_rebuild = loop.time() + self.rebuild_interval
+                try:
+                    await self.reconcile()
+                except Exception as e:
+                    logger.error(f"Percentile rebuild failed: {e}")
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Percentile flush run failed: {e}")
+
+    def start(self) -> None:
+        """Start the flush and rebuild schedule, beginning with a rebuild"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._run_flushes())
+
+    async def stop(self) -> None:
+        """Stop the flush schedule and flush what is left"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    async def _load_cells(self, metric: str, filters: Dict[str, Any]) -> Dict[str, TDigest]:
+        """Load the digests of every cell matching the fixed dimensions"""
+        from app.db.redis import get_redis
+
+        names = PERCENTILE_METRICS[metric]
+        fixed = {names.index(name): _normalize(value) for name, value in filters.items() if value is not None}
+
+        def matches(cell: str) -> bool:
+            values = cell.split(SEP)
+            return all(values[i] == value for i, value in fixed.items())
+
+        cells: Dict[str, TDigest] = {}
+        redis_client = await get_redis()
+        if redis_client:
+            try:
+                members = [cell for cell in await redis_client.smembers(CELLS_KEY.format(metric=metric)) if matches(cell)]
+                if members:
+                    stored = await redis_client.mget([DIGEST_KEY.format(metric=metric, cell=cell) for cell in members])
+                    record_redis_round_trip(2)
+                    cells = {cell: TDigest.deserialize(data) for cell, data in zip(members, stored) if data}
+            except Exception as e:
+                logger.warning(f"Percentile digest read failed for {metric}: {e}")
+
+        # Include values not flushed yet
+        for (local_metric, cell), digest in self._local.items():
+            if local_metric == metric and matches(cell):
+                copy = TDigest.deserialize(digest.serialize())
+                cells[cell] = cells[cell].merge(copy) if cell in cells else copy
+        return cells
+
+    @staticmethod
+    def summarize(digest: Optional[TDigest], ps: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+        """Percentiles of a digest with their error bounds"""
+        if digest is None or not digest.count:
+            return {"count": 0, "percentiles": {}}
+        rank_error = digest.error_bound
+        percentiles, bounds = {}, {}
+        for p in ps:
+            q = p / 100
+            name = f"p{p:g}"
+            percentiles[name] = round(digest.quantile(q), 2)
+            # Values at the edges of the rank error interval bracket the true percentile
+            bounds[name] = [
+                round(digest.quantile(max(q - rank_error, 0.0)), 2),
+                round(digest.quantile(min(q + rank_error, 1.0)), 2)
+            ]
+        return {
+            "count": int(digest.count),
+            "min": round(digest.min, 2),
+            "max": round(digest.max, 2),
+            "percentiles": percentiles,
+            "bounds": bounds,
+            "rank_error": rank_error
+        }
+
+    async def percentiles(
+        self,
+        metric: str,
+        filters: Optional[Dict[str, Any]] = None,
+        group_by: Optional[str] = None,
+        ps: Iterable[float] = DEFAULT_PERCENTILES
+    ) -> Dict[str, Any]:
+        """
+        Percentiles of a metric over a roll-up of its dimensions
+
+        Args:
+            metric: salary or faculty_score
+            filters: Dimension values to fix; omitted dimensions are rolled up
+            group_by: Return one summary per value of this dimension
+            ps: Percentiles to estimate (0-100)
+
+        Returns:
+            Summary of the merged digest, or {"groups": [...]} with group_by
+        """
+        names = PERCENTILE_METRICS.get(metric)
+        if names is None:
+            raise ValueError(f"Unknown percentile metric: {metric}")
+        filters = filters or {}
+        unknown = [name for name in list(filters) + ([group_by] if group_by else []) if name not in names]
+        if unknown:
+            raise ValueError(f"Unknown {metric} dimensions: {', '.join(unknown)}")
+
+        ps = tuple(ps)
+        cells = await self._load_cells(metric, filters)
+
+        if group_by is None:
+            merged: Optional[TDigest] = None
+            for digest in cells.values():
+                merged = digest if merged is None else merged.merge(digest)
+            return {"metric": metric, "filters": filters, **self.summarize(merged, ps)}
+
+        position = names.index(group_by)
+        groups: Dict[str, TDigest] = {}
+        for cell, digest in cells.items():
+            value = cell.split(SEP)[position]
+            groups[value] = groups[value].merge(digest) if value in groups else digest
+        return {
+            "metric": metric,
+            "filters": filters,
+            "group_by": group_by,
+            "groups": [
+                {group_by: value or None, **self.summarize(digest, ps)}
+                for value, digest in sorted(groups.items())
+            ]
+        }
+
+
+# Singleton instance
+_percentile_service = None
+
+
+def get_percentile_service() -> PercentileService:
+    """Get or create Percentile Service instance"""
+    global _percentile_service
+    if _percentile_service is None:
+        _percentile_service = PercentileService(
+            compression=settings.PERCENTILE_COMPRESSION,
+            flush_interval=settings.PERCENTILE_FLUSH_SECONDS,
+            rebuild_interval=settings.PERCENTILE_REBUILD_SECONDS
+        )
+    return _percentile_service
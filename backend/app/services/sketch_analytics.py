@@ -0,0 +1,261 @@
+"""
+NOOR Platform - Sketch Analytics
+Approximate distinct counts, trending items and percentiles over daily windows
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import date, timedelta
+import asyncio
+import logging
+
+from redis.exceptions import WatchError
+
+from app.core.config import settings
+from app.core.request_context import record_redis_round_trip
+from app.services.sketches import HyperLogLog, CountMinSketch, TDigest, SKETCH_TYPES
+
+logger = logging.getLogger(__name__)
+
+# One serialized sketch per kind, name and day
+SKETCH_KEY = "sketch:{kind}:{name}:{day}"
+
+# Per-skill distinct counters use fewer registers (1 KiB, ~3% error)
+SKILL_HLL_PRECISION = 10
+
+TIMEFRAME_DAYS = {
+    "day": 1,
+    "week": 7,
+    "month": 30,
+    "quarter": 90,
+    "year": 365
+}
+
+
+def timeframe_days(timeframe: str) -> int:
+    """Number of daily windows covered by a timeframe name"""
+    return TIMEFRAME_DAYS.get(timeframe, 7)
+
+
+class SketchAnalytics:
+    """
+    Sketch-based analytics
+
+    Provides:
+    - Distinct active users per day and per skill (HyperLogLog)
+    - Trending skills with frequency estimates (Count-Min Sketch + top-K)
+    - Salary and score percentiles (t-digest)
+
+    Events are recorded into in-process sketches (no I/O on the request
+    path) and merged into per-day Redis keys on a flush interval, so every
+    worker contributes. Queries merge the daily sketches of a window.
+    """
+
+    def __init__(self, flush_interval: int = 60, retention_days: int = 400):
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self._local: Dict[Tuple[str, str, str], Any] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _sketch(self, kind: str, name: str, day: Optional[date] = None, **options) -> Any:
+        """Get or create the local sketch of a window"""
+        key = (kind, name, (day or date.today()).isoformat())
+        sketch = self._local.get(key)
+        if sketch is None:
+            sketch = self._local[key] = SKETCH_TYPES[kind](**options)
+        return sketch
+
+    # ========================================================================
+    # RECORDING
+    # ========================================================================
+
+    def record_user_activity(self, user_id: str, skill: Optional[str] = None) -> None:
+        """Count a user as active today, optionally on a skill"""
+        if not user_id:
+            return
+        self._sketch("hll", "active_users").add(user_id)
+        if skill:
+            self._sketch("hll", f"skill_users:{skill}", precision=SKILL_HLL_PRECISION).add(user_id)
+
+    def record_skill_event(self, skill: str, count: int = 1) -> None:
+        """Count a skill occurrence for trending"""
+        if skill:
+            self._sketch("cms", "trending_skills").add(skill, count)
+
+    def record_value(self, metric: str, value: Optional[float]) -> None:
+        """Add a value (salary, score, ...) to a metric's percentile digest"""
+        if value is not None:
+            self._sketch("tdigest", metric).add(float(value))
+
+    # ========================================================================
+    # FLUSH
+    # ========================================================================
+
+    async def flush(self) -> int:
+        """
+        Merge local sketches into Redis
+
+        Returns:
+            Number of sketches flushed
+        """
+        from app.db.redis import get_redis
+
+        redis_client = await get_redis()
+        if not redis_client or not self._local:
+            return 0
+
+        local, self._local = self._local, {}
+        ttl = self.retention_days * 86400
+        flushed = 0
+        for (kind, name, day), sketch in local.items():
+            key = SKETCH_KEY.format(kind=kind, name=name, day=day)
+            try:
+                async with redis_client.pipeline(transaction=True) as pipe:
+                    while True:
+                        try:
+                            # Optimistic read-merge-write; retried if another worker flushed meanwhile
+                            await pipe.watch(key)
+                            existing = await pipe.get(key)
+                            merged = SKETCH_TYPES[kind].deserialize(existing).merge(sketch) if existing else sketch
+                            pipe.multi()
+                            pipe.set(key, merged.serialize(), ex=ttl)
+                            await pipe.execute()
+                            break
+                        except WatchError:
+                            continue
+                flushed += 1
+            except Exception as e:
+                logger.warning(f"Sketch flush failed for {key}: {e}")
+                # Keep the data for the next flush
+                pending = self._local.get((kind, name, day))
+                self._local[(kind, name, day)] = pending.merge(sketch) if pending else sketch
+        return flushed
+
+    async def _run_flushes(self) -> None:
+        """Flush every interval"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Sketch flush run failed: {e}")
+
+    def start(self) -> None:
+        """Start the flush schedule"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._run_flushes())
+
+    async def stop(self) -> None:
+        """Stop the flush schedule and flush what is left"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    async def load_daily(self, kind: str, name: str, days: int = 7, end: Optional[date] = None) -> List[Tuple[date, Any]]:
+        """
+        Load the daily sketches of a window, including unflushed local data
+
+        Args:
+            kind: hll, cms or tdigest
+            name: Sketch name
+            days: Number of days ending at end
+            end: Last day (today when omitted)
+
+        Returns:
+            (day, sketch) pairs, oldest first; days without data are omitted
+        """
+        from app.db.redis import get_redis
+
+        end = end or date.today()
+        window = [end - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+        stored: List[Optional[str]] = [None] * len(window)
+
+        redis_client = await get_redis()
+        if redis_client:
+            try:
+                stored = await redis_client.mget([
+                    SKETCH_KEY.format(kind=kind, name=name, day=day.isoformat()) for day in window
+                ])
+                record_redis_round_trip(len(window))
+            except Exception as e:
+                logger.warning(f"Sketch read failed for {kind}:{name}: {e}")
+
+        sketch_type = SKETCH_TYPES[kind]
+        daily = []
+        for day, data in zip(window, stored):
+            sketch = sketch_type.deserialize(data) if data else None
+            local = self._local.get((kind, name, day.isoformat()))
+            if local is not None:
+                sketch = sketch.merge(local) if sketch else sketch_type.deserialize(local.serialize())
+            if sketch is not None:
+                daily.append((day, sketch))
+        return daily
+
+    async def load(self, kind: str, name: str, days: int = 7, end: Optional[date] = None) -> Optional[Any]:
+        """Merge the daily sketches of a window into one (None when empty)"""
+        merged = None
+        for _, sketch in await self.load_daily(kind, name, days, end):
+            merged = sketch if merged is None else merged.merge(sketch)
+        return merged
+
+    async def distinct_users(self, days: int = 7, skill: Optional[str] = None) -> Dict[str, Any]:
+        """Distinct active users over a window, overall or on one skill"""
+        name = f"skill_users:{skill}" if skill else "active_users"
+        daily = await self.load_daily("hll", name, days)
+        daily_counts = [{"date": day.isoformat(), "distinct_users": sketch.count()} for day, sketch in daily]
+
+        merged: Optional[HyperLogLog] = None
+        for _, sketch in daily:
+            merged = sketch if merged is None else merged.merge(sketch)
+        return {
+            "distinct_users": merged.count() if merged else 0,
+            "daily": daily_counts,
+            "relative_error": round(merged.standard_error, 4) if merged else None
+        }
+
+    async def trending_skills(self, days: int = 7, k: int = 10) -> Dict[str, Any]:
+        """Most frequent skills over a window"""
+        merged: Optional[CountMinSketch] = await self.load("cms", "trending_skills", days)
+        if merged is None:
+            return {"skills": [], "total_events": 0, "max_overcount": 0}
+        return {
+            "skills": [{"skill": skill, "count": count} for skill, count in merged.top_k(k)],
+            "total_events": merged.total,
+            "max_overcount": int(merged.error_bound)
+        }
+
+    async def percentiles(self, metric: str, days: int = 30, ps: Tuple[float, ...] = (50, 90, 95, 99)) -> Dict[str, Any]:
+        """Percentiles of a metric over a window"""
+        merged: Optional[TDigest] = await self.load("tdigest", metric, days)
+        if merged is None or not merged.count:
+            return {"count": 0, "percentiles": {}}
+        return {
+            "count": int(merged.count),
+            "min": merged.min,
+            "max": merged.max,
+            "percentiles": {name: round(value, 2) for name, value in merged.percentiles(ps).items()},
+            "rank_error": merged.error_bound
+        }
+
+
+# Singleton instance
+_sketch_analytics = None
+
+
+def get_sketch_analytics() -> SketchAnalytics:
+    """Get or create Sketch Analytics instance"""
+    global _sketch_analytics
+    if _sketch_analytics is None:
+        _sketch_analytics = SketchAnalytics(
+            flush_interval=settings.SKETCH_FLUSH_SECONDS,
+            retention_days=settings.SKETCH_RETENTION_DAYS
+        )
+    return _sketch_analytics
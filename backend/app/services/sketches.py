@@ -0,0 +1,360 @@
+"""
+NOOR Platform - Probabilistic Sketches
+Mergeable, compactly serializable summaries for approximate analytics
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from array import array
+import base64
+import bisect
+import hashlib
+import math
+import struct
+import zlib
+
+
+def _hash64(item: Any, seed: int = 0) -> int:
+    """
+    Stable 64-bit hash of an item
+
+    Python's hash() is salted per process, so sketches built by different
+    workers would not merge; blake2b gives the same value everywhere.
+    """
+    digest = hashlib.blake2b(str(item).encode("utf-8"), digest_size=8, salt=seed.to_bytes(8, "little"))
+    return int.from_bytes(digest.digest(), "little")
+
+
+def _pack(kind: bytes, payload: bytes) -> str:
+    """Compress and encode a serialized sketch for storage in a text field"""
+    return base64.b64encode(kind + zlib.compress(payload)).decode("ascii")
+
+
+def _unpack(kind: bytes, data: str) -> bytes:
+    """Inverse of _pack"""
+    raw = base64.b64decode(data)
+    if raw[:len(kind)] != kind:
+        raise ValueError(f"Not a {kind.decode()} sketch")
+    return zlib.decompress(raw[len(kind):])
+
+
+# ============================================================================
+# HYPERLOGLOG
+# ============================================================================
+
+class HyperLogLog:
+    """
+    Distinct counter
+
+    Uses 2^precision registers (16 KiB at the default precision of 14) and
+    has a standard error of about 1.04 / sqrt(2^precision), i.e. 0.8%.
+    """
+
+    KIND = b"HLL1"
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, item: Any) -> None:
+        """Add an item"""
+        value = _hash64(item)
+        index = value >> (64 - self.precision)
+        remainder = value & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        """Estimate the number of distinct items added"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small range correction: linear counting
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Merge another sketch into this one (union of the two sets)"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs of different precision")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+        return self
+
+    @property
+    def standard_error(self) -> float:
+        """Relative standard error of count()"""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def serialize(self) -> str:
+        """Encode as a compact string"""
+        return _pack(self.KIND, bytes([self.precision]) + bytes(self.registers))
+
+    @classmethod
+    def deserialize(cls, data: str) -> "HyperLogLog":
+        """Decode a string produced by serialize()"""
+        payload = _unpack(cls.KIND, data)
+        sketch = cls(payload[0])
+        sketch.registers = bytearray(payload[1:])
+        return sketch
+
+
+# ============================================================================
+# COUNT-MIN SKETCH WITH TOP-K
+# ============================================================================
+
+class CountMinSketch:
+    """
+    Frequency estimator with a heavy-hitters list
+
+    Estimates never undercount; they overcount by at most e/width of the
+    total count with probability 1 - e^-depth. The k items with the highest
+    estimates are tracked alongside so trending items are available without
+    knowing them in advance.
+    """
+
+    KIND = b"CMS1"
+
+    def __init__(self, width: int = 2048, depth: int = 5, k: int = 50):
+        self.width = width
+        self.depth = depth
+        self.k = k
+        self.total = 0
+        self.table = array("Q", bytes(8 * width * depth))
+        self.top: Dict[str, int] = {}
+
+    def _cells(self, item: Any) -> List[int]:
+        """Table offsets of an item, one per row"""
+        value = _hash64(item)
+        low, high = value & 0xFFFFFFFF, value >> 32
+        # Double hashing gives depth independent-enough positions from one hash
+        return [row * self.width + (low + row * high) % self.width for row in range(self.depth)]
+
+    def add(self, item: Any, count: int = 1) -> None:
+        """Count an item"""
+        cells = self._cells(item)
+        for cell in cells:
+            self.table[cell] += count
+        self.total += count
+        self._offer(str(item), min(self.table[cell] for cell in cells))
+
+    def estimate(self, item: Any) -> int:
+        """Estimated count of an item"""
+        return min(self.table[cell] for cell in self._cells(item))
+
+    def _offer(self, item: str, estimate: int) -> None:
+        """Keep item in the top-k list if its estimate is high enough"""
+        if item in self.top or len(self.top) < self.k:
+            self.top[item] = estimate
+            return
+        weakest = min(self.top, key=self.top.get)
+        if estimate > self.top[weakest]:
+            del self.top[weakest]
+            self.top[item] = estimate
+
+    def top_k(self, k: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Heaviest items, highest first"""
+        ranked = sorted(self.top.items(), key=lambda entry: (-entry[1], entry[0]))
+        return ranked[:k or self.k]
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        """Merge another sketch into this one (sum of the two streams)"""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge Count-Min sketches of different dimensions")
+        for i, value in enumerate(other.table):
+            if value:
+                self.table[i] += value
+        self.total += other.total
+
+        # Re-rank the union of both candidate lists against the merged table
+        candidates = set(self.top) | set(other.top)
+        self.top = {}
+        for item in candidates:
+            self._offer(item, self.estimate(item))
+        return self
+
+    @property
+    def error_bound(self) -> float:
+        """Maximum overcount (absolute) with probability 1 - e^-depth"""
+        return math.e / self.width * self.total
+
+    def serialize(self) -> str:
+        """Encode as a compact string"""
+        header = struct.pack("<IIIQ", self.width, self.depth, self.k, self.total)
+        top = "\n".join(f"{count}\t{item}" for item, count in self.top.items()).encode("utf-8")
+        return _pack(self.KIND, header + struct.pack("<I", len(top)) + top + self.table.tobytes())
+
+    @classmethod
+    def deserialize(cls, data: str) -> "CountMinSketch":
+        """Decode a string produced by serialize()"""
+        payload = _unpack(cls.KIND, data)
+        width, depth, k, total = struct.unpack_from("<IIIQ", payload)
+        offset = struct.calcsize("<IIIQ")
+        (top_length,) = struct.unpack_from("<I", payload, offset)
+        offset += 4
+        sketch = cls(width, depth, k)
+        sketch.total = total
+        top = payload[offset:offset + top_length].decode("utf-8")
+        for line in filter(None, top.split("\n")):
+            count, item = line.split("\t", 1)
+            sketch.top[item] = int(count)
+        sketch.table = array("Q")
+        sketch.table.frombytes(payload[offset + top_length:])
+        return sketch
+
+
+# ============================================================================
+# T-DIGEST
+# ============================================================================
+
+class TDigest:
+    """
+    Quantile estimator (merging t-digest)
+
+    Keeps at most ~compression centroids, concentrated at the tails, so
+    extreme percentiles (p1, p99) are estimated with small relative error
+    and the median within roughly 1/compression of the rank.
+    """
+
+    KIND = b"TDG1"
+
+    def __init__(self, compression: float = 100):
+        self.compression = compression
+        self.means: List[float] = []
+        self.weights: List[float] = []
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: List[Tuple[float, float]] = []
+
+    def add(self, value: float, weight: float = 1) -> None:
+        """Add a value"""
+        self._buffer.append((float(value), float(weight)))
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def update(self, values: Iterable[float]) -> None:
+        """Add many values"""
+        for value in values:
+            self.add(value)
+
+    def _scale(self, q: float) -> float:
+        """k1 scale function: small centroids near q=0 and q=1"""
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _compress(self) -> None:
+        """Merge buffered values and existing centroids into new centroids"""
+        if not self._buffer:
+            return
+        points = sorted(list(zip(self.means, self.weights)) + self._buffer)
+        self._buffer = []
+
+        total = sum(weight for _, weight in points)
+        means: List[float] = []
+        weights: List[float] = []
+        cum = 0.0
+        mean, weight = points[0]
+        limit = self._scale(0) + 1
+        for next_mean, next_weight in points[1:]:
+            if self._scale((cum + weight + next_weight) / total) <= limit:
+                # Fold into the current centroid
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                cum += weight
+                limit = self._scale(cum / total) + 1
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+        self.means, self.weights = means, weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the value at quantile q (0-1)"""
+        self._compress()
+        if not self.means:
+            return None
+        if len(self.means) == 1:
+            return self.means[0]
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        target = q * self.count
+        # Centroid i covers ranks around its center cum_i + w_i / 2
+        centers = []
+        cum = 0.0
+        for weight in self.weights:
+            centers.append(cum + weight / 2)
+            cum += weight
+
+        i = bisect.bisect_left(centers, target)
+        if i == 0:
+            # Between the minimum and the first centroid
+            span = centers[0]
+            return self.min + (self.means[0] - self.min) * (target / span if span else 1)
+        if i == len(centers):
+            span = self.count - centers[-1]
+            return self.means[-1] + (self.max - self.means[-1]) * ((target - centers[-1]) / span if span else 0)
+        fraction = (target - centers[i - 1]) / (centers[i] - centers[i - 1])
+        return self.means[i - 1] + (self.means[i] - self.means[i - 1]) * fraction
+
+    def percentiles(self, ps: Iterable[float] = (50, 90, 95, 99)) -> Dict[str, Optional[float]]:
+        """Estimate several percentiles (0-100)"""
+        return {f"p{p:g}": self.quantile(p / 100) for p in ps}
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Merge another digest into this one"""
+        other._compress()
+        self._buffer.extend(zip(other.means, other.weights))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    @property
+    def centroid_count(self) -> int:
+        """Number of centroids after compression"""
+        self._compress()
+        return len(self.means)
+
+    @property
+    def error_bound(self) -> float:
+        """Approximate worst-case rank error of a mid quantile, as a fraction"""
+        return 1 / self.compression
+
+    def serialize(self) -> str:
+        """Encode as a compact string"""
+        self._compress()
+        header = struct.pack("<dddd", self.compression, self.count, self.min, self.max)
+        centroids = array("d", [value for pair in zip(self.means, self.weights) for value in pair])
+        return _pack(self.KIND, header + centroids.tobytes())
+
+    @classmethod
+    def deserialize(cls, data: str) -> "TDigest":
+        """Decode a string produced by serialize()"""
+        payload = _unpack(cls.KIND, data)
+        compression, count, minimum, maximum = struct.unpack_from("<dddd", payload)
+        digest = cls(compression)
+        digest.count, digest.min, digest.max = count, minimum, maximum
+        centroids = array("d")
+        centroids.frombytes(payload[struct.calcsize("<dddd"):])
+        digest.means = list(centroids[0::2])
+        digest.weights = list(centroids[1::2])
+        return digest
+
+
+SKETCH_TYPES = {
+    "hll": HyperLogLog,
+    "cms": CountMinSketch,
+    "tdigest": TDigest
+}
@@ -0,0 +1,497 @@
+"""
+NOOR Platform - Skill Demand Counters
+Incrementally maintained skill demand rollups over job postings
+"""
+
+from sqlalchemy import text, func
+from sqlalchemy.dialects.postgresql import insert
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.request_context import record_redis_round_trip
+
+logger = logging.getLogger(__name__)
+
+# Separator for composite hash fields and the wildcard scope value
+SEP = "\x1f"
+ALL = "*"
+
+# Skill lists counted per posting; "any" counts a skill once per posting
+KINDS = ("required", "preferred")
+ACTIVE_KINDS = KINDS + ("any",)
+
+# Set once the counters hold a complete view of the market
+READY_KEY = "skill_demand:ready"
+# Sorted set of skill -> open postings listing it, per kind and scope
+ACTIVE_KEY = "skill_demand:active:{kind}:{industry}:{emirate}"
+# Hash of "industry SEP emirate" (wildcards included) -> open postings
+ACTIVE_POSTINGS_KEY = "skill_demand:active_postings"
+# Hash of "kind SEP skill SEP industry SEP emirate" -> postings opened that week
+WEEK_KEY = "skill_demand:week:{week}"
+# Weeks changed since the last checkpoint
+DIRTY_WEEKS_KEY = "skill_demand:dirty_weeks"
+# Held by the worker reconciling the counters with job postings
+RECONCILE_LOCK_KEY = "skill_demand:reconcile_lock"
+
+CHECKPOINT_BATCH_SIZE = 1000
+
+
+def week_start(value: Any) -> date:
+    """Return the Monday of the ISO week containing value"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        value = value.date()
+    if value is None:
+        value = date.today()
+    return value - timedelta(days=value.weekday())
+
+
+def _scopes(industry: str, emirate: str) -> List[Tuple[str, str]]:
+    """Scopes a posting contributes to: exact, by industry, by emirate, national"""
+    return list(dict.fromkeys([
+        (industry, emirate),
+        (industry, ALL),
+        (ALL, emirate),
+        (ALL, ALL)
+    ]))
+
+
+class SkillDemandCounters:
+    """
+    Skill demand rollups
+
+    Provides:
+    - Open-posting counts per skill by industry and emirate (Redis sorted sets)
+    - Weekly counts of opened postings per (skill, industry, emirate) (Redis hashes)
+    - Incremental updates as postings are opened and closed, one round-trip each
+    - Periodic checkpoint of the weekly counts to Postgres
+    - Reconciliation with job postings on startup and every reconcile
+      interval, since postings are also written outside this service
+    """
+
+    def __init__(self, checkpoint_interval: int = 300, retention_weeks: int = 104, reconcile_interval: int = 900):
+        self.checkpoint_interval = checkpoint_interval
+        self.retention_weeks = retention_weeks
+        self.reconcile_interval = reconcile_interval
+        self._checkpoint_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _dimensions(posting: Dict[str, Any]) -> Tuple[str, str, date, set, set]:
+        """Extract industry, emirate, posting week and skill sets of a posting"""
+        industry = posting.get("industry") or ""
+        emirate = posting.get("emirate") or posting.get("location") or ""
+        required = {skill for skill in posting.get("required_skills") or [] if skill}
+        preferred = {skill for skill in posting.get("preferred_skills") or [] if skill}
+        return industry, emirate, week_start(posting.get("posted_date")), required, preferred
+
+    # ========================================================================
+    # UPDATES
+    # ========================================================================
+
+    async def posting_opened(self, posting: Dict[str, Any]) -> bool:
+        """Count a posting that became active"""
+        from app.services.sketch_analytics import get_sketch_analytics
+        from app.services.percentiles import get_percentile_service
+
+        sketches = get_sketch_analytics()
+        for skill in set(posting.get("required_skills") or []) | set(posting.get("preferred_skills") or []):
+            sketches.record_skill_event(skill)
+        salaries = [posting.get("salary_min"), posting.get("salary_max")]
+        salaries = [float(salary) for salary in salaries if salary is not None]
+        if salaries:
+            sketches.record_value("salary", sum(salaries) / len(salaries))
+            get_percentile_service().record(
+                "salary",
+                sum(salaries) / len(salaries),
+                role=posting.get("title"),
+                location=posting.get("emirate") or posting.get("location")
+            )
+
+        return await self._apply(posting, 1)
+
+    async def posting_closed(self, posting: Dict[str, Any]) -> bool:
+        """Remove a posting that was closed or filled from the open-posting counts"""
+        return await self._apply(posting, -1)
+
+    async def _apply(self, posting: Dict[str, Any], delta: int) -> bool:
+        """Apply one posting to every scope in a single transaction"""
+        from app.db.redis import get_redis
+
+        redis_client = await get_redis()
+        if not redis_client:
+            return False
+
+        industry, emirate, week, required, preferred = self._dimensions(posting)
+        skills_by_kind = {"required": required, "preferred": preferred, "any": required | preferred}
+
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                for scope_industry, scope_emirate in _scopes(industry, emirate):
+                    pipe.hincrby(ACTIVE_POSTINGS_KEY, f"{scope_industry}{SEP}{scope_emirate}", delta)
+                    for kind, skills in skills_by_kind.items():
+                        key = ACTIVE_KEY.format(kind=kind, industry=scope_industry, emirate=scope_emirate)
+                        for skill in skills:
+                            pipe.zincrby(key, delta, skill)
+                        if delta < 0:
+                            pipe.zremrangebyscore(key, "-inf", 0)
+
+                if delta > 0:
+                    week_key = WEEK_KEY.format(week=week.isoformat())
+                    for kind in KINDS:
+                        for skill in skills_by_kind[kind]:
+                            pipe.hincrby(week_key, SEP.join((kind, skill, industry, emirate)), 1)
+                    pipe.expire(week_key, self.retention_weeks * 7 * 86400)
+                    pipe.sadd(DIRTY_WEEKS_KEY, week.isoformat())
+
+                await pipe.execute()
+            record_redis_round_trip(len(required | preferred))
+            return True
+        except Exception as e:
+            logger.warning(f"Skill demand update failed: {e}")
+            return False
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    async def get_demand(
+        self,
+        industry: Optional[str] = None,
+        emirate: Optional[str] = None,
+        k: int = 10,
+        skills: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get top-K demand for a scope in one round-trip
+
+        Args:
+            industry: Industry filter (all industries when omitted)
+            emirate: Emirate filter (all emirates when omitted)
+            k: Number of top skills per kind
+            skills: Skills to also return open-posting counts for
+
+        Returns:
+            Dict with active_postings, unique_skills, top (per kind) and
+            skill_counts, or None when the counters are not available
+        """
+        from app.db.redis import get_redis
+
+        redis_client = await get_redis()
+        if not redis_client:
+            return None
+
+        scope_industry, scope_emirate = industry or ALL, emirate or ALL
+        any_key = ACTIVE_KEY.format(kind="any", industry=scope_industry, emirate=scope_emirate)
+
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.exists(READY_KEY)
+                pipe.hget(ACTIVE_POSTINGS_KEY, f"{scope_industry}{SEP}{scope_emirate}")
+                pipe.zcard(any_key)
+                for kind in ACTIVE_KINDS:
+                    key = ACTIVE_KEY.format(kind=kind, industry=scope_industry, emirate=scope_emirate)
+                    pipe.zrevrange(key, 0, k - 1, withscores=True)
+                if skills:
+                    pipe.zmscore(any_key, skills)
+                results = await pipe.execute()
+            record_redis_round_trip(3 + len(ACTIVE_KINDS) + (1 if skills else 0))
+        except Exception as e:
+            logger.warning(f"Skill demand read failed: {e}")
+            return None
+
+        if not results[0]:
+            return None
+
+        top_results = results[3:3 + len(ACTIVE_KINDS)]
+        skill_scores = results[3 + len(ACTIVE_KINDS)] if skills else []
+        return {
+            "active_postings": int(results[1] or 0),
+            "unique_skills": results[2],
+            "top": {
+                kind: [(skill, int(score)) for skill, score in top]
+                for kind, top in zip(ACTIVE_KINDS, top_results)
+            },
+            "skill_counts": {
+                skill: int(score or 0) for skill, score in zip(skills or [], skill_scores)
+            }
+        }
+
+    async def get_weekly_demand(
+        self,
+        weeks: Iterable[date],
+        kind: Optional[str] = None
+    ) -> Dict[date, Dict[Tuple[str, str, str], int]]:
+        """
+        Get postings opened per week
+
+        Args:
+            weeks: Week start dates
+            kind: Restrict to "required" or "preferred" (both summed when omitted)
+
+        Returns:
+            Mapping of week to {(skill, industry, emirate): count}
+        """
+        from app.db.redis import get_redis
+
+        weeks = [week_start(week) for week in weeks]
+        redis_client = await get_redis()
+        if not redis_client or not weeks:
+            return {}
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for week in weeks:
+                pipe.hgetall(WEEK_KEY.format(week=week.isoformat()))
+            results = await pipe.execute()
+        record_redis_round_trip(len(weeks))
+
+        series: Dict[date, Dict[Tuple[str, str, str], int]] = {}
+        for week, fields in zip(weeks, results):
+            counts: Dict[Tuple[str, str, str], int] = defaultdict(int)
+            for field, count in fields.items():
+                field_kind, skill, industry, emirate = field.split(SEP)
+                if kind is None or field_kind == kind:
+                    counts[(skill, industry, emirate)] += int(count)
+            series[week] = dict(counts)
+        return series
+
+    # ========================================================================
+    # CHECKPOINT AND REBUILD
+    # ========================================================================
+
+    async def checkpoint(self) -> int:
+        """
+        Write weekly counters changed since the last checkpoint to Postgres
+
+        Returns:
+            Number of rows written
+        """
+        from app.db.redis import get_redis
+        from app.db.postgres import AsyncSessionLocal
+        from app.db.models import SkillDemandCounter
+
+        redis_client = await get_redis()
+        if not redis_client:
+            return 0
+
+        weeks = await redis_client.spop(DIRTY_WEEKS_KEY, 1000)
+        if not weeks:
+            return 0
+
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for week in weeks:
+                    pipe.hgetall(WEEK_KEY.format(week=week))
+                results = await pipe.execute()
+
+            rows = []
+            for week, fields in zip(weeks, results):
+                for field, count in fields.items():
+                    kind, skill, industry, emirate = field.split(SEP)
+                    rows.append({
+                        "week": date.fromisoformat(week),
+                        "kind": kind,
+                        "skill": skill,
+                        "industry": industry,
+                        "emirate": emirate,
+                        "count": int(count)
+                    })
+
+            async with AsyncSessionLocal() as session:
+                for start in range(0, len(rows), CHECKPOINT_BATCH_SIZE):
+                    statement = insert(SkillDemandCounter).values(rows[start:start + CHECKPOINT_BATCH_SIZE])
+                    await session.execute(statement.on_conflict_do_update(
+                        index_elements=["week", "kind", "skill", "industry", "emirate"],
+                        set_={"count": statement.excluded.count, "updated_at": func.now()}
+                    ))
+                await session.commit()
+        except Exception:
+            # Retry these weeks on the next checkpoint
+            await redis_client.sadd(DIRTY_WEEKS_KEY, *weeks)
+            raise
+
+        logger.info(f"Skill demand checkpoint wrote {len(rows)} rows for {len(weeks)} weeks")
+        return len(rows)
+
+    async def rebuild(self, from_postings: bool = False) -> None:
+        """
+        Rebuild the counters
+
+        Open-posting counts are recomputed from active job postings; weekly
+        counts are restored from the Postgres checkpoint, or recomputed from
+        job postings when from_postings is set or no checkpoint exists yet.
+        """
+        from app.db.redis import get_redis
+        from app.db.postgres import get_session_factory, ANALYTICS
+
+        redis_client = await get_redis()
+        if not redis_client:
+            raise RuntimeError("Redis is not available")
+
+        since = week_start(date.today()) - timedelta(weeks=self.retention_weeks)
+        async with get_session_factory(ANALYTICS)() as session:
+            skill_rows = (await session.execute(text("""
+                SELECT s.kind, s.skill, COALESCE(p.industry, '') AS industry,
+                       COALESCE(p.emirate, p.location, '') AS emirate, COUNT(*) AS count
+                FROM job_postings p
+                CROSS JOIN LATERAL (
+                    SELECT 'required' AS kind, skill FROM unnest(p.required_skills) AS skill
+                    UNION
+                    SELECT 'preferred', skill FROM unnest(p.preferred_skills) AS skill
+                    UNION
+                    SELECT 'any', skill FROM unnest(p.required_skills || p.preferred_skills) AS skill
+                ) s
+                WHERE p.status = 'active' AND s.skill <> ''
+                GROUP BY 1, 2, 3, 4
+            """))).all()
+            posting_rows = (await session.execute(text("""
+                SELECT COALESCE(industry, '') AS industry, COALESCE(emirate, location, '') AS emirate,
+                       COUNT(*) AS count
+                FROM job_postings
+                WHERE status = 'active'
+                GROUP BY 1, 2
+            """))).all()
+            week_rows = [] if from_postings else (await session.execute(text("""
+                SELECT week, kind, skill, industry, emirate, count
+                FROM skill_demand_counters
+                WHERE week >= :since
+            """), {"since": since})).all()
+            backfilled = not week_rows
+            if backfilled:
+                week_rows = (await session.execute(text("""
+                    SELECT date_trunc('week', p.posted_date)::date AS week, s.kind, s.skill,
+                           COALESCE(p.industry, '') AS industry,
+                           COALESCE(p.emirate, p.location, '') AS emirate, COUNT(*) AS count
+                    FROM job_postings p
+                    CROSS JOIN LATERAL (
+                        SELECT 'required' AS kind, skill FROM unnest(p.required_skills) AS skill
+                        UNION
+                        SELECT 'preferred', skill FROM unnest(p.preferred_skills) AS skill
+                    ) s
+                    WHERE p.posted_date >= :since AND p.status <> 'draft' AND s.skill <> ''
+                    GROUP BY 1, 2, 3, 4, 5
+                """), {"since": since})).all()
+
+        # Roll exact scopes up into the wildcard scopes
+        active: Dict[Tuple[str, str, str], Counter] = defaultdict(Counter)
+        for row in skill_rows:
+            for scope in _scopes(row.industry, row.emirate):
+                active[(row.kind, *scope)][row.skill] += row.count
+        postings: Counter = Counter()
+        for row in posting_rows:
+            for scope_industry, scope_emirate in _scopes(row.industry, row.emirate):
+                postings[f"{scope_industry}{SEP}{scope_emirate}"] += row.count
+        weekly: Dict[str, Dict[str, int]] = defaultdict(dict)
+        for row in week_rows:
+            weekly[row.week.isoformat()][SEP.join((row.kind, row.skill, row.industry, row.emirate))] = row.count
+
+        # Readers fall back while READY_KEY is missing
+        await redis_client.delete(READY_KEY)
+        stale_keys = [key async for key in redis_client.scan_iter(match="skill_demand:active:*")]
+        async with redis_client.pipeline(transaction=False) as pipe:
+            if stale_keys:
+                pipe.delete(*stale_keys)
+            pipe.delete(ACTIVE_POSTINGS_KEY)
+            for (kind, scope_industry, scope_emirate), counts in active.items():
+                pipe.zadd(ACTIVE_KEY.format(kind=kind, industry=scope_industry, emirate=scope_emirate), dict(counts))
+            if postings:
+                pipe.hset(ACTIVE_POSTINGS_KEY, mapping=dict(postings))
+            for week, fields in weekly.items():
+                week_key = WEEK_KEY.format(week=week)
+                pipe.delete(week_key)
+                pipe.hset(week_key, mapping=fields)
+                pipe.expire(week_key, self.retention_weeks * 7 * 86400)
+            if backfilled and weekly:
+                pipe.sadd(DIRTY_WEEKS_KEY, *weekly.keys())
+            pipe.set(READY_KEY, datetime.utcnow().isoformat())
+            await pipe.execute()
+
+        logger.info(
+            f"Skill demand counters rebuilt: {len(active)} scopes, {sum(postings.values())} "
+            f"scoped postings, {len(weekly)} weeks{' (backfilled)' if backfilled else ''}"
+        )
+
+    async def reconcile(self) -> bool:
+        """
+        Recompute the counters from job postings
+
+        One worker reconciles at a time; the others skip while the lock is held.
+
+        Returns:
+            Whether this worker reconciled
+        """
+        from app.db.redis import get_redis
+
+        redis_client = await get_redis()
+        if not redis_client:
+            return False
+        if not await redis_client.set(RECONCILE_LOCK_KEY, "1", nx=True, ex=max(self.reconcile_interval, 60)):
+            return False
+        await self.rebuild(from_postings=True)
+        return True
+
+    async def _run_checkpoints(self) -> None:
+        """Checkpoint every interval and reconcile every reconcile interval"""
+        loop = asyncio.get_running_loop()
+        next_reconcile = loop.time() + self.reconcile_interval
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                logger.error(f"Skill demand checkpoint failed: {e}")
+            if loop.time() >= next_reconcile:
+                next_reconcile = loop.time() + self.reconcile_interval
+                try:
+                    await self.reconcile()
+                except Exception as e:
+                    logger.error(f"Skill demand reconciliation failed: {e}")
+
+    async def start(self) -> None:
+        """
+        Seed the counters from job postings and start the checkpoint schedule
+
+        A failed rebuild is not fatal: reports fall back to scanning postings.
+        """
+        try:
+            await self.reconcile()
+        except Exception as e:
+            logger.warning(f"Skill demand counters rebuild failed: {e}")
+
+        if self._checkpoint_task is None:
+            self._checkpoint_task = asyncio.create_task(self._run_checkpoints())
+
+    async def stop(self) -> None:
+        """Stop the checkpoint schedule and write a final checkpoint"""
+        if self._checkpoint_task:
+            self._checkpoint_task.cancel()
+            try:
+                await self._checkpoint_task
+            except asyncio.CancelledError:
+                pass
+            self._checkpoint_task = None
+
+        try:
+            await self.checkpoint()
+        except Exception as e:
+            logger.error(f"Final skill demand checkpoint failed: {e}")
+
+
+# Singleton instance
+_skill_demand_counters = None
+
+
+def get_skill_demand_counters() -> SkillDemandCounters:
+    """Get or create Skill Demand Counters instance"""
+    global _skill_demand_counters
+    if _skill_demand_counters is None:
+        _skill_demand_counters = SkillDemandCounters(
+            checkpoint_interval=settings.SKILL_DEMAND_CHECKPOINT_SECONDS,
+            retention_weeks=settings.SKILL_DEMAND_RETENTION_WEEKS,
+            reconcile_interval=settings.SKILL_DEMAND_RECONCILE_SECONDS
+        )
+    return _skill_demand_counters
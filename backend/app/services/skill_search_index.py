@@ -0,0 +1,380 @@
+"""
+NOOR Platform - Skill Search Index
+In-process autocomplete and substring search over the skills catalog
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from typing import List, Optional, Dict, Any, Set, Tuple
+from datetime import datetime
+import asyncio
+import logging
+import time
+import uuid
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis channel used to tell every worker that the catalog changed
+CATALOG_CHANNEL = "skills:catalog_changed"
+
+# Number of ranked ids kept on each trie node
+TRIE_NODE_CAPACITY = 50
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Return the set of character trigrams of a lowercased string"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _TrieNode:
+    """Prefix trie node holding the best-ranked skills below it"""
+
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.top: List[int] = []
+
+
+class _Snapshot:
+    """
+    Immutable view of the catalog
+
+    A rebuild creates a new snapshot and swaps it in with a single
+    assignment, so readers never see a half-built index.
+    """
+
+    def __init__(self, skills: List[Dict[str, Any]]):
+        # Rank order: most popular first, then alphabetical
+        self.skills = sorted(
+            skills,
+            key=lambda s: (-int(s.get("user_count") or 0), s["name"].lower())
+        )
+        self.names = [s["name"].lower() for s in self.skills]
+        self.categories = [(s.get("category") or "").lower() for s in self.skills]
+        self.root = _TrieNode()
+        # One trie per category, so category-filtered suggestions are not
+        # cut down from the overall top entries
+        self.category_roots: Dict[str, _TrieNode] = {}
+        self.trigrams: Dict[str, List[int]] = {}
+        self.by_id: Dict[str, int] = {}
+
+        for pos, skill in enumerate(self.skills):
+            self.by_id[str(skill["id"])] = pos
+            self._index_prefixes(pos)
+            for gram in _trigrams(self.names[pos]) | _trigrams(self.categories[pos]):
+                self.trigrams.setdefault(gram, []).append(pos)
+
+    def _index_prefixes(self, pos: int) -> None:
+        """Insert the full name, every word of the name and the category"""
+        name = self.names[pos]
+        keys = {name, self.categories[pos]}
+        keys.update(word for word in name.replace("/", " ").replace("-", " ").split() if word)
+
+        category_root = self.category_roots.setdefault(self.categories[pos], _TrieNode())
+        for root in (self.root, category_root):
+            for key in keys:
+                node = root
+                for char in key:
+                    node = node.children.setdefault(char, _TrieNode())
+                    # Positions are inserted in rank order, so the first
+                    # TRIE_NODE_CAPACITY entries are already the best ones
+                    if len(node.top) < TRIE_NODE_CAPACITY and (not node.top or node.top[-1] != pos):
+                        node.top.append(pos)
+
+
+class SkillSearchIndex:
+    """
+    In-memory skill search index
+
+    Provides:
+    - Prefix autocomplete backed by a trie over names, name words and categories
+    - Substring search backed by a trigram index (same semantics as LIKE '%q%')
+    - Popularity ranking by number of users holding the skill
+    - Rebuilds on catalog change notifications and on a refresh interval
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[_Snapshot] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._rebuild_lock = asyncio.Lock()
+        # Identifies this worker's own notifications on the shared channel
+        self.instance_id = uuid.uuid4().hex
+        self.version = 0
+        self.built_at: Optional[datetime] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether the index has been built at least once"""
+        return self._snapshot is not None
+
+    # ========================================================================
+    # BUILD
+    # ========================================================================
+
+    def build(self, skills: List[Dict[str, Any]]) -> None:
+        """
+        Build the index from catalog rows
+
+        Args:
+            skills: Dicts with id, name, category, description and user_count
+        """
+        started = time.perf_counter()
+        self._snapshot = _Snapshot(skills)
+        self.version += 1
+        self.built_at = datetime.utcnow()
+
+        logger.info(
+            f"Skill search index v{self.version} built with {len(skills)} skills "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+
+    async def refresh(self, db: Optional[AsyncSession] = None) -> None:
+        """
+        Reload the catalog with popularity counts and rebuild the index
+
+        Args:
+            db: Session to use; a new one is opened when omitted
+        """
+        from app.db.models import Skill, UserSkill
+        from app.db.postgres import AsyncSessionLocal
+
+        query = (
+            select(
+                Skill.id,
+                Skill.name,
+                Skill.category,
+                Skill.description,
+                func.count(UserSkill.id).label("user_count")
+            )
+            .outerjoin(UserSkill, UserSkill.skill_id == Skill.id)
+            .group_by(Skill.id)
+        )
+
+        async with self._rebuild_lock:
+            if db is not None:
+                rows = (await db.execute(query)).all()
+            else:
+                async with AsyncSessionLocal() as session:
+                    rows = (await session.execute(query)).all()
+
+            self.build([dict(row._mapping) for row in rows])
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    def autocomplete(
+        self,
+        prefix: str,
+        limit: int = 10,
+        category: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the most popular skills with a name word or category starting with prefix
+
+        Args:
+            prefix: Text typed so far
+            limit: Maximum number of suggestions
+            category: Restrict suggestions to this category
+
+        Returns:
+            Skill dicts in rank order
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return []
+
+        node = snapshot.category_roots.get(category.lower()) if category else snapshot.root
+        if node is None:
+            return []
+        for char in prefix.strip().lower():
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        return [snapshot.skills[pos] for pos in node.top[:limit]]
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        limit: Optional[int] = 50,
+        include_category: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Substring search over name and category
+
+        Matches exactly what LOWER(name) LIKE '%q%' OR LOWER(category) LIKE '%q%'
+        would, ranked with exact and prefix name matches first, then popularity.
+
+        Args:
+            query: Search text
+            category: Restrict results to this category
+            limit: Maximum number of results (None for all)
+            include_category: Also match the query against the category text
+
+        Returns:
+            Skill dicts in rank order
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return []
+
+        needle = query.strip().lower()
+        if len(needle) < 3:
+            # Too short for trigrams, a linear scan of a small catalog is cheap
+            candidates = range(len(snapshot.skills))
+        else:
+            postings = sorted(
+                (snapshot.trigrams.get(gram, []) for gram in _trigrams(needle)),
+                key=len
+            )
+            if not postings or not postings[0]:
+                return []
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    return []
+
+        category = category.lower() if category else None
+        matches: List[Tuple[int, int]] = []
+        for pos in candidates:
+            name = snapshot.names[pos]
+            if category and snapshot.categories[pos] != category:
+                continue
+            if needle in name:
+                tier = 0 if name == needle else 1 if name.startswith(needle) else 2
+            elif include_category and needle in snapshot.categories[pos]:
+                tier = 3
+            else:
+                continue
+            matches.append((tier, pos))
+
+        matches.sort()
+        if limit is not None:
+            matches = matches[:limit]
+        return [snapshot.skills[pos] for _, pos in matches]
+
+    def get(self, skill_id: str) -> Optional[Dict[str, Any]]:
+        """Get a skill entry by ID"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        pos = snapshot.by_id.get(str(skill_id))
+        return snapshot.skills[pos] if pos is not None else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        snapshot = self._snapshot
+        return {
+            "ready": snapshot is not None,
+            "version": self.version,
+            "skills": len(snapshot.skills) if snapshot else 0,
+            "trigrams": len(snapshot.trigrams) if snapshot else 0,
+            "built_at": self.built_at.isoformat() if self.built_at else None
+        }
+
+    # ========================================================================
+    # CHANGE NOTIFICATIONS
+    # ========================================================================
+
+    async def notify_catalog_changed(self) -> None:
+        """Rebuild locally and tell the other workers to rebuild"""
+        from app.db.redis import get_redis
+
+        try:
+            redis_client = await get_redis()
+            if redis_client:
+                await redis_client.publish(CATALOG_CHANNEL, f"{self.instance_id}:{self.version}")
+        except Exception as e:
+            logger.warning(f"Skill catalog notification failed: {e}")
+
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Skill search index rebuild failed: {e}")
+
+    def _is_own_notification(self, data: Any) -> bool:
+        """Whether a catalog notification was published by this worker"""
+        if isinstance(data, bytes):
+            data = data.decode()
+        return str(data).split(":", 1)[0] == self.instance_id
+
+    async def _listen(self, refresh_interval: int) -> None:
+        """Rebuild on catalog notifications and every refresh_interval seconds"""
+        from app.db.redis import get_redis
+
+        pubsub = None
+        try:
+            redis_client = await get_redis()
+            if redis_client:
+                pubsub = redis_client.pubsub()
+                await pubsub.subscribe(CATALOG_CHANNEL)
+        except Exception as e:
+            logger.warning(f"Skill catalog notifications unavailable, refreshing on interval only: {e}")
+            pubsub = None
+
+        next_refresh = time.monotonic() + refresh_interval
+        try:
+            while True:
+                changed = False
+                if pubsub:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    # This worker already rebuilt for its own notifications
+                    changed = message is not None and not self._is_own_notification(message["data"])
+                else:
+                    await asyncio.sleep(1.0)
+
+                if changed or time.monotonic() >= next_refresh:
+                    try:
+                        await self.refresh()
+                    except Exception as e:
+                        logger.error(f"Skill search index refresh failed: {e}")
+                    next_refresh = time.monotonic() + refresh_interval
+        finally:
+            if pubsub:
+                await pubsub.unsubscribe(CATALOG_CHANNEL)
+                await pubsub.close()
+
+    async def start(self) -> None:
+        """
+        Build the index and start the change listener
+
+        A failed initial build is not fatal: callers fall back to database
+        search until the listener's next successful refresh.
+        """
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Initial skill search index build failed: {e}")
+
+        if self._listener_task is None:
+            self._listener_task = asyncio.create_task(
+                self._listen(settings.SKILL_INDEX_REFRESH_SECONDS)
+            )
+
+    async def stop(self) -> None:
+        """Stop the change listener"""
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+
+# Singleton instance
+_skill_search_index = None
+
+
+def get_skill_search_index() -> SkillSearchIndex:
+    """Get or create Skill Search Index instance"""
+    global _skill_search_index
+    if _skill_search_index is None:
+        _skill_search_index = SkillSearchIndex()
+    return _skill_search_index
@@ -4,7 +4,7 @@ Business logic for skills management
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, case
 from sqlalchemy.orm import selectinload
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
@@ -21,6 +21,9 @@ from app.models.skills import (
     ProficiencyLevel,
     SkillCategory
 )
+from app.services.skill_search_index import get_skill_search_index
+from app.db.postgres import read_only, analytical
+from app.services.sketch_analytics import get_sketch_analytics
 
 logger = logging.getLogger(__name__)
 
@@ -30,11 +33,13 @@ class SkillsService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.search_index = get_skill_search_index()
     
     # ========================================================================
     # SKILLS CATALOG METHODS
     # ========================================================================
     
+    @read_only
     async def list_skills(
         self,
         category: Optional[SkillCategory] = None,
@@ -48,6 +53,9 @@ class SkillsService:
         Returns:
             Tuple of (skills list, total count)
         """
+        if search and self.search_index.is_ready:
+            return await self._list_skills_from_index(category, search, skip, limit)
+        
         query = select(Skill)
         
         # Apply filters
@@ -70,6 +78,32 @@ class SkillsService:
         logger.info(f"Listed {len(skills)} skills (total: {total})")
         return skills, total
     
+    async def _list_skills_from_index(
+        self,
+        category: Optional[SkillCategory],
+        search: str,
+        skip: int,
+        limit: int
+    ) -> tuple[List[Skill], int]:
+        """Resolve a name search through the in-memory index, then load one page by primary key"""
+        matches = self.search_index.search(
+            search,
+            category=category.value if category else None,
+            limit=None,
+            include_category=False
+        )
+        total = len(matches)
+        page_ids = [match["id"] for match in matches[skip:skip + limit]]
+        if not page_ids:
+            return [], total
+        
+        result = await self.db.execute(select(Skill).where(Skill.id.in_(page_ids)))
+        skills_by_id = {str(skill.id): skill for skill in result.scalars().all()}
+        skills = [skills_by_id[str(skill_id)] for skill_id in page_ids if str(skill_id) in skills_by_id]
+        
+        logger.info(f"Listed {len(skills)} skills from search index (total: {total})")
+        return skills, total
+    
     async def get_skill_by_id(self, skill_id: str) -> Optional[Skill]:
         """Get skill by ID"""
         result = await self.db.execute(
@@ -97,6 +131,7 @@ class SkillsService:
         self.db.add(skill)
         await self.db.commit()
         await self.db.refresh(skill)
+        await self.search_index.notify_catalog_changed()
         
         logger.info(f"Created skill: {skill.name} (ID: {skill.id})")
         return skill
@@ -117,55 +152,44 @@ class SkillsService:
         
         await self.db.commit()
         await self.db.refresh(skill)
+        await self.search_index.notify_catalog_changed()
         
         logger.info(f"Updated skill: {skill.name} (ID: {skill.id})")
         return skill
     
+    @analytical
     async def get_skill_statistics(self, skill_id: str) -> Dict[str, Any]:
         """Get statistics for a skill"""
         skill = await self.get_skill_by_id(skill_id)
         if not skill:
             raise ValueError(f"Skill not found: {skill_id}")
         
-        # Count total users with this skill
-        total_users = await self.db.scalar(
-            select(func.count(UserSkill.id)).where(UserSkill.skill_id == skill_id)
+        # Proficiency weights (beginner=1, intermediate=2, advanced=3, expert=4)
+        proficiency_weight = case(
+            (UserSkill.proficiency_level == 'beginner', 1),
+            (UserSkill.proficiency_level == 'intermediate', 2),
+            (UserSkill.proficiency_level == 'advanced', 3),
+            (UserSkill.proficiency_level == 'expert', 4),
+            else_=0
         )
         
-        # Calculate average proficiency (beginner=1, intermediate=2, advanced=3, expert=4)
-        proficiency_map = {
-            'beginner': 1,
-            'intermediate': 2,
-            'advanced': 3,
-            'expert': 4
-        }
-        
-        user_skills = await self.db.execute(
-            select(UserSkill).where(UserSkill.skill_id == skill_id)
-        )
-        user_skills_list = user_skills.scalars().all()
-        
-        if user_skills_list:
-            avg_proficiency = sum(
-                proficiency_map.get(us.proficiency_level, 0) for us in user_skills_list
-            ) / len(user_skills_list)
-            
-            avg_experience = sum(
-                float(us.years_of_experience or 0) for us in user_skills_list
-            ) / len(user_skills_list)
-            
-            verified_count = sum(1 for us in user_skills_list if us.is_verified)
-        else:
-            avg_proficiency = 0
-            avg_experience = 0
-            verified_count = 0
+        # Single aggregate query instead of loading every holder of the skill
+        stats = (await self.db.execute(
+            select(
+                func.count(UserSkill.id),
+                func.avg(proficiency_weight),
+                func.avg(func.coalesce(UserSkill.years_of_experience, 0)),
+                func.count(UserSkill.id).filter(UserSkill.is_verified.is_(True))
+            ).where(UserSkill.skill_id == skill_id)
+        )).one()
+        total_users, avg_proficiency, avg_experience, verified_count = stats
         
         return {
             "skill_id": str(skill.id),
             "skill_name": skill.name,
             "total_users": total_users,
-            "average_proficiency": round(avg_proficiency, 2),
-            "average_experience": round(avg_experience, 2),
+            "average_proficiency": round(float(avg_proficiency or 0), 2),
+            "average_experience": round(float(avg_experience or 0), 2),
             "verified_count": verified_count
         }
     
@@ -240,6 +264,10 @@ class SkillsService:
         # Load skill relationship
         await self.db.refresh(user_skill, ['skill'])
         
+        sketches = get_sketch_analytics()
+        sketches.record_user_activity(user_id, skill=skill.name)
+        sketches.record_skill_event(skill.name)
+        
         logger.info(f"Added skill {skill.name} to user {user_id}")
         return user_skill
     
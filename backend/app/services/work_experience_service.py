@@ -4,7 +4,7 @@ Business logic for work experience management
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc
+from sqlalchemy import select, update, func, and_, or_, desc
 from sqlalchemy.orm import selectinload
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date, timedelta
@@ -12,6 +12,7 @@ from collections import Counter
 import logging
 
 from app.db.models import WorkExperience, WorkExperienceVerification, CareerAnalytics, User, Skill
+from app.services.career_analytics import get_career_analytics_worker
 from app.models.work_experience import (
     WorkExperienceCreate,
     WorkExperienceUpdate,
@@ -247,68 +248,17 @@ class WorkExperienceService:
     
     async def get_career_progression(self, user_id: str) -> Dict[str, Any]:
         """Get career progression analysis"""
-        # Check if cached analytics exist and are fresh
+        # Rows are kept fresh by the background recompute worker; a row that
+        # is still stale (edit not yet processed) is recomputed inline
         analytics = await self._get_career_analytics(user_id)
-        if analytics and not analytics.needs_refresh:
-            return self._format_career_analytics(analytics)
+        if analytics is None or analytics.needs_refresh:
+            await get_career_analytics_worker().recompute([user_id], db=self.db)
+            analytics = await self._get_career_analytics(user_id)
+            await self.db.refresh(analytics)
         
-        # Calculate fresh analytics
-        experiences = await self.get_user_experiences(user_id)
-        
-        if not experiences:
+        if not analytics.total_experiences:
             return self._empty_career_progression(user_id)
-        
-        # Build timeline
-        timeline = [
-            {
-                "period": f"{exp.start_date.year}-{exp.end_date.year if exp.end_date else 'Present'}",
-                "title": exp.job_title,
-                "company": exp.company_name,
-                "duration_months": exp.duration_months
-            }
-            for exp in sorted(experiences, key=lambda x: x.start_date)
-        ]
-        
-        # Calculate metrics
-        total_months = sum(exp.duration_months for exp in experiences)
-        average_tenure = total_months / len(experiences) if experiences else 0
-        job_changes = len(experiences) - 1
-        
-        industries = [exp.industry for exp in experiences if exp.industry]
-        industry_changes = len(set(industries)) - 1 if industries else 0
-        
-        # Calculate progression score (0-10)
-        progression_score = self._calculate_progression_score(experiences)
-        
-        # Generate AI insights and recommendations
-        insights = self._generate_insights(experiences, progression_score)
-        recommendations = self._generate_recommendations(experiences)
-        
-        # Cache analytics
-        await self._cache_career_analytics(
-            user_id,
-            len(experiences),
-            total_months,
-            average_tenure,
-            job_changes,
-            industry_changes,
-            progression_score,
-            insights,
-            recommendations
-        )
-        
-        return {
-            "success": True,
-            "user_id": user_id,
-            "timeline": timeline,
-            "progression_score": progression_score,
-            "average_tenure": round(average_tenure, 1),
-            "job_changes": job_changes,
-            "industry_changes": industry_changes,
-            "salary_growth": None,  # TODO: Calculate if salary data available
-            "insights": insights,
-            "recommendations": recommendations
-        }
+        return self._format_career_analytics(analytics)
     
     # ========================================================================
     # VERIFICATION METHODS
@@ -403,124 +353,22 @@ class WorkExperienceService:
         )
         return result.scalar_one_or_none()
     
-    async def _cache_career_analytics(
-        self,
-        user_id: str,
-        total_experiences: int,
-        total_months: int,
-        average_tenure: float,
-        job_changes: int,
-        industry_changes: int,
-        progression_score: float,
-        insights: List[str],
-        recommendations: List[str]
-    ):
-        """Cache career analytics"""
-        analytics = await self._get_career_analytics(user_id)
-        
-        if analytics:
-            # Update existing
-            analytics.total_experiences = total_experiences
-            analytics.total_months = total_months
-            analytics.total_years = round(total_months / 12, 1)
-            analytics.average_tenure_months = round(average_tenure)
-            analytics.job_changes = job_changes
-            analytics.industry_changes = industry_changes
-            analytics.progression_score = round(progression_score)
-            analytics.insights = insights
-            analytics.recommendations = recommendations
-            analytics.last_calculated = datetime.utcnow()
-        else:
-            # Create new
-            analytics = CareerAnalytics(
-                user_id=user_id,
-                total_experiences=total_experiences,
-                total_months=total_months,
-                total_years=round(total_months / 12, 1),
-                average_tenure_months=round(average_tenure),
-                job_changes=job_changes,
-                industry_changes=industry_changes,
-                progression_score=round(progression_score),
-                insights=insights,
-                recommendations=recommendations
-            )
-            self.db.add(analytics)
-        
-        await self.db.commit()
-    
     async def _invalidate_career_analytics(self, user_id: str):
-        """Invalidate career analytics cache"""
-        analytics = await self._get_career_analytics(user_id)
-        if analytics:
-            analytics.last_calculated = datetime.utcnow() - timedelta(days=2)
-            await self.db.commit()
-    
-    def _calculate_progression_score(self, experiences: List[WorkExperience]) -> float:
-        """Calculate career progression score (0-10)"""
-        if not experiences:
-            return 0.0
-        
-        score = 5.0  # Base score
-        
-        # Positive factors
-        if len(experiences) >= 3:
-            score += 1.0  # Multiple positions
-        
-        avg_tenure = sum(exp.duration_months for exp in experiences) / len(experiences)
-        if avg_tenure >= 24:
-            score += 1.0  # Good tenure
-        
-        if any(exp.is_current for exp in experiences):
-            score += 0.5  # Currently employed
-        
-        # Check for progression in titles (simplified)
-        titles = [exp.job_title.lower() for exp in sorted(experiences, key=lambda x: x.start_date)]
-        if any('senior' in title or 'lead' in title for title in titles[-2:]):
-            score += 1.5  # Senior roles
-        
-        return min(score, 10.0)
-    
-    def _generate_insights(self, experiences: List[WorkExperience], score: float) -> List[str]:
-        """Generate career insights"""
-        insights = []
-        
-        if score >= 7:
-            insights.append("Strong career progression with consistent growth")
-        elif score >= 5:
-            insights.append("Steady career development")
-        else:
-            insights.append("Early career stage with room for growth")
-        
-        industries = set(exp.industry for exp in experiences if exp.industry)
-        if len(industries) == 1:
-            insights.append(f"Specialized expertise in {list(industries)[0]} sector")
-        elif len(industries) > 2:
-            insights.append("Diverse cross-industry experience")
-        
-        return insights
-    
-    def _generate_recommendations(self, experiences: List[WorkExperience]) -> List[str]:
-        """Generate career recommendations"""
-        recommendations = []
-        
-        latest = experiences[0] if experiences else None
-        if latest:
-            if 'junior' in latest.job_title.lower():
-                recommendations.append("Consider pursuing mid-level positions")
-            elif 'senior' in latest.job_title.lower():
-                recommendations.append("Explore leadership and management roles")
-        
-        recommendations.append("Continue building technical skills")
-        recommendations.append("Seek mentorship opportunities")
-        
-        return recommendations
+        """Mark career analytics stale and queue them for recompute"""
+        await self.db.execute(
+            update(CareerAnalytics)
+            .where(CareerAnalytics.user_id == user_id)
+            .values(last_calculated=func.now() - timedelta(days=2))
+        )
+        await self.db.commit()
+        await get_career_analytics_worker().enqueue([user_id])
     
     def _format_career_analytics(self, analytics: CareerAnalytics) -> Dict[str, Any]:
         """Format cached analytics for response"""
         return {
             "success": True,
             "user_id": str(analytics.user_id),
-            "timeline": [],  # TODO: Store timeline in cache
+            "timeline": analytics.timeline or [],
             "progression_score": analytics.progression_score,
             "average_tenure": analytics.average_tenure_months,
             "job_changes": analytics.job_changes,
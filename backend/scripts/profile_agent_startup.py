@@ -0,0 +1,85 @@
+"""Profile import time and first-use latency of the agent registry.
+
+Each measurement runs in a fresh interpreter so module caches do not carry
+over. Reports:
+- the slowest imports behind `import app.agents.agent_registry` (python -X importtime)
+- the time to import the registry, to serve a first agent lookup cold, and
+  to warm every agent up front as the app lifespan does
+
+Usage:
+    python scripts/profile_agent_startup.py [--agent matching-001] [--top 15] [--runs 3]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import json
+import statistics
+import subprocess
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMINGS = """
+import json, time
+started = time.perf_counter()
+from app.agents.agent_registry import AgentRegistry
+imported = time.perf_counter()
+registry = AgentRegistry()
+if {warm!r}:
+    registry.warm_up()
+ready = time.perf_counter()
+registry.get_agent({agent!r})
+served = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - started) * 1000,
+    "first_lookup_ms": (served - ready) * 1000,
+}}))
+"""
+
+
+def run(args, **kwargs) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, LOG_LEVEL="ERROR")
+    return subprocess.run([sys.executable, *args], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True, **kwargs)
+
+
+def import_profile(module: str, top: int):
+    """Slowest imports by cumulative time, in microseconds"""
+    stderr = run(["-X", "importtime", "-c", f"import {module}"]).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def timings(agent: str, warm: bool, runs: int) -> dict:
+    samples = [json.loads(run(["-c", TIMINGS.format(agent=agent, warm=warm)]).stdout.splitlines()[-1]) for _ in range(runs)]
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main(agent: str, top: int, runs: int):
+    print("Slowest imports under app.agents.agent_registry:")
+    print(f"{'cumulative ms':>14}  module")
+    for cumulative, name in import_profile("app.agents.agent_registry", top):
+        print(f"{cumulative / 1000:>14.1f}  {name}")
+
+    print(f"\nMedian of {runs} fresh interpreters, first lookup of {agent}:")
+    print(f"{'mode':>8} {'import ms':>10} {'startup ms':>11} {'first lookup ms':>16}")
+    for mode, warm in (("lazy", False), ("warm", True)):
+        result = timings(agent, warm, runs)
+        print(f"{mode:>8} {result['import_ms']:>10.1f} {result['startup_ms']:>11.1f} {result['first_lookup_ms']:>16.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agent registry startup profile")
+    parser.add_argument("--agent", default="matching-001")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    main(args.agent, args.top, args.runs)
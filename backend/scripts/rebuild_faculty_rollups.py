@@ -0,0 +1,26 @@
+"""Rebuild the eight-faculty score cube from user_assessments.
+
+Recomputes every faculty_score_rollups cell from the scored faculty
+assessments saved so far. The app does this at startup only when the cube
+is empty; run this after restoring assessments or fixing scoring data.
+
+Usage:
+    python scripts/rebuild_faculty_rollups.py
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import asyncio
+
+from app.services.faculty_rollups import get_faculty_rollups
+
+
+async def main():
+    cells = await get_faculty_rollups().rebuild()
+    print(f"Rebuilt {cells} faculty score rollup cells")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
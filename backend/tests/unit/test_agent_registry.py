@@ -0,0 +1,59 @@
+"""
+Unit tests for lazy agent construction in the agent registry
+"""
+
+import subprocess
+import sys
+
+from app.agents.agent_registry import AgentRegistry
+from app.agents.base_agent import BaseAgent
+
+built = []
+
+
+class StubAgent(BaseAgent):
+    def __init__(self):
+        super().__init__(agent_id="stub-001", name="Stub", description="Test agent", capabilities=[])
+        built.append(self)
+
+    async def execute(self, task):
+        return {"success": True}
+
+
+def get_stub_agent():
+    return StubAgent()
+
+
+def test_importing_the_registry_loads_no_agents():
+    code = (
+        "import sys, app.agents.agent_registry; "
+        "print(sorted(m for m in sys.modules if m.endswith('_agent') or m.startswith(('anthropic', 'openai'))))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip().splitlines()[-1] == "['app.agents.base_agent']"
+
+
+def test_agents_are_built_on_first_use_with_shared_clients():
+    built.clear()
+    client = object()
+    registry = AgentRegistry(factories={"stub-001": f"{__name__}:get_stub_agent"}, anthropic_client=client)
+
+    assert registry.list_agents() == [{"agent_id": "stub-001", "status": "not_loaded"}]
+    assert built == []
+
+    agent = registry.get_agent("stub-001")
+    assert registry.get_agent("stub-001") is agent
+    assert len(built) == 1
+    assert agent.anthropic_client is client
+    assert registry.get_agent("missing-001") is None
+
+
+def test_warm_up_builds_every_agent_once():
+    built.clear()
+    registry = AgentRegistry(factories={"stub-001": f"{__name__}:get_stub_agent"})
+    registry.warm_up()
+    registry.warm_up()
+
+    assert len(built) == 1
+    assert registry.get_system_health()["not_loaded_agents"] == 0
+    assert "stub-001" in registry.load_times_ms
@@ -0,0 +1,40 @@
+"""
+Unit tests for the cache warmer's warm tasks
+"""
+
+import asyncio
+
+from app.agents.matching_agent import MATCH_JOB_FILTERS
+from app.services.cache_warmer import CacheWarmer
+
+
+class FakeDataAgent:
+    def __init__(self):
+        self.job_filters = []
+        self.bundles = []
+
+    async def fetch_job_postings(self, filters):
+        self.job_filters.append(filters)
+        return [{"id": "j1"}]
+
+    async def fetch_user_bundle(self, user_id, record_access=True):
+        self.bundles.append((user_id, record_access))
+        return {}
+
+
+def test_warms_the_entries_live_requests_read(monkeypatch):
+    data_agent = FakeDataAgent()
+    monkeypatch.setattr("app.agents.data_retrieval_agent.get_data_retrieval_agent", lambda: data_agent)
+    warmer = CacheWarmer(concurrency=2, top_users=2)
+
+    async def hot_users():
+        return ["u1", "u2"]
+
+    warmer.get_hot_users = hot_users
+    progress = asyncio.run(warmer.warm())
+
+    assert data_agent.job_filters == [MATCH_JOB_FILTERS]
+    # Warming is not user activity
+    assert sorted(data_agent.bundles) == [("u1", False), ("u2", False)]
+    assert progress["tasks"]["job_postings"]["items"] == 1
+    assert progress["tasks"]["user_bundles"]["items"] == 2
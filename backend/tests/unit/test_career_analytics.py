@@ -0,0 +1,44 @@
+"""
+Unit tests for batch career analytics computation
+"""
+
+from datetime import date
+
+from app.services.career_analytics import compute_career_metrics
+
+
+EXPERIENCES = [
+    ("u1", "Senior Engineer", "ADNOC", "Energy", date(2020, 1, 1), None, True),
+    ("u1", "Engineer", "ADNOC", "Energy", date(2014, 1, 1), date(2017, 1, 1), False),
+    ("u1", "Junior Engineer", "Etisalat", "Telecom", date(2012, 1, 1), date(2014, 1, 1), False),
+    ("u2", "Junior Analyst", "FAB", "Banking", date(2023, 6, 1), date(2024, 6, 1), False),
+]
+
+
+def test_metrics_are_computed_per_user():
+    rows = compute_career_metrics(["u1", "u2", "u3"], EXPERIENCES, today=date(2024, 1, 1))
+
+    u1 = rows["u1"]
+    assert u1["total_experiences"] == 3
+    assert u1["total_months"] == 24 + 36 + 48
+    assert u1["total_years"] == 9
+    assert u1["companies_worked"] == 2
+    assert u1["industries"] == ["Energy", "Telecom"]
+    assert u1["industry_changes"] == 1
+    assert u1["job_changes"] == 2
+    # 5 base + 1 positions + 1 tenure + 0.5 current + 1.5 senior
+    assert u1["progression_score"] == 9
+    assert [entry["title"] for entry in u1["timeline"]] == ["Junior Engineer", "Engineer", "Senior Engineer"]
+    assert u1["timeline"][-1]["period"] == "2020-Present"
+    assert "Explore leadership and management roles" in u1["recommendations"]
+
+    u2 = rows["u2"]
+    assert u2["progression_score"] == 5
+    assert u2["insights"] == ["Steady career development", "Specialized expertise in Banking sector"]
+    assert "Consider pursuing mid-level positions" in u2["recommendations"]
+
+
+def test_users_without_experience_get_empty_rows():
+    rows = compute_career_metrics(["u3"], [])
+    assert rows["u3"]["total_experiences"] == 0
+    assert rows["u3"]["timeline"] == []
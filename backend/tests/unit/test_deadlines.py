@@ -0,0 +1,168 @@
+"""
+Unit tests for request deadlines across agent calls
+"""
+
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.agents import base_agent, matching_agent
+from app.agents.base_agent import BaseAgent
+from app.agents.task_dag import DAGExecutor, COMPLETED, TIMED_OUT
+from app.core.config import settings
+from app.core.request_context import (
+    DeadlineExceeded, deadline_scope, set_deadline, time_remaining, within_deadline
+)
+from app.core.telemetry import Telemetry, AGENT
+
+
+class SlowAgent(BaseAgent):
+    def __init__(self):
+        super().__init__(agent_id="slow-001", name="Slow", description="Test agent", capabilities=[])
+        self.cancelled = False
+
+    async def execute(self, task):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"success": True}
+
+
+class PartialAgent(BaseAgent):
+    def __init__(self):
+        super().__init__(agent_id="partial-001", name="Partial", description="Test agent", capabilities=[])
+
+    async def execute(self, task):
+        return {"success": True, "partial": True}
+
+
+class FakeDataAgent:
+    def __init__(self, cached):
+        self.cached = cached
+
+    async def fetch_user_bundle(self, user_id):
+        return {"skills": []}
+
+    async def fetch_job_postings(self, filters):
+        return [{"id": "j1"}, {"id": "j2"}]
+
+    async def get_cached_many(self, keys):
+        return {key: {"match_score": 50} for key in keys if key.rsplit(":", 1)[1] in self.cached}
+
+    async def set_cached_many(self, entries, ttl):
+        pass
+
+
+def test_request_timeouts_fall_back_on_bad_headers():
+    from app.main import _request_timeout
+
+    def timeout(header):
+        return _request_timeout(Request({"type": "http", "headers": [(b"x-request-timeout", header)]}))
+
+    assert timeout(b"2.5") == 2.5
+    for header in (b"nan", b"inf", b"soon"):
+        assert timeout(header) == settings.AGENT_TIMEOUT_SECONDS
+
+
+def test_scopes_narrow_but_never_extend_the_deadline():
+    async def scoped():
+        set_deadline(1)
+        with deadline_scope(60):
+            outer = time_remaining()
+        with deadline_scope(0.1):
+            inner = time_remaining()
+            inherited = await asyncio.create_task(asyncio.sleep(0, time_remaining()))
+        return outer, inner, inherited
+
+    outer, inner, inherited = asyncio.run(scoped())
+    assert 0.9 < outer <= 1
+    assert inner <= 0.1
+    assert inherited <= inner
+
+
+def test_work_is_cancelled_when_the_deadline_passes():
+    cancelled = []
+
+    async def slow_call():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def call():
+        set_deadline(0.02)
+        await within_deadline(slow_call())
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(call())
+    assert cancelled == [True]
+
+
+def test_agent_calls_time_out_and_are_counted(monkeypatch):
+    telemetry = Telemetry()
+    monkeypatch.setattr("app.core.telemetry.get_telemetry", lambda: telemetry)
+    monkeypatch.setattr(settings, "TELEMETRY_ENABLED", True)
+    monkeypatch.setattr(base_agent, "DEADLINE_GRACE_SECONDS", 0.01)
+    agent = SlowAgent()
+
+    async def call():
+        set_deadline(0.02)
+        return await agent.execute({"action": "crawl"})
+
+    result = asyncio.run(call())
+
+    assert result["success"] is False and result["timed_out"] is True
+    assert agent.cancelled
+    metrics = telemetry.local_snapshot(AGENT)["metrics"]["slow-001:crawl"]
+    assert (metrics["requests"], metrics["errors"], metrics["timeouts"]) == (1, 1, 1)
+
+
+def test_partial_results_count_as_timeouts_not_errors(monkeypatch):
+    telemetry = Telemetry()
+    monkeypatch.setattr("app.core.telemetry.get_telemetry", lambda: telemetry)
+    monkeypatch.setattr(settings, "TELEMETRY_ENABLED", True)
+
+    result = asyncio.run(PartialAgent().execute({"action": "match"}))
+
+    assert result["success"] is True
+    metrics = telemetry.local_snapshot(AGENT)["metrics"]["partial-001:match"]
+    assert (metrics["requests"], metrics["errors"], metrics["timeouts"]) == (1, 0, 1)
+
+
+@pytest.mark.parametrize("cached, partial", [({"j1", "j2"}, False), ({"j1"}, True)])
+def test_matches_are_partial_only_when_jobs_went_unscored(monkeypatch, cached, partial):
+    for factory in ("get_ai_client", "get_data_retrieval_agent", "get_ai_analysis_agent"):
+        monkeypatch.setattr(matching_agent, factory, lambda: None)
+    agent = matching_agent.MatchingAgent()
+    agent.data_agent = FakeDataAgent(cached)
+
+    async def call():
+        set_deadline(0)
+        return await agent.execute({"action": "match_jobs_to_user", "parameters": {"user_id": "u1"}})
+
+    result = asyncio.run(call())
+
+    assert result["partial"] is partial
+    assert len(result["matches"]) == len(cached)
+
+
+def test_dag_returns_completed_subtasks_at_the_deadline():
+    async def run_subtask(subtask):
+        await asyncio.sleep(subtask["parameters"]["seconds"])
+        return {"success": True}
+
+    async def run():
+        set_deadline(0.05)
+        return await DAGExecutor(run_subtask).run([
+            {"subtask_id": "fast", "parameters": {"seconds": 0}},
+            {"subtask_id": "slow", "parameters": {"seconds": 10}}
+        ])
+
+    execution = asyncio.run(run())
+
+    assert execution["partial"] is True
+    assert [result["status"] for result in execution["results"]] == [COMPLETED, TIMED_OUT]
@@ -0,0 +1,115 @@
+"""
+Unit tests for bulk export queries, writers and dataset access
+"""
+
+import asyncio
+import csv
+import gzip
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints import exports as export_endpoints
+from app.api.v1.endpoints.auth import TokenData
+from app.services.exports import (
+    EXPORT_DATASETS, CsvWriter, ParquetWriter, build_query, can_export, parquet_available
+)
+
+COLUMNS = [("name", "string"), ("count", "int"), ("ratio", "float"), ("active", "bool"), ("day", "date")]
+ROWS = [("a", 1, 0.5, True, date(2026, 10, 1)), (None, None, None, None, None)]
+
+
+def test_filters_are_bound_as_parameters():
+    sql, params = build_query("job_postings", {
+        "emirate": "Dubai'; DROP TABLE users; --",
+        "posted_from": date(2026, 1, 1),
+        "status": None
+    })
+
+    assert "COALESCE(p.emirate, p.location) = :emirate" in sql
+    assert "p.posted_date >= CAST(:posted_from AS date)" in sql
+    assert "DROP TABLE" not in sql
+    # Unset filters add no clause
+    assert ":status" not in sql
+    assert params == {"emirate": "Dubai'; DROP TABLE users; --", "posted_from": "2026-01-01"}
+
+
+def test_unfiltered_exports_select_everything():
+    sql, params = build_query("skill_distribution", {})
+
+    assert "WHERE true" in sql
+    assert params == {}
+
+
+@pytest.mark.parametrize("dataset, filters", [
+    ("salaries", {}),
+    ("job_postings", {"p.status = 'active' OR true": "x"}),
+    ("skill_distribution", {"industry": "Energy"})
+])
+def test_unknown_datasets_and_filters_are_rejected(dataset, filters):
+    with pytest.raises(ValueError):
+        build_query(dataset, filters)
+
+
+def test_csv_writer_writes_a_header_and_rows(tmp_path):
+    path = str(tmp_path / "export.csv.gz")
+    writer = CsvWriter(path, COLUMNS)
+    writer.write(ROWS[:1])
+    writer.write(ROWS[1:])
+    writer.close()
+
+    with gzip.open(path, "rt", newline="", encoding="utf-8") as file:
+        assert list(csv.reader(file)) == [
+            ["name", "count", "ratio", "active", "day"],
+            ["a", "1", "0.5", "True", "2026-10-01"],
+            ["", "", "", "", ""]
+        ]
+
+
+@pytest.mark.skipif(not parquet_available(), reason="pyarrow is not installed")
+def test_parquet_writer_writes_one_row_group_per_chunk(tmp_path):
+    import pyarrow.parquet as pq
+
+    path = str(tmp_path / "export.parquet")
+    writer = ParquetWriter(path, COLUMNS)
+    writer.write(ROWS[:1])
+    writer.write(ROWS[1:])
+    writer.close()
+
+    parquet = pq.ParquetFile(path)
+    assert parquet.num_row_groups == 2
+    assert [str(field.type) for field in parquet.schema_arrow] == ["string", "int64", "double", "bool", "date32[day]"]
+    assert parquet.read().to_pylist() == [
+        dict(zip([name for name, _ in COLUMNS], row)) for row in ROWS
+    ]
+
+
+def test_restricted_datasets_need_a_role():
+    assert not can_export("workforce", [])
+    assert can_export("workforce", ["analyst"])
+    assert can_export("job_postings", [])
+    assert all(can_export(name, ["admin"]) for name in EXPORT_DATASETS)
+
+
+def test_exports_of_restricted_datasets_are_forbidden(monkeypatch):
+    created = []
+
+    class FakeService:
+        async def create_export(self, owner_id, dataset, format="csv", filters=None):
+            created.append(dataset)
+            return {"job_id": "j1", "status": "queued"}
+
+    monkeypatch.setattr(export_endpoints, "get_export_service", lambda: FakeService())
+    request = export_endpoints.CreateExport(dataset="workforce")
+
+    with pytest.raises(HTTPException) as forbidden:
+        asyncio.run(export_endpoints.create_export(request, current_user=TokenData(user_id="u-1")))
+    allowed = asyncio.run(export_endpoints.create_export(
+        request, current_user=TokenData(user_id="u-2", roles=["analyst"])
+    ))
+    listed = asyncio.run(export_endpoints.list_export_datasets(current_user=TokenData(user_id="u-1")))
+
+    assert forbidden.value.status_code == 403
+    assert allowed["success"] and created == ["workforce"]
+    assert "workforce" not in [dataset["name"] for dataset in listed["datasets"]]
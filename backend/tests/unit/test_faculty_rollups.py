@@ -0,0 +1,137 @@
+"""
+Unit tests for the faculty score cube's write path and rebuild
+"""
+
+import asyncio
+from datetime import date, datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints import eight_faculty
+from app.api.v1.endpoints.auth import TokenData
+from app.api.v1.endpoints.eight_faculty import CompetencyAnswers, FacultyAssessmentSubmission
+from app.services.faculty_rollups import FacultyRollupEngine, add_score, faculty_scores
+
+QUESTIONS = [{"type": "likert_scale"}] * 3 + [{"type": "multiple_choice", "correct_answer": "B"}]
+
+
+class FakeRollups:
+    def __init__(self):
+        self.recorded = []
+
+    async def load_questions(self, assessment_id, faculty_id):
+        if assessment_id != "a-1":
+            return None
+        return {"PHY-01": QUESTIONS, "PHY-02": QUESTIONS}
+
+    async def record_assessment(self, user_id, assessment_id, faculty_id, faculty_score, **kwargs):
+        self.recorded.append((user_id, assessment_id, faculty_id, faculty_score, kwargs))
+        return "ua-1"
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for row in self.rows:
+            yield row
+
+
+class Row:
+    def __init__(self, results_json, completed_at):
+        self.results_json = results_json
+        self.completed_at = completed_at
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+        self.committed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def stream(self, statement):
+        return FakeResult(self.rows)
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+    async def commit(self):
+        self.committed = True
+
+
+def submit(monkeypatch, competencies, user_id="u-1", assessment_id="a-1"):
+    rollups = FakeRollups()
+    monkeypatch.setattr(eight_faculty, "get_faculty_rollups", lambda: rollups)
+    submission = FacultyAssessmentSubmission(assessment_id=assessment_id, competencies=competencies)
+    response = asyncio.run(eight_faculty.submit_faculty_assessment(
+        user_id, "physical", submission, current_user=TokenData(user_id="u-1")
+    ))
+    return rollups, response
+
+
+def test_submitted_assessments_are_scored_against_the_stored_key(monkeypatch):
+    rollups, response = submit(monkeypatch, [
+        CompetencyAnswers(competency_id="PHY-01", answers=[4, 4, 4, "B"]),
+        CompetencyAnswers(competency_id="PHY-02", answers=[2, 2, 2, "A"])
+    ])
+
+    _, _, faculty_id, faculty_score, kwargs = rollups.recorded[0]
+    assert faculty_id == "physical" and kwargs == {"biometric_verified": False}
+    assert faculty_scores(faculty_score) == [("", 22 / 192 * 100), ("PHY-01", 100.0), ("PHY-02", 37.5)]
+    assert response["user_assessment_id"] == "ua-1"
+
+
+@pytest.mark.parametrize("kwargs, answers, status", [
+    ({"user_id": "u-2"}, [4, 4, 4, "B"], 403),
+    ({"assessment_id": "a-2"}, [4, 4, 4, "B"], 404),
+    ({}, [5, 4, 4, "B"], 422),
+    ({}, ["often", 4, 4, "B"], 422),
+    ({}, [4, 4, "B"], 422)
+])
+def test_invalid_submissions_are_rejected(monkeypatch, kwargs, answers, status):
+    with pytest.raises(HTTPException) as error:
+        submit(monkeypatch, [CompetencyAnswers(competency_id="PHY-01", answers=answers)], **kwargs)
+    assert error.value.status_code == status
+
+
+def test_scores_accumulate_per_cell():
+    cells = {}
+    period = date(2026, 3, 1)
+    add_score(cells, period, "inst-1", "Dubai", "mental", "", 95.0)
+    add_score(cells, period, "inst-1", "Dubai", "mental", "", 45.0)
+    add_score(cells, period, None, None, "mental", "", 45.0)
+
+    cell = cells[(period, "inst-1", "Dubai", "mental", "")]
+    assert (cell["count"], cell["score_sum"], cell["score_sum_sq"]) == (2, 140.0, 95.0 ** 2 + 45.0 ** 2)
+    assert (cell["bucket_9"], cell["bucket_4"]) == (1, 1)
+    assert cells[(period, "", "", "mental", "")]["count"] == 1
+
+
+def test_rebuild_recomputes_the_cube_from_assessments(monkeypatch):
+    scored_at = datetime(2026, 3, 14, tzinfo=timezone.utc)
+    faculty_score = {"percentage": 80.0, "competency_scores": [{"competency_id": "MOR-01", "percentage": 70.0}]}
+    session = FakeSession([
+        Row({"faculty_id": "moral", "institution_id": "inst-1", "faculty_score": faculty_score}, scored_at),
+        Row('{"faculty_id": "moral", "institution_id": "inst-1", "faculty_score": {"percentage": 60.0}}', scored_at)
+    ])
+    monkeypatch.setattr("app.db.postgres.AsyncSessionLocal", lambda: session)
+
+    cells = asyncio.run(FacultyRollupEngine().rebuild())
+
+    assert cells == 2
+    lock, clear, insert = (str(statement) for statement in session.statements)
+    assert lock.startswith("LOCK TABLE faculty_score_rollups")
+    assert clear.startswith("DELETE FROM faculty_score_rollups")
+    assert insert.startswith("INSERT INTO faculty_score_rollups")
+    assert session.committed
@@ -0,0 +1,114 @@
+"""
+Unit tests for the batch hiring forecast models
+"""
+
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.hiring_forecast import ALL, HiringForecaster, forecast_batch, seasonal_naive, trend_direction
+
+
+def test_linear_trends_are_extrapolated():
+    weeks = np.arange(60)
+    y = np.stack([10 + 0.5 * weeks, 40 - 0.2 * weeks, np.full(60, 7.0)])
+    result = forecast_batch(y, horizon=4)
+    expected = np.stack([10 + 0.5 * np.arange(60, 64), 40 - 0.2 * np.arange(60, 64), np.full(4, 7.0)])
+    assert result["forecast"] == pytest.approx(expected, abs=0.5)
+    assert (result["lower"] <= result["forecast"]).all() and (result["upper"] >= result["forecast"]).all()
+
+
+def test_seasonal_series_use_seasonal_naive():
+    weeks = np.arange(104)
+    seasonal = 20 + 10 * np.sin(2 * np.pi * weeks / 52)
+    trending = 5 + 0.1 * weeks
+    result = forecast_batch(np.stack([seasonal, trending]), horizon=8, season=52)
+    assert list(result["model"]) == [1, 0]
+    assert result["forecast"][0] == pytest.approx(seasonal[52:60])
+
+
+def test_seasonal_naive_repeats_last_season():
+    y = np.array([[1.0, 2.0, 3.0, 4.0, 5.0, 6.0]])
+    forecast, errors = seasonal_naive(y, horizon=5, season=3)
+    assert forecast.tolist() == [[4.0, 5.0, 6.0, 4.0, 5.0]]
+    assert errors[0, 3:].tolist() == [3.0, 3.0, 3.0]
+
+
+def test_trend_direction():
+    assert trend_direction(0.2) == "increasing"
+    assert trend_direction(-0.2) == "decreasing"
+    assert trend_direction(0.01) == "stable"
+
+
+def test_first_use_fits_in_the_background():
+    forecaster = HiringForecaster()
+    refreshes = []
+
+    async def refresh(force=False):
+        refreshes.append(force)
+        forecaster._history, forecaster.keys = np.zeros((1, 1)), [("", "", "")]
+        return True
+
+    forecaster.refresh = refresh
+
+    async def first_use():
+        ready = await forecaster.ensure_ready()
+        await forecaster.ensure_ready()
+        await forecaster._first_fit
+        return ready, await forecaster.ensure_ready()
+
+    assert asyncio.run(first_use()) == (False, True)
+    assert refreshes == [False]
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Answers the posting and skill count queries"""
+
+    def __init__(self, posting_rows, skill_rows):
+        self.posting_rows = posting_rows
+        self.skill_rows = skill_rows
+        self.params = []
+
+    async def execute(self, query, params):
+        self.params.append(params)
+        return FakeResult(self.skill_rows if "required_skills" in str(query) else self.posting_rows)
+
+
+def test_posting_counts_are_rolled_up_into_every_series():
+    week = date(2026, 10, 12)
+    session = FakeSession(
+        posting_rows=[
+            SimpleNamespace(week=week, industry="Energy", emirate="Dubai", count=3),
+            SimpleNamespace(week=week, industry="Energy", emirate="Sharjah", count=2)
+        ],
+        skill_rows=[SimpleNamespace(week=week, skill="Python", industry="Energy", count=4)]
+    )
+
+    cells = asyncio.run(HiringForecaster()._load(session, since=date(2025, 10, 13)))
+
+    totals = {}
+    for cell_week, key, count in cells:
+        assert cell_week == week
+        totals[key] = totals.get(key, 0) + count
+    assert totals == {
+        ("Energy", "Dubai", ALL): 3,
+        ("Energy", "Sharjah", ALL): 2,
+        ("Energy", ALL, ALL): 5,
+        (ALL, "Dubai", ALL): 3,
+        (ALL, "Sharjah", ALL): 2,
+        (ALL, ALL, ALL): 5,
+        ("Energy", ALL, "Python"): 4,
+        (ALL, ALL, "Python"): 4
+    }
+    assert session.params == [{"since": date(2025, 10, 13)}] * 2
@@ -0,0 +1,134 @@
+"""
+Unit tests for the digest-backed percentile service
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from app.services.percentiles import PercentileService
+
+
+def _service() -> PercentileService:
+    # Redis is not initialized in unit tests, so queries read unflushed digests
+    service = PercentileService()
+    rng = random.Random(7)
+    for location, base in (("Dubai", 20000), ("Abu Dhabi", 18000)):
+        for _ in range(2000):
+            service.record("salary", base + rng.uniform(-5000, 5000), role="Data Engineer", location=location)
+    for _ in range(500):
+        service.record("salary", rng.uniform(8000, 12000), role="Analyst", location="Dubai")
+    return service
+
+
+def test_roll_up_merges_cells():
+    service = _service()
+    result = asyncio.run(service.percentiles("salary", {"role": "data engineer"}))
+    assert result["count"] == 4000
+    assert result["percentiles"]["p50"] == pytest.approx(19000, rel=0.03)
+    low, high = result["bounds"]["p90"]
+    assert low <= result["percentiles"]["p90"] <= high
+    assert result["rank_error"] == pytest.approx(0.01)
+
+
+def test_group_by_dimension():
+    service = _service()
+    result = asyncio.run(service.percentiles("salary", {"role": "Data Engineer"}, group_by="location"))
+    groups = {group["location"]: group for group in result["groups"]}
+    assert set(groups) == {"abu dhabi", "dubai"}
+    assert groups["dubai"]["percentiles"]["p50"] == pytest.approx(20000, rel=0.03)
+    assert groups["abu dhabi"]["percentiles"]["p10"] == pytest.approx(14000, rel=0.05)
+
+
+def test_unknown_dimension_is_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(PercentileService().percentiles("salary", {"faculty": "mental"}))
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def smembers(self, key):
+        return set(self.values.get(key, set()))
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def delete(self, *keys):
+        self.commands.append(lambda values: [values.pop(key, None) for key in keys])
+
+    def set(self, key, value):
+        self.commands.append(lambda values: values.__setitem__(key, value))
+
+    def sadd(self, key, *members):
+        self.commands.append(lambda values: values.setdefault(key, set()).update(members))
+
+    async def execute(self):
+        for command in self.commands:
+            command(self.redis_client.values)
+
+
+class Row:
+    def __init__(self, **columns):
+        self.__dict__.update(columns)
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def stream(self, statement):
+        if "job_postings" in str(statement):
+            rows = [Row(role="Analyst", location="Dubai", value=10000.0 + i) for i in range(100)]
+        else:
+            rows = [Row(results_json={"faculty_id": "mental", "faculty_score": {"percentage": 70.0}}, completed_at=None)]
+
+        async def iterate():
+            for row in rows:
+                yield row
+        return iterate()
+
+
+def test_rebuild_replaces_digests_from_source_tables(monkeypatch):
+    redis_client = FakeRedis()
+    # A stale cell from a role with no postings any more
+    redis_client.values["percentile:salary:cells"] = {"gone\x1f"}
+    redis_client.values["percentile:salary:gone\x1f"] = b"stale"
+
+    async def get_redis():
+        return redis_client
+
+    monkeypatch.setattr("app.db.redis.get_redis", get_redis)
+    monkeypatch.setattr("app.db.postgres.get_session_factory", lambda role: FakeSession)
+    service = PercentileService()
+
+    async def rebuild_and_query():
+        cells = await service.rebuild()
+        return cells, await service.percentiles("salary"), await service.percentiles("faculty_score")
+
+    cells, salary, faculty = asyncio.run(rebuild_and_query())
+
+    assert cells == {"salary": 1, "faculty_score": 1}
+    assert "percentile:salary:gone\x1f" not in redis_client.values
+    assert salary["count"] == 100 and salary["percentiles"]["p50"] == pytest.approx(10050, abs=2)
+    assert faculty["count"] == 1
@@ -0,0 +1,50 @@
+"""
+Unit tests for the orchestrator plan cache
+"""
+
+import asyncio
+
+from app.agents.master_orchestrator_v2 import MasterOrchestratorV2
+
+
+def test_known_task_types_are_planned_once_per_shape():
+    orchestrator = MasterOrchestratorV2()
+    calls = []
+
+    async def analyze(task):
+        calls.append(task)
+        return {"complexity": "moderate"}
+
+    orchestrator._analyze_task_with_ai = analyze
+
+    async def plan_twice():
+        first = await orchestrator._plan({"type": "skill_matching", "parameters": {"user_id": "u1", "job_id": "j1"}})
+        second = await orchestrator._plan({"type": "skill_matching", "parameters": {"user_id": "u2", "job_id": "j2"}})
+        return first, second
+
+    (_, first, first_cached), (_, second, second_cached) = asyncio.run(plan_twice())
+
+    assert (first_cached, second_cached) == (False, True)
+    assert first[0]["parameters"] == {"user_id": "u1"}
+    assert second[0]["parameters"] == {"user_id": "u2"}
+    assert second[1]["parameters"] == {"job_id": "j2"}
+    # Dependency placeholders are left for the DAG executor
+    assert second[2]["parameters"]["user_skills"] == "{{fetch_user_skills.result}}"
+
+
+def test_unknown_task_types_are_analyzed_once():
+    orchestrator = MasterOrchestratorV2()
+    calls = []
+
+    async def analyze(task):
+        calls.append(task)
+        return {"complexity": "complex"}
+
+    orchestrator._analyze_task_with_ai = analyze
+
+    async def plan_twice():
+        for value in (1, 2):
+            await orchestrator._plan({"type": "custom_report", "parameters": {"year": value}})
+
+    asyncio.run(plan_twice())
+    assert len(calls) == 1
@@ -0,0 +1,104 @@
+"""
+Unit tests for the batched JSON cache helpers and the job match cache
+"""
+
+import asyncio
+
+import fakeredis
+
+from app.agents.matching_agent import MatchingAgent, skills_version
+from app.db import redis as redis_cache
+from app.db.redis import cache_get_many, cache_set_many
+
+
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(redis_cache, "redis_client", client)
+    return client
+
+
+def test_many_values_round_trip_with_per_key_ttls(monkeypatch):
+    client = fake_redis(monkeypatch)
+
+    async def run():
+        stored = await cache_set_many({"a": {"score": 1}, "b": [1, 2], "c": "text"}, ttl=300, ttls={"b": 60})
+        await client.set("broken", "{not json")
+        values = await cache_get_many(["a", "b", "missing", "broken", "c"])
+        return stored, values, await client.ttl("a"), await client.ttl("b")
+
+    stored, values, ttl_a, ttl_b = asyncio.run(run())
+
+    assert stored
+    # Misses and undecodable entries are left out
+    assert values == {"a": {"score": 1}, "b": [1, 2], "c": "text"}
+    assert 60 < ttl_a <= 300 and 0 < ttl_b <= 60
+
+
+def test_empty_batches_skip_redis(monkeypatch):
+    monkeypatch.setattr(redis_cache, "redis_client", None)
+
+    assert asyncio.run(cache_get_many([])) == {}
+    assert asyncio.run(cache_set_many({}))
+
+
+def test_cache_errors_read_as_misses(monkeypatch):
+    monkeypatch.setattr(redis_cache, "redis_client", None)
+
+    assert asyncio.run(cache_get_many(["a"])) == {}
+    assert not asyncio.run(cache_set_many({"a": 1}))
+
+
+def test_skills_version_follows_skill_changes():
+    skills = [{"name": "Python", "proficiency_level": "advanced"}]
+
+    assert skills_version(skills) == skills_version([{"proficiency_level": "advanced", "name": "Python"}])
+    assert skills_version(skills) != skills_version([{"name": "Python", "proficiency_level": "expert"}])
+    assert skills_version(skills) != skills_version(skills + [{"name": "SQL", "proficiency_level": "beginner"}])
+
+
+class FakeDataAgent:
+    def __init__(self):
+        self.skills = [{"name": "Python"}]
+        self.cache = {}
+
+    async def fetch_user_bundle(self, user_id):
+        return {"profile": {}, "skills": self.skills, "work_experience": []}
+
+    async def fetch_job_postings(self, filters):
+        return [{"id": "job-1", "title": "Engineer", "required_skills": ["Python"]}]
+
+    async def get_cached_many(self, keys):
+        return {key: self.cache[key] for key in keys if key in self.cache}
+
+    async def set_cached_many(self, items, ttl=300, ttls=None):
+        self.cache.update(items)
+        return True
+
+
+class FakeAnalysisAgent:
+    def __init__(self):
+        self.calls = 0
+
+    async def execute(self, task):
+        self.calls += 1
+        return {"success": True, "analysis": {"match_score": 50 + self.calls}}
+
+
+def test_matches_are_rescored_when_the_user_skills_change():
+    agent = MatchingAgent()
+    agent.data_agent, agent.analysis_agent = FakeDataAgent(), FakeAnalysisAgent()
+
+    async def run():
+        first = await agent.match_jobs_to_user("user-1")
+        repeat = await agent.match_jobs_to_user("user-1")
+        agent.data_agent.skills = [{"name": "Python"}, {"name": "SQL"}]
+        changed = await agent.match_jobs_to_user("user-1")
+        return first, repeat, changed
+
+    first, repeat, changed = asyncio.run(run())
+
+    assert first[0]["match_score"] == repeat[0]["match_score"] == 51
+    assert changed[0]["match_score"] == 52
+    assert agent.analysis_agent.calls == 2
+    assert all(key.startswith("skill_match:user-1:") for key in agent.data_agent.cache)
+    assert len(agent.data_agent.cache) == 2
@@ -0,0 +1,110 @@
+"""
+Unit tests for per-request query accounting and N+1 detection
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.request_context import (
+    begin_request_stats, get_request_stats, record_db_statement, statement_shape
+)
+from app.db import postgres
+from app.db.postgres import get_query_stats, record_request_queries
+
+
+@pytest.fixture(autouse=True)
+def query_totals(monkeypatch):
+    monkeypatch.setattr(postgres, "_query_totals", {})
+    monkeypatch.setattr(settings, "DB_QUERY_REPEAT_THRESHOLD", 3)
+
+
+@pytest.mark.parametrize("statement, shape", [
+    ("SELECT * FROM users WHERE email = 'a@b.ae'", "SELECT * FROM users WHERE email = ?"),
+    ("SELECT * FROM users WHERE name = 'O''Brien'", "SELECT * FROM users WHERE name = ?"),
+    ("SELECT * FROM jobs WHERE salary > 1500.50 LIMIT 10", "SELECT * FROM jobs WHERE salary > ? LIMIT ?"),
+    ("SELECT * FROM skills WHERE id = $1 AND category = $2", "SELECT * FROM skills WHERE id = ? AND category = ?"),
+    ("SELECT * FROM skills WHERE id = %(id_1)s", "SELECT * FROM skills WHERE id = ?"),
+    ("SELECT * FROM skills WHERE id IN ($1, $2, $3)", "SELECT * FROM skills WHERE id IN (?)"),
+    ("SELECT *\n  FROM   table1\n WHERE x = 1", "SELECT * FROM table1 WHERE x = ?")
+])
+def test_literals_and_parameters_are_normalized(statement, shape):
+    assert statement_shape(statement) == shape
+
+
+def test_in_lists_of_any_length_share_a_shape():
+    assert statement_shape("SELECT 1 FROM t WHERE id IN (1, 2)") == statement_shape("SELECT 1 FROM t WHERE id IN (7)")
+
+
+def test_statements_outside_a_request_are_not_recorded():
+    async def run():
+        record_db_statement("SELECT 1", 0.01)
+        return get_request_stats()
+
+    assert asyncio.run(run()) is None
+
+
+def test_statements_are_counted_per_request():
+    async def run():
+        stats = begin_request_stats()
+        for user_id in range(5):
+            record_db_statement(f"SELECT * FROM user_skills WHERE user_id = {user_id}", 0.002)
+        record_db_statement("SELECT * FROM users LIMIT 20", 0.004)
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert stats.db_statements == 6
+    assert stats.db_max_repeats == 5
+    assert stats.to_dict()["db_time_ms"] == 14.0
+    assert stats.repeated_statements(3) == [("SELECT * FROM user_skills WHERE user_id = ?", 5)]
+
+
+def test_requests_are_totalled_per_route():
+    async def request(repeats):
+        stats = begin_request_stats()
+        for index in range(repeats):
+            record_db_statement(f"SELECT * FROM skills WHERE id = {index}", 0.001)
+        return stats
+
+    first = record_request_queries("GET /api/v1/skills", asyncio.run(request(2)))
+    second = record_request_queries("GET /api/v1/skills", asyncio.run(request(6)))
+
+    assert first == []
+    assert second == [("SELECT * FROM skills WHERE id = ?", 6)]
+    assert get_query_stats() == {"GET /api/v1/skills": {
+        "requests": 2,
+        "avg_statements": 4.0,
+        "avg_db_time_ms": 4.0,
+        "max_statements": 6,
+        "repeated_statement_requests": 1
+    }}
+
+
+def test_repeated_statements_are_logged_as_possible_n_plus_1(monkeypatch):
+    from app import main
+    from app.main import add_process_time_header
+
+    warnings = []
+    monkeypatch.setattr(main.logger, "warning", warnings.append)
+
+    app = FastAPI()
+    app.middleware("http")(add_process_time_header)
+
+    @app.get("/jobs")
+    async def jobs(repeats: int = 0):
+        for index in range(repeats):
+            record_db_statement(f"SELECT * FROM job_postings WHERE id = {index}", 0.001)
+        return {"ok": True}
+
+    client = TestClient(app)
+    client.get("/jobs", params={"repeats": 3})
+    assert warnings == []
+    client.get("/jobs", params={"repeats": 4})
+
+    assert len(warnings) == 1
+    assert "executed 4 times: SELECT * FROM job_postings WHERE id = ?" in warnings[0]
+    assert get_query_stats()["GET /jobs"]["repeated_statement_requests"] == 1
@@ -0,0 +1,131 @@
+"""
+Unit tests for read/write session routing
+"""
+
+import asyncio
+import itertools
+
+import pytest
+
+from app.db import postgres
+from app.db.postgres import ANALYTICS, PRIMARY, READ_ONLY, analytical, get_session_factory, read_only
+
+
+class FakeSession:
+    def __init__(self, role):
+        self.role = role
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+        return False
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    opened = []
+
+    def factory(role):
+        def open_session():
+            opened.append(FakeSession(role))
+            return opened[-1]
+        return open_session
+
+    monkeypatch.setattr(postgres, "get_session_factory", factory)
+    return opened
+
+
+class Service:
+    def __init__(self):
+        self.db = "request-session"
+
+    @read_only
+    async def list_items(self, limit=10):
+        return self.db.role, limit
+
+    @analytical
+    async def stats(self):
+        return self.db.role
+
+    async def write(self):
+        return self.db
+
+    @read_only
+    async def failing(self):
+        raise RuntimeError("query failed")
+
+
+def test_marked_methods_run_on_a_session_of_their_role(sessions):
+    service = Service()
+
+    assert asyncio.run(service.list_items(limit=5)) == (READ_ONLY, 5)
+    assert asyncio.run(service.stats()) == ANALYTICS
+    # Unmarked methods keep the request's primary session
+    assert asyncio.run(service.write()) == "request-session"
+    assert [session.role for session in sessions] == [READ_ONLY, ANALYTICS]
+    assert all(session.closed for session in sessions)
+    assert service.db == "request-session"
+
+
+def test_the_session_is_restored_when_the_method_fails(sessions):
+    service = Service()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.failing())
+
+    assert service.db == "request-session"
+    assert sessions[0].closed
+
+
+def test_replica_reads_rotate_across_replicas(monkeypatch):
+    replicas = ["replica-0", "replica-1"]
+    monkeypatch.setattr(postgres, "_replica_cycle", itertools.cycle(replicas))
+
+    assert [get_session_factory(READ_ONLY) for _ in range(3)] == ["replica-0", "replica-1", "replica-0"]
+    assert get_session_factory(PRIMARY) is postgres.AsyncSessionLocal
+    assert get_session_factory(ANALYTICS) is postgres.AnalyticsSessionLocal
+    with pytest.raises(ValueError):
+        get_session_factory("reporting")
+
+
+class FakeConnection:
+    def __init__(self, statements, fail):
+        self.statements = statements
+        self.fail = fail
+
+    async def __aenter__(self):
+        if self.fail:
+            raise ConnectionError("replica down")
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+class FakeEngine:
+    def __init__(self, statements, fail=False):
+        self.statements = statements
+        self.fail = fail
+
+    def begin(self):
+        return FakeConnection(self.statements, self.fail)
+
+    connect = begin
+
+
+def test_startup_checks_primary_and_replicas_with_text_statements(monkeypatch):
+    statements = []
+    monkeypatch.setattr(postgres, "async_engine", FakeEngine(statements))
+    monkeypatch.setattr(postgres, "replica_engines", [FakeEngine(statements), FakeEngine(statements, fail=True)])
+
+    # An unavailable replica does not fail startup
+    asyncio.run(postgres.init_postgres())
+
+    assert [str(statement) for statement in statements] == ["SELECT 1", "SELECT 1"]
+    assert all(not isinstance(statement, str) for statement in statements)
@@ -0,0 +1,82 @@
+"""
+Unit tests for the probabilistic sketches
+"""
+
+import random
+
+import pytest
+
+from app.services.sketches import HyperLogLog, CountMinSketch, TDigest
+
+
+class TestHyperLogLog:
+    """Tests for distinct counting"""
+
+    def test_estimate_within_error(self):
+        sketch = HyperLogLog()
+        for i in range(50000):
+            sketch.add(f"user-{i}")
+            sketch.add(f"user-{i}")
+        assert sketch.count() == pytest.approx(50000, rel=4 * sketch.standard_error)
+
+    def test_merge_is_union(self):
+        first, second = HyperLogLog(12), HyperLogLog(12)
+        for i in range(6000):
+            first.add(i)
+        for i in range(3000, 9000):
+            second.add(i)
+        assert first.merge(second).count() == pytest.approx(9000, rel=0.06)
+
+    def test_serialize_round_trip(self):
+        sketch = HyperLogLog(10)
+        for i in range(500):
+            sketch.add(i)
+        restored = HyperLogLog.deserialize(sketch.serialize())
+        assert restored.count() == sketch.count()
+
+
+class TestCountMinSketch:
+    """Tests for frequency estimates and top-k"""
+
+    def test_never_undercounts(self):
+        sketch = CountMinSketch(width=256, depth=4)
+        for i in range(2000):
+            sketch.add(f"skill-{i % 300}")
+        assert all(sketch.estimate(f"skill-{i}") >= 6 for i in range(300))
+
+    def test_top_k_survives_merge_and_serialization(self):
+        first, second = CountMinSketch(k=5), CountMinSketch(k=5)
+        for i in range(1000):
+            first.add(f"noise-{i}")
+            second.add(f"noise-{i + 1000}")
+        first.add("Python", 40)
+        second.add("Python", 40)
+        second.add("SQL", 30)
+        merged = CountMinSketch.deserialize(first.merge(second).serialize())
+        assert merged.top_k(2) == [("Python", 80), ("SQL", 30)]
+        assert merged.total == 2110
+
+
+class TestTDigest:
+    """Tests for percentile estimates"""
+
+    def test_percentiles_close_to_exact(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(10, 0.5) for _ in range(20000)]
+        digest = TDigest()
+        digest.update(values)
+        values.sort()
+        for q in (0.5, 0.9, 0.99):
+            assert digest.quantile(q) == pytest.approx(values[int(q * len(values))], rel=0.02)
+
+    def test_merge_matches_single_digest(self):
+        rng = random.Random(11)
+        digests = [TDigest() for _ in range(4)]
+        for digest in digests:
+            digest.update(rng.uniform(0, 100) for _ in range(5000))
+        merged = TDigest.deserialize(digests[0].serialize())
+        for digest in digests[1:]:
+            merged.merge(digest)
+        assert merged.count == 20000
+        assert merged.quantile(0.5) == pytest.approx(50, abs=2)
+        assert merged.centroid_count <= 2 * merged.compression
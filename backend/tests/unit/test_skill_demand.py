@@ -0,0 +1,148 @@
+"""
+Unit tests for skill demand counter updates, reads and reconciliation
+"""
+
+import asyncio
+
+import fakeredis
+
+from app.services.skill_demand import (
+    ACTIVE_KEY, ACTIVE_POSTINGS_KEY, ALL, READY_KEY, SEP, WEEK_KEY, SkillDemandCounters
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+
+def test_one_worker_reconciles_from_job_postings(monkeypatch):
+    redis_client = FakeRedis()
+
+    async def get_redis():
+        return redis_client
+
+    monkeypatch.setattr("app.db.redis.get_redis", get_redis)
+    rebuilds = []
+
+    async def rebuild(from_postings=False):
+        rebuilds.append(from_postings)
+
+    first, second = SkillDemandCounters(), SkillDemandCounters()
+    first.rebuild = second.rebuild = rebuild
+
+    async def reconcile_both():
+        return await first.reconcile(), await second.reconcile()
+
+    assert asyncio.run(reconcile_both()) == (True, False)
+    assert rebuilds == [True]
+
+
+def fake_redis(monkeypatch):
+    redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    async def get_redis():
+        return redis_client
+
+    monkeypatch.setattr("app.db.redis.get_redis", get_redis)
+    return redis_client
+
+
+def posting(industry="Energy", emirate="Dubai", required=("Python",), preferred=("SQL",)):
+    return {
+        "industry": industry,
+        "emirate": emirate,
+        "posted_date": "2026-10-14",
+        "required_skills": list(required),
+        "preferred_skills": list(preferred)
+    }
+
+
+def test_postings_are_counted_in_every_scope(monkeypatch):
+    redis_client = fake_redis(monkeypatch)
+    counters = SkillDemandCounters()
+
+    async def run():
+        await counters._apply(posting(), 1)
+        await counters._apply(posting(industry="Finance", required=("Python", "Excel"), preferred=()), 1)
+        return (
+            await redis_client.hgetall(ACTIVE_POSTINGS_KEY),
+            await redis_client.zrange(ACTIVE_KEY.format(kind="any", industry=ALL, emirate="Dubai"), 0, -1, withscores=True),
+            await redis_client.hgetall(WEEK_KEY.format(week="2026-10-12"))
+        )
+
+    postings, any_dubai, week = asyncio.run(run())
+
+    assert postings == {
+        f"Energy{SEP}Dubai": "1", f"Energy{SEP}{ALL}": "1",
+        f"Finance{SEP}Dubai": "1", f"Finance{SEP}{ALL}": "1",
+        f"{ALL}{SEP}Dubai": "2", f"{ALL}{SEP}{ALL}": "2"
+    }
+    assert any_dubai == [("Excel", 1.0), ("SQL", 1.0), ("Python", 2.0)]
+    assert week[SEP.join(("required", "Python", "Energy", "Dubai"))] == "1"
+    assert week[SEP.join(("preferred", "SQL", "Energy", "Dubai"))] == "1"
+
+
+def test_closed_postings_leave_the_open_counts(monkeypatch):
+    redis_client = fake_redis(monkeypatch)
+    counters = SkillDemandCounters()
+
+    async def run():
+        await counters._apply(posting(), 1)
+        await counters._apply(posting(required=("Python", "Go")), 1)
+        await counters._apply(posting(), -1)
+        return (
+            await redis_client.zrange(ACTIVE_KEY.format(kind="required", industry=ALL, emirate=ALL), 0, -1, withscores=True),
+            await redis_client.zrange(ACTIVE_KEY.format(kind="preferred", industry=ALL, emirate=ALL), 0, -1, withscores=True),
+            await redis_client.hget(WEEK_KEY.format(week="2026-10-12"), SEP.join(("required", "Python", "Energy", "Dubai")))
+        )
+
+    required, preferred, opened = asyncio.run(run())
+
+    assert required == [("Go", 1.0), ("Python", 1.0)]
+    assert preferred == [("SQL", 1.0)]
+    # Weekly counts record openings and are not reduced by closings
+    assert opened == "2"
+
+
+def test_demand_is_read_for_a_scope(monkeypatch):
+    redis_client = fake_redis(monkeypatch)
+    counters = SkillDemandCounters()
+
+    async def run():
+        await counters._apply(posting(), 1)
+        await counters._apply(posting(emirate="Abu Dhabi", required=("Python", "Go"), preferred=()), 1)
+        before_ready = await counters.get_demand()
+        await redis_client.set(READY_KEY, "2026-10-19T00:00:00")
+        return (
+            before_ready,
+            await counters.get_demand(k=1, skills=["Python", "Rust"]),
+            await counters.get_demand(industry="Energy", emirate="Dubai")
+        )
+
+    before_ready, national, dubai = asyncio.run(run())
+
+    assert before_ready is None
+    assert national == {
+        "active_postings": 2,
+        "unique_skills": 3,
+        "top": {"required": [("Python", 2)], "preferred": [("SQL", 1)], "any": [("Python", 2)]},
+        "skill_counts": {"Python": 2, "Rust": 0}
+    }
+    assert dubai["active_postings"] == 1
+    assert dubai["top"]["required"] == [("Python", 1)]
+
+
+def test_demand_is_unavailable_without_redis(monkeypatch):
+    async def get_redis():
+        return None
+
+    monkeypatch.setattr("app.db.redis.get_redis", get_redis)
+
+    assert asyncio.run(SkillDemandCounters().get_demand()) is None
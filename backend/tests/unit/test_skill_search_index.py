@@ -0,0 +1,122 @@
+"""
+Unit tests for the in-memory skill search index
+"""
+
+import pytest
+
+from app.services.skill_search_index import SkillSearchIndex
+
+
+CATALOG = [
+    {"id": "1", "name": "Python", "category": "technical", "description": None, "user_count": 120},
+    {"id": "2", "name": "Python Testing", "category": "technical", "description": None, "user_count": 15},
+    {"id": "3", "name": "Machine Learning", "category": "technical", "description": None, "user_count": 80},
+    {"id": "4", "name": "Public Speaking", "category": "soft", "description": None, "user_count": 40},
+    {"id": "5", "name": "Project Management", "category": "management", "description": None, "user_count": 95},
+    {"id": "6", "name": "Deep Learning", "category": "technical", "description": None, "user_count": 10},
+]
+
+
+@pytest.fixture
+def index():
+    search_index = SkillSearchIndex()
+    search_index.build(CATALOG)
+    return search_index
+
+
+class TestAutocomplete:
+    """Tests for prefix autocomplete"""
+
+    def test_prefix_ranked_by_popularity(self, index):
+        """Test suggestions come back most popular first"""
+        names = [s["name"] for s in index.autocomplete("p")]
+        assert names == ["Python", "Project Management", "Public Speaking", "Python Testing"]
+
+    def test_matches_inner_words(self, index):
+        """Test a prefix matches any word of the name"""
+        names = [s["name"] for s in index.autocomplete("learn")]
+        assert names == ["Machine Learning", "Deep Learning"]
+
+    def test_case_insensitive_with_limit(self, index):
+        """Test prefix is case-insensitive and limit is applied"""
+        names = [s["name"] for s in index.autocomplete("PYT", limit=1)]
+        assert names == ["Python"]
+
+    def test_category_filter(self, index):
+        """Test suggestions restricted to one category"""
+        names = [s["name"] for s in index.autocomplete("p", category="soft")]
+        assert names == ["Public Speaking"]
+
+    def test_category_filter_beyond_overall_top(self):
+        """Test a category's suggestions are not cut down by more popular skills elsewhere"""
+        catalog = [
+            {"id": str(i), "name": f"Popular {i}", "category": "technical", "description": None, "user_count": 1000 - i}
+            for i in range(60)
+        ] + [{"id": "rare", "name": "Public Policy", "category": "government", "description": None, "user_count": 1}]
+        search_index = SkillSearchIndex()
+        search_index.build(catalog)
+
+        names = [s["name"] for s in search_index.autocomplete("p", category="government")]
+        assert names == ["Public Policy"]
+        assert search_index.autocomplete("p", category="unknown") == []
+
+    def test_no_match(self, index):
+        """Test unknown prefix returns nothing"""
+        assert index.autocomplete("zzz") == []
+
+
+class TestSearch:
+    """Tests for substring search"""
+
+    def test_substring_matches_like_semantics(self, index):
+        """Test infix matches are found like LIKE '%q%'"""
+        names = {s["name"] for s in index.search("earn")}
+        assert names == {"Machine Learning", "Deep Learning"}
+
+    def test_exact_and_prefix_ranked_first(self, index):
+        """Test exact name match ranks above prefix matches"""
+        names = [s["name"] for s in index.search("python")]
+        assert names == ["Python", "Python Testing"]
+
+    def test_category_text_match(self, index):
+        """Test the query also matches the category text"""
+        names = [s["name"] for s in index.search("manage")]
+        assert names == ["Project Management"]
+
+        names = [s["name"] for s in index.search("soft")]
+        assert names == ["Public Speaking"]
+        assert index.search("soft", include_category=False) == []
+
+    def test_short_query(self, index):
+        """Test queries shorter than a trigram still match"""
+        names = {s["name"] for s in index.search("ml")}
+        assert names == set()
+        names = {s["name"] for s in index.search("ea")}
+        assert names == {"Public Speaking", "Machine Learning", "Deep Learning"}
+
+    def test_not_ready(self):
+        """Test an unbuilt index returns no results"""
+        search_index = SkillSearchIndex()
+        assert not search_index.is_ready
+        assert search_index.search("python") == []
+        assert search_index.autocomplete("py") == []
+
+    def test_rebuild_swaps_snapshot(self, index):
+        """Test rebuilding replaces the catalog and bumps the version"""
+        version = index.version
+        index.build(CATALOG + [
+            {"id": "7", "name": "Pyspark", "category": "technical", "description": None, "user_count": 500}
+        ])
+        assert index.version == version + 1
+        assert index.autocomplete("py")[0]["name"] == "Pyspark"
+        assert index.get("7")["name"] == "Pyspark"
+
+
+class TestNotifications:
+    """Tests for catalog change notifications"""
+
+    def test_own_notifications_are_recognized(self, index):
+        """Test a worker skips the echo of its own notification"""
+        assert index._is_own_notification(f"{index.instance_id}:3")
+        assert index._is_own_notification(f"{index.instance_id}:3".encode())
+        assert not index._is_own_notification(f"{SkillSearchIndex().instance_id}:3")
@@ -0,0 +1,62 @@
+"""
+Unit tests for the orchestrator subtask DAG executor
+"""
+
+import asyncio
+
+import pytest
+
+from app.agents.task_dag import DAGExecutor, build_graph
+
+
+SUBTASKS = [
+    {"subtask_id": "fetch_user_skills", "parameters": {"user_id": "u1"}},
+    {"subtask_id": "fetch_job_requirements", "parameters": {"job_id": "j1"}},
+    {
+        "subtask_id": "calculate_match",
+        "parameters": {
+            "user_skills": "{{fetch_user_skills.result}}",
+            "job_requirements": "{{fetch_job_requirements.result.skills}}",
+            "label": "job {{fetch_job_requirements.result.id}}"
+        }
+    }
+]
+
+
+async def _run(subtask):
+    await asyncio.sleep(subtask.get("delay", 0.05))
+    if subtask["subtask_id"] == "fetch_user_skills":
+        return ["python", "sql"]
+    if subtask["subtask_id"] == "fetch_job_requirements":
+        return {"id": "j1", "skills": ["python"]}
+    return subtask["parameters"]
+
+
+def test_independent_subtasks_overlap_and_results_are_substituted():
+    run = asyncio.run(DAGExecutor(_run).run(SUBTASKS))
+
+    # Two levels of 50ms each, not three sequential steps
+    assert run["wall_time_ms"] < 140
+    assert [r["status"] for r in run["results"]] == ["completed"] * 3
+    assert run["results"][2]["result"] == {
+        "user_skills": ["python", "sql"],
+        "job_requirements": ["python"],
+        "label": "job j1"
+    }
+    assert run["timings"]["calculate_match"]["started_ms"] >= run["timings"]["fetch_user_skills"]["duration_ms"]
+
+
+def test_timeouts_skip_dependents():
+    subtasks = [dict(SUBTASKS[0], delay=1, timeout=0.05), SUBTASKS[1], SUBTASKS[2]]
+    run = asyncio.run(DAGExecutor(_run).run(subtasks))
+    assert [r["status"] for r in run["results"]] == ["timed_out", "completed", "skipped"]
+
+
+def test_cycles_and_unknown_references_are_rejected():
+    with pytest.raises(ValueError):
+        build_graph([{"subtask_id": "a", "parameters": {"x": "{{b.result}}"}}])
+    with pytest.raises(ValueError):
+        build_graph([
+            {"subtask_id": "a", "parameters": {"x": "{{b.result}}"}},
+            {"subtask_id": "b", "parameters": {"x": "{{a.result}}"}}
+        ])
@@ -0,0 +1,48 @@
+"""
+Unit tests for bounded task history and its batched writer
+"""
+
+import asyncio
+
+from app.core.task_history import TaskHistory, TaskHistoryWriter
+
+
+class FakeCollection:
+    def __init__(self, fail_first: bool = False):
+        self.batches = []
+        self.fail_first = fail_first
+
+    async def insert_many(self, documents, ordered=True):
+        if self.fail_first:
+            self.fail_first = False
+            raise ConnectionError("unavailable")
+        self.batches.append(documents)
+
+
+def test_history_is_bounded_with_running_counts():
+    history = TaskHistory(capacity=3)
+    for i in range(5):
+        history.append({"task_id": i, "status": "failed" if i % 2 else "completed"})
+
+    assert len(history) == 5
+    assert [entry["task_id"] for entry in history] == [2, 3, 4]
+    assert history.recent(2) == [{"task_id": 4, "status": "completed"}, {"task_id": 3, "status": "failed"}]
+    assert history.counts == {"completed": 3, "failed": 2}
+
+
+def test_writer_batches_and_retries(monkeypatch):
+    collection = FakeCollection(fail_first=True)
+
+    async def get_mongodb():
+        return {"agent_task_history": collection}
+
+    monkeypatch.setattr("app.db.mongodb.get_mongodb", get_mongodb)
+    writer = TaskHistoryWriter(batch_size=2, max_pending=10)
+    for i in range(5):
+        writer.enqueue({"task_id": i, "task": {"payload": {1, 2}}, "result": None})
+
+    assert asyncio.run(writer.flush()) == 0
+    assert writer.get_stats()["pending"] == 5
+    assert asyncio.run(writer.flush()) == 5
+    assert [len(batch) for batch in collection.batches] == [2, 2, 1]
+    assert collection.batches[0][0]["task"] == {"payload": "{1, 2}"}
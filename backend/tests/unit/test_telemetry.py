@@ -0,0 +1,68 @@
+"""
+Unit tests for the telemetry histograms and ring buffers
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from app.core.telemetry import LatencyHistogram, RingBuffer, Telemetry, ROUTE, bucket_index, bucket_value
+
+
+def test_bucket_precision():
+    for micros in [0, 17, 64, 999, 12_345, 2_500_000, 90_000_000]:
+        assert bucket_value(bucket_index(micros)) == pytest.approx(micros, rel=0.02, abs=1)
+
+
+def test_percentiles_match_exact_values():
+    rng = random.Random(3)
+    values = sorted(int(rng.lognormvariate(11, 1)) for _ in range(50000))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    estimates = histogram.percentiles((50, 95, 99))
+    for p in (50, 95, 99):
+        exact = values[int(len(values) * p / 100) - 1] / 1000
+        assert estimates[f"p{p}"] == pytest.approx(exact, rel=0.03)
+
+
+def test_ring_buffer_keeps_most_recent():
+    ring = RingBuffer(capacity=3)
+    for value in range(5):
+        ring.append(value)
+    assert ring.values() == [2.0, 3.0, 4.0]
+
+
+def test_local_snapshot_counts_errors():
+    telemetry = Telemetry()
+    for status_code in (200, 200, 404, 500):
+        telemetry.record_request("GET /api/v1/skills", 0.01, status_code)
+    snapshot = telemetry.local_snapshot(ROUTE)
+    summary = snapshot["metrics"]["GET /api/v1/skills"]
+    assert (summary["requests"], summary["errors"], summary["client_errors"]) == (4, 1, 1)
+    assert snapshot["overall"]["error_rate"] == 0.25
+
+
+def test_platform_performance_reports_database_counts(monkeypatch):
+    from app.agents.analytics_agent import AnalyticsAgent, growth
+
+    class Sketches:
+        async def distinct_users(self, days):
+            return {"distinct_users": 40, "daily": []}
+
+    async def platform_counts(days):
+        return {"total_users": 500, "new_users": 60, "previous_users": 50, "new_jobs": 3, "previous_jobs": 0}
+
+    telemetry = Telemetry()
+    telemetry.record_request("GET /api/v1/skills", 0.01, 200)
+    monkeypatch.setattr("app.agents.analytics_agent.get_telemetry", lambda: telemetry)
+    agent = AnalyticsAgent.__new__(AnalyticsAgent)
+    agent.sketches = Sketches()
+    agent._platform_counts = platform_counts
+
+    report = asyncio.run(agent.analyze_platform_performance("week"))
+
+    assert report["metrics"]["total_users"] == 500 and "previous_users" not in report["metrics"]
+    assert report["growth_metrics"] == {"user_growth": "+20.0%", "job_growth": None, "application_growth": None}
+    assert growth(5, 10) == "-50.0%"
@@ -107,6 +107,9 @@ class Settings(BaseSettings):
     ENABLE_AGENT_LOGGING: bool = True
     ENABLE_AI_FEATURES: bool = True
     
+    # Statistics
+    STATS_CACHE_TTL_SECONDS: int = 30  # 0 disables the stats cache
+    
     # UAE Pass Integration
     UAE_PASS_CLIENT_ID: Optional[str] = None
     UAE_PASS_CLIENT_SECRET: Optional[str] = None
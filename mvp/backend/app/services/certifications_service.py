@@ -4,7 +4,7 @@ from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, date, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 
 from app.db.models.certifications import Certification
 from app.models.certifications import (
@@ -16,6 +16,7 @@ from app.models.certifications import (
     CertificationFilterParams,
     CertificationStatus
 )
+from app.services.stats_cache import cached_stats
 
 
 class CertificationsService:
@@ -145,11 +146,29 @@ class CertificationsService:
         self.db.commit()
         return True
     
+    @cached_stats("certifications")
     async def get_stats(self, user_id: UUID) -> CertificationStatsResponse:
         """Get certification statistics."""
-        certs = self.db.query(Certification).filter(Certification.user_id == user_id).all()
-        
-        if not certs:
+        today = date.today()
+        
+        # One aggregate query; rows are bounded by types x statuses
+        rows = self.db.query(
+            Certification.certification_type,
+            Certification.status,
+            func.count(Certification.id),
+            func.count(Certification.id).filter(Certification.is_verified.is_(True)),
+            func.count(Certification.id).filter(and_(
+                Certification.expiry_date > today,
+                Certification.expiry_date <= today + timedelta(days=90)
+            ))
+        ).filter(
+            Certification.user_id == user_id
+        ).group_by(
+            Certification.certification_type,
+            Certification.status
+        ).all()
+        
+        if not rows:
             return CertificationStatsResponse(
                 total_certifications=0,
                 by_type={},
@@ -162,37 +181,21 @@ class CertificationsService:
         
         by_type = {}
         by_status = {}
-        active_count = 0
-        expired_count = 0
         verified_count = 0
         expiring_soon_count = 0
         
-        for cert in certs:
-            # Count by type
-            cert_type = cert.certification_type.value
-            by_type[cert_type] = by_type.get(cert_type, 0) + 1
-            
-            # Count by status
-            status = cert.status.value
-            by_status[status] = by_status.get(status, 0) + 1
-            
-            if cert.status == CertificationStatus.ACTIVE:
-                active_count += 1
-            elif cert.status == CertificationStatus.EXPIRED:
-                expired_count += 1
-            
-            if cert.is_verified:
-                verified_count += 1
-            
-            if cert.is_expiring_soon:
-                expiring_soon_count += 1
+        for cert_type, status, count, verified, expiring_soon in rows:
+            by_type[cert_type.value] = by_type.get(cert_type.value, 0) + count
+            by_status[status.value] = by_status.get(status.value, 0) + count
+            verified_count += verified
+            expiring_soon_count += expiring_soon
         
         return CertificationStatsResponse(
-            total_certifications=len(certs),
+            total_certifications=sum(by_status.values()),
             by_type=by_type,
             by_status=by_status,
-            active_count=active_count,
-            expired_count=expired_count,
+            active_count=by_status.get(CertificationStatus.ACTIVE.value, 0),
+            expired_count=by_status.get(CertificationStatus.EXPIRED.value, 0),
             verified_count=verified_count,
             expiring_soon_count=expiring_soon_count
         )
@@ -23,6 +23,7 @@ from app.models.education import (
     EducationStatus,
     VerificationStatus
 )
+from app.services.stats_cache import cached_stats
 
 
 class EducationService:
@@ -269,6 +270,7 @@ class EducationService:
     # Statistics & Analytics
     # ========================================================================
     
+    @cached_stats("education")
     async def get_education_stats(self, user_id: UUID) -> EducationStatsResponse:
         """
         Get education statistics for a user.
@@ -279,11 +281,22 @@ class EducationService:
         Returns:
             Education statistics
         """
-        education_records = self.db.query(Education).filter(
+        # One aggregate query; rows are bounded by degree levels x statuses
+        rows = self.db.query(
+            Education.degree_level,
+            Education.status,
+            func.count(Education.id),
+            func.count(Education.id).filter(Education.is_verified.is_(True)),
+            func.sum(Education.gpa),
+            func.count(Education.gpa)
+        ).filter(
             Education.user_id == user_id
+        ).group_by(
+            Education.degree_level,
+            Education.status
         ).all()
         
-        if not education_records:
+        if not rows:
             return EducationStatsResponse(
                 total_records=0,
                 by_degree_level={},
@@ -293,24 +306,19 @@ class EducationService:
                 highest_degree=None
             )
         
-        # Count by degree level
         by_degree_level = {}
-        for record in education_records:
-            level = record.degree_level.value
-            by_degree_level[level] = by_degree_level.get(level, 0) + 1
-        
-        # Count by status
         by_status = {}
-        for record in education_records:
-            status = record.status.value
-            by_status[status] = by_status.get(status, 0) + 1
-        
-        # Count verified
-        verified_count = sum(1 for r in education_records if r.is_verified)
-        
-        # Calculate average GPA
-        gpas = [r.gpa for r in education_records if r.gpa is not None]
-        average_gpa = round(sum(gpas) / len(gpas), 2) if gpas else None
+        verified_count = 0
+        gpa_sum = 0.0
+        gpa_count = 0
+        for degree_level, status, count, verified, level_gpa_sum, level_gpa_count in rows:
+            by_degree_level[degree_level.value] = by_degree_level.get(degree_level.value, 0) + count
+            by_status[status.value] = by_status.get(status.value, 0) + count
+            verified_count += verified
+            gpa_sum += level_gpa_sum or 0.0
+            gpa_count += level_gpa_count
+        
+        average_gpa = round(gpa_sum / gpa_count, 2) if gpa_count else None
         
         # Find highest degree
         degree_hierarchy = {
@@ -325,12 +333,12 @@ class EducationService:
         }
         
         highest_degree = max(
-            education_records,
-            key=lambda x: degree_hierarchy.get(x.degree_level, 0)
-        ).degree_level if education_records else None
+            (row[0] for row in rows),
+            key=lambda level: degree_hierarchy.get(level, 0)
+        )
         
         return EducationStatsResponse(
-            total_records=len(education_records),
+            total_records=sum(by_status.values()),
             by_degree_level=by_degree_level,
             by_status=by_status,
             verified_count=verified_count,
@@ -11,6 +11,7 @@ from app.models.institutions import (
     InstitutionCreate, InstitutionUpdate, InstitutionResponse,
     InstitutionListResponse, InstitutionStatsResponse, InstitutionFilterParams
 )
+from app.services.stats_cache import cached_stats
 
 
 class InstitutionsService:
@@ -88,11 +89,26 @@ class InstitutionsService:
         self.db.commit()
         return True
     
+    @cached_stats("institutions")
     async def get_stats(self) -> InstitutionStatsResponse:
         """Get institution statistics."""
-        insts = self.db.query(Institution).all()
+        # One aggregate query; rows are bounded by the dimension values, not the table size
+        rows = self.db.query(
+            Institution.institution_type,
+            Institution.industry,
+            Institution.size,
+            Institution.emirate,
+            func.count(Institution.id),
+            func.count(Institution.id).filter(Institution.is_verified.is_(True)),
+            func.coalesce(func.sum(Institution.employee_count), 0)
+        ).group_by(
+            Institution.institution_type,
+            Institution.industry,
+            Institution.size,
+            Institution.emirate
+        ).all()
         
-        if not insts:
+        if not rows:
             return InstitutionStatsResponse(
                 total_institutions=0, by_type={}, by_industry={}, by_size={},
                 by_emirate={}, verified_count=0, total_employees=0, average_employee_count=0.0
@@ -102,26 +118,26 @@ class InstitutionsService:
         by_industry = {}
         by_size = {}
         by_emirate = {}
+        total_institutions = 0
         verified_count = 0
         total_employees = 0
         
-        for inst in insts:
-            by_type[inst.institution_type.value] = by_type.get(inst.institution_type.value, 0) + 1
-            by_industry[inst.industry.value] = by_industry.get(inst.industry.value, 0) + 1
-            by_size[inst.size.value] = by_size.get(inst.size.value, 0) + 1
-            by_emirate[inst.emirate] = by_emirate.get(inst.emirate, 0) + 1
-            if inst.is_verified:
-                verified_count += 1
-            total_employees += inst.employee_count
+        for inst_type, industry, size, emirate, count, verified, employees in rows:
+            by_type[inst_type.value] = by_type.get(inst_type.value, 0) + count
+            by_industry[industry.value] = by_industry.get(industry.value, 0) + count
+            by_size[size.value] = by_size.get(size.value, 0) + count
+            by_emirate[emirate] = by_emirate.get(emirate, 0) + count
+            total_institutions += count
+            verified_count += verified
+            total_employees += employees
         
         return InstitutionStatsResponse(
-            total_institutions=len(insts),
+            total_institutions=total_institutions,
             by_type=by_type,
             by_industry=by_industry,
             by_size=by_size,
             by_emirate=by_emirate,
             verified_count=verified_count,
             total_employees=total_employees,
-            average_employee_count=round(total_employees / len(insts), 1)
+            average_employee_count=round(total_employees / total_institutions, 1)
         )
-
@@ -4,7 +4,7 @@ Business logic for skills management
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, case
 from sqlalchemy.orm import selectinload
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
@@ -21,6 +21,7 @@ from app.models.skills import (
     ProficiencyLevel,
     SkillCategory
 )
+from app.services.stats_cache import cached_stats
 
 logger = logging.getLogger(__name__)
 
@@ -121,51 +122,39 @@ class SkillsService:
         logger.info(f"Updated skill: {skill.name} (ID: {skill.id})")
         return skill
     
+    @cached_stats("skill")
     async def get_skill_statistics(self, skill_id: str) -> Dict[str, Any]:
         """Get statistics for a skill"""
         skill = await self.get_skill_by_id(skill_id)
         if not skill:
             raise ValueError(f"Skill not found: {skill_id}")
         
-        # Count total users with this skill
-        total_users = await self.db.scalar(
-            select(func.count(UserSkill.id)).where(UserSkill.skill_id == skill_id)
+        # Proficiency weights (beginner=1, intermediate=2, advanced=3, expert=4)
+        proficiency_weight = case(
+            (UserSkill.proficiency_level == 'beginner', 1),
+            (UserSkill.proficiency_level == 'intermediate', 2),
+            (UserSkill.proficiency_level == 'advanced', 3),
+            (UserSkill.proficiency_level == 'expert', 4),
+            else_=0
         )
         
-        # Calculate average proficiency (beginner=1, intermediate=2, advanced=3, expert=4)
-        proficiency_map = {
-            'beginner': 1,
-            'intermediate': 2,
-            'advanced': 3,
-            'expert': 4
-        }
-        
-        user_skills = await self.db.execute(
-            select(UserSkill).where(UserSkill.skill_id == skill_id)
-        )
-        user_skills_list = user_skills.scalars().all()
-        
-        if user_skills_list:
-            avg_proficiency = sum(
-                proficiency_map.get(us.proficiency_level, 0) for us in user_skills_list
-            ) / len(user_skills_list)
-            
-            avg_experience = sum(
-                float(us.years_of_experience or 0) for us in user_skills_list
-            ) / len(user_skills_list)
-            
-            verified_count = sum(1 for us in user_skills_list if us.is_verified)
-        else:
-            avg_proficiency = 0
-            avg_experience = 0
-            verified_count = 0
+        # Single aggregate query instead of loading every holder of the skill
+        stats = (await self.db.execute(
+            select(
+                func.count(UserSkill.id),
+                func.avg(proficiency_weight),
+                func.avg(func.coalesce(UserSkill.years_of_experience, 0)),
+                func.count(UserSkill.id).filter(UserSkill.is_verified.is_(True))
+            ).where(UserSkill.skill_id == skill_id)
+        )).one()
+        total_users, avg_proficiency, avg_experience, verified_count = stats
         
         return {
             "skill_id": str(skill.id),
             "skill_name": skill.name,
             "total_users": total_users,
-            "average_proficiency": round(avg_proficiency, 2),
-            "average_experience": round(avg_experience, 2),
+            "average_proficiency": round(float(avg_proficiency or 0), 2),
+            "average_experience": round(float(avg_experience or 0), 2),
             "verified_count": verified_count
         }
     
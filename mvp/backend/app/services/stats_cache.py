@@ -0,0 +1,63 @@
+"""
+Statistics Cache.
+
+Short-lived in-process cache for aggregate statistics endpoints.
+"""
+
+from typing import Any, Callable, Dict, Tuple
+from functools import wraps
+import time
+
+from app.core.config import settings
+
+
+MAX_ENTRIES = 10000
+
+_entries: Dict[Tuple, Tuple[float, Any]] = {}
+
+
+def _make_room(now: float) -> None:
+    """Drop expired entries, or everything if the cache is still full."""
+    for key in [key for key, (expires_at, _) in _entries.items() if expires_at <= now]:
+        del _entries[key]
+    if len(_entries) >= MAX_ENTRIES:
+        _entries.clear()
+
+
+def cached_stats(name: str, ttl: int = None) -> Callable:
+    """
+    Cache the result of an async stats method for a few seconds.
+    
+    Results are keyed by name and the call arguments (excluding self), so
+    per-request service instances share entries. Stats may lag writes by
+    up to ttl seconds; a ttl of 0 disables caching.
+    
+    Args:
+        name: Cache namespace
+        ttl: Time to live in seconds (defaults to STATS_CACHE_TTL_SECONDS)
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            expires_in = settings.STATS_CACHE_TTL_SECONDS if ttl is None else ttl
+            if expires_in <= 0:
+                return await func(self, *args, **kwargs)
+            
+            key = (name, args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            entry = _entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+            
+            result = await func(self, *args, **kwargs)
+            if len(_entries) >= MAX_ENTRIES:
+                _make_room(now)
+            _entries[key] = (now + expires_in, result)
+            return result
+        return wrapper
+    return decorator
+
+
+def clear_stats_cache() -> None:
+    """Drop every cached statistic."""
+    _entries.clear()
@@ -0,0 +1,163 @@
+"""Benchmark memory and time of the aggregate statistics queries.
+
+Compares the previous row-loading implementation against the GROUP BY
+versions for institution and certification statistics as the tables grow.
+Peak Python memory of the aggregate path stays flat because the number of
+result rows depends on the dimension values, not on the table size.
+
+Usage:
+    python scripts/benchmark_stats.py [--sizes 1000 10000 100000] [--database-url sqlite://]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import asyncio
+import itertools
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.postgres import Base
+from app.db.models.user import User
+from app.db.models.institutions import Institution
+from app.db.models.certifications import Certification
+from app.models.institutions import InstitutionType, IndustryType, InstitutionSize
+from app.models.certifications import CertificationType, CertificationStatus
+from app.services.institutions_service import InstitutionsService
+from app.services.certifications_service import CertificationsService
+
+
+@compiles(UUID, "sqlite")
+def uuid_as_text(type_, compiler, **kw):
+    """Store UUIDs as text on SQLite.
+
+    A column declared UUID gets numeric affinity there, so hex ids such as
+    "1234e567..." were read back as floats.
+    """
+    return "CHAR(32)"
+
+
+EMIRATES = ["Abu Dhabi", "Dubai", "Sharjah", "Ajman", "Umm Al Quwain", "Ras Al Khaimah", "Fujairah"]
+
+
+def seed(db: Session, size: int, user_id: uuid.UUID) -> None:
+    """Insert size institutions and size certifications for one user."""
+    types = itertools.cycle(InstitutionType)
+    industries = itertools.cycle(IndustryType)
+    sizes = itertools.cycle(InstitutionSize)
+    db.bulk_insert_mappings(Institution, [
+        {
+            "id": uuid.uuid4(),
+            "name": f"Institution {i}",
+            "institution_type": next(types),
+            "industry": next(industries),
+            "size": next(sizes),
+            "email": f"contact{i}@example.ae",
+            "phone": "+971500000000",
+            "address_line1": "Street 1",
+            "city": "City",
+            "emirate": EMIRATES[i % len(EMIRATES)],
+            "trade_license_number": f"TL-{i}",
+            "established_date": date(2000, 1, 1),
+            "employee_count": 1 + i % 500,
+            "is_verified": i % 3 == 0
+        }
+        for i in range(size)
+    ])
+
+    cert_types = itertools.cycle(CertificationType)
+    statuses = itertools.cycle(CertificationStatus)
+    db.bulk_insert_mappings(Certification, [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "name": f"Certification {i}",
+            "issuing_organization": "Issuer",
+            "certification_type": next(cert_types),
+            "issue_date": date(2020, 1, 1),
+            "expiry_date": date.today() + timedelta(days=i % 400 - 100),
+            "status": next(statuses),
+            "is_verified": i % 2 == 0
+        }
+        for i in range(size)
+    ])
+    db.commit()
+
+
+def load_all_institutions(db: Session) -> int:
+    """Previous implementation: materialize every institution."""
+    return len(db.query(Institution).all())
+
+
+def load_all_certifications(db: Session, user_id: uuid.UUID) -> int:
+    """Previous implementation: materialize every certification of the user."""
+    return len(db.query(Certification).filter(Certification.user_id == user_id).all())
+
+
+def measure(fn):
+    """Return (peak KiB, milliseconds) of a call."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn()
+    elapsed = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    # Measure the queries, not the cache
+    settings.STATS_CACHE_TTL_SECONDS = 0
+
+    print(f"{'rows':>8} | {'stat':<15} | {'load-all KiB':>12} {'ms':>8} | {'aggregate KiB':>13} {'ms':>8}")
+    print("-" * 78)
+    for size in args.sizes:
+        engine = create_engine(args.database_url)
+        Base.metadata.create_all(engine, tables=[
+            User.__table__, Institution.__table__, Certification.__table__
+        ])
+        user_id = uuid.uuid4()
+        with Session(engine) as db:
+            seed(db, size, user_id)
+            db.expunge_all()
+
+            cases = [
+                (
+                    "institutions",
+                    lambda: load_all_institutions(db),
+                    lambda: asyncio.run(InstitutionsService(db).get_stats())
+                ),
+                (
+                    "certifications",
+                    lambda: load_all_certifications(db, user_id),
+                    lambda: asyncio.run(CertificationsService(db).get_stats(user_id))
+                )
+            ]
+            for name, load_all, aggregate in cases:
+                old_kib, old_ms = measure(load_all)
+                db.expunge_all()
+                new_kib, new_ms = measure(aggregate)
+                print(f"{size:>8} | {name:<15} | {old_kib:>12.0f} {old_ms:>8.1f} | {new_kib:>13.0f} {new_ms:>8.1f}")
+        Base.metadata.drop_all(engine, tables=[
+            Certification.__table__, Institution.__table__, User.__table__
+        ])
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,9 @@
 # NOOR Platform v7.1
 # Central coordinator for 31-agent AI workforce
 
-from anthropic import Anthropic
-from typing import List, Dict, Any, Optional
+from anthropic import AsyncAnthropic
+from typing import List, Dict, Any, Optional, Deque, Tuple, AsyncIterator, Set
+from collections import Counter, deque
 from datetime import datetime, timedelta
 from enum import Enum
 from pydantic import BaseModel, Field
@@ -11,10 +12,18 @@ import json
 import uuid
 import logging
 import asyncio
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# In-memory history bounds; older entries are dropped
+COMPLETED_TASK_HISTORY = 1000
+MCP_MESSAGE_HISTORY = 1000
+
+# Model calls per chat request; each call after the first answers tool results
+MAX_TOOL_ITERATIONS = 5
+
 # =============================================================================
 # ENUMS & TYPES
 # =============================================================================
@@ -108,6 +117,7 @@ class Task(BaseModel):
     priority: TaskPriority
     status: TaskStatus = TaskStatus.PENDING
     assigned_agent: Optional[AgentType] = None
+    assigned_agent_id: Optional[str] = None  # Instance chosen by the scheduler
     context: Dict[str, Any] = {}
     result: Optional[Dict[str, Any]] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -124,6 +134,7 @@ class MCPMessage(BaseModel):
     message_type: str  # "task_assignment", "status_update", "query", "response"
     payload: Dict[str, Any]
     correlation_id: Optional[str] = None
+    reply_to: Optional[str] = None  # Transport channel of the requester, for responses
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     requires_response: bool = False
 
@@ -132,6 +143,7 @@ class ConversationContext(BaseModel):
     conversation_id: str
     user_id: str
     messages: List[Dict[str, str]] = []
+    summary: Optional[str] = None  # Compacted memory of turns no longer in messages
     current_task: Optional[Task] = None
     session_start: datetime = Field(default_factory=datetime.utcnow)
     last_activity: datetime = Field(default_factory=datetime.utcnow)
@@ -159,23 +171,41 @@ class MasterOrchestrator:
         self.name = "NOOR Master Orchestrator"
 
         # Initialize Anthropic client
-        self.client = Anthropic(api_key=anthropic_api_key)
+        self.client = AsyncAnthropic(api_key=anthropic_api_key)
         self.model = "claude-opus-4-20250514"  # Latest and most capable model
 
-        # Agent registry
+        # Admission control over agent instances, sized by their profiles
+        from scheduler import AgentScheduler
+        self.scheduler = AgentScheduler.from_env()
+
+        # Agent registry; the version changes whenever the registry does
         self.agents: Dict[AgentType, AgentProfile] = {}
+        self.registry_version = 0
         self._initialize_agent_registry()
 
-        # Task queue
+        # System prompt blocks and tool schemas, built once per registry version
+        self._prompt_prefix_version: Optional[int] = None
+        self._system_blocks: List[Dict[str, Any]] = []
+        self._tools: List[Dict[str, Any]] = []
+        self.token_usage: Counter = Counter()  # Input/output/cache tokens, since start
+
+        # Task queue; durable when a TaskQueue is attached, in-process otherwise
+        self.task_queue = None
         self.pending_tasks: List[Task] = []
         self.active_tasks: Dict[str, Task] = {}
-        self.completed_tasks: List[Task] = []
+        self._completions: Set[asyncio.Task] = set()  # Awaiting agent responses to active tasks
+        self.completed_tasks: Deque[Task] = deque(maxlen=COMPLETED_TASK_HISTORY)
+        self.task_counts: Counter = Counter()  # Finished tasks by status, since start
 
-        # Active conversations
-        self.conversations: Dict[str, ConversationContext] = {}
+        # Active conversations; bounded in memory, persisted to Redis once connected
+        from conversation_store import ConversationStore
+        self.conversations = ConversationStore.from_env(summarize=self._summarize_turns)
 
-        # MCP message queue
-        self.mcp_messages: List[MCPMessage] = []
+        # MCP message bus, plus a bounded log of the messages sent from here
+        from mcp_bus import MCPBus
+        self.bus = MCPBus.from_env()
+        self.mcp_messages: Deque[MCPMessage] = deque(maxlen=MCP_MESSAGE_HISTORY)
+        self.mcp_message_count = 0
 
         logger.info(f"Master Orchestrator initialized: {self.agent_id}")
 
@@ -249,9 +279,55 @@ class MasterOrchestrator:
                 child_agents=orch["children"]
             )
             self.agents[orch["type"]] = profile
+            self.scheduler.register(profile)
 
+        self.registry_version += 1
         logger.info(f"Registered {len(self.agents)} agents in registry")
 
+    def register_agent(self, profile: AgentProfile):
+        """
+        Add an agent instance to the registry.
+
+        The first instance of a type is its registry entry; further instances
+        share the type's work through the scheduler.
+        """
+        current = self.agents.get(profile.agent_type)
+        if current is None or current.agent_id == profile.agent_id:
+            self.agents[profile.agent_type] = profile
+        self.scheduler.register(profile)
+        self.registry_version += 1
+
+    def _prompt_prefix(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        System prompt blocks and tool schemas for the current registry.
+
+        The prefix is identical across turns, so it is marked for prompt
+        caching: the breakpoint on the system block caches tools and system
+        prompt together, and later turns read them from the cache.
+        """
+        if self._prompt_prefix_version != self.registry_version:
+            self._system_blocks = [{
+                "type": "text",
+                "text": self._build_system_prompt(),
+                "cache_control": {"type": "ephemeral"}
+            }]
+            self._tools = self._get_available_tools()
+            self._prompt_prefix_version = self.registry_version
+        return self._system_blocks, self._tools
+
+    def _record_usage(self, response: Any) -> Dict[str, int]:
+        """Token usage of a response, including prompt cache reads and writes"""
+        usage = {
+            name: getattr(response.usage, name, None) or 0
+            for name in ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+        }
+        self.token_usage.update(usage)
+        logger.info(
+            f"Token usage: {usage['input_tokens']} input, {usage['cache_read_input_tokens']} cache read, "
+            f"{usage['cache_creation_input_tokens']} cache write, {usage['output_tokens']} output"
+        )
+        return usage
+
     async def handle_user_request(
         self,
         user_id: str,
@@ -262,66 +338,180 @@ class MasterOrchestrator:
         Handle incoming user request.
         Main entry point for user interactions.
         """
+        result: Dict[str, Any] = {}
+        async for event in self.stream_user_request(user_id, message, conversation_id, stream_tokens=False):
+            if event["type"] == "done":
+                result = {key: value for key, value in event.items() if key != "type"}
+        return result
+
+    async def stream_user_request(
+        self,
+        user_id: str,
+        message: str,
+        conversation_id: Optional[str] = None,
+        stream_tokens: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the agent loop for a user request, yielding events as it goes.
+
+        Events are {"type": "text"} deltas (when stream_tokens), {"type": "tool"}
+        per executed tool, and a final {"type": "done"} carrying the response,
+        usage and per-step timings.
+        """
         # Get or create conversation context
-        if conversation_id and conversation_id in self.conversations:
-            context = self.conversations[conversation_id]
-        else:
-            conversation_id = str(uuid.uuid4())
-            context = ConversationContext(
-                conversation_id=conversation_id,
-                user_id=user_id
-            )
-            self.conversations[conversation_id] = context
+        context = await self.conversations.get_or_create(user_id, conversation_id)
+        conversation_id = context.conversation_id
 
         # Add user message to context
         context.messages.append({
             "role": "user",
             "content": message
         })
-        context.last_activity = datetime.utcnow()
 
         logger.info(f"Processing request from user {user_id}: {message[:100]}...")
 
-        # Build system prompt for Master Orchestrator
-        system_prompt = self._build_system_prompt()
+        # Cached system prompt and tools; the memory of compacted turns follows the cached prefix
+        system_blocks, tools = self._prompt_prefix()
+        memory = self.conversations.memory_block(context).strip()
+        system = system_blocks + ([{"type": "text", "text": memory}] if memory else [])
 
-        # Prepare messages for Claude
-        messages = context.messages.copy()
+        # Prepare messages for Claude; recent turns within the token budget.
+        # Tool calls and results of this request are added as the loop runs.
+        messages = list(self.conversations.prompt_messages(context))
 
-        try:
-            # Call Claude API
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                system=system_prompt,
-                messages=messages,
-                tools=self._get_available_tools()
-            )
+        usage: Counter = Counter()
+        steps: List[Dict[str, Any]] = []
+        started = time.perf_counter()
 
-            # Process response
-            assistant_message = self._process_claude_response(response, context)
+        try:
+            assistant_message = ""
+            for iteration in range(MAX_TOOL_ITERATIONS):
+                step_started = time.perf_counter()
+                request = dict(model=self.model, max_tokens=4096, system=system, messages=messages, tools=tools)
+
+                if stream_tokens:
+                    async with self.client.messages.stream(**request) as stream:
+                        async for event in stream:
+                            if event.type == "text":
+                                yield {"type": "text", "text": event.text}
+                        response = await stream.get_final_message()
+                else:
+                    response = await self.client.messages.create(**request)
+
+                usage.update(self._record_usage(response))
+                steps.append({
+                    "step": "model",
+                    "iteration": iteration,
+                    "stop_reason": response.stop_reason,
+                    "duration_ms": round((time.perf_counter() - step_started) * 1000, 2)
+                })
+                assistant_message = "".join(block.text for block in response.content if block.type == "text")
+
+                tool_uses = [block for block in response.content if block.type == "tool_use"]
+                if response.stop_reason != "tool_use" or not tool_uses:
+                    break
+
+                # Independent tool calls of a turn run concurrently
+                tool_steps = await asyncio.gather(*(self._run_tool(block, context) for block in tool_uses))
+                for step in tool_steps:
+                    yield {"type": "tool", **{key: value for key, value in step.items() if key != "content"}}
+                steps.extend({key: value for key, value in step.items() if key != "content"} for step in tool_steps)
+
+                messages = messages + [
+                    {"role": "assistant", "content": [block.model_dump(exclude_none=True) for block in response.content]},
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "tool_result",
+                                "tool_use_id": block.id,
+                                "content": step["content"],
+                                "is_error": step["status"] != "success"
+                            }
+                            for block, step in zip(tool_uses, tool_steps)
+                        ]
+                    }
+                ]
+            else:
+                logger.warning(f"Conversation {conversation_id} reached {MAX_TOOL_ITERATIONS} tool iterations")
+                assistant_message = assistant_message or "I have started working on your request; please check back shortly."
 
-            # Add assistant message to context
+            # Only the final text is kept in the conversation; tool exchanges stay within the request
             context.messages.append({
                 "role": "assistant",
                 "content": assistant_message
             })
+            await self.conversations.save(context)
 
-            return {
+            yield {
+                "type": "done",
                 "conversation_id": conversation_id,
                 "response": assistant_message,
-                "status": "success"
+                "status": "success",
+                "usage": dict(usage),
+                "steps": steps,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2)
             }
 
         except Exception as e:
             logger.error(f"Error processing user request: {e}")
-            return {
+            await self.conversations.save(context)
+            yield {
+                "type": "done",
                 "conversation_id": conversation_id,
                 "response": "I apologize, but I encountered an error processing your request. Please try again.",
                 "status": "error",
-                "error": str(e)
+                "error": str(e),
+                "usage": dict(usage),
+                "steps": steps
             }
 
+    async def _run_tool(self, block: Any, context: ConversationContext) -> Dict[str, Any]:
+        """Execute one tool call; errors become error results for the model"""
+        from scheduler import AgentOverloaded
+
+        logger.info(f"Executing tool: {block.name} with input: {block.input}")
+        started = time.perf_counter()
+        try:
+            result = await self._execute_tool(block.name, block.input, context)
+            status = "error" if "error" in result else "success"
+        except AgentOverloaded as e:
+            logger.warning(f"Tool {block.name} shed: {e}")
+            result, status = {"error": str(e), "retry_after": e.retry_after}, "overloaded"
+        except Exception as e:
+            logger.error(f"Tool {block.name} failed: {e}")
+            result, status = {"error": str(e)}, "error"
+        return {
+            "step": "tool",
+            "tool": block.name,
+            "status": status,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "content": json.dumps(result, default=str)
+        }
+
+    async def _summarize_turns(self, summary: str, messages: List[Dict[str, Any]]) -> str:
+        """Fold conversation turns into the running summary with a small model"""
+        from conversation_store import CONVERSATION_SUMMARY_MODEL, content_text
+
+        transcript = "\n".join(f"{m['role'].upper()}: {content_text(m['content'])}" for m in messages)
+        prompt = (
+            f"Current summary:\n{summary or '(none)'}\n\n"
+            f"New turns:\n{transcript}\n\n"
+            "Update the summary to cover the new turns."
+        )
+
+        response = await self.client.messages.create(
+            model=CONVERSATION_SUMMARY_MODEL,
+            max_tokens=512,
+            system=(
+                "You maintain the memory of a NOOR career advisory conversation. Keep the user's goals, "
+                "background, preferences, decisions, open questions and any tasks created. Be concise; "
+                "write plain prose under 300 words in the language of the conversation."
+            ),
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return "".join(block.text for block in response.content if block.type == "text").strip()
+
     def _build_system_prompt(self) -> str:
         """Build comprehensive system prompt for Master Orchestrator"""
 
@@ -403,12 +593,8 @@ You are the intelligent face of NOOR. Be helpful, efficient, and trustworthy."""
                         "orchestrator_type": {
                             "type": "string",
                             "enum": [
-                                "talent_orchestrator",
-                                "learning_orchestrator",
-                                "operations_orchestrator",
-                                "compliance_orchestrator",
-                                "engagement_orchestrator",
-                                "insights_orchestrator"
+                                agent_type.value for agent_type, profile in self.agents.items()
+                                if profile.parent_orchestrator == AgentType.MASTER_ORCHESTRATOR
                             ],
                             "description": "Which category orchestrator to route to"
                         },
@@ -490,44 +676,7 @@ You are the intelligent face of NOOR. Be helpful, efficient, and trustworthy."""
             }
         ]
 
-    def _process_claude_response(
-        self,
-        response: Any,
-        context: ConversationContext
-    ) -> str:
-        """Process Claude's response and execute any tool calls"""
-
-        # Extract content and tool uses
-        content_blocks = response.content
-
-        text_response = ""
-        tool_results = []
-
-        for block in content_blocks:
-            if block.type == "text":
-                text_response = block.text
-
-            elif block.type == "tool_use":
-                # Execute tool
-                tool_name = block.name
-                tool_input = block.input
-
-                logger.info(f"Executing tool: {tool_name} with input: {tool_input}")
-
-                # Execute the tool
-                result = self._execute_tool(tool_name, tool_input, context)
-                tool_results.append({
-                    "tool": tool_name,
-                    "result": result
-                })
-
-        # If tools were used, append results to response
-        if tool_results:
-            text_response += "\n\n[Task routed to specialized agents]"
-
-        return text_response
-
-    def _execute_tool(
+    async def _execute_tool(
         self,
         tool_name: str,
         tool_input: Dict[str, Any],
@@ -536,7 +685,7 @@ You are the intelligent face of NOOR. Be helpful, efficient, and trustworthy."""
         """Execute a tool call"""
 
         if tool_name == "route_to_orchestrator":
-            return self._route_to_orchestrator(
+            return await self._route_to_orchestrator(
                 orchestrator_type=tool_input["orchestrator_type"],
                 task_description=tool_input["task_description"],
                 priority=tool_input["priority"],
@@ -548,7 +697,7 @@ You are the intelligent face of NOOR. Be helpful, efficient, and trustworthy."""
             return self._get_agent_status(tool_input["agent_type"])
 
         elif tool_name == "create_task":
-            return self._create_task(
+            return await self._create_task(
                 task_type=tool_input["task_type"],
                 description=tool_input["description"],
                 priority=tool_input["priority"],
@@ -564,7 +713,7 @@ You are the intelligent face of NOOR. Be helpful, efficient, and trustworthy."""
         else:
             return {"error": f"Unknown tool: {tool_name}"}
 
-    def _route_to_orchestrator(
+    async def _route_to_orchestrator(
         self,
         orchestrator_type: str,
         task_description: str,
@@ -572,7 +721,14 @@ You are the intelligent face of NOOR. Be helpful, efficient, and trustworthy."""
         context: Dict[str, Any],
         user_id: str
     ) -> Dict[str, Any]:
-        """Route task to category orchestrator"""
+        """
+        Route task to category orchestrator.
+
+        Raises:
+            AgentOverloaded: The orchestrator has no free capacity and its wait
+                queue is full or timed out
+        """
+        from mcp_bus import MCPUndeliverable
 
         # Create task
         task = Task(
@@ -586,52 +742,169 @@ You are the intelligent face of NOOR. Be helpful, efficient, and trustworthy."""
             assigned_at=datetime.utcnow()
         )
 
-        # Add to active tasks
-        self.active_tasks[task.task_id] = task
+        if self.task_queue is not None and self.task_queue.enabled:
+            # Dispatched by whichever worker dequeues it; admission happens there,
+            # so only shed load here when this process's wait queue is full
+            self.scheduler.check(task.assigned_agent)
+            await self.task_queue.enqueue(task)
+        else:
+            # Holds a slot until the agent answers, fails or the lease times out
+            profile = await self.scheduler.admit(task.assigned_agent, task.task_id)
+            task.assigned_agent_id = profile.agent_id
+            self.active_tasks[task.task_id] = task
+            try:
+                message = self._task_message(task)
+                response = await self.bus.start_request(message)
+            except MCPUndeliverable as e:
+                self.complete_task(task.task_id, error_message=str(e))
+                logger.warning(f"Task {task.task_id} not delivered: {e}")
+                return {
+                    "status": "failed",
+                    "task_id": task.task_id,
+                    "assigned_to": orchestrator_type,
+                    "message": f"{orchestrator_type} is unreachable"
+                }
+            except Exception as e:
+                self.complete_task(task.task_id, error_message=str(e))
+                raise
+            self._log_message(message)
+            completion = asyncio.create_task(self._await_completion(task, response))
+            self._completions.add(completion)
+            completion.add_done_callback(self._completions.discard)
+
+        logger.info(f"Routed task {task.task_id} to {orchestrator_type}")
+
+        return {
+            "status": "routed",
+            "task_id": task.task_id,
+            "assigned_to": orchestrator_type,
+            "message": f"Task assigned to {orchestrator_type}"
+        }
+
+    def _task_message(self, task: Task) -> MCPMessage:
+        """Task assignment message for a routed task"""
+
+        if task.assigned_agent is None:
+            raise ValueError(f"Task {task.task_id} has no assigned agent")
 
-        # Send MCP message to orchestrator
-        message = MCPMessage(
+        return MCPMessage(
             from_agent=AgentType.MASTER_ORCHESTRATOR,
-            to_agent=AgentType(orchestrator_type),
+            to_agent=task.assigned_agent,
             message_type="task_assignment",
             payload={
                 "task_id": task.task_id,
-                "description": task_description,
-                "priority": priority,
-                "context": context
+                "description": task.description,
+                "priority": task.priority.value,
+                "context": task.context
             },
+            correlation_id=task.task_id,
             requires_response=True
         )
+
+    def _log_message(self, message: MCPMessage):
         self.mcp_messages.append(message)
+        self.mcp_message_count += 1
 
-        logger.info(f"Routed task {task.task_id} to {orchestrator_type}")
+    async def execute_task(self, task: Task) -> Dict[str, Any]:
+        """Dispatch a routed task to its assigned agent over MCP"""
+
+        message = self._task_message(task)
+        delivered = await self.bus.publish(message)
+        self._log_message(message)
 
         return {
-            "status": "routed",
-            "task_id": task.task_id,
-            "assigned_to": orchestrator_type,
-            "message": f"Task assigned to {orchestrator_type}"
+            "dispatched_to": task.assigned_agent.value,
+            "agent_id": task.assigned_agent_id,
+            "message_id": message.message_id,
+            "delivered": delivered
         }
 
+    async def _await_completion(self, task: Task, response: asyncio.Future):
+        """Complete an active task when its agent answers, or fail it after the lease timeout"""
+
+        try:
+            message = await asyncio.wait_for(response, self.scheduler.lease_timeout)
+        except asyncio.TimeoutError:
+            self.complete_task(task.task_id, error_message=f"No response from {task.assigned_agent.value}")
+        except asyncio.CancelledError:
+            self.complete_task(task.task_id, error_message="Cancelled")
+            raise
+        else:
+            error = message.payload.get("error")
+            self.complete_task(task.task_id, result=message.payload, error_message=str(error) if error else None)
+
+    async def run_queued_task(self, task: Task) -> Dict[str, Any]:
+        """
+        Task queue handler: run a task under its agent's capacity limit.
+
+        The slot is held until the agent answers, as for in-process routes.
+
+        Raises:
+            MCPUndeliverable: No consumer of the agent is reachable
+            asyncio.TimeoutError: The agent did not answer within the lease timeout
+            RuntimeError: The agent answered with an error
+        """
+
+        profile = await self.scheduler.admit(task.assigned_agent, task.task_id, timeout=self.scheduler.lease_timeout)
+        task.assigned_agent_id = profile.agent_id
+        try:
+            message = self._task_message(task)
+            response = await self.bus.start_request(message)
+            self._log_message(message)
+            reply = await asyncio.wait_for(response, self.scheduler.lease_timeout)
+        finally:
+            self.scheduler.release(task.task_id)
+
+        error = reply.payload.get("error")
+        if error:
+            raise RuntimeError(str(error))
+        return reply.payload
+
+    def complete_task(
+        self,
+        task_id: str,
+        result: Optional[Dict[str, Any]] = None,
+        error_message: Optional[str] = None
+    ) -> Optional[Task]:
+        """Move an active task to the bounded completed history"""
+
+        task = self.active_tasks.pop(task_id, None)
+        if task is None:
+            return None
+        self.scheduler.release(task_id)
+
+        task.completed_at = datetime.utcnow()
+        task.status = TaskStatus.FAILED if error_message else TaskStatus.COMPLETED
+        task.result = result
+        task.error_message = error_message
+        if task.assigned_at:
+            task.execution_time_ms = (task.completed_at - task.assigned_at).total_seconds() * 1000
+
+        self.completed_tasks.append(task)
+        self.task_counts[task.status.value] += 1
+        return task
+
     def _get_agent_status(self, agent_type: str) -> Dict[str, Any]:
         """Get agent status"""
 
         try:
             agent = self.agents.get(AgentType(agent_type))
             if agent:
+                # Live load across every instance of the type
+                load = self.scheduler.get_load(agent.agent_type)
                 return {
                     "agent_type": agent_type,
-                    "is_online": agent.is_online,
-                    "current_load": agent.current_load,
-                    "max_load": agent.max_load,
-                    "availability": (agent.max_load - agent.current_load) / agent.max_load
+                    "is_online": any(instance["is_online"] for instance in load["instances"]),
+                    "max_load": load["capacity"],
+                    "availability": round(1 - load["utilization"], 3) if load["capacity"] else 0.0,
+                    **load
                 }
             else:
                 return {"error": "Agent not found"}
         except:
             return {"error": "Invalid agent type"}
 
-    def _create_task(
+    async def _create_task(
         self,
         task_type: str,
         description: str,
@@ -647,7 +920,10 @@ You are the intelligent face of NOOR. Be helpful, efficient, and trustworthy."""
             priority=TaskPriority(priority)
         )
 
-        self.pending_tasks.append(task)
+        if self.task_queue is not None and self.task_queue.enabled:
+            await self.task_queue.save(task)
+        else:
+            self.pending_tasks.append(task)
 
         return {
             "task_id": task.task_id,
@@ -1,15 +1,20 @@
 # Master Orchestrator REST API
 # NOOR Platform v7.1
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
+import json
 import logging
 import os
 
 from agent import MasterOrchestrator, TaskPriority
+from mcp_bus import MCP_BUS_TRANSPORT, MCPUndeliverable
+from scheduler import AgentOverloaded
+from task_queue import TaskQueue, TaskWorkerPool, TASK_QUEUE_WORKERS, redis_url
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -34,6 +39,10 @@ app.add_middleware(
 anthropic_api_key = os.getenv("ANTHROPIC_API_KEY", "")
 orchestrator = MasterOrchestrator(anthropic_api_key)
 
+# Durable task queue; connected at startup
+task_queue = TaskQueue.from_env()
+worker_pool: Optional[TaskWorkerPool] = None
+
 # =============================================================================
 # REQUEST/RESPONSE MODELS
 # =============================================================================
@@ -43,11 +52,14 @@ class ChatRequest(BaseModel):
     message: str
     conversation_id: Optional[str] = None
     metadata: Dict[str, Any] = {}
+    stream: bool = False  # Server-sent events with text deltas, tool steps and a final "done" event
 
 class ChatResponse(BaseModel):
     conversation_id: str
     response: str
     status: str
+    usage: Optional[Dict[str, int]] = None  # Includes prompt cache read/write tokens
+    steps: List[Dict[str, Any]] = []  # Timing of each model call and tool execution
     timestamp: datetime = datetime.utcnow()
 
 class AgentStatusResponse(BaseModel):
@@ -56,11 +68,34 @@ class AgentStatusResponse(BaseModel):
     current_load: int
     max_load: int
     availability: float
+    capacity: int = 0
+    utilization: float = 0.0
+    queued: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    average_wait_ms: float = 0.0
+    instances: List[Dict[str, Any]] = []
+
+class RouteTaskRequest(BaseModel):
+    user_id: str
+    orchestrator_type: str
+    description: str
+    priority: TaskPriority = TaskPriority.MEDIUM
+    context: Dict[str, Any] = {}
 
 # =============================================================================
 # API ENDPOINTS
 # =============================================================================
 
+@app.exception_handler(AgentOverloaded)
+async def agent_overloaded_handler(request: Request, exc: AgentOverloaded):
+    """Shed load with 429 and a retry hint"""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(exc), "agent_type": exc.agent_type.value, "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 @app.post("/api/v1/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -68,6 +103,17 @@ async def chat(request: ChatRequest):
     """
     logger.info(f"Chat request from user {request.user_id}")
 
+    if request.stream:
+        async def events():
+            async for event in orchestrator.stream_user_request(
+                user_id=request.user_id,
+                message=request.message,
+                conversation_id=request.conversation_id
+            ):
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
     try:
         result = await orchestrator.handle_user_request(
             user_id=request.user_id,
@@ -78,7 +124,9 @@ async def chat(request: ChatRequest):
         return ChatResponse(
             conversation_id=result["conversation_id"],
             response=result["response"],
-            status=result["status"]
+            status=result["status"],
+            usage=result.get("usage"),
+            steps=result.get("steps", [])
         )
 
     except Exception as e:
@@ -117,25 +165,40 @@ async def list_agents():
         "agents": agents
     }
 
+@app.post("/api/v1/tasks", status_code=status.HTTP_202_ACCEPTED)
+async def route_task(request: RouteTaskRequest):
+    """Route a task to a category orchestrator; 429 with Retry-After when it is at capacity"""
+    try:
+        return await orchestrator._route_to_orchestrator(
+            orchestrator_type=request.orchestrator_type,
+            task_description=request.description,
+            priority=request.priority.value,
+            context=request.context,
+            user_id=request.user_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/api/v1/tasks")
-async def list_tasks(user_id: Optional[str] = None, status: Optional[str] = None):
-    """List tasks with optional filtering"""
+async def list_tasks(user_id: Optional[str] = None, status: Optional[str] = None, limit: int = 100):
+    """List tasks with optional filtering, newest first"""
     tasks = []
 
-    # Combine all tasks
-    all_tasks = (
-        orchestrator.pending_tasks +
-        list(orchestrator.active_tasks.values()) +
-        orchestrator.completed_tasks
-    )
+    if task_queue.enabled:
+        # Shared index; covers tasks of every replica and survives restarts
+        all_tasks = await task_queue.list_tasks(user_id=user_id, status=status, limit=limit)
+    else:
+        all_tasks = [
+            task for task in (
+                orchestrator.pending_tasks +
+                list(orchestrator.active_tasks.values()) +
+                list(orchestrator.completed_tasks)
+            )
+            if (not user_id or task.user_id == user_id) and (not status or task.status.value == status)
+        ]
+        all_tasks = sorted(all_tasks, key=lambda task: task.created_at, reverse=True)[:limit]
 
-    # Filter
     for task in all_tasks:
-        if user_id and task.user_id != user_id:
-            continue
-        if status and task.status.value != status:
-            continue
-
         tasks.append({
             "task_id": task.task_id,
             "user_id": task.user_id,
@@ -155,18 +218,19 @@ async def list_tasks(user_id: Optional[str] = None, status: Optional[str] = None
 @app.get("/api/v1/conversations/{conversation_id}")
 async def get_conversation(conversation_id: str):
     """Get conversation details"""
-    if conversation_id not in orchestrator.conversations:
+    context = await orchestrator.conversations.get(conversation_id)
+    if context is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    context = orchestrator.conversations[conversation_id]
-
     return {
         "conversation_id": context.conversation_id,
         "user_id": context.user_id,
         "messages": context.messages,
         "session_start": context.session_start.isoformat(),
         "last_activity": context.last_activity.isoformat(),
-        "message_count": len(context.messages)
+        "message_count": len(context.messages),
+        "summary": context.summary,
+        "summarized_turns": context.metadata.get("summarized_turns", 0)
     }
 
 @app.get("/health")
@@ -178,6 +242,13 @@ async def health_check():
         "version": "7.1.0",
         "agents_registered": len(orchestrator.agents),
         "active_tasks": len(orchestrator.active_tasks),
+        "cached_conversations": len(orchestrator.conversations),
+        "token_usage": dict(orchestrator.token_usage),
+        "finished_tasks": dict(orchestrator.task_counts),
+        "mcp_messages": orchestrator.mcp_message_count,
+        "mcp_bus": orchestrator.bus.get_stats(),
+        "task_queue": await task_queue.get_stats(),
+        "task_workers": worker_pool.get_stats() if worker_pool else None,
         "timestamp": datetime.utcnow().isoformat()
     }
 
@@ -197,14 +268,33 @@ async def readiness_check():
 @app.on_event("startup")
 async def startup_event():
     """Initialize on startup"""
+    global worker_pool
     logger.info("Master Orchestrator API starting up...")
     # TODO: Initialize database connections
+
+    await orchestrator.conversations.connect(redis_url())
+    if MCP_BUS_TRANSPORT == "redis":
+        await orchestrator.bus.connect(redis_url())
+    if await task_queue.connect():
+        orchestrator.task_queue = task_queue
+        if TASK_QUEUE_WORKERS > 0:
+            worker_pool = TaskWorkerPool(
+                task_queue, orchestrator.run_queued_task,
+                concurrency=TASK_QUEUE_WORKERS,
+                retry_on=(MCPUndeliverable,)
+            )
+            worker_pool.start()
     # TODO: Initialize Kafka consumers for MCP messages
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Master Orchestrator API shutting down...")
+    if worker_pool:
+        await worker_pool.stop()
+    await task_queue.close()
+    await orchestrator.conversations.close()
+    await orchestrator.bus.close()
     # TODO: Close database connections
     # TODO: Close Kafka connections
 
@@ -0,0 +1,245 @@
+# Conversation Store
+# NOOR Platform v7.1
+# Bounded conversation contexts with Redis persistence and background compaction
+
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import redis.asyncio as redis
+import asyncio
+import json
+import logging
+import os
+import uuid
+
+from agent import ConversationContext
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+CONVERSATION_CACHE_SIZE = int(os.getenv("CONVERSATION_CACHE_SIZE", "1000"))
+CONVERSATION_IDLE_TTL_SECONDS = int(os.getenv("CONVERSATION_IDLE_TTL_SECONDS", str(24 * 3600)))
+CONVERSATION_TOKEN_BUDGET = int(os.getenv("CONVERSATION_TOKEN_BUDGET", "8000"))  # History tokens sent per turn
+CONVERSATION_COMPACT_MIN_TOKENS = int(os.getenv("CONVERSATION_COMPACT_MIN_TOKENS", "2000"))
+CONVERSATION_MAX_MESSAGES = int(os.getenv("CONVERSATION_MAX_MESSAGES", "200"))
+CONVERSATION_SUMMARY_MODEL = os.getenv("CONVERSATION_SUMMARY_MODEL", "claude-3-haiku-20240307")
+
+CONVERSATION_KEY = "noor:conversation:{conversation_id}"
+
+# Rough size of a token in characters; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+
+def content_text(content: Any) -> str:
+    """Plain text of a message content (a string or a list of content blocks)"""
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, default=str)
+
+
+def estimate_tokens(message: Dict[str, Any]) -> int:
+    return len(content_text(message.get("content", ""))) // CHARS_PER_TOKEN + 4
+
+
+# =============================================================================
+# CONVERSATION STORE
+# =============================================================================
+
+class ConversationStore:
+    """
+    Conversation contexts for the Master Orchestrator.
+
+    Provides:
+    - An LRU of recently active conversations in memory, backed by Redis so
+      contexts survive restarts; both expire after an idle TTL
+    - A sliding window of recent turns within a token budget for each prompt
+    - Background compaction: turns that have slid out of the window are
+      summarized into context.summary and dropped from the context
+    - A hard cap on stored turns, in case summarization is unavailable
+    """
+
+    def __init__(
+        self,
+        summarize: Optional[Callable[[str, List[Dict[str, Any]]], Awaitable[str]]] = None,
+        capacity: int = 1000,
+        idle_ttl: int = 24 * 3600,
+        token_budget: int = 8000,
+        compact_min_tokens: int = 2000,
+        max_messages: int = 200
+    ):
+        self.summarize = summarize
+        self.capacity = capacity
+        self.idle_ttl = idle_ttl
+        self.token_budget = token_budget
+        self.compact_min_tokens = compact_min_tokens
+        self.max_messages = max_messages
+        self.redis: Optional[redis.Redis] = None
+        self._cache: "OrderedDict[str, ConversationContext]" = OrderedDict()
+        self._compacting: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_env(
+        cls,
+        summarize: Optional[Callable[[str, List[Dict[str, Any]]], Awaitable[str]]] = None
+    ) -> "ConversationStore":
+        return cls(
+            summarize=summarize,
+            capacity=CONVERSATION_CACHE_SIZE,
+            idle_ttl=CONVERSATION_IDLE_TTL_SECONDS,
+            token_budget=CONVERSATION_TOKEN_BUDGET,
+            compact_min_tokens=CONVERSATION_COMPACT_MIN_TOKENS,
+            max_messages=CONVERSATION_MAX_MESSAGES
+        )
+
+    async def connect(self, url: str) -> bool:
+        """Connect the Redis backing; contexts stay in memory only if Redis is unreachable"""
+        client = redis.from_url(url, decode_responses=True)
+        try:
+            await client.ping()
+        except Exception as e:
+            logger.warning(f"Conversation store running without Redis: {e}")
+            await client.close()
+            return False
+        self.redis = client
+        return True
+
+    async def close(self):
+        for task in self._compacting.values():
+            task.cancel()
+        await asyncio.gather(*self._compacting.values(), return_exceptions=True)
+        if self.redis is not None:
+            await self.redis.close()
+            self.redis = None
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    # -------------------------------------------------------------------------
+    # Storage
+    # -------------------------------------------------------------------------
+
+    def _remember(self, context: ConversationContext):
+        """Put a context at the head of the LRU, evicting idle and excess entries"""
+        self._cache[context.conversation_id] = context
+        self._cache.move_to_end(context.conversation_id)
+
+        idle_before = datetime.utcnow() - timedelta(seconds=self.idle_ttl)
+        while self._cache:
+            oldest = next(iter(self._cache.values()))
+            if len(self._cache) <= self.capacity and oldest.last_activity >= idle_before:
+                break
+            self._cache.popitem(last=False)
+
+    async def get(self, conversation_id: str) -> Optional[ConversationContext]:
+        """Context of a conversation, from memory or Redis"""
+        context = self._cache.get(conversation_id)
+        if context is not None:
+            self._cache.move_to_end(conversation_id)
+            return context
+
+        if self.redis is None:
+            return None
+        try:
+            data = await self.redis.get(CONVERSATION_KEY.format(conversation_id=conversation_id))
+        except Exception as e:
+            logger.warning(f"Conversation read failed for {conversation_id}: {e}")
+            return None
+        if data is None:
+            return None
+        context = ConversationContext.model_validate_json(data)
+        self._remember(context)
+        return context
+
+    async def get_or_create(self, user_id: str, conversation_id: Optional[str] = None) -> ConversationContext:
+        context = await self.get(conversation_id) if conversation_id else None
+        if context is None or context.user_id != user_id:
+            context = ConversationContext(conversation_id=str(uuid.uuid4()), user_id=user_id)
+            self._remember(context)
+        return context
+
+    async def save(self, context: ConversationContext):
+        """Store a context, refresh its idle TTL and compact it if due"""
+        context.last_activity = datetime.utcnow()
+        if len(context.messages) > self.max_messages:
+            dropped = len(context.messages) - self.max_messages
+            context.messages = context.messages[dropped:]
+            context.metadata["dropped_turns"] = context.metadata.get("dropped_turns", 0) + dropped
+        self._remember(context)
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(
+                    CONVERSATION_KEY.format(conversation_id=context.conversation_id),
+                    context.model_dump_json(),
+                    ex=self.idle_ttl
+                )
+            except Exception as e:
+                logger.warning(f"Conversation write failed for {context.conversation_id}: {e}")
+
+        self._schedule_compaction(context)
+
+    # -------------------------------------------------------------------------
+    # Prompt window
+    # -------------------------------------------------------------------------
+
+    def _window_start(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Index of the first message of the window within the token budget.
+
+        The window always holds the latest message and starts on a user turn.
+        """
+        used = 0
+        start = len(messages)
+        for index in range(len(messages) - 1, -1, -1):
+            used += estimate_tokens(messages[index])
+            if used > self.token_budget and start < len(messages):
+                break
+            start = index
+        while start < len(messages) - 1 and messages[start].get("role") != "user":
+            start += 1
+        return start
+
+    def prompt_messages(self, context: ConversationContext) -> List[Dict[str, Any]]:
+        """Recent turns to send with the next request"""
+        return context.messages[self._window_start(context.messages):]
+
+    @staticmethod
+    def memory_block(context: ConversationContext) -> str:
+        """System prompt section with the summary of compacted turns"""
+        if not context.summary:
+            return ""
+        return f"\n\n# CONVERSATION MEMORY\n\nSummary of earlier turns in this conversation:\n{context.summary}"
+
+    # -------------------------------------------------------------------------
+    # Compaction
+    # -------------------------------------------------------------------------
+
+    def _schedule_compaction(self, context: ConversationContext):
+        if self.summarize is None or context.conversation_id in self._compacting:
+            return
+        start = self._window_start(context.messages)
+        if sum(estimate_tokens(message) for message in context.messages[:start]) < self.compact_min_tokens:
+            return
+        task = asyncio.create_task(self._compact(context, start))
+        self._compacting[context.conversation_id] = task
+        task.add_done_callback(lambda _: self._compacting.pop(context.conversation_id, None))
+
+    async def _compact(self, context: ConversationContext, count: int):
+        """Fold the oldest turns into the summary"""
+        older = context.messages[:count]
+        try:
+            summary = await self.summarize(context.summary or "", older)
+        except Exception as e:
+            logger.warning(f"Conversation summarization failed for {context.conversation_id}: {e}")
+            return
+
+        # Turns may have been added (or capped) meanwhile; drop exactly the summarized ones
+        summarized = {id(message) for message in older}
+        context.summary = summary
+        context.messages = [message for message in context.messages if id(message) not in summarized]
+        context.metadata["summarized_turns"] = context.metadata.get("summarized_turns", 0) + count
+        logger.info(f"Compacted {count} turns of conversation {context.conversation_id}")
+        await self.save(context)
@@ -0,0 +1,475 @@
+# MCP Message Bus
+# NOOR Platform v7.1
+# In-process async pub/sub for inter-agent MCP messages, with optional Redis Streams transport
+
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Iterable, Set
+from collections import Counter
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+import asyncio
+import logging
+import os
+import uuid
+
+from agent import AgentType, MCPMessage
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+MCP_QUEUE_SIZE = int(os.getenv("MCP_QUEUE_SIZE", "1000"))  # Per-agent mailbox bound
+MCP_SEND_TIMEOUT_SECONDS = float(os.getenv("MCP_SEND_TIMEOUT_SECONDS", "5"))
+MCP_REQUEST_TIMEOUT_SECONDS = float(os.getenv("MCP_REQUEST_TIMEOUT_SECONDS", "30"))
+MCP_BUS_TRANSPORT = os.getenv("MCP_BUS_TRANSPORT", "local")  # "local" or "redis"
+MCP_STREAM_MAXLEN = int(os.getenv("MCP_STREAM_MAXLEN", "10000"))  # Per agent stream
+MCP_CLAIM_IDLE_SECONDS = int(os.getenv("MCP_CLAIM_IDLE_SECONDS", "60"))  # Redeliver unacknowledged messages after
+
+# One stream per agent type, read through a single consumer group so each
+# message reaches one replica; responses go to the requesting process only
+AGENT_STREAM = "noor:mcp:agent:{agent_type}"
+AGENT_GROUP = "agents"
+REPLY_CHANNEL = "noor:mcp:reply:{bus_id}"
+STREAM_READ_COUNT = 100
+STREAM_BLOCK_MS = 1000
+
+
+class MCPBackpressure(Exception):
+    """A recipient's mailbox stayed full for the whole send timeout"""
+
+
+class MCPUndeliverable(Exception):
+    """No consumer is registered for the recipient, locally or over the transport"""
+
+# =============================================================================
+# SUBSCRIPTIONS
+# =============================================================================
+
+class Subscription:
+    """
+    Fan-out subscription to messages passing through the bus.
+
+    Observers never slow the bus down: when the subscription's queue is
+    full the oldest message is dropped and counted.
+    """
+
+    def __init__(
+        self,
+        bus: "MCPBus",
+        message_types: Optional[Iterable[str]] = None,
+        agents: Optional[Iterable[AgentType]] = None,
+        maxsize: int = 1000
+    ):
+        self.bus = bus
+        self.message_types: Optional[Set[str]] = set(message_types) if message_types else None
+        self.agents: Optional[Set[AgentType]] = set(agents) if agents else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def matches(self, message: MCPMessage) -> bool:
+        if self.message_types is not None and message.message_type not in self.message_types:
+            return False
+        if self.agents is not None and message.from_agent not in self.agents and message.to_agent not in self.agents:
+            return False
+        return True
+
+    def offer(self, message: MCPMessage):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout: Optional[float] = None) -> MCPMessage:
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> MCPMessage:
+        return await self.queue.get()
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+# =============================================================================
+# MESSAGE BUS
+# =============================================================================
+
+class MCPBus:
+    """
+    Message bus for the agent workforce.
+
+    Provides:
+    - A bounded mailbox per agent type with a local consumer; publishers wait
+      for space up to a send timeout, then get MCPBackpressure
+    - Request/response: request() awaits the response whose correlation_id
+      is the request's message_id (start_request() returns it as a future);
+      respond() builds that response
+    - Fan-out subscriptions by message type and/or agent for observers
+    - An optional Redis transport: agents without a local consumer are
+      reached over per-agent streams, each read by one consumer group, so
+      a message is handled by exactly one replica of the agent and is
+      acknowledged once it is in a mailbox; responses come back on a
+      per-process reply channel
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 1000,
+        send_timeout: float = 5,
+        request_timeout: float = 30,
+        stream_maxlen: int = 10000,
+        claim_idle: int = 60
+    ):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.request_timeout = request_timeout
+        self.stream_maxlen = stream_maxlen
+        self.claim_idle = claim_idle
+        self.bus_id = str(uuid.uuid4())
+        self._mailboxes: Dict[AgentType, asyncio.Queue] = {}
+        self._subscriptions: List[Subscription] = []
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._consumers: List[asyncio.Task] = []
+        self.counts: Counter = Counter()
+
+        # Redis transport
+        self.redis: Optional[redis.Redis] = None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._stream_reader: Optional[asyncio.Task] = None
+        self._groups: Set[AgentType] = set()  # Agent streams whose consumer group exists
+
+    @classmethod
+    def from_env(cls) -> "MCPBus":
+        return cls(
+            queue_size=MCP_QUEUE_SIZE,
+            send_timeout=MCP_SEND_TIMEOUT_SECONDS,
+            request_timeout=MCP_REQUEST_TIMEOUT_SECONDS,
+            stream_maxlen=MCP_STREAM_MAXLEN,
+            claim_idle=MCP_CLAIM_IDLE_SECONDS
+        )
+
+    @property
+    def reply_channel(self) -> str:
+        return REPLY_CHANNEL.format(bus_id=self.bus_id)
+
+    # -------------------------------------------------------------------------
+    # Consumers
+    # -------------------------------------------------------------------------
+
+    def register(self, agent_type: AgentType) -> asyncio.Queue:
+        """Mailbox of an agent consumed in this process"""
+        mailbox = self._mailboxes.get(agent_type)
+        if mailbox is None:
+            mailbox = self._mailboxes[agent_type] = asyncio.Queue(maxsize=self.queue_size)
+            if self.redis is not None:
+                asyncio.get_running_loop().create_task(self._join_group(agent_type))
+        return mailbox
+
+    async def receive(self, agent_type: AgentType, timeout: Optional[float] = None) -> MCPMessage:
+        """Next message for an agent"""
+        return await asyncio.wait_for(self.register(agent_type).get(), timeout)
+
+    def serve(
+        self,
+        agent_type: AgentType,
+        handler: Callable[[MCPMessage], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> asyncio.Task:
+        """
+        Consume an agent's mailbox with a handler.
+
+        The handler's return value answers messages that require a response;
+        handler errors are answered with {"error": ...}.
+        """
+        mailbox = self.register(agent_type)
+
+        async def consume():
+            while True:
+                message = await mailbox.get()
+                try:
+                    result = await handler(message)
+                except Exception as e:
+                    logger.error(f"MCP handler of {agent_type.value} failed on {message.message_id}: {e}")
+                    result = {"error": str(e)}
+                if message.requires_response:
+                    try:
+                        await self.respond(message, result or {})
+                    except Exception as e:
+                        logger.warning(f"MCP response to {message.message_id} failed: {e}")
+
+        task = asyncio.create_task(consume())
+        self._consumers.append(task)
+        return task
+
+    def subscribe(
+        self,
+        message_types: Optional[Iterable[str]] = None,
+        agents: Optional[Iterable[AgentType]] = None,
+        maxsize: int = 1000
+    ) -> Subscription:
+        """Observe messages by type and/or sending or receiving agent"""
+        subscription = Subscription(self, message_types, agents, maxsize)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    # -------------------------------------------------------------------------
+    # Publishing
+    # -------------------------------------------------------------------------
+
+    async def _deliver(self, message: MCPMessage, timeout: Optional[float]) -> bool:
+        """Deliver within this process; False when there is no local recipient"""
+        for subscription in self._subscriptions:
+            if subscription.matches(message):
+                subscription.offer(message)
+
+        if message.message_type == "response" and message.correlation_id in self._pending:
+            future = self._pending[message.correlation_id]
+            if not future.done():
+                future.set_result(message)
+            return True
+
+        mailbox = self._mailboxes.get(message.to_agent)
+        if mailbox is None:
+            return False
+        if mailbox.full():
+            self.counts["backpressure_waits"] += 1
+            try:
+                await asyncio.wait_for(mailbox.put(message), self.send_timeout if timeout is None else timeout)
+            except asyncio.TimeoutError:
+                self.counts["rejected"] += 1
+                raise MCPBackpressure(f"Mailbox of {message.to_agent.value} is full ({self.queue_size} messages)")
+        else:
+            mailbox.put_nowait(message)
+        return True
+
+    async def publish(self, message: MCPMessage, timeout: Optional[float] = None) -> bool:
+        """
+        Send a message to its recipient.
+
+        Returns:
+            False when no consumer of the recipient was reachable
+
+        Raises:
+            MCPBackpressure: The recipient's mailbox stayed full for the send timeout
+        """
+        self.counts["published"] += 1
+        if await self._deliver(message, timeout):
+            self.counts["delivered"] += 1
+            return True
+
+        if self.redis is not None:
+            if message.message_type == "response" and message.reply_to:
+                forwarded = await self.redis.publish(message.reply_to, message.model_dump_json())
+            else:
+                # Agent streams exist once a consumer has joined their group
+                forwarded = await self.redis.xadd(
+                    AGENT_STREAM.format(agent_type=message.to_agent.value),
+                    {"message": message.model_dump_json()},
+                    maxlen=self.stream_maxlen,
+                    approximate=True,
+                    nomkstream=True
+                )
+            if forwarded:
+                self.counts["forwarded"] += 1
+                return True
+
+        self.counts["undeliverable"] += 1
+        return False
+
+    async def start_request(self, message: MCPMessage) -> asyncio.Future:
+        """
+        Send a message and return the future of its response without waiting.
+
+        The future is forgotten once done or cancelled.
+
+        Raises:
+            MCPUndeliverable: No consumer of the recipient is reachable
+            MCPBackpressure: The recipient's mailbox stayed full
+        """
+        message.requires_response = True
+        if self.redis is not None:
+            message.reply_to = self.reply_channel
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message.message_id] = future
+        future.add_done_callback(lambda _: self._pending.pop(message.message_id, None))
+        try:
+            if not await self.publish(message):
+                raise MCPUndeliverable(f"No consumer for {message.to_agent.value}")
+        except BaseException:
+            future.cancel()
+            raise
+        return future
+
+    async def request(self, message: MCPMessage, timeout: Optional[float] = None) -> MCPMessage:
+        """
+        Send a message and wait for its response.
+
+        Raises:
+            MCPUndeliverable: No consumer of the recipient is reachable
+            MCPBackpressure: The recipient's mailbox stayed full
+            asyncio.TimeoutError: No response within the request timeout
+        """
+        future = await self.start_request(message)
+        return await asyncio.wait_for(future, self.request_timeout if timeout is None else timeout)
+
+    async def respond(self, request: MCPMessage, payload: Dict[str, Any]) -> bool:
+        """Answer a message that requires a response"""
+        return await self.publish(MCPMessage(
+            from_agent=request.to_agent,
+            to_agent=request.from_agent,
+            message_type="response",
+            payload=payload,
+            correlation_id=request.message_id,
+            reply_to=request.reply_to
+        ))
+
+    # -------------------------------------------------------------------------
+    # Redis transport
+    # -------------------------------------------------------------------------
+
+    async def connect(self, url: str) -> bool:
+        """Enable the Redis transport; the bus stays in-process if Redis is unreachable"""
+        client = redis.from_url(url, decode_responses=True)
+        try:
+            await client.ping()
+            pubsub = client.pubsub()
+            await pubsub.subscribe(self.reply_channel)
+        except Exception as e:
+            logger.warning(f"MCP bus running in-process only: {e}")
+            await client.close()
+            return False
+
+        self.redis, self._pubsub = client, pubsub
+        for agent_type in list(self._mailboxes):
+            await self._join_group(agent_type)
+        self._listener = asyncio.create_task(self._listen())
+        self._stream_reader = asyncio.create_task(self._read_streams())
+        logger.info(f"MCP bus connected to Redis transport ({self.bus_id})")
+        return True
+
+    async def _join_group(self, agent_type: AgentType):
+        """Create the consumer group of an agent's stream, shared by every replica consuming it"""
+        try:
+            await self.redis.xgroup_create(
+                AGENT_STREAM.format(agent_type=agent_type.value), AGENT_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                logger.error(f"MCP stream of {agent_type.value} unavailable: {e}")
+                return
+        except Exception as e:
+            logger.error(f"MCP stream of {agent_type.value} unavailable: {e}")
+            return
+        self._groups.add(agent_type)
+
+    async def _listen(self):
+        """Deliver responses from the transport to pending requests"""
+        while True:
+            try:
+                item = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if item is None:
+                    continue
+                message = MCPMessage.model_validate_json(item["data"])
+                self.counts["received"] += 1
+                if not await self._deliver(message, timeout=0):
+                    self.counts["undeliverable"] += 1
+            except asyncio.CancelledError:
+                raise
+            except MCPBackpressure as e:
+                logger.warning(f"Dropped MCP message from transport: {e}")
+            except Exception as e:
+                logger.error(f"MCP transport error: {e}")
+                await asyncio.sleep(1)
+
+    async def _claim(self, stream: str) -> List[tuple]:
+        """Entries another consumer read but never acknowledged, e.g. a replica that died"""
+        claimed = await self.redis.xautoclaim(
+            stream, AGENT_GROUP, self.bus_id,
+            min_idle_time=self.claim_idle * 1000,
+            start_id="0-0",
+            count=STREAM_READ_COUNT
+        )
+        return [(entry_id, fields) for entry_id, fields in claimed[1] if fields]
+
+    async def _receive(self, stream: str, entry_id: str, fields: Dict[str, str]):
+        """Deliver a stream entry to its local mailbox and acknowledge it"""
+        message = MCPMessage.model_validate_json(fields["message"])
+        self.counts["received"] += 1
+        try:
+            delivered = await self._deliver(message, timeout=None)
+        except MCPBackpressure as e:
+            # Left unacknowledged; claimed again after the idle timeout
+            logger.warning(f"MCP message {message.message_id} deferred: {e}")
+            return
+        if not delivered:
+            self.counts["undeliverable"] += 1
+        await self.redis.xack(stream, AGENT_GROUP, entry_id)
+
+    async def _poll(self, claim: bool = False) -> int:
+        """Deliver the next entries of the agent streams, after reclaimed ones; returns how many"""
+        streams = {AGENT_STREAM.format(agent_type=agent_type.value): ">" for agent_type in self._groups}
+        received = 0
+        if claim:
+            for stream in streams:
+                for entry_id, fields in await self._claim(stream):
+                    await self._receive(stream, entry_id, fields)
+                    received += 1
+
+        response = await self.redis.xreadgroup(
+            AGENT_GROUP, self.bus_id, streams, count=STREAM_READ_COUNT, block=STREAM_BLOCK_MS
+        )
+        for stream, entries in response or []:
+            for entry_id, fields in entries:
+                await self._receive(stream, entry_id, fields)
+                received += 1
+        return received
+
+    async def _read_streams(self):
+        """Consume the streams of agents with a local mailbox as one member of their groups"""
+        loop = asyncio.get_running_loop()
+        next_claim = loop.time()
+        while True:
+            try:
+                if not self._groups:
+                    await asyncio.sleep(1)
+                    continue
+                claim = loop.time() >= next_claim
+                if claim:
+                    next_claim = loop.time() + self.claim_idle / 2
+                await self._poll(claim)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"MCP transport error: {e}")
+                await asyncio.sleep(1)
+
+    async def close(self):
+        transport = [task for task in (self._listener, self._stream_reader) if task]
+        for task in self._consumers + transport:
+            task.cancel()
+        await asyncio.gather(*self._consumers, *transport, return_exceptions=True)
+        self._consumers, self._listener, self._stream_reader = [], None, None
+        self._groups.clear()
+        if self._pubsub is not None:
+            await self._pubsub.close()
+            self._pubsub = None
+        if self.redis is not None:
+            await self.redis.close()
+            self.redis = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "transport": "redis" if self.redis is not None else "local",
+            **dict(self.counts),
+            "pending_requests": len(self._pending),
+            "mailboxes": {agent_type.value: mailbox.qsize() for agent_type, mailbox in self._mailboxes.items()},
+            "subscriptions": len(self._subscriptions),
+            "subscription_drops": sum(subscription.dropped for subscription in self._subscriptions)
+        }
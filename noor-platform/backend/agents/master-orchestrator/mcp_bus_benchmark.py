@@ -0,0 +1,104 @@
+# MCP Message Bus Benchmark
+# NOOR Platform v7.1
+# Throughput of the MCP bus at various payload sizes
+#
+# Usage:
+#   python mcp_bus_benchmark.py [--messages 20000] [--redis redis://localhost:6379/0]
+#
+# In-process delivery passes message objects by reference, so payload size
+# barely matters; with --redis, messages cross between two buses over the
+# transport and are serialized both ways.
+
+import argparse
+import asyncio
+import time
+
+from agent import AgentType, MCPMessage
+from mcp_bus import MCPBus
+
+PAYLOAD_SIZES = [64, 1024, 16 * 1024, 128 * 1024]
+
+
+def message(size: int, message_type: str = "task_assignment") -> MCPMessage:
+    return MCPMessage(
+        from_agent=AgentType.MASTER_ORCHESTRATOR,
+        to_agent=AgentType.TALENT_ORCHESTRATOR,
+        message_type=message_type,
+        payload={"data": "x" * size}
+    )
+
+
+async def one_way(sender: MCPBus, receiver: MCPBus, count: int, size: int, subscribers: int = 0) -> float:
+    """Messages per second from one publisher to one consumer, with optional fan-out observers"""
+    received = asyncio.Event()
+    seen = 0
+
+    async def handler(_: MCPMessage):
+        nonlocal seen
+        seen += 1
+        if seen == count:
+            received.set()
+
+    consumer = receiver.serve(AgentType.TALENT_ORCHESTRATOR, handler)
+    await asyncio.sleep(0.1)  # Let the consumer join the agent's stream group
+    observers = [sender.subscribe() for _ in range(subscribers)]
+    messages = [message(size) for _ in range(count)]
+
+    started = time.perf_counter()
+    for item in messages:
+        await sender.publish(item)
+    await received.wait()
+    elapsed = time.perf_counter() - started
+
+    consumer.cancel()
+    for observer in observers:
+        observer.close()
+    return count / elapsed
+
+
+async def round_trip(sender: MCPBus, receiver: MCPBus, count: int, size: int, concurrency: int = 32) -> float:
+    """Request/response pairs per second"""
+    consumer = receiver.serve(AgentType.TALENT_ORCHESTRATOR, lambda request: asyncio.sleep(0, {"ok": True}))
+    await asyncio.sleep(0.1)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call():
+        async with semaphore:
+            await sender.request(message(size, "query"))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(count)))
+    elapsed = time.perf_counter() - started
+
+    consumer.cancel()
+    return count / elapsed
+
+
+async def main(count: int, redis_url: str = None):
+    # In-process messages are passed by reference, so bytes per second only means something over the transport
+    bandwidth = f" {'MB/s':>8}" if redis_url else ""
+    print(f"{'payload':>10} {'one-way msg/s':>15}{bandwidth} {'4 subscribers':>15} {'request/s':>12}")
+    for size in PAYLOAD_SIZES:
+        n = max(count // max(size // 1024, 1), 500)
+        sender = MCPBus(queue_size=1000)
+        receiver = sender
+        if redis_url:
+            # Separate buses, as in two processes, so messages cross the transport
+            receiver = MCPBus(queue_size=1000)
+            await sender.connect(redis_url)
+            await receiver.connect(redis_url)
+        rate = await one_way(sender, receiver, n, size)
+        fanout = await one_way(sender, receiver, n, size, subscribers=4)
+        requests = await round_trip(sender, receiver, max(n // 4, 200), size)
+        await sender.close()
+        await receiver.close()
+        bandwidth = f" {rate * size / 1e6:>8.1f}" if redis_url else ""
+        print(f"{size:>10} {rate:>15,.0f}{bandwidth} {fanout:>15,.0f} {requests:>12,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MCP bus throughput benchmark")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--redis", default=None, help="Redis URL; benchmark the transport between two buses")
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.redis))
@@ -0,0 +1,228 @@
+# Agent Scheduler
+# NOOR Platform v7.1
+# Load-aware admission control and routing for registered agents
+
+from typing import Dict, Any, Optional
+from collections import Counter
+import asyncio
+import logging
+import math
+import os
+import time
+
+from agent import AgentProfile, AgentType
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+SCHEDULER_QUEUE_TIMEOUT_SECONDS = float(os.getenv("SCHEDULER_QUEUE_TIMEOUT_SECONDS", "5"))
+SCHEDULER_MAX_QUEUED = int(os.getenv("SCHEDULER_MAX_QUEUED", "50"))  # Waiting requests per agent type
+SCHEDULER_LEASE_TIMEOUT_SECONDS = float(os.getenv("SCHEDULER_LEASE_TIMEOUT_SECONDS", "300"))
+
+
+class AgentOverloaded(Exception):
+    """Every instance of an agent type is at capacity and its wait queue is full or timed out"""
+
+    def __init__(self, agent_type: AgentType, retry_after: int):
+        super().__init__(f"{agent_type.value} is at capacity; retry after {retry_after}s")
+        self.agent_type = agent_type
+        self.retry_after = retry_after
+
+
+def agent_capacity(profile: AgentProfile) -> int:
+    """Concurrent tasks an agent admits: its max_load, capped by its capabilities"""
+    limits = [profile.max_load] + [capability.max_concurrent_tasks for capability in profile.capabilities]
+    return max(min(limits), 1)
+
+# =============================================================================
+# SCHEDULER
+# =============================================================================
+
+class AgentScheduler:
+    """
+    Admission control for agent tasks.
+
+    Provides:
+    - A semaphore per agent instance sized by its AgentProfile limits; the
+      profile's current_load tracks the slots in use
+    - Least-loaded routing among online instances of the same agent type
+    - A bounded wait queue per agent type; callers that cannot be admitted
+      within the queue timeout (or find the queue full) get AgentOverloaded
+      with a retry-after estimate
+    - Leases released on task completion, or expired after a timeout when
+      an agent never reports back
+    """
+
+    def __init__(self, queue_timeout: float = 5, max_queued: int = 50, lease_timeout: float = 300):
+        self.queue_timeout = queue_timeout
+        self.max_queued = max_queued
+        self.lease_timeout = lease_timeout
+        self.instances: Dict[AgentType, Dict[str, AgentProfile]] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._released: Dict[AgentType, asyncio.Condition] = {}
+        self._waiting: Counter = Counter()
+        self._leases: Dict[str, tuple] = {}  # task_id -> (agent_type, agent_id, admitted_at)
+        self.admitted: Counter = Counter()
+        self.rejected: Counter = Counter()
+        self.wait_ms: Counter = Counter()
+
+    @classmethod
+    def from_env(cls) -> "AgentScheduler":
+        return cls(
+            queue_timeout=SCHEDULER_QUEUE_TIMEOUT_SECONDS,
+            max_queued=SCHEDULER_MAX_QUEUED,
+            lease_timeout=SCHEDULER_LEASE_TIMEOUT_SECONDS
+        )
+
+    def register(self, profile: AgentProfile):
+        """Add an agent instance; instances of the same type are interchangeable"""
+        self.instances.setdefault(profile.agent_type, {})[profile.agent_id] = profile
+        if profile.agent_id not in self._semaphores:
+            self._semaphores[profile.agent_id] = asyncio.Semaphore(agent_capacity(profile))
+        self._released.setdefault(profile.agent_type, asyncio.Condition())
+
+    # -------------------------------------------------------------------------
+    # Admission
+    # -------------------------------------------------------------------------
+
+    def _least_loaded(self, agent_type: AgentType) -> Optional[AgentProfile]:
+        """Online instance with a free slot and the lowest utilization"""
+        candidates = [
+            profile for profile in self.instances.get(agent_type, {}).values()
+            if profile.is_online and not self._semaphores[profile.agent_id].locked()
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda profile: profile.current_load / agent_capacity(profile))
+
+    async def _take(self, profile: AgentProfile, task_id: str):
+        # Only called for an unlocked semaphore, which is acquired without suspending
+        await self._semaphores[profile.agent_id].acquire()
+        profile.current_load += 1
+        self._leases[task_id] = (profile.agent_type, profile.agent_id, time.monotonic())
+
+    def retry_after(self, agent_type: AgentType) -> int:
+        """Seconds until a slot is likely free, from the instances' response times"""
+        instances = list(self.instances.get(agent_type, {}).values())
+        if not instances:
+            return 1
+        capacity = sum(agent_capacity(profile) for profile in instances)
+        response_ms = max(
+            (capability.average_response_time_ms for profile in instances for capability in profile.capabilities),
+            default=1000.0
+        )
+        return max(math.ceil(response_ms / 1000 * (self._waiting[agent_type] + 1) / capacity), 1)
+
+    async def admit(self, agent_type: AgentType, task_id: str, timeout: Optional[float] = None) -> AgentProfile:
+        """
+        Reserve a slot on the least-loaded instance of an agent type.
+
+        Waits up to timeout seconds (the queue timeout by default) for a slot
+        to be released.
+
+        Raises:
+            AgentOverloaded: The wait queue is full or no slot freed in time
+            ValueError: No instance of the agent type is registered
+        """
+        if not self.instances.get(agent_type):
+            raise ValueError(f"No registered instance of {agent_type.value}")
+        self._expire_leases()
+
+        profile = self._least_loaded(agent_type)
+        if profile is not None:
+            await self._take(profile, task_id)
+            self.admitted[agent_type] += 1
+            return profile
+
+        if self._waiting[agent_type] >= self.max_queued:
+            self.rejected[agent_type] += 1
+            raise AgentOverloaded(agent_type, self.retry_after(agent_type))
+
+        timeout = self.queue_timeout if timeout is None else timeout
+        released = self._released[agent_type]
+        started = time.monotonic()
+        self._waiting[agent_type] += 1
+        try:
+            async with released:
+                await asyncio.wait_for(
+                    released.wait_for(lambda: self._least_loaded(agent_type) is not None),
+                    timeout
+                )
+                profile = self._least_loaded(agent_type)
+                await self._take(profile, task_id)
+        except asyncio.TimeoutError:
+            self.rejected[agent_type] += 1
+            raise AgentOverloaded(agent_type, self.retry_after(agent_type))
+        finally:
+            self._waiting[agent_type] -= 1
+
+        self.admitted[agent_type] += 1
+        self.wait_ms[agent_type] += (time.monotonic() - started) * 1000
+        return profile
+
+    def check(self, agent_type: AgentType):
+        """
+        Shed load without reserving a slot.
+
+        Raises:
+            AgentOverloaded: No instance has a free slot and the wait queue is full
+        """
+        if self._least_loaded(agent_type) is None and self._waiting[agent_type] >= self.max_queued:
+            self.rejected[agent_type] += 1
+            raise AgentOverloaded(agent_type, self.retry_after(agent_type))
+
+    def release(self, task_id: str) -> bool:
+        """Free the slot held by a task; unknown task ids are ignored"""
+        lease = self._leases.pop(task_id, None)
+        if lease is None:
+            return False
+        agent_type, agent_id, _ = lease
+        self._semaphores[agent_id].release()
+        profile = self.instances[agent_type][agent_id]
+        profile.current_load = max(profile.current_load - 1, 0)
+        asyncio.get_running_loop().create_task(self._notify(agent_type))
+        return True
+
+    async def _notify(self, agent_type: AgentType):
+        released = self._released[agent_type]
+        async with released:
+            released.notify()
+
+    def _expire_leases(self):
+        """Release slots of tasks whose agents never reported completion"""
+        cutoff = time.monotonic() - self.lease_timeout
+        for task_id in [task_id for task_id, lease in self._leases.items() if lease[2] < cutoff]:
+            logger.warning(f"Lease of task {task_id} expired; releasing its slot")
+            self.release(task_id)
+
+    # -------------------------------------------------------------------------
+    # Metrics
+    # -------------------------------------------------------------------------
+
+    def get_load(self, agent_type: AgentType) -> Dict[str, Any]:
+        """Live load of an agent type and each of its instances"""
+        instances = list(self.instances.get(agent_type, {}).values())
+        capacity = sum(agent_capacity(profile) for profile in instances)
+        load = sum(profile.current_load for profile in instances)
+        admitted = self.admitted[agent_type]
+        return {
+            "current_load": load,
+            "capacity": capacity,
+            "utilization": round(load / capacity, 3) if capacity else 0.0,
+            "queued": self._waiting[agent_type],
+            "admitted": admitted,
+            "rejected": self.rejected[agent_type],
+            "average_wait_ms": round(self.wait_ms[agent_type] / admitted, 2) if admitted else 0.0,
+            "instances": [
+                {
+                    "agent_id": profile.agent_id,
+                    "is_online": profile.is_online,
+                    "current_load": profile.current_load,
+                    "capacity": agent_capacity(profile)
+                }
+                for profile in instances
+            ]
+        }
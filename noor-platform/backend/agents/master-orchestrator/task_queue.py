@@ -0,0 +1,465 @@
+# Durable Task Queue
+# NOOR Platform v7.1
+# Redis Streams task queue and worker pool for routed agent tasks
+
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Tuple, Type
+from datetime import datetime
+from pydantic import BaseModel
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+import asyncio
+import logging
+import os
+import socket
+
+from agent import Task, TaskPriority, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", "")
+REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+
+TASK_QUEUE_WORKERS = int(os.getenv("TASK_QUEUE_WORKERS", "4"))  # Per process; 0 for API-only replicas
+TASK_VISIBILITY_TIMEOUT_SECONDS = int(os.getenv("TASK_VISIBILITY_TIMEOUT_SECONDS", "60"))
+TASK_MAX_DELIVERIES = int(os.getenv("TASK_MAX_DELIVERIES", "3"))
+TASK_RETENTION_SECONDS = int(os.getenv("TASK_RETENTION_SECONDS", str(7 * 24 * 3600)))
+TASK_STREAM_MAXLEN = int(os.getenv("TASK_STREAM_MAXLEN", "100000"))
+
+# Share of dequeues each priority gets while all queues are backlogged
+PRIORITY_WEIGHTS: Dict[TaskPriority, int] = {
+    TaskPriority.CRITICAL: 8,
+    TaskPriority.HIGH: 4,
+    TaskPriority.MEDIUM: 2,
+    TaskPriority.LOW: 1
+}
+
+STREAM_KEY = "noor:tasks:stream:{priority}"
+CONSUMER_GROUP = "task-workers"
+
+# Task documents and the sorted-set indexes (scored by creation time) behind /api/v1/tasks
+TASK_KEY = "noor:task:{task_id}"
+INDEX_KEY = "noor:tasks:index"
+USER_INDEX_KEY = "noor:tasks:index:user:{user_id}"
+STATUS_INDEX_KEY = "noor:tasks:index:status:{status}"
+
+FINISHED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED)
+
+
+def redis_url() -> str:
+    """Redis connection URL from the environment"""
+    if REDIS_PASSWORD:
+        return f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
+    return f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
+
+
+class Lease(BaseModel):
+    """A task delivered to a worker; it is redelivered unless acknowledged in time"""
+    priority: TaskPriority
+    entry_id: str
+    task: Task
+    deliveries: int = 1
+
+# =============================================================================
+# TASK QUEUE
+# =============================================================================
+
+class TaskQueue:
+    """
+    Durable task queue on Redis Streams.
+
+    Provides:
+    - One stream per TaskPriority, read through a shared consumer group so
+      any number of worker processes can share the load
+    - Weighted-fair dequeuing (smooth weighted round-robin over PRIORITY_WEIGHTS),
+      so lower priorities keep moving while higher ones are backlogged
+    - Visibility timeouts: unacknowledged entries idle past the timeout are
+      reclaimed by another worker, up to TASK_MAX_DELIVERIES deliveries
+    - A task index (documents plus sorted sets by user and status) that
+      survives restarts and is shared by every replica
+    """
+
+    def __init__(
+        self,
+        url: str,
+        visibility_timeout: int = 60,
+        max_deliveries: int = 3,
+        retention: int = 7 * 24 * 3600,
+        stream_maxlen: int = 100000
+    ):
+        self.url = url
+        self.visibility_timeout = visibility_timeout
+        self.max_deliveries = max_deliveries
+        self.retention = retention
+        self.stream_maxlen = stream_maxlen
+        self.redis: Optional[redis.Redis] = None
+        self._credits: Dict[TaskPriority, int] = {priority: 0 for priority in PRIORITY_WEIGHTS}
+
+    @property
+    def enabled(self) -> bool:
+        return self.redis is not None
+
+    async def connect(self) -> bool:
+        """Connect and create the consumer groups; the queue stays disabled if Redis is unreachable"""
+        client = redis.from_url(self.url, decode_responses=True)
+        try:
+            await client.ping()
+            for priority in PRIORITY_WEIGHTS:
+                try:
+                    await client.xgroup_create(
+                        STREAM_KEY.format(priority=priority.value), CONSUMER_GROUP, id="0", mkstream=True
+                    )
+                except ResponseError as e:
+                    if "BUSYGROUP" not in str(e):
+                        raise
+        except Exception as e:
+            logger.warning(f"Task queue unavailable, using in-process tasks: {e}")
+            await client.close()
+            return False
+
+        self.redis = client
+        logger.info("Task queue connected")
+        return True
+
+    async def close(self):
+        if self.redis is not None:
+            await self.redis.close()
+            self.redis = None
+
+    # -------------------------------------------------------------------------
+    # Index
+    # -------------------------------------------------------------------------
+
+    def _index(self, pipe, task: Task, previous_status: Optional[TaskStatus] = None):
+        """Queue the document and index writes of a task on a pipeline"""
+        score = task.created_at.timestamp()
+        key = TASK_KEY.format(task_id=task.task_id)
+        if task.status in FINISHED_STATUSES:
+            pipe.set(key, task.model_dump_json(), ex=self.retention)
+        else:
+            pipe.set(key, task.model_dump_json())
+        pipe.zadd(INDEX_KEY, {task.task_id: score})
+        pipe.zadd(USER_INDEX_KEY.format(user_id=task.user_id), {task.task_id: score})
+        if previous_status is not None and previous_status != task.status:
+            pipe.zrem(STATUS_INDEX_KEY.format(status=previous_status.value), task.task_id)
+        pipe.zadd(STATUS_INDEX_KEY.format(status=task.status.value), {task.task_id: score})
+
+    async def save(self, task: Task, previous_status: Optional[TaskStatus] = None):
+        """Store a task in the index without queueing it for execution"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._index(pipe, task, previous_status)
+            await pipe.execute()
+
+    async def get(self, task_id: str) -> Optional[Task]:
+        data = await self.redis.get(TASK_KEY.format(task_id=task_id))
+        return Task.model_validate_json(data) if data else None
+
+    async def list_tasks(
+        self,
+        user_id: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Task]:
+        """Most recent tasks, newest first, from the index"""
+        if user_id:
+            key = USER_INDEX_KEY.format(user_id=user_id)
+        elif status:
+            key = STATUS_INDEX_KEY.format(status=status)
+        else:
+            key = INDEX_KEY
+
+        # With both filters the per-user set is read whole and filtered by status
+        task_ids = await self.redis.zrevrange(key, 0, -1 if user_id and status else limit - 1)
+        if not task_ids:
+            return []
+
+        tasks, expired = [], []
+        for task_id, data in zip(task_ids, await self.redis.mget([TASK_KEY.format(task_id=t) for t in task_ids])):
+            if data is None:
+                expired.append(task_id)
+                continue
+            task = Task.model_validate_json(data)
+            if status and task.status.value != status:
+                continue
+            tasks.append(task)
+            if len(tasks) >= limit:
+                break
+
+        if expired:
+            # Documents past their retention; drop them from the set that was read
+            await self.redis.zrem(key, *expired)
+        return tasks
+
+    # -------------------------------------------------------------------------
+    # Queue
+    # -------------------------------------------------------------------------
+
+    async def enqueue(self, task: Task):
+        """Index a task and queue it on the stream of its priority"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._index(pipe, task)
+            pipe.xadd(
+                STREAM_KEY.format(priority=task.priority.value),
+                {"task_id": task.task_id},
+                maxlen=self.stream_maxlen,
+                approximate=True
+            )
+            await pipe.execute()
+
+    def _schedule(self) -> List[TaskPriority]:
+        """
+        Priorities in the order to try them for the next dequeue.
+
+        Smooth weighted round-robin picks the first; the rest follow by weight
+        so an empty queue passes its turn to the next busiest priority.
+        """
+        total = sum(PRIORITY_WEIGHTS.values())
+        for priority, weight in PRIORITY_WEIGHTS.items():
+            self._credits[priority] += weight
+        pick = max(self._credits, key=self._credits.get)
+        self._credits[pick] -= total
+        return [pick] + [priority for priority in PRIORITY_WEIGHTS if priority != pick]
+
+    async def _lease(self, priority: TaskPriority, entry_id: str, fields: Dict[str, str], deliveries: int = 1) -> Optional[Lease]:
+        """Load the task of a stream entry"""
+        task = await self.get(fields.get("task_id", ""))
+        if task is None:
+            # Document expired or never written; nothing to run
+            await self._remove(priority, entry_id)
+            return None
+        return Lease(priority=priority, entry_id=entry_id, task=task, deliveries=deliveries)
+
+    async def reclaim(self, consumer: str) -> List[Lease]:
+        """Take over entries whose visibility timeout has passed"""
+        leases = []
+        for priority in PRIORITY_WEIGHTS:
+            stream = STREAM_KEY.format(priority=priority.value)
+            claimed = await self.redis.xautoclaim(
+                stream, CONSUMER_GROUP, consumer,
+                min_idle_time=self.visibility_timeout * 1000,
+                start_id="0-0",
+                count=10
+            )
+            for entry_id, fields in claimed[1]:
+                if fields is None:
+                    continue
+                pending = await self.redis.xpending_range(stream, CONSUMER_GROUP, min=entry_id, max=entry_id, count=1)
+                deliveries = pending[0]["times_delivered"] if pending else 1
+                lease = await self._lease(priority, entry_id, fields, deliveries)
+                if lease is None:
+                    continue
+                if deliveries > self.max_deliveries:
+                    logger.error(f"Task {lease.task.task_id} failed after {deliveries - 1} deliveries")
+                    await self.finish(lease, error_message="Task was not acknowledged within its visibility timeout")
+                    continue
+                leases.append(lease)
+        return leases
+
+    async def dequeue(self, consumer: str, block_ms: int = 5000) -> List[Lease]:
+        """
+        Deliver the next task in weighted-fair order.
+
+        Blocks up to block_ms when every queue is empty; a blocking read can
+        deliver one entry from each stream that receives work meanwhile.
+        """
+        for priority in self._schedule():
+            response = await self.redis.xreadgroup(
+                CONSUMER_GROUP, consumer, {STREAM_KEY.format(priority=priority.value): ">"}, count=1
+            )
+            if response:
+                entry_id, fields = response[0][1][0]
+                lease = await self._lease(priority, entry_id, fields)
+                return [lease] if lease else []
+
+        response = await self.redis.xreadgroup(
+            CONSUMER_GROUP, consumer,
+            {STREAM_KEY.format(priority=priority.value): ">" for priority in PRIORITY_WEIGHTS},
+            count=1,
+            block=block_ms
+        )
+        leases = []
+        for stream, entries in response or []:
+            priority = TaskPriority(stream.rsplit(":", 1)[1])
+            for entry_id, fields in entries:
+                lease = await self._lease(priority, entry_id, fields)
+                if lease:
+                    leases.append(lease)
+        return leases
+
+    async def _remove(self, priority: TaskPriority, entry_id: str):
+        """Acknowledge and delete a stream entry"""
+        stream = STREAM_KEY.format(priority=priority.value)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(stream, CONSUMER_GROUP, entry_id)
+            pipe.xdel(stream, entry_id)
+            await pipe.execute()
+
+    async def touch(self, lease: Lease, consumer: str):
+        """Reset a lease's idle time so it is not reclaimed while its task is still running"""
+        await self.redis.xclaim(
+            STREAM_KEY.format(priority=lease.priority.value), CONSUMER_GROUP, consumer,
+            min_idle_time=0,
+            message_ids=[lease.entry_id],
+            justid=True
+        )
+
+    async def start(self, lease: Lease):
+        """Mark a leased task in progress"""
+        previous = lease.task.status
+        lease.task.status = TaskStatus.IN_PROGRESS
+        await self.save(lease.task, previous)
+
+    async def finish(
+        self,
+        lease: Lease,
+        result: Optional[Dict[str, Any]] = None,
+        error_message: Optional[str] = None
+    ):
+        """Record the outcome of a leased task and acknowledge it"""
+        task = lease.task
+        previous = task.status
+        task.completed_at = datetime.utcnow()
+        task.status = TaskStatus.FAILED if error_message else TaskStatus.COMPLETED
+        task.result = result
+        task.error_message = error_message
+        if task.assigned_at:
+            task.execution_time_ms = (task.completed_at - task.assigned_at).total_seconds() * 1000
+
+        stream = STREAM_KEY.format(priority=lease.priority.value)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._index(pipe, task, previous)
+            pipe.xack(stream, CONSUMER_GROUP, lease.entry_id)
+            pipe.xdel(stream, lease.entry_id)
+            await pipe.execute()
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and unacknowledged entries per priority"""
+        if not self.enabled:
+            return {"enabled": False}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for priority in PRIORITY_WEIGHTS:
+                stream = STREAM_KEY.format(priority=priority.value)
+                pipe.xlen(stream)
+                pipe.xpending(stream, CONSUMER_GROUP)
+            replies = await pipe.execute()
+        return {
+            "enabled": True,
+            "queues": {
+                priority.value: {"length": length, "unacknowledged": pending["pending"]}
+                for priority, length, pending in zip(PRIORITY_WEIGHTS, replies[::2], replies[1::2])
+            }
+        }
+
+    @classmethod
+    def from_env(cls) -> "TaskQueue":
+        return cls(
+            url=redis_url(),
+            visibility_timeout=TASK_VISIBILITY_TIMEOUT_SECONDS,
+            max_deliveries=TASK_MAX_DELIVERIES,
+            retention=TASK_RETENTION_SECONDS,
+            stream_maxlen=TASK_STREAM_MAXLEN
+        )
+
+# =============================================================================
+# WORKER POOL
+# =============================================================================
+
+class TaskWorkerPool:
+    """
+    Concurrent consumers of the task queue.
+
+    Each worker is a consumer of the shared group; run pools in as many
+    processes or replicas as needed. Tasks are acknowledged after the handler
+    returns, and their leases are kept alive while it runs, so only a crashed
+    worker's tasks are redelivered after the visibility timeout. Handler
+    errors fail the task without redelivery, except for the retry_on errors,
+    which leave it to be redelivered up to TASK_MAX_DELIVERIES times.
+    """
+
+    def __init__(
+        self,
+        queue: TaskQueue,
+        handler: Callable[[Task], Awaitable[Dict[str, Any]]],
+        concurrency: int = 4,
+        name: Optional[str] = None,
+        retry_on: Tuple[Type[Exception], ...] = ()
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = concurrency
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.retry_on = retry_on
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        self._workers: List[asyncio.Task] = []
+
+    async def _keep_alive(self, lease: Lease, consumer: str):
+        while True:
+            await asyncio.sleep(max(self.queue.visibility_timeout / 3, 1))
+            try:
+                await self.queue.touch(lease, consumer)
+            except Exception as e:
+                logger.warning(f"Could not extend the lease of task {lease.task.task_id}: {e}")
+
+    async def _execute(self, lease: Lease, consumer: str):
+        await self.queue.start(lease)
+        heartbeat = asyncio.create_task(self._keep_alive(lease, consumer))
+        try:
+            result = await self.handler(lease.task)
+        except self.retry_on as e:
+            logger.warning(f"Task {lease.task.task_id} will be retried: {e}")
+            self.retried += 1
+            return
+        except Exception as e:
+            logger.error(f"Task {lease.task.task_id} failed: {e}")
+            self.failed += 1
+            await self.queue.finish(lease, error_message=str(e) or type(e).__name__)
+            return
+        finally:
+            heartbeat.cancel()
+        self.processed += 1
+        await self.queue.finish(lease, result=result)
+
+    async def _work(self, index: int):
+        consumer = f"{self.name}-{index}"
+        loop = asyncio.get_running_loop()
+        next_reclaim = loop.time()
+        while True:
+            try:
+                leases = []
+                if loop.time() >= next_reclaim:
+                    next_reclaim = loop.time() + self.queue.visibility_timeout / 2
+                    leases = await self.queue.reclaim(consumer)
+                for lease in leases or await self.queue.dequeue(consumer):
+                    await self._execute(lease, consumer)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Task worker {consumer} error: {e}")
+                await asyncio.sleep(1)
+
+    def start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work(i)) for i in range(self.concurrency)]
+            logger.info(f"Started {self.concurrency} task workers ({self.name})")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "workers": len(self._workers),
+            "processed": self.processed,
+            "failed": self.failed,
+            "retried": self.retried
+        }
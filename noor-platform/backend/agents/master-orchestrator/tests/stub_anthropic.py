@@ -0,0 +1,68 @@
+"""
+Stand-in for AsyncAnthropic that replays canned messages
+"""
+
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from anthropic.types import Message, TextBlock, ToolUseBlock, Usage
+
+
+def message(*content: Any, stop_reason: str = "end_turn", **usage: int) -> Message:
+    """An assistant message; str items become text blocks"""
+    return Message(
+        id="msg",
+        type="message",
+        role="assistant",
+        model="stub",
+        content=[TextBlock(type="text", text=item) if isinstance(item, str) else item for item in content],
+        stop_reason=stop_reason,
+        stop_sequence=None,
+        usage=Usage(input_tokens=usage.pop("input_tokens", 10), output_tokens=usage.pop("output_tokens", 5), **usage)
+    )
+
+
+def tool_use(name: str, tool_input: Dict[str, Any], block_id: str = "toolu_1") -> ToolUseBlock:
+    return ToolUseBlock(type="tool_use", id=block_id, name=name, input=tool_input)
+
+
+class StubStream:
+    def __init__(self, response: Message):
+        self.response = response
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        for block in self.response.content:
+            if block.type == "text":
+                yield SimpleNamespace(type="text", text=block.text)
+
+    async def get_final_message(self) -> Message:
+        return self.response
+
+
+class StubMessages:
+    """Records requests; answers each with the next canned message (the last one repeats)"""
+
+    def __init__(self, responses: List[Message]):
+        self.responses = list(responses)
+        self.requests: List[Dict[str, Any]] = []
+
+    def _next(self, request: Dict[str, Any]) -> Message:
+        self.requests.append(request)
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+    async def create(self, **request) -> Message:
+        return self._next(request)
+
+    def stream(self, **request) -> StubStream:
+        return StubStream(self._next(request))
+
+
+class StubAnthropic:
+    def __init__(self, *responses: Message):
+        self.messages = StubMessages(responses)
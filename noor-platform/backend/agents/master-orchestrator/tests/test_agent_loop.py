@@ -0,0 +1,122 @@
+"""
+Unit tests for the streamed tool-use loop of user requests
+"""
+
+import asyncio
+import json
+
+from agent import MAX_TOOL_ITERATIONS, MasterOrchestrator
+from stub_anthropic import StubAnthropic, message, tool_use
+
+
+def orchestrator(*responses, tool_result=None) -> MasterOrchestrator:
+    master = MasterOrchestrator(anthropic_api_key="test")
+    master.client = StubAnthropic(*responses)
+    master.tool_calls = []
+
+    async def execute_tool(name, tool_input, context):
+        master.tool_calls.append((name, tool_input))
+        if isinstance(tool_result, Exception):
+            raise tool_result
+        return tool_result or {"status": "routed", "task_id": "task-1"}
+
+    master._execute_tool = execute_tool
+    return master
+
+
+def stream(master: MasterOrchestrator, text: str) -> list:
+    async def collect():
+        return [event async for event in master.stream_user_request("user-1", text)]
+
+    return asyncio.run(collect())
+
+
+def test_tool_results_are_sent_back_until_the_final_answer():
+    master = orchestrator(
+        message("Let me route that.", tool_use("route_to_orchestrator", {"orchestrator_type": "talent_orchestrator"}),
+                stop_reason="tool_use"),
+        message("Your job search has started.")
+    )
+
+    events = stream(master, "Find me a job")
+
+    assert [event["type"] for event in events] == ["text", "tool", "text", "done"]
+    assert events[1]["tool"] == "route_to_orchestrator" and events[1]["status"] == "success"
+    done = events[-1]
+    assert done["status"] == "success" and done["response"] == "Your job search has started."
+    assert [step["step"] for step in done["steps"]] == ["model", "tool", "model"]
+    assert done["usage"]["input_tokens"] == 20
+
+    first, second = master.client.messages.requests
+    assert first["messages"] == [{"role": "user", "content": "Find me a job"}]
+    assistant, results = second["messages"][1:]
+    assert assistant["role"] == "assistant"
+    assert [block["type"] for block in assistant["content"]] == ["text", "tool_use"]
+    assert results == {"role": "user", "content": [{
+        "type": "tool_result",
+        "tool_use_id": "toolu_1",
+        "content": json.dumps({"status": "routed", "task_id": "task-1"}),
+        "is_error": False
+    }]}
+
+    # Only the final text is kept in the conversation
+    context = asyncio.run(master.conversations.get(done["conversation_id"]))
+    assert context.messages == [
+        {"role": "user", "content": "Find me a job"},
+        {"role": "assistant", "content": "Your job search has started."}
+    ]
+
+
+def test_tool_calls_of_a_turn_run_together():
+    master = orchestrator(
+        message(tool_use("get_agent_status", {}, "toolu_1"), tool_use("get_task_status", {"task_id": "t"}, "toolu_2"),
+                stop_reason="tool_use"),
+        message("Done.")
+    )
+
+    events = stream(master, "Status?")
+
+    assert [name for name, _ in master.tool_calls] == ["get_agent_status", "get_task_status"]
+    results = master.client.messages.requests[1]["messages"][-1]["content"]
+    assert [result["tool_use_id"] for result in results] == ["toolu_1", "toolu_2"]
+    assert events[-1]["response"] == "Done."
+
+
+def test_failed_tools_are_reported_to_the_model_as_errors():
+    master = orchestrator(
+        message(tool_use("route_to_orchestrator", {}), stop_reason="tool_use"),
+        message("Sorry, that did not work."),
+        tool_result=RuntimeError("bus down")
+    )
+
+    events = stream(master, "Find me a job")
+
+    assert events[0]["type"] == "tool" and events[0]["status"] == "error"
+    result = master.client.messages.requests[1]["messages"][-1]["content"][0]
+    assert result["is_error"] and "bus down" in result["content"]
+    assert events[-1]["status"] == "success"
+
+
+def test_the_loop_stops_at_the_iteration_cap():
+    master = orchestrator(message(tool_use("get_agent_status", {}), stop_reason="tool_use"))
+
+    events = stream(master, "Loop forever")
+
+    assert len(master.client.messages.requests) == MAX_TOOL_ITERATIONS
+    assert len(master.tool_calls) == MAX_TOOL_ITERATIONS
+    done = events[-1]
+    assert done["status"] == "success"
+    assert done["response"] == "I have started working on your request; please check back shortly."
+
+
+def test_model_errors_end_the_stream_with_an_error():
+    master = orchestrator(message("unused"))
+
+    def fail(**request):
+        raise RuntimeError("overloaded_error")
+
+    master.client.messages.stream = fail
+    events = stream(master, "Hi")
+
+    assert [event["type"] for event in events] == ["done"]
+    assert (events[0]["status"], events[0]["error"]) == ("error", "overloaded_error")
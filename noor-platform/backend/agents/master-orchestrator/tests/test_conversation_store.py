@@ -0,0 +1,177 @@
+"""
+Unit tests for conversation windowing, compaction and eviction
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+
+import conversation_store
+from agent import ConversationContext
+from conversation_store import ConversationStore, estimate_tokens
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        conversation_store.redis, "from_url",
+        lambda url, **kwargs: fakeredis.FakeAsyncRedis(server=server, **kwargs)
+    )
+
+
+def turn(role: str, index: int) -> dict:
+    # 13 estimated tokens each
+    return {"role": role, "content": f"{index:02d}" + "x" * 34}
+
+
+def turns(count: int) -> list:
+    return [turn("user" if i % 2 == 0 else "assistant", i) for i in range(count)]
+
+
+def context(conversation_id: str = "c1", messages: list = None) -> ConversationContext:
+    return ConversationContext(conversation_id=conversation_id, user_id="user-1", messages=messages or [])
+
+
+def test_window_holds_recent_turns_within_the_budget():
+    store = ConversationStore(token_budget=30)
+    messages = turns(4)
+
+    assert estimate_tokens(messages[0]) == 13
+    assert store._window_start(messages) == 2
+    assert store.prompt_messages(context(messages=messages)) == messages[2:]
+
+
+def test_window_starts_on_a_user_turn():
+    store = ConversationStore(token_budget=30)
+
+    # The two turns in budget start with an assistant turn, which is skipped
+    assert store._window_start(turns(5)) == 4
+
+
+def test_window_always_holds_the_latest_turn():
+    store = ConversationStore(token_budget=10)
+    messages = turns(2) + [{"role": "user", "content": "x" * 400}]
+
+    assert store._window_start(messages) == 2
+    assert store._window_start([]) == 0
+
+
+def test_turns_out_of_the_window_are_summarized():
+    calls = []
+    release = asyncio.Event()
+
+    async def summarize(summary, messages):
+        calls.append((summary, [message["content"][:2] for message in messages]))
+        await release.wait()
+        return "summary of 00-05"
+
+    async def run():
+        store = ConversationStore(summarize=summarize, token_budget=30, compact_min_tokens=50)
+        conversation = context(messages=turns(4))
+        await store.save(conversation)
+        no_compaction = dict(store._compacting)
+
+        conversation.messages = turns(8)
+        await store.save(conversation)
+        task = store._compacting[conversation.conversation_id]
+        # A turn added while the summary is written is kept
+        conversation.messages.append(turn("user", 8))
+        release.set()
+        await task
+        return no_compaction, conversation, store
+
+    no_compaction, conversation, store = asyncio.run(run())
+
+    assert no_compaction == {}
+    assert calls == [("", ["00", "01", "02", "03", "04", "05"])]
+    assert conversation.summary == "summary of 00-05"
+    assert [message["content"][:2] for message in conversation.messages] == ["06", "07", "08"]
+    assert conversation.metadata["summarized_turns"] == 6
+    assert "summary of 00-05" in store.memory_block(conversation)
+
+
+def test_failed_summaries_keep_the_turns():
+    async def summarize(summary, messages):
+        raise RuntimeError("model unavailable")
+
+    async def run():
+        store = ConversationStore(summarize=summarize, token_budget=30, compact_min_tokens=10)
+        conversation = context(messages=turns(6))
+        await store.save(conversation)
+        await asyncio.gather(*store._compacting.values())
+        return conversation
+
+    conversation = asyncio.run(run())
+
+    assert conversation.summary is None
+    assert len(conversation.messages) == 6
+
+
+def test_stored_turns_are_capped():
+    store = ConversationStore(max_messages=3)
+    conversation = context(messages=turns(5))
+
+    asyncio.run(store.save(conversation))
+
+    assert [message["content"][:2] for message in conversation.messages] == ["02", "03", "04"]
+    assert conversation.metadata["dropped_turns"] == 2
+
+
+def test_least_recently_used_contexts_are_evicted():
+    async def run():
+        store = ConversationStore(capacity=2)
+        for conversation_id in ("c1", "c2"):
+            await store.save(context(conversation_id))
+        await store.get("c1")
+        await store.save(context("c3"))
+        return store
+
+    store = asyncio.run(run())
+
+    assert list(store._cache) == ["c1", "c3"]
+
+
+def test_idle_contexts_are_evicted():
+    store = ConversationStore(idle_ttl=60)
+    idle = context("idle")
+    idle.last_activity = datetime.utcnow() - timedelta(seconds=61)
+    store._remember(idle)
+
+    store._remember(context("active"))
+
+    assert list(store._cache) == ["active"]
+
+
+def test_evicted_contexts_are_reloaded_from_redis(fake_redis):
+    async def run():
+        store = ConversationStore(capacity=1)
+        assert await store.connect("redis://fake")
+        await store.save(context("c1", messages=turns(2)))
+        await store.save(context("c2"))
+        evicted = "c1" not in store._cache
+        reloaded = await store.get("c1")
+        ttl = await store.redis.ttl(conversation_store.CONVERSATION_KEY.format(conversation_id="c1"))
+        await store.close()
+        return evicted, reloaded, ttl
+
+    evicted, reloaded, ttl = asyncio.run(run())
+
+    assert evicted
+    assert reloaded.messages == turns(2)
+    assert 0 < ttl <= 24 * 3600
+
+
+def test_contexts_of_other_users_are_not_resumed():
+    async def run():
+        store = ConversationStore()
+        mine = await store.get_or_create("user-1")
+        theirs = await store.get_or_create("user-2", mine.conversation_id)
+        return mine, theirs
+
+    mine, theirs = asyncio.run(run())
+
+    assert theirs.conversation_id != mine.conversation_id
+    assert theirs.user_id == "user-2"
@@ -0,0 +1,109 @@
+"""
+Unit tests for the MCP bus Redis Streams transport
+"""
+
+import asyncio
+
+import fakeredis
+
+from agent import AgentType, MCPMessage
+from mcp_bus import AGENT_GROUP, AGENT_STREAM, MCPBus
+
+TALENT = AgentType.TALENT_ORCHESTRATOR
+TALENT_STREAM = AGENT_STREAM.format(agent_type=TALENT.value)
+
+
+def message() -> MCPMessage:
+    return MCPMessage(
+        from_agent=AgentType.MASTER_ORCHESTRATOR,
+        to_agent=TALENT,
+        message_type="task_assignment",
+        payload={"task_id": "t1"}
+    )
+
+
+def transport(server: fakeredis.FakeServer, **kwargs) -> MCPBus:
+    """A bus on the transport without its background readers, which tests drive with _poll"""
+    bus = MCPBus(**kwargs)
+    bus.redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    return bus
+
+
+async def replica(server: fakeredis.FakeServer, **kwargs) -> MCPBus:
+    bus = transport(server, **kwargs)
+    bus._mailboxes[TALENT] = asyncio.Queue(maxsize=bus.queue_size)
+    await bus._join_group(TALENT)
+    return bus
+
+
+def drain(bus: MCPBus) -> list:
+    mailbox = bus._mailboxes[TALENT]
+    return [mailbox.get_nowait().message_id for _ in range(mailbox.qsize())]
+
+
+def test_each_message_reaches_one_replica():
+    async def run():
+        server = fakeredis.FakeServer()
+        sender = transport(server)
+        replicas = [await replica(server) for _ in range(2)]
+        messages = [message() for _ in range(10)]
+        for item in messages[:5]:
+            assert await sender.publish(item)
+        await replicas[0]._poll()
+        for item in messages[5:]:
+            assert await sender.publish(item)
+        await replicas[1]._poll()
+        # Nothing left for the first replica
+        assert await replicas[0]._poll() == 0
+        return messages, [drain(bus) for bus in replicas], await sender.redis.xpending(TALENT_STREAM, AGENT_GROUP)
+
+    messages, received, pending = asyncio.run(run())
+
+    assert received[0] == [item.message_id for item in messages[:5]]
+    assert received[1] == [item.message_id for item in messages[5:]]
+    # Acknowledged once in a mailbox
+    assert pending["pending"] == 0
+
+
+def test_messages_of_a_dead_replica_are_claimed():
+    async def run():
+        server = fakeredis.FakeServer()
+        sender = transport(server)
+        survivor = await replica(server, claim_idle=0)
+        sent = message()
+        await sender.publish(sent)
+        # Read by a replica that died before acknowledging it
+        await sender.redis.xreadgroup(AGENT_GROUP, "dead-replica", {TALENT_STREAM: ">"}, count=1)
+
+        unclaimed = await survivor._poll()
+        claimed = await survivor._poll(claim=True)
+        return sent, unclaimed, claimed, drain(survivor)
+
+    sent, unclaimed, claimed, received = asyncio.run(run())
+
+    assert (unclaimed, claimed) == (0, 1)
+    assert received == [sent.message_id]
+
+
+def test_full_mailboxes_leave_messages_unacknowledged():
+    async def run():
+        server = fakeredis.FakeServer()
+        sender = transport(server)
+        busy = await replica(server, queue_size=1, send_timeout=0.01)
+        for _ in range(2):
+            await sender.publish(message())
+        await busy._poll()
+        return busy._mailboxes[TALENT].qsize(), await sender.redis.xpending(TALENT_STREAM, AGENT_GROUP)
+
+    queued, pending = asyncio.run(run())
+
+    assert queued == 1
+    assert pending["pending"] == 1
+
+
+def test_agents_without_consumers_are_undeliverable():
+    async def run():
+        sender = transport(fakeredis.FakeServer())
+        return await sender.publish(message()), sender.counts["undeliverable"]
+
+    assert asyncio.run(run()) == (False, 1)
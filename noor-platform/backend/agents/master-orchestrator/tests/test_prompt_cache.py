@@ -0,0 +1,79 @@
+"""
+Unit tests for prompt caching of the orchestrator's system prompt and tools
+"""
+
+import asyncio
+
+from agent import AgentCapability, AgentProfile, AgentType, MasterOrchestrator
+from stub_anthropic import StubAnthropic, message
+
+CACHE = {"type": "ephemeral"}
+
+
+def orchestrator(*responses) -> MasterOrchestrator:
+    master = MasterOrchestrator(anthropic_api_key="test")
+    master.client = StubAnthropic(*responses)
+    return master
+
+
+def ask(master: MasterOrchestrator, text: str, conversation_id: str = None) -> dict:
+    return asyncio.run(master.handle_user_request("user-1", text, conversation_id))
+
+
+def test_the_cache_breakpoint_is_on_the_system_prompt():
+    master = orchestrator()
+    system, tools = master._prompt_prefix()
+
+    # One breakpoint caches tools and system prompt together
+    assert [block.get("cache_control") for block in system] == [CACHE]
+    assert all("cache_control" not in tool for tool in tools)
+    assert master._prompt_prefix() == (system, tools)
+    assert master._prompt_prefix()[0] is system
+
+
+def test_the_prefix_is_rebuilt_when_the_registry_changes():
+    master = orchestrator()
+    system, _ = master._prompt_prefix()
+    master.register_agent(AgentProfile(
+        agent_id="talent-002", agent_type=AgentType.TALENT_ORCHESTRATOR, name="Talent Orchestrator",
+        description="Second instance", capabilities=[AgentCapability(name="Task Routing", description="", tools=[])]
+    ))
+
+    rebuilt, _ = master._prompt_prefix()
+
+    assert rebuilt is not system
+    assert rebuilt[0]["cache_control"] == CACHE
+
+
+def test_turns_send_an_identical_prefix_with_memory_after_it():
+    master = orchestrator(message("Hello"))
+    first = ask(master, "Hi")
+    context = asyncio.run(master.conversations.get(first["conversation_id"]))
+    context.summary = "The user wants a data role in Dubai."
+    ask(master, "Any jobs?", first["conversation_id"])
+
+    requests = master.client.messages.requests
+    cached = [request["system"][0] for request in requests]
+    assert cached[0] == cached[1] and cached[0]["cache_control"] == CACHE
+    assert requests[0]["tools"] == requests[1]["tools"]
+    assert len(requests[0]["system"]) == 1
+    memory = requests[1]["system"][1]
+    assert "data role in Dubai" in memory["text"] and "cache_control" not in memory
+
+
+def test_cache_reads_and_writes_are_reported():
+    master = orchestrator(
+        message("Hello", input_tokens=20, cache_creation_input_tokens=3000),
+        message("Again", input_tokens=25, cache_read_input_tokens=3000, output_tokens=7)
+    )
+
+    first = ask(master, "Hi")
+    second = ask(master, "Hi again", first["conversation_id"])
+
+    assert first["usage"] == {
+        "input_tokens": 20, "output_tokens": 5, "cache_read_input_tokens": 0, "cache_creation_input_tokens": 3000
+    }
+    assert second["usage"]["cache_read_input_tokens"] == 3000
+    assert master.token_usage == {
+        "input_tokens": 45, "output_tokens": 12, "cache_read_input_tokens": 3000, "cache_creation_input_tokens": 3000
+    }
@@ -0,0 +1,123 @@
+"""
+Unit tests for in-process task routing under scheduler capacity limits
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from agent import AgentType, MasterOrchestrator, Task, TaskPriority, TaskStatus
+from scheduler import AgentOverloaded, agent_capacity
+
+TALENT = AgentType.TALENT_ORCHESTRATOR
+
+
+def orchestrator(queue_timeout: float = 0.2, lease_timeout: float = 300) -> MasterOrchestrator:
+    master = MasterOrchestrator(anthropic_api_key="test")
+    master.scheduler.queue_timeout = queue_timeout
+    master.scheduler.lease_timeout = lease_timeout
+    return master
+
+
+def capacity(master: MasterOrchestrator) -> int:
+    return sum(agent_capacity(profile) for profile in master.scheduler.instances[TALENT].values())
+
+
+def test_answered_routes_release_their_slots():
+    async def run():
+        master = orchestrator()
+        master.bus.serve(TALENT, lambda message: asyncio.sleep(0, {"matches": 3}))
+        routes = [
+            await master._route_to_orchestrator(TALENT.value, "Find jobs", "medium", {}, "user-1")
+            for _ in range(capacity(master) * 3)
+        ]
+        await asyncio.sleep(0.05)
+        return master, routes
+
+    master, routes = asyncio.run(run())
+
+    assert {route["status"] for route in routes} == {"routed"}
+    assert master.active_tasks == {}
+    assert master.scheduler._leases == {}
+    assert master.task_counts[TaskStatus.COMPLETED.value] == len(routes)
+    assert master.completed_tasks[-1].result == {"matches": 3}
+
+
+def test_unanswered_routes_are_failed_after_the_lease_timeout():
+    async def run():
+        master = orchestrator(lease_timeout=0.05)
+        # Consumed but never answered
+        master.bus.serve(TALENT, lambda message: asyncio.sleep(10))
+        for _ in range(capacity(master)):
+            await master._route_to_orchestrator(TALENT.value, "Find jobs", "medium", {}, "user-1")
+        route = await master._route_to_orchestrator(TALENT.value, "Find jobs", "medium", {}, "user-1")
+        return master, route
+
+    master, route = asyncio.run(run())
+
+    # The expired leases made room for the last route
+    assert route["status"] == "routed"
+    expired = list(master.completed_tasks)[:capacity(master)]
+    assert all(task.error_message == f"No response from {TALENT.value}" for task in expired)
+
+
+def test_undeliverable_routes_do_not_hold_a_slot():
+    master = orchestrator()
+    route = asyncio.run(master._route_to_orchestrator(TALENT.value, "Find jobs", "medium", {}, "user-1"))
+
+    assert route["status"] == "failed"
+    assert master.active_tasks == {}
+    assert master.scheduler._leases == {}
+
+
+def test_queued_tasks_hold_their_slot_until_answered():
+    async def run():
+        master = orchestrator(queue_timeout=0.01)
+        answered = asyncio.Event()
+
+        async def respond(message):
+            await answered.wait()
+            return {"matches": 1}
+
+        master.bus.serve(TALENT, respond)
+        tasks = [
+            Task(
+                user_id="user-1", task_type=TALENT.value, description="Find jobs",
+                priority=TaskPriority.MEDIUM, assigned_agent=TALENT
+            )
+            for _ in range(capacity(master))
+        ]
+        running = [asyncio.create_task(master.run_queued_task(task)) for task in tasks]
+        await asyncio.sleep(0.05)
+        held = len(master.scheduler._leases)
+        with pytest.raises(AgentOverloaded):
+            await master.scheduler.admit(TALENT, "one-more")
+        answered.set()
+        return held, await asyncio.gather(*running), master
+
+    held, results, master = asyncio.run(run())
+
+    assert held == capacity(master)
+    assert results == [{"matches": 1}] * capacity(master)
+    assert master.scheduler._leases == {}
+
+
+def test_overloaded_agents_answer_429_with_retry_after(monkeypatch):
+    master = orchestrator(queue_timeout=0.01)
+    monkeypatch.setattr(api, "orchestrator", master)
+    # No instance can take the task within the queue timeout
+    for profile in master.scheduler.instances[TALENT].values():
+        profile.is_online = False
+
+    response = TestClient(api.app).post("/api/v1/tasks", json={
+        "orchestrator_type": TALENT.value, "description": "Find jobs", "user_id": "user-1"
+    })
+
+    assert response.status_code == 429
+    assert response.json()["agent_type"] == TALENT.value
+    assert response.json()["retry_after"] >= 1
+    assert response.headers["Retry-After"] == str(response.json()["retry_after"])
+    assert master.scheduler.rejected[TALENT] == 1
+    assert master.active_tasks == {}
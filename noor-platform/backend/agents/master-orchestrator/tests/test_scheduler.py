@@ -0,0 +1,96 @@
+"""
+Unit tests for agent admission control and instance routing
+"""
+
+import asyncio
+
+import pytest
+
+from agent import AgentCapability, AgentProfile, AgentType
+from scheduler import AgentOverloaded, AgentScheduler
+
+TALENT = AgentType.TALENT_ORCHESTRATOR
+
+
+def profile(agent_id: str, max_load: int, response_ms: float = 1000.0) -> AgentProfile:
+    return AgentProfile(
+        agent_id=agent_id,
+        agent_type=TALENT,
+        name=agent_id,
+        description="Test instance",
+        capabilities=[AgentCapability(
+            name="matching", description="", tools=[], max_concurrent_tasks=max_load,
+            average_response_time_ms=response_ms
+        )],
+        max_load=max_load
+    )
+
+
+def scheduler(*profiles: AgentProfile, **kwargs) -> AgentScheduler:
+    result = AgentScheduler(**kwargs)
+    for item in profiles:
+        result.register(item)
+    return result
+
+
+def test_tasks_go_to_the_least_utilized_instance():
+    async def run():
+        agents = scheduler(profile("small", 2), profile("large", 6))
+        return [(await agents.admit(TALENT, f"t{i}")).agent_id for i in range(8)], agents
+
+    admitted, agents = asyncio.run(run())
+
+    # Utilization stays level: 1 of 2 on the small instance per 3 of 6 on the large one
+    assert admitted.count("small") == 2 and admitted.count("large") == 6
+    assert admitted[:4].count("small") == 1
+    assert {item.agent_id: item.current_load for item in agents.instances[TALENT].values()} == {"small": 2, "large": 6}
+
+
+def test_offline_instances_are_skipped():
+    async def run():
+        offline = profile("offline", 5)
+        offline.is_online = False
+        agents = scheduler(offline, profile("online", 5))
+        return (await agents.admit(TALENT, "t1")).agent_id
+
+    assert asyncio.run(run()) == "online"
+
+
+def test_admission_waits_for_a_released_slot():
+    async def run():
+        agents = scheduler(profile("only", 1), queue_timeout=1)
+        await agents.admit(TALENT, "t1")
+        waiting = asyncio.create_task(agents.admit(TALENT, "t2"))
+        await asyncio.sleep(0.01)
+        agents.release("t1")
+        return (await waiting).agent_id, agents.wait_ms[TALENT]
+
+    agent_id, wait_ms = asyncio.run(run())
+    assert agent_id == "only" and wait_ms > 0
+
+
+def test_full_agents_are_overloaded_with_a_retry_hint():
+    async def run():
+        agents = scheduler(profile("only", 1, response_ms=2500), queue_timeout=0.01, max_queued=1)
+        await agents.admit(TALENT, "t1")
+        with pytest.raises(AgentOverloaded) as timed_out:
+            await agents.admit(TALENT, "t2")
+        agents.max_queued = 0
+        with pytest.raises(AgentOverloaded) as queue_full:
+            await agents.admit(TALENT, "t3")
+        return timed_out.value, queue_full.value, agents.rejected[TALENT]
+
+    timed_out, queue_full, rejected = asyncio.run(run())
+
+    # The timed-out caller still counts itself as queued when the hint is computed
+    assert (timed_out.retry_after, queue_full.retry_after) == (5, 3)
+    assert rejected == 2
+
+
+def test_expired_leases_free_their_slots():
+    async def run():
+        agents = scheduler(profile("only", 1), queue_timeout=0.01, lease_timeout=0)
+        await agents.admit(TALENT, "t1")
+        return (await agents.admit(TALENT, "t2")).agent_id, list(agents._leases)
+
+    assert asyncio.run(run()) == ("only", ["t2"])
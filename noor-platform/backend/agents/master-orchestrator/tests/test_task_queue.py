@@ -0,0 +1,216 @@
+"""
+Unit tests for the Redis Streams task queue and its worker pool
+"""
+
+import asyncio
+from collections import Counter
+
+import fakeredis
+import pytest
+
+import task_queue
+from agent import AgentType, MasterOrchestrator, Task, TaskPriority, TaskStatus
+from mcp_bus import MCPUndeliverable
+from task_queue import PRIORITY_WEIGHTS, TASK_KEY, TaskQueue, TaskWorkerPool
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        task_queue.redis, "from_url",
+        lambda url, **kwargs: fakeredis.FakeAsyncRedis(server=server, **kwargs)
+    )
+
+
+def make_task(priority: TaskPriority = TaskPriority.MEDIUM, user_id: str = "user-1") -> Task:
+    return Task(
+        user_id=user_id,
+        task_type="talent_orchestrator",
+        description="Find jobs",
+        priority=priority,
+        assigned_agent=AgentType.TALENT_ORCHESTRATOR
+    )
+
+
+async def connected(**kwargs) -> TaskQueue:
+    queue = TaskQueue("redis://fake", **kwargs)
+    assert await queue.connect()
+    return queue
+
+
+def test_backlogged_priorities_are_dequeued_by_weight(fake_redis):
+    async def run():
+        queue = await connected()
+        total = sum(PRIORITY_WEIGHTS.values())
+        for priority in PRIORITY_WEIGHTS:
+            for _ in range(total):
+                await queue.enqueue(make_task(priority))
+        dequeued = Counter()
+        for _ in range(total):
+            for lease in await queue.dequeue("worker-1", block_ms=10):
+                dequeued[lease.priority] += 1
+        return dequeued
+
+    assert asyncio.run(run()) == Counter(PRIORITY_WEIGHTS)
+
+
+def test_an_empty_priority_passes_its_turn(fake_redis):
+    async def run():
+        queue = await connected()
+        await queue.enqueue(make_task(TaskPriority.LOW))
+        return await queue.dequeue("worker-1", block_ms=10)
+
+    leases = asyncio.run(run())
+    assert [lease.priority for lease in leases] == [TaskPriority.LOW]
+
+
+def test_tasks_of_a_dead_worker_are_reclaimed(fake_redis):
+    async def run():
+        queue = await connected(visibility_timeout=0, max_deliveries=2)
+        task = make_task()
+        await queue.enqueue(task)
+        # Delivered to a worker that never acknowledges it
+        await queue.dequeue("dead-worker", block_ms=10)
+
+        reclaimed = await queue.reclaim("worker-2")
+        await queue.finish(reclaimed[0], result={"ok": True})
+        return task, reclaimed, await queue.reclaim("worker-2"), await queue.get(task.task_id)
+
+    task, reclaimed, again, stored = asyncio.run(run())
+
+    assert [(lease.task.task_id, lease.deliveries) for lease in reclaimed] == [(task.task_id, 2)]
+    # Acknowledged entries are not reclaimed again
+    assert again == []
+    assert stored.status == TaskStatus.COMPLETED
+
+
+def test_tasks_past_max_deliveries_are_failed(fake_redis):
+    async def run():
+        queue = await connected(visibility_timeout=0, max_deliveries=1)
+        task = make_task()
+        await queue.enqueue(task)
+        await queue.dequeue("dead-worker", block_ms=10)
+        return task, await queue.reclaim("worker-2"), await queue.get(task.task_id), await queue.get_stats()
+
+    task, reclaimed, stored, stats = asyncio.run(run())
+
+    assert reclaimed == []
+    assert stored.status == TaskStatus.FAILED
+    assert stats["queues"][task.priority.value] == {"length": 0, "unacknowledged": 0}
+
+
+def test_list_tasks_reads_the_index_newest_first(fake_redis):
+    async def run():
+        queue = await connected()
+        tasks = [make_task(user_id=user_id) for user_id in ("user-1", "user-2", "user-1", "user-1")]
+        for task in tasks:
+            await queue.enqueue(task)
+        lease = (await queue.dequeue("worker-1", block_ms=10))[0]
+        await queue.finish(lease, result={})
+        # A document past its retention
+        await queue.redis.delete(TASK_KEY.format(task_id=tasks[3].task_id))
+
+        listed = {
+            "all": await queue.list_tasks(),
+            "user": await queue.list_tasks(user_id="user-1"),
+            "status": await queue.list_tasks(status=TaskStatus.PENDING.value),
+            "user_and_status": await queue.list_tasks(user_id="user-1", status=TaskStatus.PENDING.value),
+            "limited": await queue.list_tasks(limit=1)
+        }
+        return tasks, listed, await queue.redis.zcard(task_queue.INDEX_KEY)
+
+    tasks, listed, indexed = asyncio.run(run())
+    ids = {name: [task.task_id for task in found] for name, found in listed.items()}
+
+    assert ids["all"] == [tasks[2].task_id, tasks[1].task_id, tasks[0].task_id]
+    assert ids["user"] == [tasks[2].task_id, tasks[0].task_id]
+    assert ids["status"] == [tasks[2].task_id, tasks[1].task_id]
+    assert ids["user_and_status"] == [tasks[2].task_id]
+    assert ids["limited"] == [tasks[2].task_id]
+    # The expired entry was dropped from the set that was read
+    assert indexed == 3
+
+
+def test_workers_record_results_and_failures(fake_redis):
+    async def handler(task):
+        if task.description == "fail":
+            raise RuntimeError("agent unavailable")
+        return {"matches": 3}
+
+    async def run():
+        queue = await connected()
+        done, failed = make_task(), make_task()
+        failed.description = "fail"
+        await queue.enqueue(done)
+        await queue.enqueue(failed)
+
+        pool = TaskWorkerPool(queue, handler, name="test")
+        for _ in range(2):
+            for lease in await queue.dequeue("test-0", block_ms=10):
+                await pool._execute(lease, "test-0")
+        return pool, await queue.get(done.task_id), await queue.get(failed.task_id), await queue.get_stats()
+
+    pool, done, failed, stats = asyncio.run(run())
+
+    assert (pool.processed, pool.failed) == (1, 1)
+    assert (done.status, done.result) == (TaskStatus.COMPLETED, {"matches": 3})
+    assert (failed.status, failed.error_message) == (TaskStatus.FAILED, "agent unavailable")
+    # Handler errors are acknowledged, not redelivered
+    assert stats["queues"][done.priority.value] == {"length": 0, "unacknowledged": 0}
+
+
+def test_running_tasks_keep_their_lease(fake_redis):
+    async def run():
+        queue = await connected(visibility_timeout=1)
+        await queue.enqueue(make_task())
+        lease = (await queue.dequeue("worker-1", block_ms=10))[0]
+        await asyncio.sleep(1.1)
+        await queue.touch(lease, "worker-1")
+        return await queue.reclaim("worker-2")
+
+    assert asyncio.run(run()) == []
+
+
+def test_queued_tasks_complete_with_the_agent_reply(fake_redis):
+    async def run():
+        master = MasterOrchestrator(anthropic_api_key="test")
+        master.bus.serve(AgentType.TALENT_ORCHESTRATOR, lambda message: asyncio.sleep(0, {"matches": 3}))
+        queue = await connected()
+        task = make_task()
+        await queue.enqueue(task)
+
+        pool = TaskWorkerPool(queue, master.run_queued_task, name="test", retry_on=(MCPUndeliverable,))
+        for lease in await queue.dequeue("test-0", block_ms=10):
+            await pool._execute(lease, "test-0")
+        return master, await queue.get(task.task_id)
+
+    master, stored = asyncio.run(run())
+
+    assert (stored.status, stored.result) == (TaskStatus.COMPLETED, {"matches": 3})
+    assert master.scheduler._leases == {}
+
+
+def test_undeliverable_tasks_are_left_for_redelivery(fake_redis):
+    async def run():
+        master = MasterOrchestrator(anthropic_api_key="test")
+        queue = await connected(visibility_timeout=0, max_deliveries=2)
+        task = make_task()
+        await queue.enqueue(task)
+
+        pool = TaskWorkerPool(queue, master.run_queued_task, name="test", retry_on=(MCPUndeliverable,))
+        for lease in await queue.dequeue("test-0", block_ms=10):
+            await pool._execute(lease, "test-0")
+        retried = await queue.get(task.task_id)
+        # Redelivered, and failed once its deliveries run out
+        for lease in await queue.reclaim("test-1"):
+            await pool._execute(lease, "test-1")
+        await queue.reclaim("test-1")
+        return pool, master, retried, await queue.get(task.task_id)
+
+    pool, master, retried, stored = asyncio.run(run())
+
+    assert pool.retried == 2 and pool.processed == 0
+    assert retried.status == TaskStatus.IN_PROGRESS
+    assert stored.status == TaskStatus.FAILED
+    assert master.scheduler._leases == {}
@@ -0,0 +1,50 @@
+# Master Orchestrator Task Worker
+# NOOR Platform v7.1
+# Standalone consumer of the task queue; scale replicas horizontally
+
+import asyncio
+import logging
+import os
+import signal
+
+from agent import MasterOrchestrator
+from mcp_bus import MCPUndeliverable
+from task_queue import TaskQueue, TaskWorkerPool, TASK_QUEUE_WORKERS, redis_url
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    """Run a worker pool until SIGTERM/SIGINT"""
+
+    orchestrator = MasterOrchestrator(os.getenv("ANTHROPIC_API_KEY", ""))
+    queue = TaskQueue.from_env()
+    if not await queue.connect():
+        raise SystemExit("Task queue unavailable")
+    orchestrator.task_queue = queue
+    # Agents run in other processes, so tasks and their replies cross the transport
+    if not await orchestrator.bus.connect(redis_url()):
+        raise SystemExit("MCP bus transport unavailable")
+
+    pool = TaskWorkerPool(
+        queue, orchestrator.run_queued_task,
+        concurrency=max(TASK_QUEUE_WORKERS, 1),
+        retry_on=(MCPUndeliverable,)
+    )
+    pool.start()
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+    await stopping.wait()
+
+    logger.info("Task worker shutting down...")
+    await pool.stop()
+    await queue.close()
+    await orchestrator.bus.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
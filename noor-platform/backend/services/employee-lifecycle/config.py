@@ -63,6 +63,13 @@ class Settings(BaseSettings):
     # Data Zones (for RLS)
     DATA_ZONE: str = "L2_INSTITUTIONAL"
 
+    # Emiratization
+    EMIRATIZATION_NATIONALITY_CODES: list = ["ARE"]
+    EMIRATIZATION_DEFAULT_TARGET: float = 10.0  # Percent, when no quota is set
+    EMIRATIZATION_AT_RISK_MARGIN: float = 1.0  # Percentage points above target
+    EMIRATIZATION_EXCEEDING_MARGIN: float = 5.0
+    EMIRATIZATION_RECOMPUTE_HOURS: int = 24
+
     @property
     def postgres_url(self) -> str:
         """PostgreSQL connection URL"""
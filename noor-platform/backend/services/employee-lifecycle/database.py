@@ -9,6 +9,9 @@ from pymongo import MongoClient
 from motor.motor_asyncio import AsyncIOMotorClient
 import redis.asyncio as aioredis
 from typing import AsyncGenerator
+from functools import wraps
+import asyncio
+import json
 import logging
 
 from config import get_settings
@@ -186,13 +189,13 @@ def cache_result(ttl=300):
             ...
     """
     def decorator(func):
+        @wraps(func)
         async def wrapper(*args, **kwargs):
             cache_key = f"{func.__name__}:{':'.join(map(str, args))}"
 
             # Try to get from cache
             cached = await redis_client.get(cache_key)
             if cached:
-                import json
                 return json.loads(cached)
 
             # Execute function
@@ -200,8 +203,7 @@ def cache_result(ttl=300):
 
             # Cache result
             if result:
-                import json
-                await redis_client.setex(cache_key, ttl, json.dumps(result))
+                await redis_client.setex(cache_key, ttl, json.dumps(result, default=str))
 
             return result
         return wrapper
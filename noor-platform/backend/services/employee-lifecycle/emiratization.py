@@ -0,0 +1,578 @@
+# Emiratization Ratio Engine
+# NOOR Platform v7.1 - Employee Lifecycle Service
+
+import numpy as np
+from sqlalchemy import text
+from typing import Dict, Any, List, Optional, Sequence
+from datetime import datetime
+import asyncio
+import logging
+
+from config import get_settings
+from database import AsyncSessionLocal
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Employees without a salary grade are counted in this band
+UNBANDED = "unbanded"
+
+HIRED = "HIRED"
+TERMINATED = "TERMINATED"
+ROLE_CHANGED = "ROLE_CHANGED"
+
+# =============================================================================
+# SET-BASED QUERIES
+# =============================================================================
+
+HEADCOUNT_QUERY = text("""
+    SELECT e.company_id::text AS company_id,
+           c.industry AS sector,
+           COALESCE(e.salary_grade, :unbanded) AS band,
+           COUNT(*) AS total,
+           COUNT(*) FILTER (WHERE up.nationality = ANY(:nationals)) AS nationals
+    FROM employees e
+    JOIN companies c ON c.id = e.company_id
+    LEFT JOIN user_profiles up ON up.user_id = e.user_id
+    WHERE e.status <> 'terminated' AND c.status = 'active'
+    GROUP BY 1, 2, 3
+""")
+
+TARGETS_QUERY = text("""
+    SELECT c.id::text AS company_id,
+           c.industry AS sector,
+           COALESCE(q.target_percentage, c.emiratization_target, :default_target) AS target
+    FROM companies c
+    LEFT JOIN emiratization_quotas q ON q.company_id = c.id AND q.year = :year
+    WHERE c.status = 'active'
+""")
+
+NATIONALITY_QUERY = text("""
+    SELECT user_id::text AS user_id, nationality = ANY(:nationals) AS is_national
+    FROM user_profiles
+    WHERE user_id::text = ANY(:user_ids)
+""")
+
+UPSERT_QUOTAS_QUERY = text("""
+    INSERT INTO emiratization_quotas (
+        company_id, year, target_percentage, current_percentage, total_employees,
+        emirati_employees, compliant, compliance_status, last_calculated_at
+    )
+    SELECT r.company_id::uuid, :year, r.target, r.current, r.total, r.nationals,
+           r.compliant, r.status, NOW()
+    FROM UNNEST(
+        CAST(:company_ids AS text[]), CAST(:targets AS numeric[]), CAST(:currents AS numeric[]),
+        CAST(:totals AS int[]), CAST(:nationals AS int[]), CAST(:compliants AS bool[]),
+        CAST(:statuses AS text[])
+    ) AS r(company_id, target, current, total, nationals, compliant, status)
+    ON CONFLICT (company_id, year) DO UPDATE SET
+        current_percentage = EXCLUDED.current_percentage,
+        total_employees = EXCLUDED.total_employees,
+        emirati_employees = EXCLUDED.emirati_employees,
+        compliant = EXCLUDED.compliant,
+        compliance_status = EXCLUDED.compliance_status,
+        last_calculated_at = EXCLUDED.last_calculated_at
+""")
+
+UPDATE_COMPANY_COUNTS_QUERY = text("""
+    UPDATE companies c SET
+        employee_count = c.employee_count + d.total,
+        emirati_count = c.emirati_count + d.nationals
+    FROM UNNEST(
+        CAST(:company_ids AS text[]), CAST(:totals AS int[]), CAST(:nationals AS int[])
+    ) AS d(company_id, total, nationals)
+    WHERE c.id = d.company_id::uuid
+""")
+
+RESET_COMPANY_COUNTS_QUERY = text("""
+    UPDATE companies c SET
+        employee_count = COALESCE(h.total, 0),
+        emirati_count = COALESCE(h.nationals, 0)
+    FROM companies src
+    LEFT JOIN (
+        SELECT e.company_id,
+               COUNT(*) AS total,
+               COUNT(*) FILTER (WHERE up.nationality = ANY(:nationals)) AS nationals
+        FROM employees e
+        LEFT JOIN user_profiles up ON up.user_id = e.user_id
+        WHERE e.status <> 'terminated'
+        GROUP BY 1
+    ) h ON h.company_id = src.id
+    WHERE c.id = src.id
+      AND (c.employee_count, c.emirati_count)
+          IS DISTINCT FROM (COALESCE(h.total, 0)::int, COALESCE(h.nationals, 0)::int)
+""")
+
+# =============================================================================
+# VECTORIZED RATIO MATH
+# =============================================================================
+
+def nationals_ratio(nationals: np.ndarray, total: np.ndarray) -> np.ndarray:
+    """Nationals percentage, 0 where there are no employees"""
+    nationals = np.asarray(nationals, dtype=float)
+    total = np.asarray(total, dtype=float)
+    return np.divide(nationals * 100.0, total, out=np.zeros_like(total), where=total > 0)
+
+
+def nationals_needed(nationals: np.ndarray, total: np.ndarray, target: np.ndarray) -> np.ndarray:
+    """
+    National hires needed to reach the target percentage
+
+    Solves (N + x) / (T + x) >= t for the smallest whole x, assuming only
+    nationals are hired.
+    """
+    t = np.clip(np.asarray(target, dtype=float) / 100.0, 0.0, 0.9999)
+    shortfall = t * np.asarray(total, dtype=float) - np.asarray(nationals, dtype=float)
+    # Round first so float noise does not add a hire when the target is met exactly
+    needed = np.ceil(np.round(shortfall / (1.0 - t), 9))
+    return np.maximum(needed, 0).astype(np.int64)
+
+
+def compliance_status(ratio: np.ndarray, target: np.ndarray) -> np.ndarray:
+    """Compliance status per company, as stored in emiratization_quotas"""
+    ratio = np.asarray(ratio, dtype=float)
+    target = np.asarray(target, dtype=float)
+    return np.select(
+        [
+            ratio < target,
+            ratio < target + settings.EMIRATIZATION_AT_RISK_MARGIN,
+            ratio >= target + settings.EMIRATIZATION_EXCEEDING_MARGIN
+        ],
+        ["non_compliant", "at_risk", "exceeding"],
+        default="compliant"
+    )
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+class EmiratizationEngine:
+    """
+    Emiratization ratio engine over employee lifecycle records
+
+    Provides:
+    - Dense per-company, per-band headcount and nationals counters, rebuilt
+      with one GROUP BY over employees and user nationality
+    - Company headcount columns kept in step with the counters and reset
+      from employees on every rebuild
+    - Incremental counter updates from hire, termination and role-change
+      events, applied in batches
+    - Vectorized ratio, compliance and what-if projections, so a whole
+      sector is evaluated in one pass
+    - A daily recompute persisted to emiratization_quotas
+    """
+
+    def __init__(self):
+        self._reset()
+        self.last_rebuilt: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _reset(self) -> None:
+        """Clear all counters and indexes"""
+        self.company_ids: List[str] = []
+        self.company_index: Dict[str, int] = {}
+        self.bands: List[str] = [UNBANDED]
+        self.band_index: Dict[str, int] = {UNBANDED: 0}
+        self.sectors: List[str] = []
+        self.sector_index: Dict[str, int] = {}
+        self.company_sector = np.zeros(0, dtype=np.int64)
+        self.targets = np.zeros(0)
+        # Counters shaped (companies, bands)
+        self.total = np.zeros((0, 1), dtype=np.int64)
+        self.nationals = np.zeros((0, 1), dtype=np.int64)
+
+    # -------------------------------------------------------------------------
+    # Index management
+    # -------------------------------------------------------------------------
+
+    def _add_companies(self, company_ids: Sequence[str], sectors: Sequence[Optional[str]]) -> None:
+        """Register new companies, growing the counters once per batch"""
+        new = {}
+        for company_id, sector in zip(company_ids, sectors):
+            if company_id not in self.company_index and company_id not in new:
+                new[company_id] = self._sector(sector or "unknown")
+        if not new:
+            return
+        for company_id in new:
+            self.company_index[company_id] = len(self.company_ids)
+            self.company_ids.append(company_id)
+        self.company_sector = np.concatenate([self.company_sector, np.fromiter(new.values(), dtype=np.int64)])
+        self.targets = np.concatenate([self.targets, np.full(len(new), settings.EMIRATIZATION_DEFAULT_TARGET)])
+        padding = np.zeros((len(new), len(self.bands)), dtype=np.int64)
+        self.total = np.vstack([self.total, padding])
+        self.nationals = np.vstack([self.nationals, padding])
+
+    def _add_bands(self, bands: Sequence[Optional[str]]) -> None:
+        """Register new bands, growing the counters once per batch"""
+        new = [band for band in dict.fromkeys(band or UNBANDED for band in bands) if band not in self.band_index]
+        if not new:
+            return
+        for band in new:
+            self.band_index[band] = len(self.bands)
+            self.bands.append(band)
+        padding = np.zeros((len(self.company_ids), len(new)), dtype=np.int64)
+        self.total = np.hstack([self.total, padding])
+        self.nationals = np.hstack([self.nationals, padding])
+
+    def _sector(self, sector: str) -> int:
+        """Index of a sector"""
+        index = self.sector_index.get(sector)
+        if index is None:
+            index = len(self.sectors)
+            self.sectors.append(sector)
+            self.sector_index[sector] = index
+        return index
+
+    # -------------------------------------------------------------------------
+    # Rebuild & persistence
+    # -------------------------------------------------------------------------
+
+    async def rebuild(self) -> None:
+        """
+        Rebuild all counters from the source-of-truth tables
+
+        The companies.employee_count and emirati_count columns are reset from
+        employees too, undoing any drift from incremental updates.
+        """
+        year = datetime.utcnow().year
+        async with AsyncSessionLocal() as session:
+            reset = await session.execute(RESET_COMPANY_COUNTS_QUERY, {
+                "nationals": settings.EMIRATIZATION_NATIONALITY_CODES
+            })
+            await session.commit()
+            if reset.rowcount:
+                logger.info(f"Company headcounts corrected for {reset.rowcount} companies")
+            targets = (await session.execute(TARGETS_QUERY, {
+                "default_target": settings.EMIRATIZATION_DEFAULT_TARGET,
+                "year": year
+            })).all()
+            headcounts = (await session.execute(HEADCOUNT_QUERY, {
+                "unbanded": UNBANDED,
+                "nationals": settings.EMIRATIZATION_NATIONALITY_CODES
+            })).all()
+
+        async with self._lock:
+            self._reset()
+            self._add_companies([row.company_id for row in targets], [row.sector for row in targets])
+            self.targets[:] = [float(row.target) for row in targets]
+            self._add_companies([row.company_id for row in headcounts], [row.sector for row in headcounts])
+            self._add_bands([row.band for row in headcounts])
+
+            rows = [self.company_index[row.company_id] for row in headcounts]
+            cols = [self.band_index[row.band] for row in headcounts]
+            self.total[rows, cols] = [row.total for row in headcounts]
+            self.nationals[rows, cols] = [row.nationals for row in headcounts]
+            self.last_rebuilt = datetime.utcnow()
+
+        logger.info(
+            f"Emiratization counters rebuilt: {len(self.company_ids)} companies, "
+            f"{len(self.bands)} bands, {int(self.total.sum())} employees"
+        )
+
+    async def persist(self) -> int:
+        """Write current ratios and compliance to emiratization_quotas"""
+        if not self.company_ids:
+            return 0
+        total = self.total.sum(axis=1)
+        nationals = self.nationals.sum(axis=1)
+        ratio = nationals_ratio(nationals, total)
+        status = compliance_status(ratio, self.targets)
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(UPSERT_QUOTAS_QUERY, {
+                "year": datetime.utcnow().year,
+                "company_ids": self.company_ids,
+                "targets": self.targets.tolist(),
+                "currents": np.round(ratio, 2).tolist(),
+                "totals": total.tolist(),
+                "nationals": nationals.tolist(),
+                "compliants": (ratio >= self.targets).tolist(),
+                "statuses": status.tolist()
+            })
+            await session.commit()
+        return len(self.company_ids)
+
+    async def recompute(self) -> None:
+        """Daily recompute: rebuild counters and persist compliance"""
+        await self.rebuild()
+        persisted = await self.persist()
+        logger.info(f"Emiratization compliance recomputed for {persisted} companies")
+
+    # -------------------------------------------------------------------------
+    # Incremental events
+    # -------------------------------------------------------------------------
+
+    async def apply_events(self, events: Sequence[Dict[str, Any]]) -> int:
+        """
+        Apply lifecycle events to the counters
+
+        Each event has event_type (HIRED, TERMINATED or ROLE_CHANGED),
+        company_id and user_id, plus band (and previous_band for role changes).
+        is_national may be given; otherwise nationality is looked up for the
+        whole batch in one query.
+
+        Returns:
+            Number of events applied
+        """
+        if not events:
+            return 0
+
+        unknown = [e["user_id"] for e in events if e.get("is_national") is None]
+        national = {}
+        if unknown:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(NATIONALITY_QUERY, {
+                    "user_ids": unknown,
+                    "nationals": settings.EMIRATIZATION_NATIONALITY_CODES
+                })
+                national = {row.user_id: bool(row.is_national) for row in result}
+
+        rows, cols, deltas, is_national = [], [], [], []
+
+        async with self._lock:
+            self._add_companies([e["company_id"] for e in events], [e.get("sector") for e in events])
+            self._add_bands([e.get(key) for e in events for key in ("band", "previous_band")])
+            for event in events:
+                company = self.company_index[event["company_id"]]
+                flag = event.get("is_national")
+                flag = national.get(event["user_id"], False) if flag is None else bool(flag)
+                event_type = event["event_type"]
+
+                if event_type == HIRED:
+                    changes = [(event.get("band"), 1)]
+                elif event_type == TERMINATED:
+                    changes = [(event.get("band"), -1)]
+                elif event_type == ROLE_CHANGED:
+                    changes = [(event.get("previous_band"), -1), (event.get("band"), 1)]
+                else:
+                    logger.warning(f"Ignoring unknown lifecycle event type: {event_type}")
+                    continue
+
+                for band, delta in changes:
+                    rows.append(company)
+                    cols.append(self.band_index[band or UNBANDED])
+                    deltas.append(delta)
+                    is_national.append(flag)
+
+            if not rows:
+                return 0
+            deltas = np.array(deltas, dtype=np.int64)
+            np.add.at(self.total, (rows, cols), deltas)
+            np.add.at(self.nationals, (rows, cols), deltas * np.array(is_national, dtype=np.int64))
+            np.maximum(self.total, 0, out=self.total)
+            np.minimum(self.nationals, self.total, out=self.nationals)
+
+        # Keep the company headcount columns in step (role changes net to zero)
+        company_rows = np.array(rows, dtype=np.int64)
+        company_total = np.bincount(company_rows, weights=deltas, minlength=len(self.company_ids))
+        company_nationals = np.bincount(
+            company_rows, weights=deltas * np.array(is_national), minlength=len(self.company_ids)
+        )
+        changed = np.flatnonzero((company_total != 0) | (company_nationals != 0))
+        if len(changed):
+            try:
+                async with AsyncSessionLocal() as session:
+                    await session.execute(UPDATE_COMPANY_COUNTS_QUERY, {
+                        "company_ids": [self.company_ids[i] for i in changed],
+                        "totals": company_total[changed].astype(int).tolist(),
+                        "nationals": company_nationals[changed].astype(int).tolist()
+                    })
+                    await session.commit()
+            except Exception as e:
+                logger.warning(f"Failed to update company headcounts: {e}")
+
+        return len(events)
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def _indices(self, company_ids: Optional[Sequence[str]] = None, sector: Optional[str] = None) -> np.ndarray:
+        """Company indices for explicit ids or a whole sector"""
+        if company_ids is not None:
+            missing = [c for c in company_ids if c not in self.company_index]
+            if missing:
+                raise KeyError(f"Unknown companies: {', '.join(missing[:5])}")
+            return np.array([self.company_index[c] for c in company_ids], dtype=np.int64)
+        if sector is not None:
+            if sector not in self.sector_index:
+                raise KeyError(f"Unknown sector: {sector}")
+            return np.flatnonzero(self.company_sector == self.sector_index[sector])
+        return np.arange(len(self.company_ids))
+
+    def company_ratios(self, company_ids: Optional[Sequence[str]] = None, sector: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Nationals ratio per company, overall and by band"""
+        idx = self._indices(company_ids, sector)
+        total = self.total[idx]
+        nationals = self.nationals[idx]
+        band_ratio = nationals_ratio(nationals, total)
+        overall_total = total.sum(axis=1)
+        overall_nationals = nationals.sum(axis=1)
+        ratio = nationals_ratio(overall_nationals, overall_total)
+        targets = self.targets[idx]
+        status = compliance_status(ratio, targets)
+        needed = nationals_needed(overall_nationals, overall_total, targets)
+
+        return [
+            {
+                "company_id": self.company_ids[i],
+                "sector": self.sectors[self.company_sector[i]],
+                "total_employees": int(overall_total[k]),
+                "emirati_employees": int(overall_nationals[k]),
+                "ratio": round(float(ratio[k]), 2),
+                "target": float(targets[k]),
+                "compliance_status": str(status[k]),
+                "nationals_needed": int(needed[k]),
+                "bands": {
+                    self.bands[b]: {
+                        "total": int(total[k, b]),
+                        "nationals": int(nationals[k, b]),
+                        "ratio": round(float(band_ratio[k, b]), 2)
+                    }
+                    for b in np.flatnonzero(total[k])
+                }
+            }
+            for k, i in enumerate(idx)
+        ]
+
+    def sector_summary(self) -> List[Dict[str, Any]]:
+        """Nationals ratio and compliance counts per sector"""
+        n = len(self.sectors)
+        total = self.total.sum(axis=1)
+        nationals = self.nationals.sum(axis=1)
+        compliant = nationals_ratio(nationals, total) >= self.targets
+
+        sector_total = np.bincount(self.company_sector, weights=total, minlength=n)
+        sector_nationals = np.bincount(self.company_sector, weights=nationals, minlength=n)
+        companies = np.bincount(self.company_sector, minlength=n)
+        compliant_companies = np.bincount(self.company_sector, weights=compliant, minlength=n)
+        ratio = nationals_ratio(sector_nationals, sector_total)
+
+        # Band totals per sector: sum company rows into their sector
+        band_total = np.zeros((n, len(self.bands)), dtype=np.int64)
+        band_nationals = np.zeros((n, len(self.bands)), dtype=np.int64)
+        np.add.at(band_total, self.company_sector, self.total)
+        np.add.at(band_nationals, self.company_sector, self.nationals)
+        band_ratio = nationals_ratio(band_nationals, band_total)
+
+        return [
+            {
+                "sector": sector,
+                "companies": int(companies[s]),
+                "compliant_companies": int(compliant_companies[s]),
+                "total_employees": int(sector_total[s]),
+                "emirati_employees": int(sector_nationals[s]),
+                "ratio": round(float(ratio[s]), 2),
+                "bands": {
+                    self.bands[b]: round(float(band_ratio[s, b]), 2)
+                    for b in np.flatnonzero(band_total[s])
+                }
+            }
+            for s, sector in enumerate(self.sectors)
+        ]
+
+    def what_if(
+        self,
+        national_hires: Any = 0,
+        other_hires: Any = 0,
+        company_ids: Optional[Sequence[str]] = None,
+        sector: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Project ratios and compliance after planned hires
+
+        Args:
+            national_hires: Planned national hires, a scalar applied to every
+                company or one value per company
+            other_hires: Planned non-national hires, scalar or per company
+            company_ids: Companies to project (all when omitted)
+            sector: Project every company in a sector instead
+
+        Returns:
+            Current and projected ratio and status per company, plus totals
+        """
+        idx = self._indices(company_ids, sector)
+        national_hires = np.broadcast_to(np.asarray(national_hires, dtype=np.int64), idx.shape)
+        other_hires = np.broadcast_to(np.asarray(other_hires, dtype=np.int64), idx.shape)
+
+        total = self.total[idx].sum(axis=1)
+        nationals = self.nationals[idx].sum(axis=1)
+        targets = self.targets[idx]
+        projected_total = total + national_hires + other_hires
+        projected_nationals = nationals + national_hires
+
+        ratio = nationals_ratio(nationals, total)
+        projected_ratio = nationals_ratio(projected_nationals, projected_total)
+        status = compliance_status(ratio, targets)
+        projected_status = compliance_status(projected_ratio, targets)
+        needed = nationals_needed(projected_nationals, projected_total, targets)
+
+        return {
+            "companies": [
+                {
+                    "company_id": self.company_ids[i],
+                    "ratio": round(float(ratio[k]), 2),
+                    "projected_ratio": round(float(projected_ratio[k]), 2),
+                    "target": float(targets[k]),
+                    "compliance_status": str(status[k]),
+                    "projected_compliance_status": str(projected_status[k]),
+                    "nationals_still_needed": int(needed[k])
+                }
+                for k, i in enumerate(idx)
+            ],
+            "summary": {
+                "companies": int(len(idx)),
+                "compliant": int((ratio >= targets).sum()),
+                "projected_compliant": int((projected_ratio >= targets).sum()),
+                "ratio": round(float(nationals_ratio(nationals.sum(), total.sum())), 2),
+                "projected_ratio": round(float(nationals_ratio(projected_nationals.sum(), projected_total.sum())), 2)
+            }
+        }
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    async def _run(self) -> None:
+        """Recompute on the configured interval"""
+        while True:
+            await asyncio.sleep(settings.EMIRATIZATION_RECOMPUTE_HOURS * 3600)
+            try:
+                await self.recompute()
+            except Exception as e:
+                logger.error(f"Emiratization recompute failed: {e}")
+
+    async def start(self) -> None:
+        """Build the counters and schedule the daily recompute"""
+        try:
+            await self.rebuild()
+        except Exception as e:
+            logger.warning(f"Emiratization counters not built at startup: {e}")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the recompute schedule"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# =============================================================================
+# GLOBAL ENGINE INSTANCE
+# =============================================================================
+
+_emiratization_engine: EmiratizationEngine = None
+
+
+def get_emiratization_engine() -> EmiratizationEngine:
+    """Get global Emiratization engine instance"""
+    global _emiratization_engine
+    if _emiratization_engine is None:
+        _emiratization_engine = EmiratizationEngine()
+    return _emiratization_engine
@@ -6,12 +6,17 @@ from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict, Any
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime, date
 from enum import Enum
 import uuid
 import logging
 
+from database import AsyncSessionLocal
+from emiratization import get_emiratization_engine, HIRED, TERMINATED, ROLE_CHANGED
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -91,9 +96,11 @@ class EmployeeBase(BaseModel):
     reporting_manager_id: Optional[str] = None
     work_location: Optional[str] = None
     probation_period_months: int = Field(6, ge=0, le=24)
+    salary_grade: Optional[str] = Field(None, description="Salary grade, the Emiratization band")
+    employee_number: Optional[str] = Field(None, description="Company employee number, generated when omitted")
 
 class EmployeeCreate(EmployeeBase):
-    pass
+    employment_status: EmploymentStatus = EmploymentStatus.ACTIVE
 
 class EmployeeUpdate(BaseModel):
     department_id: Optional[str] = None
@@ -223,6 +230,53 @@ class OffboardingChecklist(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class EmiratizationEventType(str, Enum):
+    HIRED = HIRED
+    TERMINATED = TERMINATED
+    ROLE_CHANGED = ROLE_CHANGED
+
+class EmiratizationEvent(BaseModel):
+    event_type: EmiratizationEventType
+    company_id: str
+    user_id: str
+    band: Optional[str] = Field(None, description="Salary grade after the event")
+    previous_band: Optional[str] = Field(None, description="Salary grade before a role change")
+    is_national: Optional[bool] = Field(None, description="Looked up from the user profile when omitted")
+    sector: Optional[str] = None
+
+class EmiratizationWhatIf(BaseModel):
+    company_ids: Optional[List[str]] = None
+    sector: Optional[str] = None
+    national_hires: Union[int, List[int]] = Field(0, description="One value for all companies or one per company")
+    other_hires: Union[int, List[int]] = 0
+
+# =============================================================================
+# QUERIES
+# =============================================================================
+
+INSERT_EMPLOYEE_QUERY = text("""
+    INSERT INTO employees (
+        id, user_id, company_id, employee_number, hire_date, status, department,
+        position, employment_type, manager_id, salary_grade, work_location
+    )
+    VALUES (
+        :id, :user_id, :company_id, :employee_number, :hire_date, :status, :department,
+        :position, :employment_type, :manager_id, :salary_grade, :work_location
+    )
+""")
+
+# Values allowed by employees.chk_employee_status
+EMPLOYEE_STATUS_COLUMN = {
+    EmploymentStatus.ACTIVE, EmploymentStatus.ON_LEAVE,
+    EmploymentStatus.SUSPENDED, EmploymentStatus.TERMINATED
+}
+
+# employees.employment_type has no internship or consultant values
+EMPLOYMENT_TYPE_COLUMN = {
+    EmploymentType.INTERNSHIP: "intern",
+    EmploymentType.CONSULTANT: "contract"
+}
+
 # =============================================================================
 # AUTHENTICATION & AUTHORIZATION
 # =============================================================================
@@ -266,10 +320,53 @@ async def create_employee(
     """
     logger.info(f"Creating employee for user_id: {employee.user_id}")
 
-    # TODO: Save to PostgreSQL database
     # TODO: Publish noor.users.employment.hired event to Kafka
 
+    if employee.employment_status not in EMPLOYEE_STATUS_COLUMN:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Employment status '{employee.employment_status.value}' cannot be recorded for a new employee"
+        )
+
     new_employee = Employee(**employee.dict())
+    new_employee.employee_number = new_employee.employee_number or f"EMP-{new_employee.id[:8].upper()}"
+
+    try:
+        async with AsyncSessionLocal() as session:
+            await session.execute(INSERT_EMPLOYEE_QUERY, {
+                "id": new_employee.id,
+                "user_id": new_employee.user_id,
+                "company_id": new_employee.company_id,
+                "employee_number": new_employee.employee_number,
+                "hire_date": new_employee.start_date,
+                "status": new_employee.employment_status.value,
+                "department": new_employee.department_id,
+                "position": new_employee.role_id,
+                "employment_type": EMPLOYMENT_TYPE_COLUMN.get(
+                    new_employee.employment_type, new_employee.employment_type.value
+                ),
+                "manager_id": new_employee.reporting_manager_id,
+                "salary_grade": new_employee.salary_grade,
+                "work_location": new_employee.work_location
+            })
+            await session.commit()
+    except IntegrityError as e:
+        logger.warning(f"Employee not created for user_id {employee.user_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Employee number already in use, or unknown user or company"
+        )
+
+    # Counted only once the row exists, so rebuilds from employees agree
+    try:
+        await get_emiratization_engine().apply_events([{
+            "event_type": HIRED,
+            "company_id": new_employee.company_id,
+            "user_id": new_employee.user_id,
+            "band": new_employee.salary_grade
+        }])
+    except Exception as e:
+        logger.warning(f"Emiratization counters not updated for hire: {e}")
 
     return new_employee
 
@@ -492,6 +589,74 @@ async def complete_offboarding_task(
 
     return {"status": "success", "message": "Task marked as complete"}
 
+# =============================================================================
+# API ENDPOINTS - EMIRATIZATION
+# =============================================================================
+
+@app.get("/api/v1/emiratization/companies/{company_id}")
+async def get_company_emiratization(
+    company_id: str,
+    user: Dict[str, Any] = Depends(verify_token)
+):
+    """Nationals ratio of a company, overall and by band"""
+    try:
+        return get_emiratization_engine().company_ratios(company_ids=[company_id])[0]
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+@app.get("/api/v1/emiratization/sectors")
+async def get_sector_emiratization(user: Dict[str, Any] = Depends(verify_token)):
+    """Nationals ratio and compliant company counts per sector"""
+    return get_emiratization_engine().sector_summary()
+
+@app.get("/api/v1/emiratization/sectors/{sector}/companies")
+async def get_sector_companies_emiratization(
+    sector: str,
+    user: Dict[str, Any] = Depends(verify_token)
+):
+    """Nationals ratio of every company in a sector"""
+    try:
+        return get_emiratization_engine().company_ratios(sector=sector)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Sector not found")
+
+@app.post("/api/v1/emiratization/what-if")
+async def emiratization_what_if(
+    request: EmiratizationWhatIf,
+    user: Dict[str, Any] = Depends(verify_token)
+):
+    """
+    Project ratios and compliance after planned hires.
+    Omit company_ids and sector to project every company.
+    """
+    try:
+        return get_emiratization_engine().what_if(
+            national_hires=request.national_hires,
+            other_hires=request.other_hires,
+            company_ids=request.company_ids,
+            sector=request.sector
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Hire counts must be one value or one per company")
+
+@app.post("/api/v1/emiratization/events")
+async def record_emiratization_events(
+    events: List[EmiratizationEvent],
+    user: Dict[str, Any] = Depends(require_hr_role)
+):
+    """Apply hire, termination and role-change events to the counters"""
+    applied = await get_emiratization_engine().apply_events([event.dict() for event in events])
+    return {"status": "success", "applied": applied}
+
+@app.post("/api/v1/emiratization/recompute")
+async def recompute_emiratization(user: Dict[str, Any] = Depends(require_hr_role)):
+    """Rebuild counters from employee records and persist compliance"""
+    engine = get_emiratization_engine()
+    await engine.recompute()
+    return {"status": "success", "companies": len(engine.company_ids), "recomputed_at": engine.last_rebuilt}
+
 # =============================================================================
 # HEALTH CHECK
 # =============================================================================
@@ -529,6 +694,7 @@ async def startup_event():
     # TODO: Initialize MongoDB connection
     # TODO: Initialize Kafka producer
     # TODO: Initialize Redis cache
+    await get_emiratization_engine().start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -537,6 +703,7 @@ async def shutdown_event():
     # TODO: Close database connections
     # TODO: Close Kafka producer
     # TODO: Close Redis connection
+    await get_emiratization_engine().stop()
 
 if __name__ == "__main__":
     import uvicorn
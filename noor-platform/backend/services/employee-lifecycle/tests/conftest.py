@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The service's modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Required settings; no connection is opened by the unit tests
+for name in ("POSTGRES_PASSWORD", "MONGODB_PASSWORD", "JWT_SECRET_KEY"):
+    os.environ.setdefault(name, "test")
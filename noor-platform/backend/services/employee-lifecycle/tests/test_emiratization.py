@@ -0,0 +1,149 @@
+"""
+Unit tests for the Emiratization ratio engine
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import emiratization
+from emiratization import (
+    HIRED, NATIONALITY_QUERY, ROLE_CHANGED, TERMINATED, UPDATE_COMPANY_COUNTS_QUERY,
+    EmiratizationEngine, nationals_needed, nationals_ratio
+)
+
+
+class FakeSession:
+    """Records executed statements; answers nationality lookups"""
+
+    def __init__(self, executed, nationals):
+        self.executed = executed
+        self.nationals = nationals
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params):
+        self.executed.append((query, params))
+        if query is NATIONALITY_QUERY:
+            return [
+                SimpleNamespace(user_id=user_id, is_national=user_id in self.nationals)
+                for user_id in params["user_ids"]
+            ]
+        return SimpleNamespace(rowcount=0)
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def executed(monkeypatch):
+    statements = []
+    monkeypatch.setattr(
+        emiratization, "AsyncSessionLocal", lambda: FakeSession(statements, nationals={"u-national"})
+    )
+    return statements
+
+
+def event(event_type, company_id="c1", user_id="u1", band="G1", is_national=None, **extra):
+    return {
+        "event_type": event_type, "company_id": company_id, "user_id": user_id,
+        "band": band, "is_national": is_national, **extra
+    }
+
+
+def test_nationals_ratio_is_zero_without_employees():
+    ratio = nationals_ratio(np.array([1, 0, 3]), np.array([4, 0, 3]))
+
+    assert ratio.tolist() == [25.0, 0.0, 100.0]
+
+
+@pytest.mark.parametrize("nationals, total, target, needed", [
+    (1, 10, 20, 2),     # (1 + 2) / 12 = 25%; one hire reaches only 18%
+    (2, 10, 20, 0),     # Exactly on target
+    (5, 10, 20, 0),     # Above target
+    (0, 0, 10, 0),      # No employees counts as no shortfall
+    (3, 4, 50, 0),
+    (0, 4, 50, 4)
+])
+def test_nationals_needed_is_the_smallest_whole_hire_count(nationals, total, target, needed):
+    assert nationals_needed(np.array([nationals]), np.array([total]), np.array([target])).tolist() == [needed]
+
+
+def test_events_update_band_counters(executed):
+    engine = EmiratizationEngine()
+    applied = asyncio.run(engine.apply_events([
+        event(HIRED, user_id="u1", is_national=True),
+        event(HIRED, user_id="u2", is_national=False),
+        event(HIRED, user_id="u3", band=None, is_national=False),
+        event(ROLE_CHANGED, user_id="u1", band="G2", previous_band="G1", is_national=True),
+        event(TERMINATED, user_id="u2", is_national=False),
+        event("PROMOTED", user_id="u4", is_national=True)
+    ]))
+
+    assert applied == 6
+    bands = {band: i for i, band in enumerate(engine.bands)}
+    row = engine.company_index["c1"]
+    assert engine.total[row, bands["G1"]] == 0
+    assert engine.total[row, bands["G2"]] == engine.nationals[row, bands["G2"]] == 1
+    assert engine.total[row, bands[emiratization.UNBANDED]] == 1
+    assert engine.nationals[row].sum() == 1
+
+
+def test_unknown_nationality_is_looked_up_once_per_batch(executed):
+    engine = EmiratizationEngine()
+    asyncio.run(engine.apply_events([
+        event(HIRED, user_id="u-national"),
+        event(HIRED, user_id="u-other"),
+        event(HIRED, user_id="u-flagged", is_national=True)
+    ]))
+
+    lookups = [params for query, params in executed if query is NATIONALITY_QUERY]
+    assert [params["user_ids"] for params in lookups] == [["u-national", "u-other"]]
+    assert engine.nationals.sum() == 2
+
+
+def test_company_headcounts_are_updated_for_changed_companies_only(executed):
+    engine = EmiratizationEngine()
+    asyncio.run(engine.apply_events([
+        event(HIRED, company_id="c1", is_national=True),
+        event(HIRED, company_id="c2", is_national=False),
+        event(ROLE_CHANGED, company_id="c3", band="G2", previous_band="G1", is_national=True)
+    ]))
+
+    updates = [params for query, params in executed if query is UPDATE_COMPANY_COUNTS_QUERY]
+    assert updates == [{"company_ids": ["c1", "c2"], "totals": [1, 1], "nationals": [1, 0]}]
+
+
+def test_what_if_projects_planned_hires(executed):
+    engine = EmiratizationEngine()
+    asyncio.run(engine.apply_events(
+        [event(HIRED, company_id="c1", user_id=f"n{i}", is_national=True) for i in range(1)] +
+        [event(HIRED, company_id="c1", user_id=f"o{i}", is_national=False) for i in range(9)] +
+        [event(HIRED, company_id="c2", user_id=f"o{i}", is_national=False) for i in range(4)]
+    ))
+    engine.targets[:] = [20.0, 20.0]
+
+    projection = engine.what_if(national_hires=[2, 1], other_hires=0)
+
+    c1, c2 = projection["companies"]
+    assert (c1["ratio"], c1["projected_ratio"]) == (10.0, 25.0)
+    assert (c1["compliance_status"], c1["projected_compliance_status"]) == ("non_compliant", "exceeding")
+    assert c1["nationals_still_needed"] == 0
+    assert (c2["projected_ratio"], c2["nationals_still_needed"]) == (20.0, 0)
+    assert projection["summary"] == {
+        "companies": 2, "compliant": 0, "projected_compliant": 2,
+        "ratio": round(100 / 14, 2), "projected_ratio": round(400 / 17, 2)
+    }
+
+
+def test_what_if_rejects_unknown_companies(executed):
+    engine = EmiratizationEngine()
+
+    with pytest.raises(KeyError):
+        engine.what_if(national_hires=1, company_ids=["missing"])